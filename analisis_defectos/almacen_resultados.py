@@ -0,0 +1,218 @@
+"""Almacén de resultados de análisis versionado y direccionado por contenido.
+
+Modo no destructivo de `analizar_rollo`: las imágenes originales se quedan en la
+carpeta del rollo y las salidas (imagen anotada, medidas .txt y tipos .json) se
+escriben en un directorio de resultados con esta estructura:
+
+    <ruta>/objetos/<ab>/<clave>/      salidas de una imagen + resultado.json
+    <ruta>/rollos/<rollo>/v000001.json  manifiesto de cada análisis del rollo
+    <ruta>/rollos/<rollo>/actual        versión vigente del rollo
+
+La clave de cada objeto es el SHA-256 del contenido de la imagen y de todo lo que
+influye en el resultado (etiquetas de la imagen, umbral, calibración y versión del
+algoritmo): si ya existe, el resultado se reutiliza sin volver a procesar la imagen.
+Restablecer un rollo solo borra su puntero 'actual'; no se mueve ni borra ningún archivo.
+"""
+import os
+import json
+import uuid
+import shutil
+import hashlib
+from datetime import datetime
+
+# Cambiar si se modifica el algoritmo de segmentación: invalida los resultados reutilizables
+VERSION_ALGORITMO = 1
+# Carpeta de resultados por defecto, dentro de la carpeta raíz de los rollos
+DIR_RESULTADOS_POR_DEFECTO = ".isli_resultados"
+
+
+def _escribir_json_atomico(ruta, datos):
+    temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+class AlmacenResultados:
+    """
+    Directorio de resultados versionado y direccionado por contenido.
+
+    Args:
+        ruta (str): Carpeta raíz del almacén (se crea si no existe).
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.dir_objetos = os.path.join(ruta, "objetos")
+        self.dir_rollos = os.path.join(ruta, "rollos")
+        os.makedirs(self.dir_objetos, exist_ok=True)
+        os.makedirs(self.dir_rollos, exist_ok=True)
+
+    # --- Objetos (resultado de una imagen) ---
+
+    @staticmethod
+    def clave_resultado(ruta_imagen, entrada, area_umbral, pixel_to_mm):
+        """
+        Calcula la clave de contenido del resultado de una imagen.
+
+        Args:
+            ruta_imagen (str): Imagen original.
+            entrada (dict): Entrada del JSON de etiquetas correspondiente a la imagen.
+            area_umbral (float): Umbral de área (mm²).
+            pixel_to_mm (float): Calibración de la cámara.
+        """
+        h = hashlib.sha256()
+        with open(ruta_imagen, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+        parametros = {
+            "entrada": entrada,
+            "area_umbral": area_umbral,
+            "pixel_to_mm": pixel_to_mm,
+            "version": VERSION_ALGORITMO
+        }
+        h.update(json.dumps(parametros, sort_keys=True).encode("utf-8"))
+        return h.hexdigest()
+
+    def ruta_objeto(self, clave):
+        return os.path.join(self.dir_objetos, clave[:2], clave)
+
+    def obtener(self, clave):
+        """
+        Devuelve el resultado ya calculado para la clave, o None si no existe.
+
+        Returns:
+            dict | None: 'nombre_archivo', 'areas_mm2', 'tipos', 'clave' y 'ruta_procesada'.
+        """
+        carpeta = self.ruta_objeto(clave)
+        try:
+            with open(os.path.join(carpeta, "resultado.json"), "r", encoding="utf-8") as f:
+                resultado = json.load(f)
+        except (OSError, ValueError):
+            return None
+        resultado["clave"] = clave
+        resultado["ruta_procesada"] = os.path.join(carpeta, resultado["nombre_archivo"])
+        return resultado
+
+    def preparar(self, clave):
+        """Crea y devuelve una carpeta temporal donde escribir las salidas de la imagen."""
+        temporal = os.path.join(self.dir_objetos, f".tmp-{clave[:16]}-{uuid.uuid4().hex}")
+        os.makedirs(temporal)
+        return temporal
+
+    def confirmar(self, clave, carpeta_temporal, nombre_archivo, areas_mm2, tipos):
+        """
+        Publica las salidas escritas en `carpeta_temporal` como objeto de la clave.
+
+        Si otro proceso publicó la misma clave mientras tanto, se conserva el existente.
+
+        Returns:
+            dict: Resultado con el mismo formato que `obtener`.
+        """
+        _escribir_json_atomico(
+            os.path.join(carpeta_temporal, "resultado.json"),
+            {"nombre_archivo": nombre_archivo, "areas_mm2": areas_mm2, "tipos": tipos}
+        )
+        destino = self.ruta_objeto(clave)
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        try:
+            os.rename(carpeta_temporal, destino)
+        except OSError:
+            if not os.path.isdir(destino):
+                raise
+            shutil.rmtree(carpeta_temporal, ignore_errors=True)
+        return self.obtener(clave)
+
+    # --- Versiones por rollo ---
+
+    def _dir_rollo(self, rollo):
+        return os.path.join(self.dir_rollos, rollo)
+
+    def versiones(self, rollo):
+        """Números de versión registrados para el rollo, en orden."""
+        try:
+            nombres = os.listdir(self._dir_rollo(rollo))
+        except FileNotFoundError:
+            return []
+        return sorted(int(n[1:-5]) for n in nombres if n.startswith("v") and n.endswith(".json"))
+
+    def registrar_version(self, rollo, resultados, parametros):
+        """
+        Guarda el manifiesto de un análisis completo del rollo y lo marca como versión vigente.
+
+        Args:
+            rollo (str): Nombre del rollo.
+            resultados (list[dict]): Resultados por imagen (con su 'clave').
+            parametros (dict): Parámetros del análisis (umbral, calibración...).
+
+        Returns:
+            int: Número de la nueva versión.
+        """
+        carpeta = self._dir_rollo(rollo)
+        os.makedirs(carpeta, exist_ok=True)
+        version = (self.versiones(rollo) or [0])[-1] + 1
+        manifiesto = {
+            "rollo": rollo,
+            "version": version,
+            "fecha": datetime.now().isoformat(),
+            "parametros": parametros,
+            "imagenes": [
+                {
+                    "nombre_archivo": r["nombre_archivo"],
+                    "clave": r["clave"],
+                    "areas_mm2": r["areas_mm2"],
+                    "tipos": r["tipos"]
+                }
+                for r in resultados
+            ]
+        }
+        _escribir_json_atomico(os.path.join(carpeta, f"v{version:06d}.json"), manifiesto)
+        self._fijar_actual(rollo, version)
+        return version
+
+    def _fijar_actual(self, rollo, version):
+        ruta = os.path.join(self._dir_rollo(rollo), "actual")
+        temporal = f"{ruta}.{uuid.uuid4().hex}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(str(version))
+        os.replace(temporal, ruta)
+
+    def version_actual(self, rollo):
+        """Versión vigente del rollo, o None si no tiene (nunca analizado o restablecido)."""
+        try:
+            with open(os.path.join(self._dir_rollo(rollo), "actual"), "r", encoding="utf-8") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def cargar_version(self, rollo, version=None):
+        """
+        Devuelve el manifiesto de una versión (por defecto, la vigente) o None.
+
+        Cada imagen del manifiesto incluye 'ruta_procesada', resuelta en el almacén de objetos.
+        """
+        version = version if version is not None else self.version_actual(rollo)
+        if version is None:
+            return None
+        try:
+            with open(os.path.join(self._dir_rollo(rollo), f"v{version:06d}.json"), "r", encoding="utf-8") as f:
+                manifiesto = json.load(f)
+        except (OSError, ValueError):
+            return None
+        for imagen in manifiesto["imagenes"]:
+            imagen["ruta_procesada"] = os.path.join(self.ruta_objeto(imagen["clave"]), imagen["nombre_archivo"])
+        return manifiesto
+
+    def rollos_con_version_actual(self):
+        """Rollos que tienen una versión vigente."""
+        try:
+            nombres = os.listdir(self.dir_rollos)
+        except FileNotFoundError:
+            return []
+        return [n for n in nombres if os.path.exists(os.path.join(self.dir_rollos, n, "actual"))]
+
+    def restablecer(self, rollo):
+        """Quita la versión vigente del rollo (los resultados siguen disponibles para reutilizarse)."""
+        try:
+            os.remove(os.path.join(self._dir_rollo(rollo), "actual"))
+        except FileNotFoundError:
+            pass
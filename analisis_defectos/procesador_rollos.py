@@ -4,8 +4,98 @@ import json
 import cv2
 import numpy as np
 from analisis_defectos.blackspots_segmentation import BlackSpotsSegmentation
+from analisis_defectos.restauracion_rollos import DiarioRollos
 
-def analizar_rollo(base_path: str, rollo: str, json_filename: str = "formaspack_test_black_dots.json", area_umbral: float = 1.0, pixel_to_mm: float = 0.13379797308):
+def _procesar_imagen(procesador, ruta_img, entrada, area_umbral, pixel_to_mm, carpeta_salida):
+    """
+    Segmenta los defectos de una imagen y escribe sus salidas en `carpeta_salida`:
+    la imagen anotada, el .txt con el área de cada defecto y el .json con los tipos.
+
+    Returns:
+        tuple[list[float], list[str]]: Áreas de los defectos (mm²) y tipos únicos detectados.
+    """
+    nombre_img = entrada["originalFileName"]
+    imagen = cv2.imread(ruta_img, cv2.IMREAD_GRAYSCALE)
+    imagen_vis = cv2.cvtColor(imagen.copy(), cv2.COLOR_GRAY2RGB)
+
+    # Inicializar máscara para acumulación de defectos
+    mascara_total = np.zeros_like(imagen, dtype=np.uint8)
+
+    for crop in entrada.get("crops", []):
+        if crop["imageObjectId"] not in ["punto-negro", "pegote-cascarilla"]:
+            continue
+
+        x1 = max(0, crop["rect"]["x"])
+        y1 = max(0, crop["rect"]["y"])
+        x2 = min(imagen.shape[1], x1 + crop["rect"]["w"])
+        y2 = min(imagen.shape[0], y1 + crop["rect"]["h"])
+
+        subimg = imagen[y1:y2, x1:x2].copy()
+        print(f"Aplicando umbral dinámico de usuario: {area_umbral} mm²")
+        blackspots, _ = procesador.blackspot_segmentation_and_classification_by_size(
+            subimg, area_umbral, pixel_to_mm, return_visualization=False)
+
+        # Insertar el crop segmentado en su posición original
+        mascara_total[y1:y2, x1:x2] = np.logical_or(mascara_total[y1:y2, x1:x2], blackspots).astype(np.uint8)
+
+        ok, nok = procesador.blackspot_filter_by_size(blackspots, area_umbral, pixel_to_mm)
+        imagen_vis = procesador.create_visualization(imagen_vis, ok, nok, pixel_to_mm, crop_area=[x1, y1, x2, y2])
+
+    # Dibujar bounding boxes
+    for crop in entrada.get("crops", []):
+        if crop["imageObjectId"] in ["punto-negro", "pegote-cascarilla"]:
+            imagen_vis = procesador.draw_bounding_box(imagen_vis, crop["rect"], crop["imageObjectId"])
+
+    # Guardar imagen visual
+    cv2.imwrite(os.path.join(carpeta_salida, nombre_img), imagen_vis)
+
+    # Guardar archivo de mediciones
+    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mascara_total)
+    areas_mm2 = []
+    with open(os.path.join(carpeta_salida, nombre_img + ".txt"), "w", encoding="utf-8") as f_medidas:
+        for idx, (area, centroid) in enumerate(zip(stats[:, cv2.CC_STAT_AREA], centroids[:])):
+            if idx == 0:
+                continue
+            area_mm = area * pixel_to_mm * pixel_to_mm
+            f_medidas.write(f"{idx} {area_mm:.2f}mm2\n")
+            areas_mm2.append(round(float(area_mm), 2))
+
+    # Crear estructura con tipos de defecto
+    tipos_detectados = []
+
+    for crop in entrada.get("crops", []):
+        tipo = crop.get("imageObjectId")
+        if tipo in ["punto-negro", "pegote-cascarilla"]:
+            tipos_detectados.append(tipo)
+
+    # Guardar solo los tipos únicos
+    tipos_unicos = list(set(tipos_detectados))
+
+    # Guardar JSON con tipos
+    json_tipo_path = os.path.join(carpeta_salida, nombre_img + ".json")
+    with open(json_tipo_path, "w", encoding="utf-8") as f_json:
+        json.dump({"tipos": tipos_unicos}, f_json, indent=2, ensure_ascii=False)
+
+    return areas_mm2, tipos_unicos
+
+
+def _resultado_desde_almacen(almacen, procesador, ruta_img, entrada, area_umbral, pixel_to_mm):
+    """Reutiliza el resultado de la imagen si ya está en el almacén; si no, la procesa y lo publica."""
+    clave = almacen.clave_resultado(ruta_img, entrada, area_umbral, pixel_to_mm)
+    resultado = almacen.obtener(clave)
+    if resultado is None:
+        carpeta_temporal = almacen.preparar(clave)
+        try:
+            areas_mm2, tipos = _procesar_imagen(procesador, ruta_img, entrada, area_umbral, pixel_to_mm, carpeta_temporal)
+            resultado = almacen.confirmar(clave, carpeta_temporal, entrada["originalFileName"], areas_mm2, tipos)
+        finally:
+            shutil.rmtree(carpeta_temporal, ignore_errors=True)
+    else:
+        print(f"Resultado reutilizado para {entrada['originalFileName']}")
+    return resultado
+
+
+def analizar_rollo(base_path: str, rollo: str, json_filename: str = "formaspack_test_black_dots.json", area_umbral: float = 1.0, pixel_to_mm: float = 0.13379797308, progreso=None, al_procesar=None, cancelado=None, almacen=None):
     """
     Procesa un rollo de imágenes industriales detectando defectos visuales y generando resultados para inspección.
 
@@ -15,7 +105,9 @@ def analizar_rollo(base_path: str, rollo: str, json_filename: str = "formaspack_
     - Archivos .txt con medidas de cada defecto en mm².
     - Archivos .json con los tipos de defectos encontrados.
 
-    Además, mueve las imágenes originales a una carpeta separada.
+    Por defecto mueve las imágenes originales a una carpeta separada. Si se indica `almacen`,
+    las originales no se tocan y las salidas se guardan en el almacén de resultados
+    versionado, reutilizando las de imágenes ya analizadas con los mismos parámetros.
 
     Args:
         base_path (str): Ruta raíz donde se encuentran el archivo JSON y las carpetas de rollos.
@@ -23,11 +115,25 @@ def analizar_rollo(base_path: str, rollo: str, json_filename: str = "formaspack_
         json_filename (str): Nombre del archivo JSON con las etiquetas (por defecto, 'formaspack_test_black_dots.json').
         area_umbral (float): Área máxima tolerable para un defecto (en milímetros cuadrados).
         pixel_to_mm (float): Factor de conversión de píxeles a milímetros (calibrado para la cámara).
+        progreso (callable, opcional): Función `progreso(procesadas, total)` invocada tras cada imagen.
+        al_procesar (callable, opcional): Función `al_procesar(resultado, procesadas, total)` que recibe
+            el resultado de cada imagen en cuanto se termina de procesar.
+        cancelado (callable, opcional): Función sin argumentos que se consulta antes de cada imagen;
+            si devuelve True el análisis se detiene y se devuelven los resultados obtenidos hasta entonces.
+        almacen (AlmacenResultados, opcional): Activa el modo no destructivo. Al completar el rollo
+            se registra una nueva versión de sus resultados.
+
+    Returns:
+        list[dict]: Un resultado por imagen procesada con 'nombre_archivo', 'areas_mm2', 'tipos',
+        'ruta_original' y 'ruta_procesada' (y 'clave' en modo no destructivo).
 
     Side Effects:
+        Sin `almacen`:
+        - Anota el rollo en el diario de la carpeta raíz (`DiarioRollos`) para poder restaurarlo.
         - Crea carpetas 'procesado' y 'originales' dentro del rollo.
         - Genera archivos visuales, de medidas (.txt) y etiquetas (.json) en 'procesado'.
         - Mueve imágenes originales a 'originales'.
+        Con `almacen`: solo escribe en el almacén de resultados.
 
     """
     ruta_json = os.path.join(base_path, json_filename)
@@ -35,8 +141,10 @@ def analizar_rollo(base_path: str, rollo: str, json_filename: str = "formaspack_
     carpeta_procesado = os.path.join(ruta_rollo, "procesado")
     carpeta_originales = os.path.join(ruta_rollo, "originales")
 
-    os.makedirs(carpeta_procesado, exist_ok=True)
-    os.makedirs(carpeta_originales, exist_ok=True)
+    if almacen is None:
+        DiarioRollos(base_path).registrar(rollo)
+        os.makedirs(carpeta_procesado, exist_ok=True)
+        os.makedirs(carpeta_originales, exist_ok=True)
 
     print("Analizando imágenes en:", ruta_rollo)
 
@@ -46,75 +154,46 @@ def analizar_rollo(base_path: str, rollo: str, json_filename: str = "formaspack_
     nombres_imagenes = [f for f in os.listdir(ruta_rollo) if f.lower().endswith((".jpg", ".jpeg", ".png", ".bmp"))]
     procesador = BlackSpotsSegmentation(True)
 
-    for entrada in etiquetas:
-        if entrada["labelSource"] not in ["manual", "ground-truth"]:
-            continue
+    entradas = [
+        entrada for entrada in etiquetas
+        if entrada["labelSource"] in ["manual", "ground-truth"] and entrada["originalFileName"] in nombres_imagenes
+    ]
+    resultados = []
 
-        nombre_img = entrada["originalFileName"]
-        if nombre_img not in nombres_imagenes:
-            continue
+    for num_entrada, entrada in enumerate(entradas, start=1):
+        if cancelado is not None and cancelado():
+            print("Análisis cancelado para:", rollo)
+            return resultados
 
+        nombre_img = entrada["originalFileName"]
         ruta_img = os.path.join(ruta_rollo, nombre_img)
-        imagen = cv2.imread(ruta_img, cv2.IMREAD_GRAYSCALE)
-        imagen_vis = cv2.cvtColor(imagen.copy(), cv2.COLOR_GRAY2RGB)
-
-        # Inicializar máscara para acumulación de defectos
-        mascara_total = np.zeros_like(imagen, dtype=np.uint8)
-
-        for crop in entrada.get("crops", []):
-            if crop["imageObjectId"] not in ["punto-negro", "pegote-cascarilla"]:
-                continue
 
-            x1 = max(0, crop["rect"]["x"])
-            y1 = max(0, crop["rect"]["y"])
-            x2 = min(imagen.shape[1], x1 + crop["rect"]["w"])
-            y2 = min(imagen.shape[0], y1 + crop["rect"]["h"])
-
-            subimg = imagen[y1:y2, x1:x2].copy()
-            print(f"Aplicando umbral dinámico de usuario: {area_umbral} mm²")
-            blackspots, _ = procesador.blackspot_segmentation_and_classification_by_size(
-                subimg, area_umbral, pixel_to_mm, return_visualization=False)
-
-            # Insertar el crop segmentado en su posición original
-            mascara_total[y1:y2, x1:x2] = np.logical_or(mascara_total[y1:y2, x1:x2], blackspots).astype(np.uint8)
-
-            ok, nok = procesador.blackspot_filter_by_size(blackspots, area_umbral, pixel_to_mm)
-            imagen_vis = procesador.create_visualization(imagen_vis, ok, nok, pixel_to_mm, crop_area=[x1, y1, x2, y2])
-
-        # Dibujar bounding boxes
-        for crop in entrada.get("crops", []):
-            if crop["imageObjectId"] in ["punto-negro", "pegote-cascarilla"]:
-                imagen_vis = procesador.draw_bounding_box(imagen_vis, crop["rect"], crop["imageObjectId"])
-
-        # Guardar imagen visual
-        cv2.imwrite(os.path.join(carpeta_procesado, nombre_img), imagen_vis)
-
-        # Guardar archivo de mediciones
-        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mascara_total)
-        with open(os.path.join(carpeta_procesado, nombre_img + ".txt"), "w", encoding="utf-8") as f_medidas:
-            for idx, (area, centroid) in enumerate(zip(stats[:, cv2.CC_STAT_AREA], centroids[:])):
-                if idx == 0:
-                    continue
-                area_mm = area * pixel_to_mm * pixel_to_mm
-                f_medidas.write(f"{idx} {area_mm:.2f}mm2\n")
-        
-        # Crear estructura con tipos de defecto
-        tipos_detectados = []
-
-        for crop in entrada.get("crops", []):
-            tipo = crop.get("imageObjectId")
-            if tipo in ["punto-negro", "pegote-cascarilla"]:
-                tipos_detectados.append(tipo)
-
-        # Guardar solo los tipos únicos
-        tipos_unicos = list(set(tipos_detectados))
-
-        # Guardar JSON con tipos
-        json_tipo_path = os.path.join(carpeta_procesado, nombre_img + ".json")
-        with open(json_tipo_path, "w", encoding="utf-8") as f_json:
-            json.dump({"tipos": tipos_unicos}, f_json, indent=2, ensure_ascii=False)
-
-        # Mover imagen original
-        shutil.move(ruta_img, os.path.join(carpeta_originales, nombre_img))
+        if almacen is None:
+            areas_mm2, tipos_unicos = _procesar_imagen(procesador, ruta_img, entrada, area_umbral, pixel_to_mm, carpeta_procesado)
+
+            # Mover imagen original
+            shutil.move(ruta_img, os.path.join(carpeta_originales, nombre_img))
+
+            resultado = {
+                "nombre_archivo": nombre_img,
+                "areas_mm2": areas_mm2,
+                "tipos": tipos_unicos,
+                "ruta_original": os.path.join(carpeta_originales, nombre_img),
+                "ruta_procesada": os.path.join(carpeta_procesado, nombre_img)
+            }
+        else:
+            resultado = _resultado_desde_almacen(almacen, procesador, ruta_img, entrada, area_umbral, pixel_to_mm)
+            resultado["ruta_original"] = ruta_img
+
+        resultados.append(resultado)
+        if al_procesar is not None:
+            al_procesar(resultado, num_entrada, len(entradas))
+        if progreso is not None:
+            progreso(num_entrada, len(entradas))
+
+    if almacen is not None:
+        version = almacen.registrar_version(rollo, resultados, {"area_umbral": area_umbral, "pixel_to_mm": pixel_to_mm})
+        print(f"Versión {version} de resultados registrada para: {rollo}")
 
     print("Análisis finalizado para:", rollo)
+    return resultados
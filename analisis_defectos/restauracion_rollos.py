@@ -0,0 +1,114 @@
+"""Diario de rollos modificados por el análisis y restauración de su estructura original.
+
+En el modo clásico `analizar_rollo` mueve las imágenes analizadas a '<rollo>/originales'
+y escribe las salidas en '<rollo>/procesado'. Para deshacerlo:
+- `DiarioRollos` anota cada rollo antes de modificarlo, con un archivo marcador por rollo
+  en '<base_folder>/.isli_diario'. Crear o borrar un archivo es atómico, así que varios
+  procesos pueden anotar rollos a la vez; el diario sobrevive a un cierre inesperado.
+- `restaurar_rollo` devuelve un rollo a su estado original con renombrados de carpetas
+  completas en el mismo sistema de archivos: 'originales' pasa a ser la carpeta del rollo,
+  en lugar de mover de vuelta cada imagen.
+"""
+import os
+import shutil
+
+# Carpeta del diario, dentro de la carpeta raíz de los rollos
+DIR_DIARIO = ".isli_diario"
+
+
+class DiarioRollos:
+    """
+    Rollos modificados por el análisis y pendientes de restaurar.
+
+    Args:
+        base_folder (str): Carpeta raíz de los rollos.
+    """
+    def __init__(self, base_folder):
+        self.base_folder = base_folder
+        self.ruta = os.path.join(base_folder, DIR_DIARIO)
+
+    def registrar(self, rollo):
+        """Anota el rollo; debe llamarse antes de modificar su carpeta."""
+        os.makedirs(self.ruta, exist_ok=True)
+        open(os.path.join(self.ruta, rollo), "a").close()
+
+    def rollos(self):
+        """Rollos anotados, ordenados por nombre."""
+        try:
+            return sorted(os.listdir(self.ruta))
+        except FileNotFoundError:
+            return []
+
+    def quitar(self, rollo):
+        """Elimina la anotación del rollo (tras restaurarlo)."""
+        try:
+            os.remove(os.path.join(self.ruta, rollo))
+        except FileNotFoundError:
+            pass
+
+
+def restaurar_rollo(base_folder, rollo):
+    """
+    Devuelve las imágenes de '<rollo>/originales' a la raíz del rollo y descarta '<rollo>/procesado'.
+
+    1. 'procesado' se saca del rollo con un renombrado y se borra al final.
+    2. Lo que quede en la raíz del rollo (imágenes sin etiquetar, otros archivos) se
+       renombra dentro de 'originales'; normalmente son pocas entradas o ninguna.
+    3. 'originales' se renombra a una carpeta intermedia junto al rollo, se elimina la
+       carpeta vacía del rollo y la intermedia toma su nombre.
+
+    Si una restauración anterior quedó a medias (cierre entre los pasos del punto 3),
+    se completa a partir de la carpeta intermedia.
+
+    Returns:
+        bool: True si se restauró el rollo; False si no tenía nada que restaurar.
+
+    Raises:
+        FileExistsError: Si un archivo de la raíz del rollo coincide con uno de 'originales', o si
+            una restauración interrumpida no se puede completar porque la carpeta del rollo ya
+            no está vacía (las originales siguen en la carpeta intermedia).
+        OSError: Si no se puede renombrar alguna carpeta.
+    """
+    ruta_rollo = os.path.join(base_folder, rollo)
+    ruta_originales = os.path.join(ruta_rollo, "originales")
+    ruta_procesado = os.path.join(ruta_rollo, "procesado")
+    ruta_intermedia = os.path.join(base_folder, f".{rollo}.restaurando")
+    ruta_descarte = os.path.join(base_folder, f".{rollo}.descartado")
+
+    if os.path.isdir(ruta_intermedia):
+        # Restauración interrumpida: solo falta que la carpeta intermedia ocupe el lugar del rollo
+        if os.path.isdir(ruta_rollo):
+            restantes = os.listdir(ruta_rollo)
+            if restantes:
+                # No se mezcla nada con las originales: se deja para revisarlo a mano
+                raise FileExistsError(
+                    f"Restauración interrumpida de {rollo}: las originales están en '{ruta_intermedia}', "
+                    f"pero la carpeta del rollo no está vacía ({', '.join(sorted(restantes)[:3])})"
+                )
+            os.rmdir(ruta_rollo)
+        os.rename(ruta_intermedia, ruta_rollo)
+        shutil.rmtree(ruta_descarte, ignore_errors=True)
+        return True
+
+    if not os.path.isdir(ruta_originales):
+        return False
+
+    with os.scandir(ruta_rollo) as entradas:
+        restantes = [entrada.name for entrada in entradas if entrada.name not in ("originales", "procesado")]
+    conflictos = [nombre for nombre in restantes if os.path.exists(os.path.join(ruta_originales, nombre))]
+    if conflictos:
+        # No sobrescribir nunca una imagen original
+        raise FileExistsError(f"{len(conflictos)} archivo(s) de {rollo} ya existen en 'originales': {', '.join(conflictos[:3])}")
+
+    shutil.rmtree(ruta_descarte, ignore_errors=True)
+    if os.path.isdir(ruta_procesado):
+        os.rename(ruta_procesado, ruta_descarte)
+
+    for nombre in restantes:
+        os.rename(os.path.join(ruta_rollo, nombre), os.path.join(ruta_originales, nombre))
+
+    os.rename(ruta_originales, ruta_intermedia)
+    os.rmdir(ruta_rollo)
+    os.rename(ruta_intermedia, ruta_rollo)
+    shutil.rmtree(ruta_descarte, ignore_errors=True)
+    return True
@@ -0,0 +1,85 @@
+"""Carga de los datos del panel de administración con caché de corta duración.
+
+Usuarios (con su indicador de solicitud de contraseña pendiente) y rollos
+controlados se obtienen en una única consulta. El resultado se guarda durante
+ADMIN_PANEL_TTL segundos y se invalida desde cualquier endpoint que modifique
+usuarios, rollos o solicitudes.
+"""
+import os
+from dotenv import load_dotenv
+from db import get_connection
+from cache import CacheTTL
+
+load_dotenv()
+
+cache_panel = CacheTTL(ttl=int(os.getenv("ADMIN_PANEL_TTL", 30)), max_entradas=1)
+
+# Las solicitudes pendientes se agregan una vez por correo en lugar de
+# evaluar un EXISTS correlacionado por cada usuario.
+SQL_PANEL = """
+    SELECT 'usuario' AS tipo, u.id_usuario AS id, u.nombre_usuario, u.email_usuario, u.rol, u.activo,
+           (s.email_usuario IS NOT NULL) AS tiene_solicitud_pendiente,
+           NULL AS ruta_local_rollo, NULL AS estado_rollo
+    FROM USUARIO u
+    LEFT JOIN (
+        SELECT DISTINCT email_usuario FROM SOLICITUD_CAMBIO_PASSWORD
+        WHERE estado_solicitud = 'pendiente'
+    ) s ON s.email_usuario = u.email_usuario
+    UNION ALL
+    SELECT 'rollo', r.id_rollo, NULL, NULL, NULL, NULL, NULL, r.ruta_local_rollo, r.estado_rollo
+    FROM ROLLO r
+    WHERE r.estado_rollo = 'controlado'
+"""
+
+
+def separar_filas_panel(filas):
+    """
+    Reparte las filas de la consulta combinada en usuarios y rollos.
+
+    Returns:
+        dict: Claves 'usuarios', 'rollos' y 'solicitudes_pendientes' (correos con solicitud pendiente).
+    """
+    usuarios, rollos = [], []
+    for fila in filas:
+        if fila["tipo"] == "usuario":
+            usuarios.append({
+                "id_usuario": fila["id"],
+                "nombre_usuario": fila["nombre_usuario"],
+                "email_usuario": fila["email_usuario"],
+                "rol": fila["rol"],
+                "activo": fila["activo"],
+                "tiene_solicitud_pendiente": bool(fila["tiene_solicitud_pendiente"])
+            })
+        else:
+            rollos.append({
+                "id_rollo": fila["id"],
+                "ruta_local_rollo": fila["ruta_local_rollo"],
+                "estado_rollo": fila["estado_rollo"]
+            })
+    return {
+        "usuarios": usuarios,
+        "rollos": rollos,
+        "solicitudes_pendientes": sorted(u["email_usuario"] for u in usuarios if u["tiene_solicitud_pendiente"])
+    }
+
+
+def cargar_datos_panel():
+    """Ejecuta la consulta del panel contra la base de datos."""
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(SQL_PANEL)
+        return separar_filas_panel(cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def obtener_datos_panel():
+    """Devuelve los datos del panel desde caché o recargándolos si han caducado."""
+    return cache_panel.obtener_o_calcular("panel", cargar_datos_panel)
+
+
+def invalidar_panel():
+    """Descarta los datos en caché tras una modificación."""
+    cache_panel.invalidar()
@@ -1,15 +1,15 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.security import HTTPBearer
-from jose import jwt, JWTError
 import os
 from dotenv import load_dotenv
 from fastapi import Query
 from fastapi import Form
 from fastapi.responses import RedirectResponse
-from passlib.context import CryptContext
-from db import get_connection
+from db import get_connection, versiones_tablas
+from hashing import hashear_contrasena_async
+from seguridad import administrador_actual, administrador_formulario
+from admin_panel.datos_panel import obtener_datos_panel, invalidar_panel
 
 load_dotenv()
 
@@ -17,73 +17,49 @@ load_dotenv()
 ruta_templates = os.path.join(os.path.dirname(__file__), "templates")
 templates = Jinja2Templates(directory=ruta_templates)
 
-# Seguridad JWT
-security = HTTPBearer()
-SECRET_KEY = os.getenv("SECRET_KEY", "superclave")
-ALGORITHM = "HS256"
-
 admin_router = APIRouter()
 
 @admin_router.get("/admin", response_class=HTMLResponse)
-def mostrar_panel_admin(request: Request, token: str = Query(None)):
+def mostrar_panel_admin(request: Request, token: str = Query(None), admin: dict = Depends(administrador_actual)):
     """
     Muestra el panel de administración si el token es válido y el usuario es administrador.
 
-    Valida el token JWT proporcionado por URL, verifica el rol y carga:
+    Valida el token JWT proporcionado por URL (dependencia `administrador_actual`) y carga:
     - Lista de usuarios.
     - Rollos controlados.
     - Solicitudes pendientes de cambio de contraseña.
     """
-    if not token:
-        raise HTTPException(status_code=401, detail="Token requerido en la URL")
-
-    try:
-        token = token.strip()  # eliminar espacios invisibles
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print("Payload decodificado:", payload)
-        rol = payload.get("rol")
-        if rol != "administrador":
-            raise HTTPException(status_code=403, detail="Acceso restringido a administradores")
-    except JWTError as e:
-        print(f"Error al decodificar token: {e}")
-        raise HTTPException(status_code=401, detail="Token inválido o expirado")
-
-    # Obtener usuarios desde la base de datos
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    # Obtener usuarios y verificar si tienen solicitudes pendientes
-    cursor.execute("""
-        SELECT u.id_usuario, u.nombre_usuario, u.email_usuario, u.rol, u.activo,
-            EXISTS (
-                SELECT 1 FROM SOLICITUD_CAMBIO_PASSWORD s
-                WHERE s.email_usuario = u.email_usuario AND s.estado_solicitud = 'pendiente'
-            ) AS tiene_solicitud_pendiente
-        FROM USUARIO u
-    """)
-    usuarios = cursor.fetchall()
-
-    
-    cursor.execute("SELECT id_rollo, ruta_local_rollo, estado_rollo FROM ROLLO WHERE estado_rollo = 'controlado'")
-    rollos = cursor.fetchall()
-
-    cursor.execute("""
-        SELECT email_usuario FROM SOLICITUD_CAMBIO_PASSWORD
-        WHERE estado_solicitud = 'pendiente'
-    """)
-    solicitudes_pendientes = {row["email_usuario"] for row in cursor.fetchall()}
-
-    cursor.close()
-    conn.close()
+    token = token.strip() if token else ""  # eliminar espacios invisibles
+    datos = obtener_datos_panel()
 
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
-        "usuarios": usuarios,
-        "rollos": rollos,
+        "usuarios": datos["usuarios"],
+        "rollos": datos["rollos"],
         "token": token,
-        "solicitudes_pendientes": solicitudes_pendientes
+        "solicitudes_pendientes": set(datos["solicitudes_pendientes"])
     })
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@admin_router.get("/admin/api/panel")
+def datos_panel_admin(admin: dict = Depends(administrador_actual)):
+    """
+    Devuelve en JSON los usuarios, rollos controlados y solicitudes pendientes del panel.
+
+    Lo usa el propio panel para refrescar sus tablas tras una acción sin recargar la página.
+    """
+    return obtener_datos_panel()
+
+def respuesta_accion(request: Request, token: str, msg: str, status_code: int = 200):
+    """
+    Responde a una acción del panel.
+
+    Si el cliente pide JSON (cabecera Accept) devuelve el mensaje para que el panel
+    refresque solo sus tablas; en otro caso redirige al panel como un formulario clásico.
+    """
+    if "application/json" in request.headers.get("accept", ""):
+        return JSONResponse(status_code=status_code, content={"msg": msg})
+    # Redirigir de nuevo al panel (para evitar reenvíos de formulario)
+    return RedirectResponse(url=f"/admin?token={token}", status_code=303)
 
 @admin_router.post("/admin/usuarios/crear")
 async def crear_usuario_desde_panel(
@@ -92,7 +68,8 @@ async def crear_usuario_desde_panel(
     email_usuario: str = Form(...),
     password: str = Form(...),
     rol: str = Form(...),
-    token: str = Form(...)
+    token: str = Form(...),
+    admin: dict = Depends(administrador_formulario)
 ):
     conn = get_connection()
     cursor = conn.cursor()
@@ -101,30 +78,34 @@ async def crear_usuario_desde_panel(
 
     Hashea la contraseña, asigna rol y marca el usuario como activo.
     """
+    msg, status_code = f"Usuario creado: {email_usuario}", 200
     try:
         # Verificar si ya existe ese email
         cursor.execute("SELECT * FROM USUARIO WHERE email_usuario = %s", (email_usuario,))
         if cursor.fetchone():
             print(f"Usuario ya existe: {email_usuario}")
+            msg, status_code = f"El usuario {email_usuario} ya existe", 409
         else:
-            hashed = pwd_context.hash(password)
+            hashed = await hashear_contrasena_async(password)
             cursor.execute("""
                 INSERT INTO usuario (nombre_usuario, email_usuario, password, rol, activo)
                 VALUES (%s, %s, %s, %s, 1)
             """, (nombre_usuario, email_usuario, hashed, rol))
             conn.commit()
+            versiones_tablas.incrementar("USUARIO")
+            invalidar_panel()
             print(f"Usuario creado desde el panel: {email_usuario} ({rol})")
     except Exception as e:
         print(f"Error al crear usuario: {e}")
+        msg, status_code = "Error al crear el usuario", 500
     finally:
         cursor.close()
         conn.close()
 
-    # Redirigir de nuevo al panel (para evitar reenvíos de formulario)
-    return RedirectResponse(url=f"/admin?token={token}", status_code=303)
+    return respuesta_accion(request, token, msg, status_code)
 
 @admin_router.post("/admin/usuarios/toggle_activo")
-async def toggle_usuario_activo(id_usuario: int = Form(...), token: str = Form(...)):
+async def toggle_usuario_activo(request: Request, id_usuario: int = Form(...), token: str = Form(...), admin: dict = Depends(administrador_formulario)):
     """
     Activa o desactiva un usuario alternando su estado entre 1 y 0.
     """
@@ -140,14 +121,15 @@ async def toggle_usuario_activo(id_usuario: int = Form(...), token: str = Form(.
     nuevo_estado = 0 if result[0] == 1 else 1
     cursor.execute("UPDATE usuario SET activo = %s WHERE id_usuario = %s", (nuevo_estado, id_usuario))
     conn.commit()
+    invalidar_panel()
 
     cursor.close()
     conn.close()
-    return RedirectResponse(url=f"/admin?token={token}", status_code=303)
+    return respuesta_accion(request, token, "Usuario dado de alta" if nuevo_estado else "Usuario dado de baja")
 
 
 @admin_router.post("/admin/usuarios/cambiar_rol")
-async def cambiar_rol_usuario(id_usuario: int = Form(...), token: str = Form(...)):
+async def cambiar_rol_usuario(request: Request, id_usuario: int = Form(...), token: str = Form(...), admin: dict = Depends(administrador_formulario)):
     """
     Cambia el rol de un usuario entre 'operario' y 'administrador'.
     """
@@ -162,13 +144,14 @@ async def cambiar_rol_usuario(id_usuario: int = Form(...), token: str = Form(...
     nuevo_rol = "administrador" if result[0] == "operario" else "operario"
     cursor.execute("UPDATE usuario SET rol = %s WHERE id_usuario = %s", (nuevo_rol, id_usuario))
     conn.commit()
+    invalidar_panel()
 
     cursor.close()
     conn.close()
-    return RedirectResponse(url=f"/admin?token={token}", status_code=303)
+    return respuesta_accion(request, token, f"Nuevo rol: {nuevo_rol}")
 
 @admin_router.post("/admin/rollos/devolver")
-async def devolver_rollo_al_almacen(id_rollo: int = Form(...), token: str = Form(...)):
+async def devolver_rollo_al_almacen(request: Request, id_rollo: int = Form(...), token: str = Form(...), admin: dict = Depends(administrador_formulario)):
     """
     Devuelve un rollo al estado 'disponible' en el sistema.
     """
@@ -177,13 +160,14 @@ async def devolver_rollo_al_almacen(id_rollo: int = Form(...), token: str = Form
     try:
         cursor.execute("UPDATE rollo SET estado_rollo = 'disponible' WHERE id_rollo = %s", (id_rollo,))
         conn.commit()
+        invalidar_panel()
     finally:
         cursor.close()
         conn.close()
-    return RedirectResponse(url=f"/admin?token={token}", status_code=303)
+    return respuesta_accion(request, token, "Rollo devuelto al almacén")
 
 @admin_router.post("/admin/usuarios/reiniciar_password")
-async def reiniciar_contrasena_usuario(email_usuario: str = Form(...), token: str = Form(...)):
+async def reiniciar_contrasena_usuario(request: Request, email_usuario: str = Form(...), token: str = Form(...), admin: dict = Depends(administrador_formulario)):
     """
     Reinicia la contraseña de un usuario según una solicitud pendiente.
 
@@ -196,7 +180,7 @@ async def reiniciar_contrasena_usuario(email_usuario: str = Form(...), token: st
         token (str): Token JWT del administrador (para redirección).
 
     Returns:
-        RedirectResponse: Redirección al panel administrativo.
+        RedirectResponse | JSONResponse: Redirección al panel o mensaje JSON si se pidió.
 
     Raises:
         HTTPException: Si no hay solicitud o si ocurre un error de base de datos.
@@ -219,8 +203,8 @@ async def reiniciar_contrasena_usuario(email_usuario: str = Form(...), token: st
 
         id_solicitud, password_nueva = solicitud
 
-        # Hashear la nueva contraseña
-        hashed = pwd_context.hash(password_nueva)
+        # Hashear la nueva contraseña en el pool dedicado de bcrypt
+        hashed = await hashear_contrasena_async(password_nueva)
 
         # Actualizar la contraseña del usuario
         cursor.execute("""
@@ -234,7 +218,11 @@ async def reiniciar_contrasena_usuario(email_usuario: str = Form(...), token: st
         """, (id_solicitud,))
 
         conn.commit()
+        invalidar_panel()
         print(f"Contraseña reiniciada para: {email_usuario}")
+    except HTTPException:
+        conn.rollback()
+        raise
     except Exception as e:
         conn.rollback()
         print(f"Error al reiniciar contraseña: {e}")
@@ -243,7 +231,7 @@ async def reiniciar_contrasena_usuario(email_usuario: str = Form(...), token: st
         cursor.close()
         conn.close()
 
-    return RedirectResponse(url=f"/admin?token={token}", status_code=303)
+    return respuesta_accion(request, token, f"Contraseña reiniciada para {email_usuario}")
 
 @admin_router.get("/session_expired.html", response_class=HTMLResponse)
 def session_expired():
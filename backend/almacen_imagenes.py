@@ -0,0 +1,294 @@
+"""Almacén de imágenes de rollos subidas al servidor.
+
+Guarda cada imagen una sola vez según el hash SHA-256 de su contenido y la enlaza
+en la carpeta del rollo correspondiente. Las subidas por fragmentos se escriben
+directamente a disco en un archivo parcial, lo que permite reanudarlas desde el
+último byte recibido sin mantener el archivo completo en memoria.
+"""
+import os
+import json
+import shutil
+import time
+import hashlib
+import tempfile
+
+TAMANO_BLOQUE = 1024 * 1024
+# Intervalo mínimo entre dos purgas de subidas abandonadas, en segundos
+INTERVALO_PURGA = 3600
+
+
+class SubidaNoEncontradaError(LookupError):
+    """No existe ninguna subida con el identificador indicado."""
+
+
+class SubidaInvalidaError(ValueError):
+    """Los datos de la subida no son coherentes (nombre, tamaño o hash)."""
+
+
+class DesfaseSubidaError(ValueError):
+    """El offset enviado por el cliente no coincide con los bytes ya recibidos."""
+
+    def __init__(self, offset_esperado):
+        super().__init__(f"Offset incorrecto, se esperaba {offset_esperado}")
+        self.offset_esperado = offset_esperado
+
+
+def calcular_sha256(ruta):
+    """Calcula el SHA-256 de un archivo leyéndolo por bloques."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAMANO_BLOQUE), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def validar_nombre(nombre):
+    """Comprueba que un nombre de rollo o archivo no contenga rutas."""
+    if not nombre or nombre in (".", "..") or os.path.basename(nombre) != nombre or "\\" in nombre:
+        raise SubidaInvalidaError(f"Nombre no válido: {nombre!r}")
+    return nombre
+
+
+class AlmacenImagenes:
+    """
+    Almacén direccionado por contenido para las imágenes de los rollos.
+
+    Args:
+        carpeta_rollos (str): Carpeta raíz donde viven las carpetas de rollos.
+        carpeta_datos (str): Carpeta de trabajo para objetos y subidas parciales.
+        tamano_maximo (int): Tamaño máximo admitido por archivo, en bytes.
+        caducidad_parciales (int): Segundos sin recibir datos tras los que una subida
+            parcial se considera abandonada y se borra.
+    """
+    def __init__(self, carpeta_rollos, carpeta_datos, tamano_maximo=200 * 1024 * 1024, caducidad_parciales=24 * 3600):
+        self.carpeta_rollos = carpeta_rollos
+        self.carpeta_objetos = os.path.join(carpeta_datos, "objetos")
+        self.carpeta_parciales = os.path.join(carpeta_datos, "parciales")
+        self.tamano_maximo = tamano_maximo
+        self.caducidad_parciales = caducidad_parciales
+        self._proxima_purga = 0
+        os.makedirs(self.carpeta_objetos, exist_ok=True)
+        os.makedirs(self.carpeta_parciales, exist_ok=True)
+
+    # ---- Objetos por contenido ----
+
+    def ruta_objeto(self, sha256):
+        return os.path.join(self.carpeta_objetos, sha256[:2], sha256)
+
+    def existe_objeto(self, sha256):
+        return os.path.isfile(self.ruta_objeto(sha256))
+
+    def _guardar_objeto(self, ruta_temporal, sha256):
+        """Mueve un archivo temporal al almacén, descartándolo si el contenido ya existía."""
+        destino = self.ruta_objeto(sha256)
+        if os.path.exists(destino):
+            os.remove(ruta_temporal)
+            return False
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(ruta_temporal, destino)
+        return True
+
+    def enlazar_en_rollo(self, sha256, rollo, nombre_archivo):
+        """
+        Coloca el objeto en la carpeta del rollo con su nombre original.
+
+        Usa un enlace duro cuando el sistema de archivos lo permite y una copia en caso contrario.
+
+        Returns:
+            str: Ruta final de la imagen dentro del rollo.
+        """
+        ruta_rollo = os.path.join(self.carpeta_rollos, validar_nombre(rollo))
+        destino = os.path.join(ruta_rollo, validar_nombre(nombre_archivo))
+        os.makedirs(ruta_rollo, exist_ok=True)
+
+        origen = self.ruta_objeto(sha256)
+        if os.path.exists(destino) and os.path.samefile(origen, destino):
+            return destino
+
+        temporal = destino + ".enlace"
+        try:
+            os.link(origen, temporal)
+        except OSError:
+            shutil.copyfile(origen, temporal)
+        os.replace(temporal, destino)
+        return destino
+
+    def guardar_flujo(self, rollo, nombre_archivo, flujo):
+        """
+        Guarda una imagen leída de un objeto tipo archivo calculando su hash al vuelo.
+
+        Returns:
+            dict: Hash del contenido, si estaba duplicado y ruta dentro del rollo.
+        """
+        validar_nombre(rollo)
+        validar_nombre(nombre_archivo)
+        sha = hashlib.sha256()
+        tamano = 0
+        fd, temporal = tempfile.mkstemp(dir=self.carpeta_parciales, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as destino:
+                for bloque in iter(lambda: flujo.read(TAMANO_BLOQUE), b""):
+                    tamano += len(bloque)
+                    if tamano > self.tamano_maximo:
+                        raise SubidaInvalidaError("El archivo supera el tamaño máximo permitido")
+                    sha.update(bloque)
+                    destino.write(bloque)
+        except BaseException:
+            os.remove(temporal)
+            raise
+
+        sha256 = sha.hexdigest()
+        nuevo = self._guardar_objeto(temporal, sha256)
+        ruta = self.enlazar_en_rollo(sha256, rollo, nombre_archivo)
+        return {"sha256": sha256, "duplicada": not nuevo, "ruta": ruta}
+
+    # ---- Subidas por fragmentos reanudables ----
+
+    def _rutas_subida(self, id_subida):
+        if not id_subida.isalnum():
+            raise SubidaNoEncontradaError(id_subida)
+        base = os.path.join(self.carpeta_parciales, id_subida)
+        return base + ".json", base + ".part"
+
+    def iniciar_subida(self, rollo, nombre_archivo, tamano, sha256):
+        """
+        Registra (o recupera) una subida por fragmentos.
+
+        El identificador depende del rollo, el nombre y el hash, por lo que repetir la
+        misma petición tras un corte devuelve la subida existente y el offset desde el que seguir.
+        Si el contenido ya está en el almacén, la imagen se enlaza y no hace falta enviar datos.
+
+        Returns:
+            dict: id_subida, offset, tamano y si la subida ya está completada o duplicada.
+        """
+        validar_nombre(rollo)
+        validar_nombre(nombre_archivo)
+        self._purgar_si_toca()
+        sha256 = sha256.lower()
+        if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+            raise SubidaInvalidaError("Hash SHA-256 no válido")
+        if tamano < 0 or tamano > self.tamano_maximo:
+            raise SubidaInvalidaError("El archivo supera el tamaño máximo permitido")
+
+        id_subida = hashlib.sha256(f"{rollo}\0{nombre_archivo}\0{sha256}".encode("utf-8")).hexdigest()[:32]
+
+        if self.existe_objeto(sha256):
+            self.enlazar_en_rollo(sha256, rollo, nombre_archivo)
+            self._descartar(id_subida)
+            return {"id_subida": id_subida, "offset": tamano, "tamano": tamano, "completada": True, "duplicada": True}
+
+        ruta_meta, ruta_parcial = self._rutas_subida(id_subida)
+        if not os.path.exists(ruta_meta):
+            with open(ruta_meta, "w", encoding="utf-8") as f:
+                json.dump({"rollo": rollo, "nombre_archivo": nombre_archivo, "tamano": tamano, "sha256": sha256}, f)
+            open(ruta_parcial, "ab").close()
+
+        return self.estado_subida(id_subida)
+
+    def _leer_meta(self, id_subida):
+        ruta_meta, ruta_parcial = self._rutas_subida(id_subida)
+        try:
+            with open(ruta_meta, "r", encoding="utf-8") as f:
+                return json.load(f), ruta_parcial
+        except FileNotFoundError:
+            raise SubidaNoEncontradaError(id_subida)
+
+    def estado_subida(self, id_subida):
+        """Devuelve el offset actual de una subida en curso."""
+        meta, ruta_parcial = self._leer_meta(id_subida)
+        offset = os.path.getsize(ruta_parcial) if os.path.exists(ruta_parcial) else 0
+        return {"id_subida": id_subida, "offset": offset, "tamano": meta["tamano"], "completada": False, "duplicada": False}
+
+    def abrir_fragmento(self, id_subida, offset):
+        """
+        Abre el archivo parcial para anexar datos a partir de `offset`.
+
+        Returns:
+            tuple[file, int]: Archivo abierto en modo anexado y bytes que faltan por recibir.
+
+        Raises:
+            DesfaseSubidaError: Si `offset` no coincide con los bytes ya recibidos.
+        """
+        meta, ruta_parcial = self._leer_meta(id_subida)
+        actual = os.path.getsize(ruta_parcial)
+        if offset != actual:
+            raise DesfaseSubidaError(actual)
+        return open(ruta_parcial, "ab"), meta["tamano"] - actual
+
+    def finalizar_si_completa(self, id_subida):
+        """
+        Verifica el hash y mueve la subida al almacén cuando se han recibido todos los bytes.
+
+        Returns:
+            dict: Estado de la subida tras la comprobación.
+
+        Raises:
+            SubidaInvalidaError: Si el contenido recibido no coincide con el hash declarado.
+        """
+        meta, ruta_parcial = self._leer_meta(id_subida)
+        estado = self.estado_subida(id_subida)
+        if estado["offset"] < meta["tamano"]:
+            return estado
+
+        if calcular_sha256(ruta_parcial) != meta["sha256"]:
+            self._descartar(id_subida)
+            raise SubidaInvalidaError("El contenido recibido no coincide con el hash declarado")
+
+        nuevo = self._guardar_objeto(ruta_parcial, meta["sha256"])
+        self.enlazar_en_rollo(meta["sha256"], meta["rollo"], meta["nombre_archivo"])
+        self._descartar(id_subida)
+        return {**estado, "completada": True, "duplicada": not nuevo}
+
+    def _descartar(self, id_subida):
+        for ruta in self._rutas_subida(id_subida):
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    # ---- Limpieza de subidas abandonadas ----
+
+    def _purgar_si_toca(self):
+        ahora = time.time()
+        if ahora >= self._proxima_purga:
+            self._proxima_purga = ahora + INTERVALO_PURGA
+            self.purgar_abandonadas(ahora)
+
+    def purgar_abandonadas(self, ahora=None):
+        """
+        Borra las subidas parciales sin datos nuevos desde hace más de `caducidad_parciales`
+        segundos, y los temporales que `guardar_flujo` dejara tras una caída del servidor.
+
+        Returns:
+            int: Número de archivos borrados.
+        """
+        limite = (ahora if ahora is not None else time.time()) - self.caducidad_parciales
+        subidas = {}
+        temporales = []
+        with os.scandir(self.carpeta_parciales) as entradas:
+            for entrada in entradas:
+                base, extension = os.path.splitext(entrada.name)
+                try:
+                    mtime = entrada.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if extension in (".json", ".part") and base.isalnum():
+                    # Una subida sigue viva mientras alguno de sus archivos sea reciente
+                    subidas[base] = max(subidas.get(base, 0), mtime)
+                elif mtime < limite:
+                    temporales.append(entrada.path)
+
+        borrados = 0
+        for ruta in temporales:
+            try:
+                os.remove(ruta)
+                borrados += 1
+            except FileNotFoundError:
+                pass
+        for id_subida, mtime in subidas.items():
+            if mtime < limite:
+                for ruta in self._rutas_subida(id_subida):
+                    try:
+                        os.remove(ruta)
+                        borrados += 1
+                    except FileNotFoundError:
+                        pass
+        return borrados
@@ -0,0 +1,117 @@
+"""Caché en memoria con caducidad (TTL) compartida por los routers del backend.
+
+Se usa para respuestas agregadas costosas de calcular que solo cambian cuando
+se escriben datos nuevos: los endpoints de escritura invalidan la caché y la
+siguiente lectura vuelve a calcular el resultado.
+"""
+import time
+import threading
+from collections import OrderedDict
+
+
+class CacheTTL:
+    """
+    Diccionario con caducidad por entrada y límite de tamaño.
+
+    Args:
+        ttl (float): Segundos que una entrada permanece válida.
+        max_entradas (int): Número máximo de entradas; al superarlo se descarta la más antigua.
+    """
+    def __init__(self, ttl, max_entradas=128):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self._datos = {}
+        # Cambia en cada invalidación: descarta los valores calculados antes de ella
+        self._generacion = 0
+        self._lock = threading.Lock()
+
+    def generacion(self):
+        """Devuelve la generación actual, que `invalidar()` incrementa."""
+        with self._lock:
+            return self._generacion
+
+    def obtener(self, clave):
+        """Devuelve el valor almacenado o None si no existe o ha caducado."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            caduca, valor = entrada
+            if caduca < time.monotonic():
+                del self._datos[clave]
+                return None
+            return valor
+
+    def guardar(self, clave, valor, generacion=None):
+        """
+        Guarda un valor con la caducidad configurada.
+
+        Si se indica `generacion` (leída antes de calcular el valor) y la caché se ha
+        invalidado desde entonces, el valor está obsoleto y no se guarda.
+        """
+        with self._lock:
+            if generacion is not None and generacion != self._generacion:
+                return
+            if clave not in self._datos and len(self._datos) >= self.max_entradas:
+                del self._datos[next(iter(self._datos))]
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+
+    def obtener_o_calcular(self, clave, calcular):
+        """Devuelve el valor en caché o lo calcula con `calcular()` y lo guarda."""
+        valor = self.obtener(clave)
+        if valor is None:
+            generacion = self.generacion()
+            valor = calcular()
+            self.guardar(clave, valor, generacion)
+        return valor
+
+    def invalidar(self):
+        """Vacía la caché completa."""
+        with self._lock:
+            self._generacion += 1
+            self._datos.clear()
+
+
+class CacheExpiracionLRU:
+    """
+    Caché LRU acotada cuyas entradas caducan en un instante absoluto propio.
+
+    Pensada para claims de tokens JWT ya verificados: cada entrada vive hasta
+    el `exp` del token y, si se alcanza el tamaño máximo, se descarta la menos usada.
+
+    Args:
+        max_entradas (int): Número máximo de entradas.
+    """
+    def __init__(self, max_entradas=1024):
+        self.max_entradas = max_entradas
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Devuelve el valor o None si no existe o ya ha caducado."""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            caduca, valor = entrada
+            if caduca <= time.time():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor, caduca):
+        """Guarda un valor que caduca en el timestamp `caduca` (segundos desde epoch)."""
+        with self._lock:
+            self._datos[clave] = (caduca, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def eliminar(self, clave):
+        """Elimina una entrada si existe."""
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def __len__(self):
+        return len(self._datos)
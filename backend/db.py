@@ -1,19 +1,30 @@
 import mysql.connector
 import os
 from dotenv import load_dotenv
+from versiones import crear_versiones
+from instrumentacion_db import ConexionMedida
 load_dotenv()
 
+# Versión de cada tabla, incrementada por los endpoints que escriben en ella (ETag de las lecturas).
+# VERSIONES_BACKEND=sqlite la comparte entre varios workers de uvicorn.
+versiones_tablas = crear_versiones(
+    os.getenv("VERSIONES_BACKEND", "memoria"),
+    os.getenv("VERSIONES_SQLITE_PATH", "versiones.sqlite3")
+)
+
 def get_connection():
     """
     Establece y devuelve una conexión a la base de datos MySQL usando variables de entorno.
 
+    La conexión se devuelve envuelta en `ConexionMedida` para las métricas de /metrics.
+
     Returns:
-        mysql.connector.connection.MySQLConnection: Conexión activa con la base de datos.
+        ConexionMedida: Conexión activa con la base de datos (misma interfaz que la de mysql.connector).
     """
-    return mysql.connector.connect(
+    return ConexionMedida(mysql.connector.connect(
         host=os.getenv("DB_HOST"),
         user=os.getenv("DB_USER"),
         password=os.getenv("DB_PASSWORD"),
         database=os.getenv("DB_NAME"),
         port=int(os.getenv("DB_PORT", 3306))
-    )
+    ))
@@ -0,0 +1,84 @@
+"""Cálculos de estadísticas agregadas del histórico de controles.
+
+Funciones puras que transforman filas ya agrupadas por la base de datos en las
+métricas que devuelve /controles/estadisticas.
+"""
+
+PERCENTILES_AREA = (50, 75, 90, 95, 99)
+
+
+def tasa_nok(filas, clave):
+    """
+    Convierte filas agrupadas (clave, total, nok) en una lista con la tasa NOK.
+
+    Args:
+        filas (list[dict]): Filas con la clave de agrupación y los campos 'total' y 'nok'.
+        clave (str): Nombre del campo de agrupación (dia, usuario, rollo...).
+
+    Returns:
+        list[dict]: Una entrada por grupo con total, nok y tasa_nok (0-1).
+    """
+    resultado = []
+    for fila in filas:
+        total = int(fila["total"] or 0)
+        nok = int(fila["nok"] or 0)
+        resultado.append({
+            clave: fila[clave],
+            "total": total,
+            "nok": nok,
+            "tasa_nok": round(nok / total, 4) if total else 0.0,
+        })
+    return resultado
+
+
+def percentiles_desde_histograma(histograma, percentiles=PERCENTILES_AREA):
+    """
+    Calcula percentiles (método del rango más cercano) a partir de un histograma.
+
+    La base de datos devuelve cada área distinta con su número de apariciones, de modo que
+    el volumen transferido depende de los valores distintos y no del tamaño del histórico.
+
+    Args:
+        histograma (list[tuple[float, int]]): Pares (valor, apariciones) ordenados por valor.
+        percentiles (tuple[int]): Percentiles a calcular.
+
+    Returns:
+        dict: {"p50": valor, ...}; vacío si no hay datos.
+    """
+    total = sum(apariciones for _, apariciones in histograma)
+    if not total:
+        return {}
+
+    resultado = {}
+    objetivos = sorted(percentiles)
+    acumulado = 0
+    i = 0
+    for valor, apariciones in histograma:
+        acumulado += apariciones
+        while i < len(objetivos) and acumulado >= objetivos[i] / 100 * total:
+            resultado[f"p{objetivos[i]}"] = float(valor)
+            i += 1
+    for p in objetivos[i:]:
+        resultado[f"p{p}"] = float(histograma[-1][0])
+    return resultado
+
+
+def conteo_por_tipo(filas):
+    """
+    Suma las imágenes por tipo de defecto.
+
+    El frontend registra los tipos de una imagen unidos por comas ("punto-negro, pegote-cascarilla"),
+    por lo que cada combinación se reparte entre sus tipos individuales.
+
+    Args:
+        filas (list[dict]): Filas con 'tipo_defecto' y 'imagenes'.
+
+    Returns:
+        dict: Número de imágenes por tipo de defecto.
+    """
+    conteo = {}
+    for fila in filas:
+        tipos = [t.strip() for t in (fila["tipo_defecto"] or "").split(",") if t.strip() and t.strip() != "—"]
+        for tipo in tipos or ["sin-defecto"]:
+            conteo[tipo] = conteo.get(tipo, 0) + int(fila["imagenes"])
+    return conteo
@@ -0,0 +1,126 @@
+"""Hash y verificación de contraseñas con bcrypt en un pool de hilos dedicado.
+
+bcrypt es deliberadamente lento; ejecutarlo en el threadpool general de FastAPI
+hace que un pico de logins (cambio de turno) retrase el resto de endpoints.
+Aquí se ejecuta en un pool propio y acotado. Configurable mediante:
+- BCRYPT_ROUNDS: coste de los hashes nuevos.
+- HASH_MAX_WORKERS: hilos dedicados a bcrypt.
+- HASH_MAX_PENDIENTES: operaciones en cola antes de rechazar con 503.
+"""
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from dotenv import load_dotenv
+from metricas import Histograma, Indicador, registro
+
+load_dotenv()
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+HASH_MAX_WORKERS = int(os.getenv("HASH_MAX_WORKERS", 2))
+HASH_MAX_PENDIENTES = int(os.getenv("HASH_MAX_PENDIENTES", 32))
+
+latencia_hash = registro.registrar(Histograma(
+    "isli_bcrypt_segundos",
+    "Duración de las operaciones bcrypt en el pool dedicado",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+    etiquetas=("operacion",)
+))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_MAX_WORKERS, thread_name_prefix="bcrypt")
+_pendientes = 0
+_lock = threading.Lock()
+
+
+class HashSaturadoError(Exception):
+    """Hay demasiadas operaciones de hash en cola."""
+
+
+class HashInvalidoError(ValueError):
+    """El hash almacenado no es un hash bcrypt válido."""
+
+
+def verificar_contrasena(plain_password, hashed_password):
+    """
+    Verifica si una contraseña en texto plano coincide con un hash bcrypt.
+
+    Args:
+        plain_password (str or bytes): Contraseña proporcionada por el usuario.
+        hashed_password (str or bytes): Contraseña almacenada en la base de datos.
+
+    Returns:
+        bool: True si coinciden, False si no.
+
+    Raises:
+        HashInvalidoError: Si el hash almacenado no es un hash bcrypt válido.
+    """
+    # Convertir contraseña a bytes si es string
+    if isinstance(plain_password, str):
+        plain_password = plain_password.encode('utf-8')
+
+    # Convertir hash a bytes si es string
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode('utf-8')
+
+    try:
+        return bcrypt.checkpw(plain_password, hashed_password)
+    except ValueError as e:
+        raise HashInvalidoError(f"Hash de contraseña no válido: {e}") from e
+
+
+def hashear_contrasena(plain_password):
+    """
+    Genera un hash bcrypt (coste BCRYPT_ROUNDS) para una contraseña en texto plano.
+
+    Returns:
+        str: Hash listo para almacenarse en la base de datos.
+    """
+    if isinstance(plain_password, str):
+        plain_password = plain_password.encode('utf-8')
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(plain_password, salt).decode('utf-8')
+
+
+def _medido(operacion, funcion, *args):
+    inicio = time.perf_counter()
+    try:
+        return funcion(*args)
+    finally:
+        latencia_hash.observar(time.perf_counter() - inicio, operacion)
+
+
+async def _ejecutar_en_pool(operacion, funcion, *args):
+    global _pendientes
+    with _lock:
+        if _pendientes >= HASH_MAX_PENDIENTES:
+            raise HashSaturadoError("Demasiadas operaciones de contraseña en curso")
+        _pendientes += 1
+    try:
+        return await asyncio.wrap_future(_executor.submit(_medido, operacion, funcion, *args))
+    finally:
+        with _lock:
+            _pendientes -= 1
+
+
+async def verificar_contrasena_async(plain_password, hashed_password):
+    """Versión asíncrona de `verificar_contrasena` ejecutada en el pool de bcrypt."""
+    return await _ejecutar_en_pool("verificar", verificar_contrasena, plain_password, hashed_password)
+
+
+async def hashear_contrasena_async(plain_password):
+    """Versión asíncrona de `hashear_contrasena` ejecutada en el pool de bcrypt."""
+    return await _ejecutar_en_pool("hashear", hashear_contrasena, plain_password)
+
+
+def operaciones_pendientes():
+    """Número de operaciones bcrypt en cola o en ejecución."""
+    return _pendientes
+
+
+registro.registrar(Indicador(
+    "isli_bcrypt_pendientes",
+    "Operaciones bcrypt en cola o en ejecución",
+    funcion=operaciones_pendientes
+))
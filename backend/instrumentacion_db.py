@@ -0,0 +1,113 @@
+"""Medición de las conexiones y sentencias SQL del backend.
+
+`get_connection()` devuelve las conexiones de mysql.connector envueltas en
+`ConexionMedida`; sus cursores registran el tiempo de cada `execute` y `executemany` agrupado
+por sentencia y lo añaden como span a la traza de la petición en curso. El resto de atributos se delegan en el objeto original, de modo
+que los routers no necesitan cambios.
+"""
+import re
+import time
+import threading
+from metricas import Contador, Histograma, Indicador, registro
+from trazas import registrar_span
+
+latencia_sentencias = registro.registrar(Histograma(
+    "isli_db_sentencia_segundos",
+    "Duración de cursor.execute/executemany por sentencia (operación y tabla principal)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    etiquetas=("sentencia",)
+))
+conexiones_abiertas = registro.registrar(Contador(
+    "isli_db_conexiones_abiertas_total",
+    "Conexiones a MySQL abiertas desde el arranque"
+))
+
+_en_uso = 0
+_lock = threading.Lock()
+
+
+def conexiones_en_uso():
+    """Número de conexiones a MySQL abiertas en este momento."""
+    return _en_uso
+
+
+registro.registrar(Indicador(
+    "isli_db_conexiones_en_uso",
+    "Conexiones a MySQL abiertas y todavía no cerradas",
+    funcion=conexiones_en_uso
+))
+
+_PATRON_TABLA = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+`?(\w+)", re.IGNORECASE)
+
+
+def etiqueta_sentencia(sql):
+    """
+    Resume una sentencia SQL en 'operacion tabla' (p. ej. 'select control_resumen').
+
+    Mantiene acotado el número de series de las métricas: las sentencias del
+    backend son textos fijos, así que cada una produce siempre la misma etiqueta.
+    """
+    texto = sql.lstrip()
+    operacion = texto.split(None, 1)[0].lower() if texto else "vacia"
+    tabla = _PATRON_TABLA.search(texto)
+    return f"{operacion} {tabla.group(1).lower()}" if tabla else operacion
+
+
+class CursorMedido:
+    """
+    Cursor que mide la duración de cada `execute` y `executemany` (métrica y span de traza).
+    Delega el resto de atributos en el cursor original.
+    """
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _medir(self, sql, funcion, *args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(sql, *args, **kwargs)
+        finally:
+            duracion = time.perf_counter() - inicio
+            sentencia = etiqueta_sentencia(sql)
+            latencia_sentencias.observar(duracion, sentencia)
+            registrar_span("sql", inicio, duracion, sentencia=sentencia,
+                           filas=getattr(self._cursor, "rowcount", None))
+
+    def execute(self, sql, params=None, *args, **kwargs):
+        return self._medir(sql, self._cursor.execute, params, *args, **kwargs)
+
+    def executemany(self, sql, secuencia_params, *args, **kwargs):
+        # Un lote cuenta como una sola observación de la sentencia
+        return self._medir(sql, self._cursor.executemany, secuencia_params, *args, **kwargs)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class ConexionMedida:
+    """
+    Conexión que lleva la cuenta de conexiones abiertas y devuelve cursores medidos.
+    """
+    def __init__(self, conexion):
+        global _en_uso
+        self._conexion = conexion
+        self._cerrada = False
+        conexiones_abiertas.incrementar()
+        with _lock:
+            _en_uso += 1
+
+    def cursor(self, *args, **kwargs):
+        return CursorMedido(self._conexion.cursor(*args, **kwargs))
+
+    def close(self):
+        global _en_uso
+        if not self._cerrada:
+            self._cerrada = True
+            with _lock:
+                _en_uso -= 1
+        return self._conexion.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
@@ -0,0 +1,57 @@
+"""Limitación de intentos fallidos de login por cuenta."""
+import time
+import threading
+from collections import deque
+
+
+class LimitadorIntentos:
+    """
+    Ventana deslizante de intentos fallidos por clave (por ejemplo, el correo del usuario).
+
+    Args:
+        max_intentos (int): Fallos permitidos dentro de la ventana.
+        ventana (float): Duración de la ventana en segundos.
+        max_claves (int): Número máximo de claves vigiladas a la vez.
+    """
+    def __init__(self, max_intentos=5, ventana=300, max_claves=10000):
+        self.max_intentos = max_intentos
+        self.ventana = ventana
+        self.max_claves = max_claves
+        self._fallos = {}
+        self._lock = threading.Lock()
+
+    def _vigentes(self, clave, ahora):
+        fallos = self._fallos.get(clave)
+        if fallos is None:
+            return None
+        while fallos and fallos[0] <= ahora - self.ventana:
+            fallos.popleft()
+        if not fallos:
+            del self._fallos[clave]
+            return None
+        return fallos
+
+    def segundos_bloqueo(self, clave):
+        """Devuelve los segundos que faltan para poder volver a intentarlo (0 si no está bloqueada)."""
+        ahora = time.monotonic()
+        with self._lock:
+            fallos = self._vigentes(clave, ahora)
+            if fallos is None or len(fallos) < self.max_intentos:
+                return 0
+            return max(0.0, fallos[0] + self.ventana - ahora)
+
+    def registrar_fallo(self, clave):
+        """Anota un intento fallido para la clave."""
+        ahora = time.monotonic()
+        with self._lock:
+            fallos = self._vigentes(clave, ahora)
+            if fallos is None:
+                if len(self._fallos) >= self.max_claves:
+                    del self._fallos[next(iter(self._fallos))]
+                fallos = self._fallos[clave] = deque(maxlen=self.max_intentos)
+            fallos.append(ahora)
+
+    def reiniciar(self, clave):
+        """Olvida los fallos de una clave (tras un login correcto)."""
+        with self._lock:
+            self._fallos.pop(clave, None)
@@ -3,21 +3,38 @@
 Configura la aplicación FastAPI, gestiona middleware, excepciones globales y enrutado de endpoints.
 """
 import os
+import time
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from routers.auth import login_router
-from routers.controles import router as controles_router
+from routers.controles import router as controles_router, router_publico as controles_publico_router
+from routers.analisis import router as analisis_router
+from routers.subidas import router as subidas_router
+from trabajos_analisis import cerrar_gestor
 from admin_panel.routes_admin import admin_router
+from metricas import Contador, Histograma, Indicador, registro
+from trazas import configurar_logger_trazas, normalizar_id_peticion, iniciar_traza, finalizar_traza
 import logging
 from fastapi.staticfiles import StaticFiles
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+configurar_logger_trazas()
 
 app = FastAPI()
 
+# Compresión de respuestas: brotli si el paquete opcional brotli-asgi está instalado
+# (con gzip como alternativa para clientes que no lo aceptan), gzip en otro caso.
+COMPRESION_MIN_BYTES = int(os.getenv("COMPRESION_MIN_BYTES", 1024))
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESION_MIN_BYTES, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESION_MIN_BYTES)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -26,6 +43,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métricas HTTP expuestas en /metrics
+peticiones_total = registro.registrar(Contador(
+    "isli_http_peticiones_total",
+    "Peticiones HTTP atendidas por ruta y código de estado",
+    etiquetas=("metodo", "ruta", "estado")
+))
+latencia_peticiones = registro.registrar(Histograma(
+    "isli_http_peticion_segundos",
+    "Duración de las peticiones HTTP por ruta",
+    etiquetas=("metodo", "ruta")
+))
+peticiones_en_curso = registro.registrar(Indicador(
+    "isli_http_peticiones_en_curso",
+    "Peticiones HTTP en curso"
+))
+
+@app.middleware("http")
+async def medir_peticiones(request: Request, call_next):
+    """
+    Registra número, duración y concurrencia de las peticiones.
+
+    Las series se etiquetan con la plantilla de la ruta (p. ej. /analisis/trabajos/{id_trabajo})
+    y no con la URL concreta, para que su número no crezca con cada ID consultado.
+    """
+    peticiones_en_curso.incrementar()
+    inicio = time.perf_counter()
+    estado = 500
+    try:
+        respuesta = await call_next(request)
+        estado = respuesta.status_code
+        return respuesta
+    finally:
+        duracion = time.perf_counter() - inicio
+        peticiones_en_curso.incrementar(cantidad=-1)
+        ruta = getattr(request.scope.get("route"), "path", "sin_ruta")
+        peticiones_total.incrementar(request.method, ruta, str(estado))
+        latencia_peticiones.observar(duracion, request.method, ruta)
+
+@app.middleware("http")
+async def trazar_peticion(request: Request, call_next):
+    """
+    Asigna un identificador a cada petición y registra su traza con los spans SQL.
+
+    Reutiliza la cabecera X-Request-ID del cliente si la envía y la devuelve en la respuesta.
+    """
+    id_peticion = normalizar_id_peticion(request.headers.get("x-request-id"))
+    token = iniciar_traza(id_peticion, request.method, request.url.path)
+    estado = 500
+    try:
+        respuesta = await call_next(request)
+        estado = respuesta.status_code
+        respuesta.headers["X-Request-ID"] = id_peticion
+        return respuesta
+    finally:
+        finalizar_traza(token, estado, getattr(request.scope.get("route"), "path", None))
+
 # Manejador global de excepciones
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -43,8 +116,25 @@ async def global_exception_handler(request: Request, exc: Exception):
 # Incluir routers
 app.include_router(login_router)
 app.include_router(controles_router)
+app.include_router(controles_publico_router)
+app.include_router(analisis_router)
+app.include_router(subidas_router)
 app.include_router(admin_router)
 
+@app.on_event("shutdown")
+def liberar_pool_analisis():
+    """Detiene el pool de procesos de análisis al apagar el servidor."""
+    cerrar_gestor()
+
+@app.get("/metrics", include_in_schema=False)
+def exponer_metricas():
+    """
+    Métricas del backend en formato de texto Prometheus.
+
+    Incluye peticiones HTTP, conexiones y sentencias MySQL, pool de bcrypt y cola de análisis.
+    """
+    return PlainTextResponse(registro.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/")
 def read_root():
     """
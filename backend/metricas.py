@@ -0,0 +1,160 @@
+"""Métricas internas del backend en formato compatible con Prometheus.
+
+Los módulos crean sus métricas con las clases de este archivo, las añaden al
+`registro` global y registran en ellas sus observaciones. El endpoint /metrics
+devuelve `registro.exponer()`.
+"""
+import threading
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _formatear_etiquetas(nombres, valores, extra=None):
+    pares = list(zip(nombres, valores))
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ""
+    contenido = ",".join(f'{k}="{str(v)}"'.replace("\n", " ") for k, v in pares)
+    return "{" + contenido + "}"
+
+
+class Histograma:
+    """
+    Histograma acumulado por etiquetas (por ejemplo, latencias en segundos).
+
+    Args:
+        nombre (str): Nombre de la métrica.
+        descripcion (str): Texto de ayuda.
+        buckets (tuple[float]): Límites superiores de los intervalos.
+        etiquetas (tuple[str]): Nombres de las etiquetas de cada serie.
+    """
+    def __init__(self, nombre, descripcion, buckets=BUCKETS_LATENCIA, etiquetas=()):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.buckets = tuple(sorted(buckets))
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_etiquetas):
+        """Registra una observación en la serie correspondiente a las etiquetas dadas."""
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = self._series[valores_etiquetas] = {"cuentas": [0] * len(self.buckets), "suma": 0.0, "total": 0}
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    serie["cuentas"][i] += 1
+            serie["suma"] += valor
+            serie["total"] += 1
+
+    def resumen(self, *valores_etiquetas):
+        """Devuelve total de observaciones y suma para una serie (0, 0.0 si no existe)."""
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            return (serie["total"], serie["suma"]) if serie else (0, 0.0)
+
+    def exponer(self):
+        """Devuelve las líneas de la métrica en formato de texto Prometheus."""
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} histogram"]
+        with self._lock:
+            for valores, serie in sorted(self._series.items()):
+                for limite, cuenta in zip(self.buckets, serie["cuentas"]):
+                    etiquetas = _formatear_etiquetas(self.etiquetas, valores, ("le", repr(float(limite))))
+                    lineas.append(f"{self.nombre}_bucket{etiquetas} {cuenta}")
+                etiquetas = _formatear_etiquetas(self.etiquetas, valores, ("le", "+Inf"))
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {serie['total']}")
+                etiquetas = _formatear_etiquetas(self.etiquetas, valores)
+                lineas.append(f"{self.nombre}_sum{etiquetas} {serie['suma']}")
+                lineas.append(f"{self.nombre}_count{etiquetas} {serie['total']}")
+        return lineas
+
+
+class Contador:
+    """
+    Contador monótono por etiquetas (por ejemplo, peticiones atendidas).
+
+    Args:
+        nombre (str): Nombre de la métrica (por convención termina en _total).
+        descripcion (str): Texto de ayuda.
+        etiquetas (tuple[str]): Nombres de las etiquetas de cada serie.
+    """
+    def __init__(self, nombre, descripcion, etiquetas=()):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = tuple(etiquetas)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *valores_etiquetas, cantidad=1):
+        """Suma `cantidad` a la serie correspondiente a las etiquetas dadas."""
+        with self._lock:
+            self._series[valores_etiquetas] = self._series.get(valores_etiquetas, 0) + cantidad
+
+    def valor(self, *valores_etiquetas):
+        """Devuelve el valor actual de una serie (0 si no existe)."""
+        with self._lock:
+            return self._series.get(valores_etiquetas, 0)
+
+    def exponer(self):
+        """Devuelve las líneas de la métrica en formato de texto Prometheus."""
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} counter"]
+        with self._lock:
+            for valores, valor in sorted(self._series.items()):
+                lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, valores)} {valor}")
+        return lineas
+
+
+class Indicador(Contador):
+    """
+    Valor que puede subir y bajar (por ejemplo, peticiones en curso).
+
+    Si se indica `funcion`, el valor se obtiene al exponer la métrica llamándola:
+    debe devolver un número o, si hay etiquetas, un diccionario {tupla_etiquetas: valor}.
+    """
+    def __init__(self, nombre, descripcion, etiquetas=(), funcion=None):
+        super().__init__(nombre, descripcion, etiquetas)
+        self.funcion = funcion
+
+    def fijar(self, valor, *valores_etiquetas):
+        """Establece el valor de la serie correspondiente a las etiquetas dadas."""
+        with self._lock:
+            self._series[valores_etiquetas] = valor
+
+    def exponer(self):
+        """Devuelve las líneas de la métrica en formato de texto Prometheus."""
+        if self.funcion is not None:
+            valor = self.funcion()
+            with self._lock:
+                self._series = dict(valor) if isinstance(valor, dict) else {(): valor}
+        lineas = super().exponer()
+        lineas[1] = f"# TYPE {self.nombre} gauge"
+        return lineas
+
+
+class RegistroMetricas:
+    """
+    Conjunto de métricas que se exponen juntas en /metrics.
+    """
+    def __init__(self):
+        self._metricas = []
+        self._lock = threading.Lock()
+
+    def registrar(self, metrica):
+        """Añade una métrica al registro y la devuelve (para usarlo en la asignación)."""
+        with self._lock:
+            self._metricas.append(metrica)
+        return metrica
+
+    def exponer(self):
+        """Devuelve el texto Prometheus de todas las métricas registradas."""
+        with self._lock:
+            metricas = list(self._metricas)
+        lineas = []
+        for metrica in metricas:
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+registro = RegistroMetricas()
@@ -0,0 +1,63 @@
+"""Serialización JSON rápida para respuestas con muchas filas de la base de datos.
+
+FastAPI convierte por defecto cada respuesta con `jsonable_encoder`, que recorre
+recursivamente todas las filas antes de llamar a `json.dumps`. Para listados
+grandes (histórico de controles) las filas devueltas por mysql.connector se
+serializan directamente: con orjson si está instalado y, si no, con el módulo
+json estándar y un `default` para los tipos que no soporta.
+
+El formato de salida es el mismo que el de FastAPI: fechas en ISO 8601 y
+Decimal como número (entero si no tiene parte decimal).
+"""
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def codificar_valor(valor):
+    """
+    Convierte los tipos que devuelve mysql.connector y que JSON no admite de forma nativa.
+
+    Raises:
+        TypeError: Si el tipo no está soportado.
+    """
+    if isinstance(valor, Decimal):
+        return int(valor) if valor.as_tuple().exponent >= 0 else float(valor)
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, timedelta):
+        return valor.total_seconds()
+    if isinstance(valor, (bytes, bytearray)):
+        return valor.decode("utf-8")
+    if isinstance(valor, set):
+        return list(valor)
+    raise TypeError(f"Tipo no serializable a JSON: {type(valor).__name__}")
+
+
+def serializar_json(contenido):
+    """
+    Serializa a bytes JSON (UTF-8) listas y diccionarios con valores de la base de datos.
+    """
+    if orjson is not None:
+        return orjson.dumps(contenido, default=codificar_valor, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        contenido, default=codificar_valor, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class RespuestaJSONRapida(JSONResponse):
+    """
+    JSONResponse que serializa el contenido directamente, sin pasar por `jsonable_encoder`.
+
+    Los endpoints deben devolver una instancia de esta clase (no el contenido) para
+    que FastAPI no aplique la conversión genérica; el `response_model` del endpoint
+    se mantiene para documentar el esquema en OpenAPI.
+    """
+    def render(self, content):
+        return serializar_json(content)
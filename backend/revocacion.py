@@ -0,0 +1,112 @@
+"""Almacenes de tokens JWT revocados (logout).
+
+Los tokens se identifican por su claim `jti` y cada entrada caduca en el `exp`
+del propio token: a partir de ese momento el token ya no es válido por sí mismo
+y no tiene sentido seguir guardándolo.
+
+Hay dos implementaciones intercambiables:
+- AlmacenRevocacionMemoria: para un único proceso de uvicorn.
+- AlmacenRevocacionSQLite: archivo compartido entre varios workers de la misma máquina.
+"""
+import time
+import heapq
+import sqlite3
+import threading
+
+
+class AlmacenRevocacionMemoria:
+    """
+    Conjunto de `jti` revocados en memoria con expulsión automática al llegar su `exp`.
+    """
+    def __init__(self):
+        self._revocados = {}
+        self._caducidades = []
+        self._lock = threading.Lock()
+
+    def _purgar(self, ahora):
+        while self._caducidades and self._caducidades[0][0] <= ahora:
+            exp, jti = heapq.heappop(self._caducidades)
+            if self._revocados.get(jti) == exp:
+                del self._revocados[jti]
+
+    def revocar(self, jti, exp):
+        """Marca un token como revocado hasta su fecha de expiración (timestamp)."""
+        with self._lock:
+            self._purgar(time.time())
+            self._revocados[jti] = exp
+            heapq.heappush(self._caducidades, (exp, jti))
+
+    def esta_revocado(self, jti):
+        """Indica si el token con ese `jti` ha sido revocado y aún no ha expirado."""
+        with self._lock:
+            self._purgar(time.time())
+            return jti in self._revocados
+
+    def __len__(self):
+        with self._lock:
+            self._purgar(time.time())
+            return len(self._revocados)
+
+
+class AlmacenRevocacionSQLite:
+    """
+    Tokens revocados en una base de datos SQLite compartida por varios procesos.
+
+    Args:
+        ruta (str): Ruta del archivo SQLite.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        conn = self._conexion()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS token_revocado (
+                jti TEXT PRIMARY KEY,
+                exp REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_token_revocado_exp ON token_revocado (exp)")
+        conn.commit()
+
+    def _conexion(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def revocar(self, jti, exp):
+        """Marca un token como revocado y elimina las entradas ya expiradas."""
+        conn = self._conexion()
+        with conn:
+            conn.execute("DELETE FROM token_revocado WHERE exp <= ?", (time.time(),))
+            conn.execute("INSERT OR REPLACE INTO token_revocado (jti, exp) VALUES (?, ?)", (jti, exp))
+
+    def esta_revocado(self, jti):
+        """Indica si el token con ese `jti` ha sido revocado y aún no ha expirado."""
+        fila = self._conexion().execute(
+            "SELECT 1 FROM token_revocado WHERE jti = ? AND exp > ?", (jti, time.time())
+        ).fetchone()
+        return fila is not None
+
+    def __len__(self):
+        fila = self._conexion().execute(
+            "SELECT COUNT(*) FROM token_revocado WHERE exp > ?", (time.time(),)
+        ).fetchone()
+        return fila[0]
+
+
+def crear_almacen_revocacion(tipo="memoria", ruta_sqlite="revocados.sqlite3"):
+    """
+    Crea el almacén de revocación indicado por configuración.
+
+    Args:
+        tipo (str): 'memoria' o 'sqlite'.
+        ruta_sqlite (str): Archivo a usar cuando el tipo es 'sqlite'.
+    """
+    if tipo == "sqlite":
+        return AlmacenRevocacionSQLite(ruta_sqlite)
+    if tipo == "memoria":
+        return AlmacenRevocacionMemoria()
+    raise ValueError(f"Tipo de almacén de revocación desconocido: {tipo}")
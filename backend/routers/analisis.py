@@ -0,0 +1,136 @@
+"""Módulo de endpoints del backend para ejecutar análisis de rollos en el servidor.
+
+Permite encolar análisis de rollos (por ruta del almacén o subiendo imágenes),
+consultar su estado y progreso, obtener los resultados y cancelar trabajos pendientes.
+"""
+import os
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from typing import List
+from schemas.schemas_analisis import TrabajoAnalisisInput, EstadoTrabajoAnalisis, ResultadoImagen
+from trabajos_analisis import obtener_gestor, ColaLlenaError, ANALISIS_BASE_FOLDER
+from almacen_imagenes import SubidaInvalidaError, validar_nombre
+from routers.subidas import almacen
+from seguridad import usuario_actual
+
+router = APIRouter(prefix="/analisis", tags=["Análisis"], dependencies=[Depends(usuario_actual)])
+
+EXTENSIONES_IMAGEN = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def resolver_ruta_rollo(ruta_rollo):
+    """
+    Valida que la ruta indicada sea una carpeta de rollo dentro del almacén del servidor.
+
+    Args:
+        ruta_rollo (str): Ruta absoluta o relativa a ANALISIS_BASE_FOLDER.
+
+    Returns:
+        tuple[str, str]: Carpeta base y nombre del rollo.
+
+    Raises:
+        HTTPException: Si la ruta está fuera del almacén o no existe.
+    """
+    base = os.path.realpath(ANALISIS_BASE_FOLDER)
+    ruta = os.path.realpath(os.path.join(base, ruta_rollo))
+    if os.path.commonpath([base, ruta]) != base or ruta == base:
+        raise HTTPException(status_code=400, detail="La ruta del rollo debe estar dentro del almacén del servidor")
+    if not os.path.isdir(ruta):
+        raise HTTPException(status_code=404, detail=f"No existe el rollo '{ruta_rollo}' en el servidor")
+    return os.path.dirname(ruta), os.path.basename(ruta)
+
+
+def encolar_analisis(base_path, rollo, area_umbral, pixel_to_mm):
+    """Encola el análisis y traduce una cola llena en un error 503."""
+    try:
+        id_trabajo = obtener_gestor().encolar(base_path, rollo, area_umbral, pixel_to_mm)
+    except ColaLlenaError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"id_trabajo": id_trabajo, "estado": "pendiente"}
+
+
+@router.post("/trabajos")
+def crear_trabajo_analisis(trabajo: TrabajoAnalisisInput):
+    """
+    Encola el análisis de un rollo ya presente en el almacén del servidor.
+
+    Args:
+        trabajo (TrabajoAnalisisInput): Ruta del rollo y parámetros del análisis.
+
+    Returns:
+        dict: ID del trabajo creado y su estado inicial.
+    """
+    base_path, rollo = resolver_ruta_rollo(trabajo.ruta_rollo)
+    return encolar_analisis(base_path, rollo, trabajo.area_umbral, trabajo.pixel_to_mm)
+
+
+@router.post("/trabajos/imagenes")
+def crear_trabajo_desde_imagenes(
+    rollo: str = Form(...),
+    area_umbral: float = Form(..., gt=0),
+    pixel_to_mm: float = Form(0.13379797308, gt=0),
+    imagenes: List[UploadFile] = File(...)
+):
+    """
+    Recibe las imágenes de un rollo, las guarda en el almacén del servidor y encola su análisis.
+
+    Las imágenes se copian a disco por bloques, sin cargarlas completas en memoria,
+    y se deduplican por contenido a través del almacén de subidas.
+    """
+    # El nombre del rollo se valida antes de escribir nada en el almacén
+    try:
+        validar_nombre(rollo)
+    except SubidaInvalidaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for imagen in imagenes:
+        nombre = os.path.basename(imagen.filename or "")
+        if not nombre.lower().endswith(EXTENSIONES_IMAGEN):
+            raise HTTPException(status_code=400, detail=f"Formato de imagen no soportado: {imagen.filename}")
+        try:
+            almacen.guardar_flujo(rollo, nombre, imagen.file)
+        except SubidaInvalidaError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    base_path, nombre_rollo = resolver_ruta_rollo(rollo)
+    return encolar_analisis(base_path, nombre_rollo, area_umbral, pixel_to_mm)
+
+
+@router.get("/trabajos/{id_trabajo}", response_model=EstadoTrabajoAnalisis)
+def consultar_trabajo_analisis(id_trabajo: str):
+    """
+    Devuelve el estado y el progreso (imágenes procesadas / total) de un trabajo.
+    """
+    estado = obtener_gestor().estado(id_trabajo)
+    if estado is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return estado
+
+
+@router.get("/trabajos/{id_trabajo}/resultados", response_model=List[ResultadoImagen])
+def obtener_resultados_trabajo(id_trabajo: str):
+    """
+    Devuelve los resultados por imagen de un trabajo completado.
+
+    Raises:
+        HTTPException: 404 si no existe, 409 si todavía no ha terminado correctamente.
+    """
+    gestor = obtener_gestor()
+    estado = gestor.estado(id_trabajo)
+    if estado is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    if estado["estado"] != "completado":
+        raise HTTPException(status_code=409, detail=f"El trabajo está en estado '{estado['estado']}'")
+    return gestor.resultados(id_trabajo)
+
+
+@router.delete("/trabajos/{id_trabajo}")
+def cancelar_trabajo_analisis(id_trabajo: str):
+    """
+    Cancela un trabajo que aún no ha comenzado a ejecutarse.
+    """
+    gestor = obtener_gestor()
+    if gestor.estado(id_trabajo) is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    if not gestor.cancelar(id_trabajo):
+        raise HTTPException(status_code=409, detail="El trabajo ya está en ejecución o ha finalizado")
+    return {"msg": "Trabajo cancelado"}
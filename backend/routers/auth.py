@@ -4,62 +4,33 @@ Gestiona el login de usuarios, verificación de contraseñas y generación de to
 Usado por el endpoint /login.
 """
 from fastapi import APIRouter, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
 from db import get_connection
 from jose import jwt
 from datetime import datetime, timedelta
 import os
+import uuid
+import logging
 from dotenv import load_dotenv
-import bcrypt
 from unidecode import unidecode
+from seguridad import SECRET_KEY, ALGORITHM, verificar_token, revocar_token
+from hashing import verificar_contrasena_async, HashSaturadoError, HashInvalidoError
+from limitador import LimitadorIntentos
 
 load_dotenv()
 
-SECRET_KEY = os.getenv("SECRET_KEY", "superclave")
-ALGORITHM = "HS256"
+logger = logging.getLogger(__name__)
+
 # Establece tiempo de expiración del token
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 login_router = APIRouter()
 
-# Conjunto para almacenar tokens revocados (blacklist temporal)
-REVOKED_TOKENS = set()
-
-def verificar_contrasena(plain_password, hashed_password):
-    """
-    Verifica si una contraseña en texto plano coincide con un hash bcrypt.
-
-    Args:
-        plain_password (str or bytes): Contraseña proporcionada por el usuario.
-        hashed_password (str or bytes): Contraseña almacenada en la base de datos.
-
-    Returns:
-        bool: True si coinciden, False si no o si ocurre un error.
-    """
-    try:
-        # Convertir contraseña a bytes si es string
-        if isinstance(plain_password, str):
-            plain_password = plain_password.encode('utf-8')
-        
-        # Convertir hash a bytes si es string
-        if isinstance(hashed_password, str):
-            hashed_password = hashed_password.encode('utf-8')
-            
-        # Verificar contraseña usando bcrypt directamente
-        return bcrypt.checkpw(plain_password, hashed_password)
-    except Exception as e:
-        print(f"Error al verificar contraseña: {e}")
-        return False
-
-def hashear_contrasena(plain_password):
-    """
-    Genera un hash para una contraseña en texto plano.
-    Útil para crear nuevos usuarios o actualizar contraseñas.
-    Usa bcrypt con semilla aleatoria. Se recomienda para creación y actualización de usuarios.
-    """
-    if isinstance(plain_password, str):
-        plain_password = plain_password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(plain_password, salt)
+# Intentos fallidos de login permitidos por cuenta dentro de la ventana (segundos)
+limitador_login = LimitadorIntentos(
+    max_intentos=int(os.getenv("LOGIN_MAX_INTENTOS", 5)),
+    ventana=int(os.getenv("LOGIN_VENTANA_SEGUNDOS", 300))
+)
 
 def crear_token(data: dict):
     """
@@ -67,6 +38,7 @@ def crear_token(data: dict):
 
     - Elimina acentos y normaliza strings antes de codificar.
     - Añade una fecha de expiración automática.
+    - Añade un identificador único (jti) que permite revocar el token.
 
     Args:
         data (dict): Diccionario con los datos del usuario (ej. ID, rol, nombre...).
@@ -83,17 +55,32 @@ def crear_token(data: dict):
             to_encode[key] = value
 
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
 
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def buscar_usuario_activo(correo):
+    """Devuelve el usuario activo con ese correo, o None."""
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT * FROM USUARIO
+            WHERE email_usuario = %s AND activo = 1
+        """, (correo,))
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
 @login_router.post("/login")
-def login(usuario: dict):
+async def login(usuario: dict):
     """
     Endpoint de autenticación de usuarios.
 
+    - Rechaza la cuenta temporalmente si acumula demasiados intentos fallidos.
     - Verifica que el email exista y que el usuario esté activo.
-    - Comprueba la contraseña usando bcrypt.
+    - Comprueba la contraseña con bcrypt en el pool dedicado (no bloquea el resto de endpoints).
     - Si es válido, devuelve un token JWT con los datos clave del usuario.
 
     Args:
@@ -103,24 +90,34 @@ def login(usuario: dict):
         dict: Información del usuario autenticado y token de acceso.
 
     Raises:
-        HTTPException: Si las credenciales no son válidas o el usuario está inactivo.
+        HTTPException: 401 si las credenciales no son válidas o el usuario está inactivo,
+        429 si la cuenta está limitada por intentos fallidos, 503 si el pool de bcrypt está saturado.
     """
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-    
+    correo = str(usuario["correo"]).strip().lower()
+    espera = limitador_login.segundos_bloqueo(correo)
+    if espera:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados intentos fallidos. Inténtelo más tarde",
+            headers={"Retry-After": str(int(espera) + 1)}
+        )
+
     # Buscar usuario activo por correo
-    cursor.execute("""
-        SELECT * FROM USUARIO
-        WHERE email_usuario = %s AND activo = 1
-    """, (usuario["correo"],))
-    
-    user = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    
+    user = await run_in_threadpool(buscar_usuario_activo, usuario["correo"])
+
     # Verificar si el usuario existe y la contraseña es correcta
-    if not user or not verificar_contrasena(usuario["contrasenia"], user["password"]):
+    try:
+        valido = bool(user) and await verificar_contrasena_async(usuario["contrasenia"], user["password"])
+    except HashSaturadoError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except HashInvalidoError as e:
+        # Hash corrupto en la base de datos: se rechaza como credenciales incorrectas
+        logger.error(f"Usuario {user['id_usuario']}: {e}")
+        valido = False
+    if not valido:
+        limitador_login.registrar_fallo(correo)
         raise HTTPException(status_code=401, detail="Credenciales incorrectas o usuario inactivo")
+    limitador_login.reiniciar(correo)
     
     # Generar token JWT
     token = crear_token({
@@ -142,27 +139,21 @@ def login(usuario: dict):
 def logout(payload: dict = Body(...)):
     """
     Endpoint para revocar/invalidate un token JWT (logout).
-    Guarda el token en una blacklist temporal.
+    Registra el jti del token como revocado hasta su expiración.
+    Un token ya inválido o expirado no necesita revocarse.
     """
     token = payload.get("token")
-    print(f"Revoking token: {token!r}")
     if not token:
         raise HTTPException(status_code=400, detail="Token requerido")
-    REVOKED_TOKENS.add(token)
-    print(f"Current blacklist: {REVOKED_TOKENS}")
+    revocar_token(token)
     return {"detail": "Token revocado"}
 
 @login_router.get("/validate_token")
 def validate_token(token: str):
-    print(f"Validating token: {token!r}")
-    print(f"Current blacklist: {REVOKED_TOKENS}")
-    from jose import JWTError
-    try:
-        if token in REVOKED_TOKENS:
-            print("Token is revoked!")
-            raise HTTPException(status_code=401, detail="Token revocado")
-        jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return {"valid": True}
-    except JWTError:
-        print("Token is invalid or expired!")
-        raise HTTPException(status_code=401, detail="Token inválido o expirado")
\ No newline at end of file
+    """
+    Comprueba que un token sea válido, no haya expirado y no haya sido revocado.
+
+    Los clientes lo consultan periódicamente; los tokens ya verificados se resuelven desde caché.
+    """
+    verificar_token(token)
+    return {"valid": True}
@@ -3,13 +3,58 @@
 Incluye creación de controles, consulta de histórico, informes, comentarios y solicitudes de cambio de contraseña.
 """
 import os
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response, Depends
 from datetime import datetime
-from schemas.schemas_controles import ControlCalidadInput, InformeControlInput, ActualizarNotasInput, SolicitudCambioPassword
-from db import get_connection
+from schemas.schemas_controles import ControlCalidadInput, InformeControlInput, InformesControlInput, DetalleControlesInput, ActualizarNotasInput, SolicitudCambioPassword, ControlHistorico
+from db import get_connection, versiones_tablas
+from versiones import calcular_etag, etag_coincide
 from typing import List, Optional
+from cache import CacheTTL
+from estadisticas import tasa_nok, percentiles_desde_histograma, conteo_por_tipo
+from admin_panel.datos_panel import invalidar_panel
+from respuestas import RespuestaJSONRapida
+from trazas import span
+from seguridad import usuario_actual
+
+# Todos los endpoints exigen un token válido, salvo los de `router_publico`
+router = APIRouter(
+    prefix="/controles", tags=["Controles"], default_response_class=RespuestaJSONRapida,
+    dependencies=[Depends(usuario_actual)]
+)
+# Endpoints usados desde la ventana de login, antes de tener sesión
+router_publico = APIRouter(prefix="/controles", tags=["Controles"], default_response_class=RespuestaJSONRapida)
+
+# Estadísticas agregadas: se recalculan como mucho cada ESTADISTICAS_TTL segundos
+# o tras registrar un nuevo control.
+cache_estadisticas = CacheTTL(ttl=int(os.getenv("ESTADISTICAS_TTL", 300)))
+
+# Debe coincidir con ngram_token_size del servidor MySQL (ver sql/002_busqueda_control_resumen.sql)
+NGRAM_TOKEN_SIZE = int(os.getenv("NGRAM_TOKEN_SIZE", 2))
+
+# Número máximo de controles por petición en los endpoints por lotes
+MAX_CONTROLES_LOTE = int(os.getenv("MAX_CONTROLES_LOTE", 200))
+
+# Recalcula la fila de CONTROL_RESUMEN de un control (ver sql/001_control_resumen.sql).
+# Se ejecuta con el mismo cursor que la escritura para que ambas queden en la misma transacción.
+SQL_ACTUALIZAR_RESUMEN = """
+    REPLACE INTO CONTROL_RESUMEN (
+        id_control, id_usuario, nombre_usuario, fecha_control, umbral_tamano_defecto,
+        num_defectos_tolerables_por_tamano, observacs, notas, tiene_informe, resultado_rollo, nombre_rollo
+    )
+    SELECT c.id_control, c.id_usuario, u.nombre_usuario, c.fecha_control, c.umbral_tamano_defecto,
+           c.num_defectos_tolerables_por_tamano, c.observacs, i.notas,
+           i.id_informe IS NOT NULL, rc.resultado_rollo, r.nombre_rollo
+    FROM CONTROL_CALIDAD c
+    JOIN USUARIO u ON c.id_usuario = u.id_usuario
+    LEFT JOIN INFORME_CONTROL i ON c.id_control = i.id_control
+    LEFT JOIN ROLLO_CONTROLADO rc ON c.id_control = rc.id_control
+    LEFT JOIN ROLLO r ON rc.id_rollo = r.id_rollo
+    WHERE c.id_control = %s
+"""
 
-router = APIRouter(prefix="/controles", tags=["Controles"])
+def actualizar_resumen_control(cursor, id_control):
+    """Sincroniza CONTROL_RESUMEN con los datos actuales de un control (sin hacer commit)."""
+    cursor.execute(SQL_ACTUALIZAR_RESUMEN, (id_control,))
 
 @router.post("/nuevo")
 def guardar_control_calidad(control: ControlCalidadInput):
@@ -47,23 +92,24 @@ def guardar_control_calidad(control: ControlCalidadInput):
         id_control = cursor.lastrowid
 
         # Buscar o insertar ROLLO
-        nombre_rollo = os.path.basename(control.rollo.ruta_local_rollo).strip().lower()
-        cursor.execute("SELECT id_rollo FROM ROLLO WHERE TRIM(LOWER(nombre_rollo)) = %s", (nombre_rollo,))
-        rollo_existente = cursor.fetchone()
-
-        if rollo_existente:
-            id_rollo = rollo_existente[0]
-        else:
-            cursor.execute("""
-                INSERT INTO ROLLO (ruta_local_rollo, nombre_rollo, num_defectos_rollo, estado_rollo)
-                VALUES (%s, %s, %s, %s)
-            """, (
-                control.rollo.ruta_local_rollo,
-                nombre_rollo,
-                control.rollo.num_defectos_rollo,
-                "controlado"
-            ))
-            id_rollo = cursor.lastrowid
+        with span("buscar_rollo"):
+            nombre_rollo = os.path.basename(control.rollo.ruta_local_rollo).strip().lower()
+            cursor.execute("SELECT id_rollo FROM ROLLO WHERE TRIM(LOWER(nombre_rollo)) = %s", (nombre_rollo,))
+            rollo_existente = cursor.fetchone()
+
+            if rollo_existente:
+                id_rollo = rollo_existente[0]
+            else:
+                cursor.execute("""
+                    INSERT INTO ROLLO (ruta_local_rollo, nombre_rollo, num_defectos_rollo, estado_rollo)
+                    VALUES (%s, %s, %s, %s)
+                """, (
+                    control.rollo.ruta_local_rollo,
+                    nombre_rollo,
+                    control.rollo.num_defectos_rollo,
+                    "controlado"
+                ))
+                id_rollo = cursor.lastrowid
 
         # Insertar ROLLO_CONTROLADO
         rollo = control.rollo
@@ -79,35 +125,41 @@ def guardar_control_calidad(control: ControlCalidadInput):
         ))
 
         # Insertar IMG_DEFECTO y DEFECTO_MEDIDO
-        for img in control.imagenes:
-            cursor.execute("""
-                INSERT INTO IMG_DEFECTO (id_rollo, id_control, nombre_archivo, fecha_captura, max_dim_defecto_medido, clasificacion)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (
-                id_rollo,
-                id_control,
-                img.nombre_archivo,
-                img.fecha_captura,
-                img.max_dim_defecto_medido,
-                img.clasificacion  # ok / nok
-            ))
-            id_imagen = cursor.lastrowid
-
-            for defecto in img.defectos:
-                # Este bloque guarda tipo y valor del defecto (min o max)
+        with span("insertar_imagenes", imagenes=len(control.imagenes)):
+            for img in control.imagenes:
                 cursor.execute("""
-                    INSERT INTO DEFECTO_MEDIDO (id_imagen, area_mm, tipo_valor, tipo_defecto)
-                    VALUES (%s, %s, %s, %s)
+                    INSERT INTO IMG_DEFECTO (id_rollo, id_control, nombre_archivo, fecha_captura, max_dim_defecto_medido, clasificacion)
+                    VALUES (%s, %s, %s, %s, %s, %s)
                 """, (
-                    id_imagen,
-                    defecto.area,
-                    defecto.tipo_valor,       # 'min' o 'max'
-                    defecto.tipo_defecto      # 'punto-negro', etc.
+                    id_rollo,
+                    id_control,
+                    img.nombre_archivo,
+                    img.fecha_captura,
+                    img.max_dim_defecto_medido,
+                    img.clasificacion  # ok / nok
                 ))
+                id_imagen = cursor.lastrowid
+
+                for defecto in img.defectos:
+                    # Este bloque guarda tipo y valor del defecto (min o max)
+                    cursor.execute("""
+                        INSERT INTO DEFECTO_MEDIDO (id_imagen, area_mm, tipo_valor, tipo_defecto)
+                        VALUES (%s, %s, %s, %s)
+                    """, (
+                        id_imagen,
+                        defecto.area,
+                        defecto.tipo_valor,       # 'min' o 'max'
+                        defecto.tipo_defecto      # 'punto-negro', etc.
+                    ))
 
         # Marcar rollo como controlado
         cursor.execute("UPDATE rollo SET estado_rollo = 'controlado' WHERE id_rollo = %s", (id_rollo,))
-        conn.commit()
+        actualizar_resumen_control(cursor, id_control)
+        with span("commit"):
+            conn.commit()
+        versiones_tablas.incrementar("CONTROL_RESUMEN")
+        cache_estadisticas.invalidar()
+        invalidar_panel()
         return {"msg": "Control de calidad guardado exitosamente", "id_control": id_control}
 
     except Exception as e:
@@ -139,44 +191,94 @@ def obtener_ultimo_id_control():
         cursor.close()
         conn.close()
 
-@router.get("/historico", response_model=List[dict])
+def escapar_like(texto):
+    """Escapa los comodines de LIKE para buscar el texto de forma literal."""
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def construir_busqueda_fulltext(q):
+    """
+    Convierte el texto libre de búsqueda en una expresión MATCH ... AGAINST en modo booleano.
+
+    Cada palabra se exige (+) y se busca como frase para que el parser ngram la encuentre
+    dentro de nombres y notas. Las palabras más cortas que NGRAM_TOKEN_SIZE no generan
+    ningún n-grama, así que se buscan como prefijo (los n-gramas que empiezan por ellas).
+    Se eliminan los operadores booleanos escritos por el usuario.
+
+    Returns:
+        str | None: Expresión booleana, o None si no queda ningún término.
+    """
+    limpio = "".join(" " if c in '+-<>()~*"@' else c for c in q)
+    terminos = limpio.split()
+    if not terminos:
+        return None
+    return " ".join(f"+{t}*" if len(t) < NGRAM_TOKEN_SIZE else f'+"{t}"' for t in terminos)
+
+def comprobar_etag(request: Request, tabla):
+    """
+    Calcula el ETag de una lectura a partir de la versión de la tabla y los parámetros de la URL.
+
+    La versión se lee antes de consultar la base de datos, así una escritura
+    concurrente nunca queda oculta.
+
+    Returns:
+        tuple[dict, Response | None]: Cabeceras ETag/Cache-Control para la respuesta y una
+        respuesta 304 si el cliente ya tiene esos datos (None si hay que generarlos).
+    """
+    etag = calcular_etag(versiones_tablas.version(tabla), request.url.path,
+                         tuple(sorted(request.query_params.multi_items())))
+    cabeceras = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return cabeceras, Response(status_code=304, headers=cabeceras)
+    return cabeceras, None
+
+@router.get("/historico", response_model=List[ControlHistorico])
 def obtener_historico_controles(
+    request: Request,
     max_defectos: Optional[int] = Query(None),
     max_dim: Optional[float] = Query(None),
     usuario: Optional[str] = Query(None),
     desde: Optional[datetime] = Query(None),
-    hasta: Optional[datetime] = Query(None)
+    hasta: Optional[datetime] = Query(None),
+    q: Optional[str] = Query(None)
 ):
     """
     Devuelve el listado de controles de calidad registrados, con filtros opcionales.
 
+    Lee de la tabla desnormalizada CONTROL_RESUMEN, sin JOIN. Admite peticiones
+    condicionales: si el If-None-Match del cliente sigue vigente devuelve 304 sin consultar la base de datos.
+
     Args:
         max_defectos (int, opcional): Máximo número de defectos tolerables.
         max_dim (float, opcional): Máximo umbral de tamaño de defecto.
-        usuario (str, opcional): Nombre parcial del usuario.
+        usuario (str, opcional): Comienzo del nombre del usuario.
         desde (datetime, opcional): Fecha mínima del control.
         hasta (datetime, opcional): Fecha máxima del control.
+        q (str, opcional): Texto a buscar en nombres de usuario, nombres de rollo y notas.
+
+    Las filas se serializan directamente con `RespuestaJSONRapida`, sin validarlas
+    una a una contra `ControlHistorico` (que solo documenta el esquema).
 
     Returns:
-        List[dict]: Controles que cumplen con los filtros aplicados.
+        List[ControlHistorico]: Controles que cumplen con los filtros aplicados.
     """
+    cabeceras, no_modificado = comprobar_etag(request, "CONTROL_RESUMEN")
+    if no_modificado is not None:
+        return no_modificado
+
     conn = get_connection()
     cursor = conn.cursor(dictionary=True)
     try:
         query = """
             SELECT c.id_control,
-                   u.nombre_usuario,
+                   c.nombre_usuario,
                    c.fecha_control,
                    c.umbral_tamano_defecto,
                    c.num_defectos_tolerables_por_tamano,
                    c.observacs,
-                   i.notas,
-                   CASE WHEN i.id_informe IS NOT NULL THEN 1 ELSE 0 END AS tiene_informe,
-                   rc.resultado_rollo
-            FROM CONTROL_CALIDAD c
-            JOIN USUARIO u ON c.id_usuario = u.id_usuario
-            LEFT JOIN INFORME_CONTROL i ON c.id_control = i.id_control
-            LEFT JOIN ROLLO_CONTROLADO rc ON c.id_control = rc.id_control
+                   c.notas,
+                   c.tiene_informe,
+                   c.resultado_rollo
+            FROM CONTROL_RESUMEN c
             WHERE 1=1
         """
         params = []
@@ -190,8 +292,9 @@ def obtener_historico_controles(
             params.append(max_dim)
 
         if usuario is not None:
-            query += " AND u.nombre_usuario LIKE %s"
-            params.append(f"%{usuario}%")
+            # Búsqueda por prefijo para poder usar idx_resumen_usuario
+            query += " AND c.nombre_usuario LIKE %s"
+            params.append(escapar_like(usuario) + "%")
 
         if desde is not None:
             query += " AND c.fecha_control >= %s"
@@ -201,11 +304,17 @@ def obtener_historico_controles(
             query += " AND c.fecha_control <= %s"
             params.append(hasta)
 
+        busqueda = construir_busqueda_fulltext(q) if q else None
+        if busqueda is not None:
+            # Usa el índice ft_resumen_busqueda (sql/002_busqueda_control_resumen.sql)
+            query += " AND MATCH(c.nombre_usuario, c.nombre_rollo, c.notas) AGAINST (%s IN BOOLEAN MODE)"
+            params.append(busqueda)
+
         query += " ORDER BY c.fecha_control DESC"
 
         cursor.execute(query, params)
         controles = cursor.fetchall()
-        return controles
+        return RespuestaJSONRapida(controles, headers=cabeceras)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -215,13 +324,104 @@ def obtener_historico_controles(
 
 
 @router.get("/usuarios", response_model=List[str])
-def obtener_lista_usuarios():
+def obtener_lista_usuarios(request: Request):
+    """
+    Devuelve los nombres de usuario registrados, ordenados alfabéticamente.
+
+    Admite peticiones condicionales (ETag / If-None-Match).
+    """
+    cabeceras, no_modificado = comprobar_etag(request, "USUARIO")
+    if no_modificado is not None:
+        return no_modificado
+
     conn = get_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("SELECT DISTINCT nombre_usuario FROM USUARIO ORDER BY nombre_usuario ASC")
         usuarios = [fila[0] for fila in cursor.fetchall()]
-        return usuarios
+        return RespuestaJSONRapida(usuarios, headers=cabeceras)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        cursor.close()
+        conn.close()
+
+@router.get("/estadisticas")
+def obtener_estadisticas(
+    desde: Optional[datetime] = Query(None),
+    hasta: Optional[datetime] = Query(None)
+):
+    """
+    Devuelve métricas agregadas del histórico para cuadros de mando.
+
+    Incluye la tasa de rollos NOK por día, usuario y rollo, los percentiles del mayor
+    defecto medido por imagen y el número de imágenes por tipo de defecto.
+    El resultado se guarda en caché y se invalida al registrar un nuevo control.
+
+    Args:
+        desde (datetime, opcional): Fecha mínima del control.
+        hasta (datetime, opcional): Fecha máxima del control.
+
+    Returns:
+        dict: Métricas agregadas.
+    """
+    return cache_estadisticas.obtener_o_calcular((desde, hasta), lambda: calcular_estadisticas(desde, hasta))
+
+
+def calcular_estadisticas(desde, hasta):
+    """Ejecuta las consultas agregadas de /controles/estadisticas."""
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        filtro = " WHERE 1=1"
+        params = []
+        if desde is not None:
+            filtro += " AND c.fecha_control >= %s"
+            params.append(desde)
+        if hasta is not None:
+            filtro += " AND c.fecha_control <= %s"
+            params.append(hasta)
+
+        agrupaciones = {
+            "dia": "DATE(c.fecha_control)",
+            "usuario": "c.nombre_usuario",
+            "rollo": "c.nombre_rollo",
+        }
+        estadisticas = {}
+        for clave, expresion in agrupaciones.items():
+            cursor.execute(f"""
+                SELECT {expresion} AS {clave},
+                       COUNT(*) AS total,
+                       SUM(c.resultado_rollo = 'nok') AS nok
+                FROM CONTROL_RESUMEN c
+                {filtro}
+                GROUP BY {expresion}
+                ORDER BY {expresion}
+            """, params)
+            estadisticas[f"nok_por_{clave}"] = tasa_nok(cursor.fetchall(), clave)
+
+        cursor.execute(f"""
+            SELECT i.max_dim_defecto_medido AS area, COUNT(*) AS apariciones
+            FROM IMG_DEFECTO i
+            JOIN CONTROL_CALIDAD c ON i.id_control = c.id_control
+            {filtro}
+            GROUP BY i.max_dim_defecto_medido
+            ORDER BY i.max_dim_defecto_medido
+        """, params)
+        histograma = [(fila["area"], fila["apariciones"]) for fila in cursor.fetchall()]
+        estadisticas["percentiles_area_mm2"] = percentiles_desde_histograma(histograma)
+
+        cursor.execute(f"""
+            SELECT d.tipo_defecto, COUNT(*) AS imagenes
+            FROM DEFECTO_MEDIDO d
+            JOIN IMG_DEFECTO i ON d.id_imagen = i.id_imagen
+            JOIN CONTROL_CALIDAD c ON i.id_control = c.id_control
+            {filtro} AND d.tipo_valor = 'max'
+            GROUP BY d.tipo_defecto
+        """, params)
+        estadisticas["imagenes_por_tipo_defecto"] = conteo_por_tipo(cursor.fetchall())
+        return estadisticas
+
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
@@ -252,7 +452,9 @@ def guardar_informe_control(informe: InformeControlInput):
             informe.fecha_generacion,
             informe.notas or ""
         ))
+        actualizar_resumen_control(cursor, informe.id_control)
         conn.commit()
+        versiones_tablas.incrementar("CONTROL_RESUMEN")
         return {"msg": "Informe guardado correctamente"}
     except Exception as e:
         conn.rollback()
@@ -261,6 +463,125 @@ def guardar_informe_control(informe: InformeControlInput):
         cursor.close()
         conn.close()
 
+@router.post("/informe")
+def guardar_informes_control(lote: InformesControlInput):
+    """
+    Registra en una sola transacción los informes PDF de varios controles.
+
+    Usado por la generación de informes por lotes del histórico. Los controles que
+    ya tienen informe se omiten, de modo que reintentar un lote no duplica registros.
+
+    Args:
+        lote (InformesControlInput): Informes a registrar (como mucho MAX_CONTROLES_LOTE).
+
+    Returns:
+        dict: Confirmación con los IDs de control 'registrados' y 'omitidos'.
+
+    Raises:
+        HTTPException: 400 si el lote es demasiado grande; 500 si falla la base de datos.
+    """
+    informes = {informe.id_control: informe for informe in lote.informes}
+    if len(informes) > MAX_CONTROLES_LOTE:
+        raise HTTPException(status_code=400, detail=f"Como máximo {MAX_CONTROLES_LOTE} informes por lote")
+    if not informes:
+        return {"msg": "No hay informes que registrar", "registrados": [], "omitidos": []}
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        marcadores = ", ".join(["%s"] * len(informes))
+        cursor.execute(f"SELECT DISTINCT id_control FROM INFORME_CONTROL WHERE id_control IN ({marcadores})", list(informes))
+        existentes = {fila[0] for fila in cursor.fetchall()}
+        nuevos = [informe for id_control, informe in informes.items() if id_control not in existentes]
+
+        if nuevos:
+            cursor.executemany("""
+                INSERT INTO INFORME_CONTROL (id_control, ruta_pdf, generado_por, fecha_generacion, notas)
+                VALUES (%s, %s, %s, %s, %s)
+            """, [
+                (informe.id_control, informe.ruta_pdf, informe.generado_por, informe.fecha_generacion, informe.notas or "")
+                for informe in nuevos
+            ])
+            cursor.executemany(SQL_ACTUALIZAR_RESUMEN, [(informe.id_control,) for informe in nuevos])
+        conn.commit()
+        if nuevos:
+            versiones_tablas.incrementar("CONTROL_RESUMEN")
+        return {
+            "msg": f"{len(nuevos)} informes guardados correctamente",
+            "registrados": [informe.id_control for informe in nuevos],
+            "omitidos": sorted(existentes)
+        }
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        cursor.close()
+        conn.close()
+
+@router.post("/detalle")
+def obtener_detalle_controles(datos: DetalleControlesInput):
+    """
+    Devuelve los datos necesarios para generar el informe PDF de varios controles.
+
+    Por cada control: usuario y rol, fecha, tolerancias, rollo (nombre y ruta local),
+    resultado y sus imágenes con clasificación, mayor defecto y tipo de defecto, en orden
+    de registro. Dos consultas para todo el lote, en lugar de una por control.
+
+    Args:
+        datos (DetalleControlesInput): IDs de los controles (como mucho MAX_CONTROLES_LOTE).
+
+    Returns:
+        list[dict]: Detalle de los controles encontrados, en el orden solicitado.
+
+    Raises:
+        HTTPException: 400 si se piden demasiados controles; 500 si falla la base de datos.
+    """
+    ids = list(dict.fromkeys(datos.ids))
+    if len(ids) > MAX_CONTROLES_LOTE:
+        raise HTTPException(status_code=400, detail=f"Como máximo {MAX_CONTROLES_LOTE} controles por petición")
+    if not ids:
+        return []
+
+    conn = get_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        marcadores = ", ".join(["%s"] * len(ids))
+        cursor.execute(f"""
+            SELECT c.id_control, c.fecha_control, c.umbral_tamano_defecto, c.num_defectos_tolerables_por_tamano,
+                   u.nombre_usuario, u.rol AS rol_usuario, r.nombre_rollo, r.ruta_local_rollo, rc.resultado_rollo
+            FROM CONTROL_CALIDAD c
+            JOIN USUARIO u ON c.id_usuario = u.id_usuario
+            LEFT JOIN ROLLO_CONTROLADO rc ON c.id_control = rc.id_control
+            LEFT JOIN ROLLO r ON rc.id_rollo = r.id_rollo
+            WHERE c.id_control IN ({marcadores})
+        """, ids)
+        controles = {fila["id_control"]: dict(fila, imagenes=[]) for fila in cursor.fetchall()}
+
+        cursor.execute(f"""
+            SELECT i.id_control, i.nombre_archivo, i.max_dim_defecto_medido, i.clasificacion, d.tipo_defecto
+            FROM IMG_DEFECTO i
+            LEFT JOIN DEFECTO_MEDIDO d ON d.id_imagen = i.id_imagen AND d.tipo_valor = 'max'
+            WHERE i.id_control IN ({marcadores})
+            ORDER BY i.id_control, i.id_imagen
+        """, ids)
+        for fila in cursor.fetchall():
+            control = controles.get(fila["id_control"])
+            if control is None:
+                continue
+            control["imagenes"].append({
+                "nombre_archivo": fila["nombre_archivo"],
+                "max_dim_defecto_medido": fila["max_dim_defecto_medido"],
+                "clasificacion": fila["clasificacion"],
+                "tipo_defecto": fila["tipo_defecto"]
+            })
+
+        return [controles[id_control] for id_control in ids if id_control in controles]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        cursor.close()
+        conn.close()
+
 @router.get("/rollo/orden_analisis")
 def obtener_orden_analisis(nombre_rollo: str):
     """
@@ -346,7 +667,9 @@ def actualizar_notas_informe(datos: ActualizarNotasInput):
             SET notas = %s
             WHERE id_control = %s
         """, (datos.notas, datos.id_control))
+        cursor.execute("UPDATE CONTROL_RESUMEN SET notas = %s WHERE id_control = %s", (datos.notas, datos.id_control))
         conn.commit()
+        versiones_tablas.incrementar("CONTROL_RESUMEN")
         return {"msg": "Notas actualizadas correctamente"}
     except Exception as e:
         conn.rollback()
@@ -356,7 +679,7 @@ def actualizar_notas_informe(datos: ActualizarNotasInput):
         conn.close()
 
 
-@router.post("/solicitud_password")
+@router_publico.post("/solicitud_password")
 def registrar_solicitud_cambio(solicitud: SolicitudCambioPassword):
     """
     Registra una solicitud de cambio de contraseña para un usuario.
@@ -392,6 +715,7 @@ def registrar_solicitud_cambio(solicitud: SolicitudCambioPassword):
             solicitud.timestamp.isoformat()
         ))
         conn.commit()
+        invalidar_panel()
         return {"mensaje": "Solicitud para cambio de contraseña registrada correctamente"}
     except Exception as e:
         conn.rollback()
@@ -0,0 +1,127 @@
+"""Módulo de endpoints del backend para subir imágenes de rollos al servidor.
+
+Implementa un protocolo de subida por fragmentos reanudable:
+1. POST /subidas con nombre, rollo, tamaño y SHA-256 del archivo.
+2. PUT /subidas/{id}?offset=N con los bytes restantes en el cuerpo (puede repetirse).
+3. GET /subidas/{id} para conocer desde qué offset reanudar tras un corte.
+
+Las imágenes se deduplican por contenido: si el hash ya existe en el servidor no se envían datos.
+Las subidas parciales sin datos nuevos durante SUBIDAS_CADUCIDAD_HORAS se borran.
+Configurable mediante SUBIDAS_FOLDER, SUBIDAS_MAX_BYTES y SUBIDAS_CADUCIDAD_HORAS.
+"""
+import os
+import asyncio
+import weakref
+from fastapi import APIRouter, HTTPException, Request, Query, Depends
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from dotenv import load_dotenv
+from almacen_imagenes import AlmacenImagenes, SubidaNoEncontradaError, SubidaInvalidaError, DesfaseSubidaError, TAMANO_BLOQUE
+from trabajos_analisis import ANALISIS_BASE_FOLDER
+from seguridad import usuario_actual
+
+load_dotenv()
+
+SUBIDAS_FOLDER = os.getenv("SUBIDAS_FOLDER", os.path.join(os.path.expanduser("~"), "isli_subidas"))
+SUBIDAS_MAX_BYTES = int(os.getenv("SUBIDAS_MAX_BYTES", 200 * 1024 * 1024))
+SUBIDAS_CADUCIDAD_HORAS = float(os.getenv("SUBIDAS_CADUCIDAD_HORAS", 24))
+
+almacen = AlmacenImagenes(
+    ANALISIS_BASE_FOLDER, SUBIDAS_FOLDER, SUBIDAS_MAX_BYTES,
+    caducidad_parciales=int(SUBIDAS_CADUCIDAD_HORAS * 3600)
+)
+
+# Un cerrojo por subida en curso: dos PUT de la misma subida no escriben a la vez.
+# Se liberan solos cuando ninguna petición los usa.
+_bloqueos_subidas = weakref.WeakValueDictionary()
+
+
+def bloqueo_subida(id_subida):
+    """Devuelve el cerrojo (asyncio.Lock) de la subida, creándolo si no existe."""
+    bloqueo = _bloqueos_subidas.get(id_subida)
+    if bloqueo is None:
+        bloqueo = asyncio.Lock()
+        _bloqueos_subidas[id_subida] = bloqueo
+    return bloqueo
+
+router = APIRouter(prefix="/subidas", tags=["Subidas"], dependencies=[Depends(usuario_actual)])
+
+
+class SubidaInput(BaseModel):
+    """
+    Metadatos de una imagen que se va a subir por fragmentos.
+    """
+    rollo: str
+    nombre_archivo: str
+    tamano: int = Field(ge=0)
+    sha256: str
+
+
+@router.post("")
+def iniciar_subida(subida: SubidaInput):
+    """
+    Crea o reanuda una subida por fragmentos.
+
+    Returns:
+        dict: ID de la subida, offset desde el que enviar datos y si ya está completada
+        (por ejemplo, porque el contenido ya existía en el servidor).
+    """
+    try:
+        return almacen.iniciar_subida(subida.rollo, subida.nombre_archivo, subida.tamano, subida.sha256)
+    except SubidaInvalidaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{id_subida}")
+def consultar_subida(id_subida: str):
+    """
+    Devuelve el offset actual de una subida para poder reanudarla.
+    """
+    try:
+        return almacen.estado_subida(id_subida)
+    except SubidaNoEncontradaError:
+        raise HTTPException(status_code=404, detail="Subida no encontrada o ya completada")
+
+
+@router.put("/{id_subida}")
+async def subir_fragmento(id_subida: str, request: Request, offset: int = Query(..., ge=0)):
+    """
+    Anexa al archivo parcial los bytes del cuerpo de la petición.
+
+    El cuerpo se escribe a disco conforme llega, por bloques y fuera del bucle de eventos,
+    sin cargarlo en memoria. Si con este fragmento se completa el archivo, se verifica el
+    hash y se enlaza en el rollo (también fuera del bucle de eventos).
+    Las peticiones a una misma subida se atienden de una en una: la segunda comprueba su
+    offset cuando termina la primera.
+
+    Raises:
+        HTTPException: 404 si la subida no existe, 409 si el offset no coincide,
+        413 si se envían más bytes de los declarados, 400 si el hash no coincide.
+    """
+    async with bloqueo_subida(id_subida):
+        try:
+            archivo, restantes = await run_in_threadpool(almacen.abrir_fragmento, id_subida, offset)
+        except SubidaNoEncontradaError:
+            raise HTTPException(status_code=404, detail="Subida no encontrada o ya completada")
+        except DesfaseSubidaError as e:
+            raise HTTPException(status_code=409, detail={"msg": str(e), "offset": e.offset_esperado})
+
+        try:
+            pendiente = bytearray()
+            async for fragmento in request.stream():
+                if len(fragmento) > restantes:
+                    raise HTTPException(status_code=413, detail="Se han enviado más bytes de los declarados")
+                restantes -= len(fragmento)
+                pendiente += fragmento
+                if len(pendiente) >= TAMANO_BLOQUE:
+                    await run_in_threadpool(archivo.write, bytes(pendiente))
+                    pendiente.clear()
+            if pendiente:
+                await run_in_threadpool(archivo.write, bytes(pendiente))
+        finally:
+            await run_in_threadpool(archivo.close)
+
+        try:
+            return await run_in_threadpool(almacen.finalizar_si_completa, id_subida)
+        except SubidaInvalidaError as e:
+            raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+
+class TrabajoAnalisisInput(BaseModel):
+    """
+    Petición de análisis en servidor de un rollo ubicado en el almacén del servidor.
+    """
+    ruta_rollo: str
+    area_umbral: float = Field(gt=0)
+    pixel_to_mm: float = Field(0.13379797308, gt=0)
+
+
+class ResultadoImagen(BaseModel):
+    """
+    Resultado del análisis de una imagen: áreas medidas (mm²) y tipos de defecto.
+    """
+    nombre_archivo: str
+    areas_mm2: List[float] = []
+    tipos: List[str] = []
+
+
+class EstadoTrabajoAnalisis(BaseModel):
+    """
+    Estado y progreso de un trabajo de análisis encolado en el servidor.
+    """
+    id_trabajo: str
+    rollo: str
+    estado: str
+    procesadas: int
+    total: int
+    fecha_creacion: datetime
+    fecha_fin: Optional[datetime] = None
+    error: Optional[str] = None
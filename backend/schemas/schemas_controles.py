@@ -59,6 +59,20 @@ class InformeControlInput(BaseModel):
     notas: Optional[str] = None
 
 
+class InformesControlInput(BaseModel):
+    """
+    Lote de informes PDF a registrar en una sola llamada (generación por lotes desde el histórico).
+    """
+    informes: List[InformeControlInput]
+
+
+class DetalleControlesInput(BaseModel):
+    """
+    IDs de los controles cuyo detalle (rollo e imágenes) se solicita.
+    """
+    ids: List[int]
+
+
 class ActualizarNotasInput(BaseModel):
     """
     Modelo para actualizar las notas de un informe existente.
@@ -75,3 +89,18 @@ class SolicitudCambioPassword(BaseModel):
     motivo: str = ""
     password_nueva: str
     timestamp: datetime
+
+
+class ControlHistorico(BaseModel):
+    """
+    Fila del histórico de controles (tabla CONTROL_RESUMEN) tal como la devuelve /controles/historico.
+    """
+    id_control: int
+    nombre_usuario: str
+    fecha_control: datetime
+    umbral_tamano_defecto: Decimal
+    num_defectos_tolerables_por_tamano: int
+    observacs: Optional[str] = None
+    notas: Optional[str] = None
+    tiene_informe: int
+    resultado_rollo: Optional[str] = None
@@ -0,0 +1,122 @@
+"""Verificación de tokens JWT y dependencias de autenticación para los routers.
+
+Centraliza la clave de firma, la lista de tokens revocados y una caché de claims
+ya verificados: validar repetidamente el mismo token (por ejemplo, el sondeo
+periódico de /validate_token) cuesta una búsqueda en diccionario en lugar de
+volver a comprobar la firma HMAC.
+"""
+import os
+import hashlib
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, Form
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jose import jwt, JWTError
+from dotenv import load_dotenv
+from cache import CacheExpiracionLRU
+from revocacion import crear_almacen_revocacion
+
+load_dotenv()
+
+SECRET_KEY = os.getenv("SECRET_KEY", "superclave")
+ALGORITHM = "HS256"
+
+# Tokens revocados por logout, indexados por jti y con caducidad en el exp del token.
+# REVOCACION_BACKEND=sqlite comparte la lista entre varios workers de uvicorn.
+almacen_revocados = crear_almacen_revocacion(
+    os.getenv("REVOCACION_BACKEND", "memoria"),
+    os.getenv("REVOCACION_SQLITE_PATH", "revocados.sqlite3")
+)
+
+# Claims de tokens con firma ya verificada, válidos hasta su exp
+cache_tokens = CacheExpiracionLRU(max_entradas=int(os.getenv("TOKEN_CACHE_MAX", 1024)))
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def identificador_token(token, claims):
+    """
+    Devuelve la clave con la que se registra un token en la lista de revocados.
+
+    Usa el claim jti; los tokens emitidos antes de incluirlo se identifican por su hash.
+    """
+    return claims.get("jti") or hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def decodificar_token(token):
+    """
+    Devuelve los claims de un token con firma válida y no expirado.
+
+    Consulta primero la caché de tokens verificados.
+
+    Raises:
+        HTTPException: 401 si el token no es válido o ha expirado.
+    """
+    token = token.strip()
+    claims = cache_tokens.obtener(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError:
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+        cache_tokens.guardar(token, claims, claims["exp"])
+    return claims
+
+
+def verificar_token(token):
+    """
+    Devuelve los claims de un token válido que no ha sido revocado.
+
+    Raises:
+        HTTPException: 401 si el token no es válido, ha expirado o ha sido revocado.
+    """
+    claims = decodificar_token(token)
+    if almacen_revocados.esta_revocado(identificador_token(token.strip(), claims)):
+        raise HTTPException(status_code=401, detail="Token revocado")
+    return claims
+
+
+def revocar_token(token):
+    """
+    Revoca un token hasta su expiración. Un token ya inválido no necesita revocarse.
+    """
+    token = token.strip()
+    try:
+        claims = decodificar_token(token)
+    except HTTPException:
+        return
+    almacen_revocados.revocar(identificador_token(token, claims), claims["exp"])
+    cache_tokens.eliminar(token)
+
+
+def token_de_peticion(
+    credenciales: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+    token: Optional[str] = Query(None)
+):
+    """Obtiene el token de la cabecera 'Authorization: Bearer' o, en su defecto, del parámetro ?token=."""
+    if credenciales is not None:
+        return credenciales.credentials
+    if token:
+        return token
+    raise HTTPException(status_code=401, detail="Token requerido")
+
+
+def usuario_actual(token: str = Depends(token_de_peticion)):
+    """Dependencia FastAPI: claims del usuario autenticado."""
+    return verificar_token(token)
+
+
+def exigir_administrador(claims):
+    """Comprueba que los claims correspondan a un administrador."""
+    if claims.get("rol") != "administrador":
+        raise HTTPException(status_code=403, detail="Acceso restringido a administradores")
+    return claims
+
+
+def administrador_actual(claims: dict = Depends(usuario_actual)):
+    """Dependencia FastAPI: claims de un administrador autenticado (token en cabecera o URL)."""
+    return exigir_administrador(claims)
+
+
+def administrador_formulario(token: str = Form(...)):
+    """Dependencia FastAPI: claims de un administrador cuyo token llega en un formulario del panel."""
+    return exigir_administrador(verificar_token(token))
@@ -0,0 +1,39 @@
+-- Tabla desnormalizada con una fila por control de calidad.
+-- Sustituye los JOIN de CONTROL_CALIDAD, USUARIO, INFORME_CONTROL y ROLLO_CONTROLADO
+-- en la consulta del histórico. El backend la mantiene en la misma transacción
+-- en la que escribe controles, informes y notas (ver routers/controles.py).
+
+CREATE TABLE IF NOT EXISTS CONTROL_RESUMEN (
+    id_control INT NOT NULL PRIMARY KEY,
+    id_usuario INT NOT NULL,
+    nombre_usuario VARCHAR(100) NOT NULL,
+    fecha_control DATETIME NOT NULL,
+    umbral_tamano_defecto DECIMAL(5,2) NOT NULL,
+    num_defectos_tolerables_por_tamano INT NOT NULL,
+    observacs TEXT,
+    notas TEXT,
+    tiene_informe TINYINT(1) NOT NULL DEFAULT 0,
+    resultado_rollo VARCHAR(10),
+    nombre_rollo VARCHAR(255),
+    -- Listado por fecha: el orden sale del índice y los filtros de tolerancia se evalúan
+    -- sobre sus entradas antes de leer la fila. No es un índice cubriente: el histórico
+    -- también devuelve observacs y notas (TEXT), que se leen de la fila.
+    INDEX idx_resumen_fecha (fecha_control, num_defectos_tolerables_por_tamano, umbral_tamano_defecto),
+    -- Filtro por usuario (prefijo) ordenado por fecha
+    INDEX idx_resumen_usuario (nombre_usuario, fecha_control),
+    INDEX idx_resumen_rollo (nombre_rollo, fecha_control)
+);
+
+-- Carga inicial a partir de los datos existentes
+REPLACE INTO CONTROL_RESUMEN (
+    id_control, id_usuario, nombre_usuario, fecha_control, umbral_tamano_defecto,
+    num_defectos_tolerables_por_tamano, observacs, notas, tiene_informe, resultado_rollo, nombre_rollo
+)
+SELECT c.id_control, c.id_usuario, u.nombre_usuario, c.fecha_control, c.umbral_tamano_defecto,
+       c.num_defectos_tolerables_por_tamano, c.observacs, i.notas,
+       i.id_informe IS NOT NULL, rc.resultado_rollo, r.nombre_rollo
+FROM CONTROL_CALIDAD c
+JOIN USUARIO u ON c.id_usuario = u.id_usuario
+LEFT JOIN INFORME_CONTROL i ON c.id_control = i.id_control
+LEFT JOIN ROLLO_CONTROLADO rc ON c.id_control = rc.id_control
+LEFT JOIN ROLLO r ON rc.id_rollo = r.id_rollo;
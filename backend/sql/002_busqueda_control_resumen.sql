@@ -0,0 +1,7 @@
+-- Índice de texto completo para el parámetro q= de /controles/historico.
+-- El parser ngram indexa fragmentos de ngram_token_size caracteres (2 por defecto),
+-- de modo que se encuentran coincidencias parciales dentro de nombres de usuario,
+-- nombres de rollo y notas de informe sin recorrer la tabla con LIKE '%...%'.
+
+ALTER TABLE CONTROL_RESUMEN
+    ADD FULLTEXT INDEX ft_resumen_busqueda (nombre_usuario, nombre_rollo, notas) WITH PARSER ngram;
@@ -0,0 +1,227 @@
+"""Cola de trabajos de análisis de rollos ejecutados en el servidor.
+
+Los análisis se lanzan sobre un pool de procesos propio del backend para que el
+trabajo pesado de OpenCV no recaiga en los equipos de los operarios.
+Configurable mediante variables de entorno:
+- ANALISIS_BASE_FOLDER: carpeta raíz del almacén de rollos en el servidor.
+- ANALISIS_MAX_WORKERS: número máximo de análisis simultáneos.
+- ANALISIS_MAX_COLA: número máximo de trabajos en espera.
+"""
+import os
+import sys
+import uuid
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+from metricas import Indicador, registro
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+load_dotenv()
+
+ANALISIS_BASE_FOLDER = os.getenv("ANALISIS_BASE_FOLDER", os.path.join(os.path.expanduser("~"), "almacen_servidor"))
+ANALISIS_MAX_WORKERS = int(os.getenv("ANALISIS_MAX_WORKERS", os.cpu_count() or 2))
+ANALISIS_MAX_COLA = int(os.getenv("ANALISIS_MAX_COLA", 20))
+# Número de trabajos finalizados que se conservan para consulta
+ANALISIS_RETENCION_TRABAJOS = int(os.getenv("ANALISIS_RETENCION_TRABAJOS", 500))
+
+ESTADOS_ACTIVOS = ("pendiente", "en_curso")
+
+
+class ColaLlenaError(Exception):
+    """Se lanza cuando la cola de análisis ha alcanzado su profundidad máxima."""
+
+
+def _ejecutar_trabajo(id_trabajo, base_path, rollo, area_umbral, pixel_to_mm, progreso_compartido):
+    """
+    Función ejecutada en el proceso hijo: analiza el rollo y publica el avance.
+
+    Returns:
+        list[dict]: Resultados por imagen devueltos por `analizar_rollo`.
+    """
+    from analisis_defectos.procesador_rollos import analizar_rollo
+
+    def publicar(procesadas, total):
+        progreso_compartido[id_trabajo] = (procesadas, total)
+
+    publicar(0, 0)
+    return analizar_rollo(
+        base_path=base_path,
+        rollo=rollo,
+        area_umbral=area_umbral,
+        pixel_to_mm=pixel_to_mm,
+        progreso=publicar
+    )
+
+
+class GestorAnalisis:
+    """
+    Mantiene el pool de procesos y el registro de trabajos de análisis.
+
+    Cada trabajo se identifica por un ID hexadecimal y pasa por los estados
+    'pendiente', 'en_curso', 'completado', 'error' o 'cancelado'.
+
+    Args:
+        max_workers (int): Análisis simultáneos.
+        max_cola (int): Trabajos en espera admitidos además de los que se ejecutan.
+        funcion_trabajo (callable): Función que ejecuta cada trabajo en el proceso hijo, con la
+            firma de `_ejecutar_trabajo`; debe poder importarse desde el proceso hijo.
+    """
+    def __init__(self, max_workers=ANALISIS_MAX_WORKERS, max_cola=ANALISIS_MAX_COLA, funcion_trabajo=_ejecutar_trabajo):
+        contexto = multiprocessing.get_context("spawn")
+        self.max_workers = max_workers
+        self.max_cola = max_cola
+        self.funcion_trabajo = funcion_trabajo
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto)
+        self._manager = contexto.Manager()
+        self._progreso = self._manager.dict()
+        self._trabajos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encolar(self, base_path, rollo, area_umbral, pixel_to_mm):
+        """
+        Añade un análisis a la cola.
+
+        Returns:
+            str: ID del trabajo creado.
+
+        Raises:
+            ColaLlenaError: Si ya hay demasiados trabajos activos.
+        """
+        with self._lock:
+            if self.trabajos_activos() >= self.max_workers + self.max_cola:
+                raise ColaLlenaError("La cola de análisis está llena")
+
+            id_trabajo = uuid.uuid4().hex
+            futuro = self._executor.submit(
+                self.funcion_trabajo, id_trabajo, base_path, rollo, area_umbral, pixel_to_mm, self._progreso
+            )
+            self._trabajos[id_trabajo] = {
+                "id_trabajo": id_trabajo,
+                "rollo": rollo,
+                "estado": "pendiente",
+                "fecha_creacion": datetime.now(),
+                "fecha_fin": None,
+                "error": None,
+                "resultados": None,
+                "futuro": futuro,
+            }
+            self._purgar_finalizados()
+
+        futuro.add_done_callback(lambda f: self._al_finalizar(id_trabajo, f))
+        return id_trabajo
+
+    def _al_finalizar(self, id_trabajo, futuro):
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            if trabajo is None:
+                return
+            trabajo["fecha_fin"] = datetime.now()
+            if futuro.cancelled():
+                trabajo["estado"] = "cancelado"
+            elif futuro.exception() is not None:
+                trabajo["estado"] = "error"
+                trabajo["error"] = str(futuro.exception())
+            else:
+                trabajo["estado"] = "completado"
+                trabajo["resultados"] = futuro.result()
+
+    def _purgar_finalizados(self):
+        """Descarta los trabajos finalizados más antiguos por encima del límite de retención."""
+        finalizados = [i for i, t in self._trabajos.items() if t["estado"] not in ESTADOS_ACTIVOS]
+        for id_trabajo in finalizados[:max(0, len(finalizados) - ANALISIS_RETENCION_TRABAJOS)]:
+            del self._trabajos[id_trabajo]
+            self._progreso.pop(id_trabajo, None)
+
+    def trabajos_activos(self):
+        """Devuelve el número de trabajos pendientes o en curso."""
+        return sum(1 for t in self._trabajos.values() if t["estado"] in ESTADOS_ACTIVOS)
+
+    def conteo_activos(self):
+        """Devuelve cuántos trabajos hay en cola (pendiente) y en ejecución (en_curso)."""
+        conteo = {"pendiente": 0, "en_curso": 0}
+        with self._lock:
+            for trabajo in self._trabajos.values():
+                if trabajo["estado"] == "pendiente":
+                    conteo["en_curso" if trabajo["futuro"].running() else "pendiente"] += 1
+        return conteo
+
+    def estado(self, id_trabajo):
+        """
+        Devuelve el estado y el progreso de un trabajo, o None si no existe.
+        """
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            if trabajo is None:
+                return None
+            estado = trabajo["estado"]
+            if estado == "pendiente" and trabajo["futuro"].running():
+                estado = "en_curso"
+            procesadas, total = self._progreso.get(id_trabajo, (0, 0))
+            return {
+                "id_trabajo": id_trabajo,
+                "rollo": trabajo["rollo"],
+                "estado": estado,
+                "procesadas": procesadas,
+                "total": total,
+                "fecha_creacion": trabajo["fecha_creacion"],
+                "fecha_fin": trabajo["fecha_fin"],
+                "error": trabajo["error"],
+            }
+
+    def resultados(self, id_trabajo):
+        """Devuelve los resultados de un trabajo completado (o None si aún no los hay)."""
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+            return trabajo["resultados"] if trabajo else None
+
+    def cancelar(self, id_trabajo):
+        """Cancela un trabajo que todavía no ha empezado. Devuelve True si se canceló."""
+        with self._lock:
+            trabajo = self._trabajos.get(id_trabajo)
+        return bool(trabajo) and trabajo["futuro"].cancel()
+
+    def cerrar(self):
+        """Detiene el pool de procesos y el gestor de memoria compartida."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
+
+
+_gestor = None
+_gestor_lock = threading.Lock()
+
+
+def obtener_gestor():
+    """Devuelve el gestor de análisis compartido, creándolo la primera vez que se usa."""
+    global _gestor
+    with _gestor_lock:
+        if _gestor is None:
+            _gestor = GestorAnalisis()
+        return _gestor
+
+
+def cerrar_gestor():
+    """Libera el gestor compartido si llegó a crearse."""
+    global _gestor
+    with _gestor_lock:
+        if _gestor is not None:
+            _gestor.cerrar()
+            _gestor = None
+
+
+def _conteo_para_metricas():
+    # No crea el pool de procesos solo para exponer métricas
+    gestor = _gestor
+    conteo = gestor.conteo_activos() if gestor is not None else {"pendiente": 0, "en_curso": 0}
+    return {(estado,): valor for estado, valor in conteo.items()}
+
+
+registro.registrar(Indicador(
+    "isli_analisis_trabajos",
+    "Trabajos de análisis en cola (pendiente) o en ejecución (en_curso)",
+    etiquetas=("estado",),
+    funcion=_conteo_para_metricas
+))
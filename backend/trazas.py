@@ -0,0 +1,149 @@
+"""Trazas por petición en formato JSON estructurado.
+
+Cada petición recibe un identificador (cabecera X-Request-ID, propia o del
+cliente) y acumula "spans": las sentencias SQL ejecutadas y los bloques de
+código marcados con `span()`. Al terminar se escribe una línea JSON con la
+petición completa y sus spans en el logger `isli.trazas`, que puede analizarse
+offline para encontrar las sentencias más lentas de cada endpoint.
+
+Configurable mediante:
+- TRAZAS_MUESTREO: fracción de peticiones que se registran (0.0 - 1.0).
+- TRAZAS_UMBRAL_LENTO_MS: las peticiones más lentas se registran siempre.
+- TRAZAS_MAX_SPANS: spans guardados por petición (el resto solo se cuentan).
+- TRAZAS_ARCHIVO: archivo de salida; por defecto, la salida de error estándar.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+TRAZAS_MUESTREO = float(os.getenv("TRAZAS_MUESTREO", 0.1))
+TRAZAS_UMBRAL_LENTO_MS = float(os.getenv("TRAZAS_UMBRAL_LENTO_MS", 1000))
+TRAZAS_MAX_SPANS = int(os.getenv("TRAZAS_MAX_SPANS", 500))
+
+logger_trazas = logging.getLogger("isli.trazas")
+
+_traza_actual = ContextVar("traza_actual", default=None)
+
+
+class Traza:
+    """
+    Spans acumulados durante una petición.
+
+    Args:
+        id_peticion (str): Identificador de la petición.
+        metodo (str): Método HTTP.
+        ruta (str): Ruta de la URL.
+    """
+    def __init__(self, id_peticion, metodo, ruta):
+        self.id_peticion = id_peticion
+        self.metodo = metodo
+        self.ruta = ruta
+        self.inicio = time.perf_counter()
+        self.spans = []
+        self.spans_descartados = 0
+
+    def agregar_span(self, nombre, inicio, duracion, atributos):
+        """Guarda un span con su inicio relativo al de la petición (ms) y su duración (ms)."""
+        if len(self.spans) >= TRAZAS_MAX_SPANS:
+            self.spans_descartados += 1
+            return
+        span = {"nombre": nombre, "inicio_ms": round((inicio - self.inicio) * 1000, 3),
+                "duracion_ms": round(duracion * 1000, 3)}
+        span.update(atributos)
+        self.spans.append(span)
+
+    def a_dict(self, ruta_plantilla, estado, duracion):
+        """Devuelve el registro JSON de la petición finalizada."""
+        return {
+            "tipo": "traza",
+            "id_peticion": self.id_peticion,
+            "metodo": self.metodo,
+            "ruta": ruta_plantilla or self.ruta,
+            "url": self.ruta,
+            "estado": estado,
+            "duracion_ms": round(duracion * 1000, 3),
+            "spans": self.spans,
+            "spans_descartados": self.spans_descartados,
+        }
+
+
+def configurar_logger_trazas():
+    """
+    Envía las trazas a TRAZAS_ARCHIVO (o a stderr) como líneas JSON sin prefijo de logging.
+    """
+    if logger_trazas.handlers:
+        return
+    archivo = os.getenv("TRAZAS_ARCHIVO")
+    manejador = logging.FileHandler(archivo, encoding="utf-8") if archivo else logging.StreamHandler(sys.stderr)
+    manejador.setFormatter(logging.Formatter("%(message)s"))
+    logger_trazas.addHandler(manejador)
+    logger_trazas.setLevel(logging.INFO)
+    logger_trazas.propagate = False
+
+
+def normalizar_id_peticion(valor):
+    """
+    Acepta el X-Request-ID recibido si es razonable o genera uno nuevo.
+    """
+    if valor and len(valor) <= 64 and all(c.isalnum() or c in "-_." for c in valor):
+        return valor
+    return uuid.uuid4().hex
+
+
+def iniciar_traza(id_peticion, metodo, ruta):
+    """Abre la traza de la petición en el contexto actual y devuelve el token para cerrarla."""
+    return _traza_actual.set(Traza(id_peticion, metodo, ruta))
+
+
+def finalizar_traza(token, estado, ruta_plantilla=None):
+    """
+    Cierra la traza del contexto actual y la escribe si entra en el muestreo o ha sido lenta.
+
+    Returns:
+        dict | None: Registro escrito, o None si se descartó por muestreo.
+    """
+    traza = _traza_actual.get()
+    _traza_actual.reset(token)
+    if traza is None:
+        return None
+    duracion = time.perf_counter() - traza.inicio
+    if duracion * 1000 < TRAZAS_UMBRAL_LENTO_MS and random.random() >= TRAZAS_MUESTREO:
+        return None
+    registro = traza.a_dict(ruta_plantilla, estado, duracion)
+    logger_trazas.info(json.dumps(registro, ensure_ascii=False))
+    return registro
+
+
+def id_peticion_actual():
+    """Identificador de la petición en curso, o None fuera de una petición."""
+    traza = _traza_actual.get()
+    return traza.id_peticion if traza else None
+
+
+def registrar_span(nombre, inicio, duracion, **atributos):
+    """Añade un span ya medido (inicio según time.perf_counter) a la traza en curso, si la hay."""
+    traza = _traza_actual.get()
+    if traza is not None:
+        traza.agregar_span(nombre, inicio, duracion, atributos)
+
+
+@contextmanager
+def span(nombre, **atributos):
+    """
+    Mide un bloque de código como span de la traza en curso.
+
+    Ejemplo:
+        with span("insertar_imagenes", imagenes=len(control.imagenes)):
+            ...
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_span(nombre, inicio, time.perf_counter() - inicio, **atributos)
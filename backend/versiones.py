@@ -0,0 +1,123 @@
+"""Contadores de versión por tabla para respuestas condicionales (ETag).
+
+Cada endpoint de escritura incrementa la versión de las tablas que modifica.
+Los endpoints de lectura construyen su ETag a partir de esa versión, de modo
+que una petición con If-None-Match vigente se responde con 304 sin consultar
+la base de datos ni serializar la respuesta.
+
+Hay dos implementaciones intercambiables, como en `revocacion`:
+- VersionesMemoria: para un único proceso de uvicorn.
+- VersionesSQLite: archivo compartido entre varios workers de la misma máquina.
+"""
+import uuid
+import hashlib
+import sqlite3
+import threading
+
+
+class VersionesMemoria:
+    """
+    Versiones por tabla en memoria.
+
+    Los contadores se reinician con el proceso; el prefijo aleatorio `instancia`
+    evita que un ETag emitido antes de un reinicio coincida con uno nuevo.
+    """
+    def __init__(self):
+        self.instancia = uuid.uuid4().hex[:8]
+        self._versiones = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, *tablas):
+        """Registra una modificación en las tablas indicadas."""
+        with self._lock:
+            for tabla in tablas:
+                self._versiones[tabla] = self._versiones.get(tabla, 0) + 1
+
+    def version(self, tabla):
+        """Devuelve la versión actual de la tabla."""
+        with self._lock:
+            return f"{self.instancia}.{self._versiones.get(tabla, 0)}"
+
+
+class VersionesSQLite:
+    """
+    Versiones por tabla en una base de datos SQLite compartida por varios procesos.
+
+    Args:
+        ruta (str): Ruta del archivo SQLite.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        conn = self._conexion()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS version_tabla (
+                tabla TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _conexion(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def incrementar(self, *tablas):
+        """Registra una modificación en las tablas indicadas."""
+        conn = self._conexion()
+        with conn:
+            for tabla in tablas:
+                conn.execute("""
+                    INSERT INTO version_tabla (tabla, version) VALUES (?, 1)
+                    ON CONFLICT(tabla) DO UPDATE SET version = version + 1
+                """, (tabla,))
+
+    def version(self, tabla):
+        """Devuelve la versión actual de la tabla."""
+        fila = self._conexion().execute(
+            "SELECT version FROM version_tabla WHERE tabla = ?", (tabla,)
+        ).fetchone()
+        return str(fila[0] if fila else 0)
+
+
+def crear_versiones(tipo="memoria", ruta_sqlite="versiones.sqlite3"):
+    """
+    Crea el almacén de versiones indicado por configuración.
+
+    Args:
+        tipo (str): 'memoria' o 'sqlite'.
+        ruta_sqlite (str): Archivo a usar cuando el tipo es 'sqlite'.
+    """
+    if tipo == "sqlite":
+        return VersionesSQLite(ruta_sqlite)
+    if tipo == "memoria":
+        return VersionesMemoria()
+    raise ValueError(f"Tipo de almacén de versiones desconocido: {tipo}")
+
+
+def calcular_etag(version, *partes):
+    """
+    Construye un ETag débil a partir de la versión de los datos y de los parámetros de la consulta.
+
+    Returns:
+        str: Valor listo para la cabecera ETag, p. ej. 'W/"3f2a..."'.
+    """
+    huella = hashlib.sha1(repr((version,) + partes).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{huella}"'
+
+
+def etag_coincide(if_none_match, etag):
+    """
+    Indica si la cabecera If-None-Match del cliente incluye el ETag actual.
+
+    Acepta listas separadas por comas y el comodín '*'. La comparación es débil:
+    ignora el prefijo W/ que algunos intermediarios añaden o eliminan.
+    """
+    if not if_none_match:
+        return False
+    candidatos = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return "*" in candidatos or etag.removeprefix("W/") in candidatos
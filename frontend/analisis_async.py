@@ -0,0 +1,119 @@
+"""Análisis de rollos en un hilo de trabajo para no bloquear la interfaz gráfica.
+
+`analizar_rollo` procesa todas las imágenes del rollo de forma síncrona. Ejecutado
+en el hilo de Qt, la ventana deja de repintarse hasta que termina el rollo completo.
+`HiloAnalisisRollo` lo ejecuta en un QThread y emite una señal por cada imagen
+procesada, de modo que la ventana puede mostrarla y actualizar el progreso en cuanto
+está disponible. El análisis se puede cancelar entre imagen e imagen.
+
+`HiloRestauracionRollos` deshace en segundo plano, al reiniciar, los cambios del
+análisis en los rollos anotados en el diario.
+"""
+import threading
+from PySide6.QtCore import QThread, Signal
+from analisis_defectos.procesador_rollos import analizar_rollo
+from analisis_defectos.restauracion_rollos import DiarioRollos, restaurar_rollo
+
+
+class HiloAnalisisRollo(QThread):
+    """
+    Ejecuta `analizar_rollo` en segundo plano.
+
+    Señales (entregadas en el hilo de la interfaz):
+        imagen_procesada(int, int, dict): imágenes procesadas, total y resultado de la imagen
+            (incluye 'ruta_original' y 'ruta_procesada').
+        completado(list): Resultados de todas las imágenes procesadas.
+        fallido(Exception): Error producido durante el análisis.
+
+    Args:
+        base_path (str): Carpeta raíz de los rollos.
+        rollo (str): Nombre de la carpeta del rollo.
+        area_umbral (float): Área máxima tolerable de un defecto (mm²).
+        almacen (AlmacenResultados, opcional): Almacén de resultados para el modo no destructivo.
+    """
+    imagen_procesada = Signal(int, int, object)
+    completado = Signal(object)
+    fallido = Signal(object)
+
+    def __init__(self, base_path, rollo, area_umbral, almacen=None, parent=None):
+        super().__init__(parent)
+        self.base_path = base_path
+        self.rollo = rollo
+        self.area_umbral = area_umbral
+        self.almacen = almacen
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        """Solicita detener el análisis; la imagen en curso termina de procesarse."""
+        self._cancelado.set()
+
+    def cancelado(self):
+        """Indica si se ha solicitado cancelar el análisis."""
+        return self._cancelado.is_set()
+
+    def _publicar(self, resultado, procesadas, total):
+        self.imagen_procesada.emit(procesadas, total, dict(resultado))
+
+    def run(self):
+        try:
+            resultados = analizar_rollo(
+                base_path=self.base_path,
+                rollo=self.rollo,
+                area_umbral=self.area_umbral,
+                al_procesar=self._publicar,
+                cancelado=self.cancelado,
+                almacen=self.almacen
+            )
+        except Exception as e:
+            self.fallido.emit(e)
+            return
+        self.completado.emit(resultados)
+
+
+class HiloRestauracionRollos(QThread):
+    """
+    Restaura en segundo plano los rollos modificados por el análisis.
+
+    Solo recorre los rollos anotados en el diario (`DiarioRollos`) y, en modo no
+    destructivo, los que tienen una versión vigente en el almacén de resultados.
+    Un rollo solo se quita del diario cuando su restauración se completa; si falla o no
+    había nada que restaurar, sigue anotado para revisarlo en el siguiente reinicio.
+
+    Señales (entregadas en el hilo de la interfaz):
+        progreso(int, int, str): rollos procesados, total y nombre del último rollo.
+        completado(list): Lista de (rollo, mensaje de error) de los rollos que fallaron.
+
+    Args:
+        base_path (str): Carpeta raíz de los rollos.
+        almacen (AlmacenResultados, opcional): Almacén de resultados del modo no destructivo.
+    """
+    progreso = Signal(int, int, str)
+    completado = Signal(object)
+
+    def __init__(self, base_path, almacen=None, parent=None):
+        super().__init__(parent)
+        self.base_path = base_path
+        self.almacen = almacen
+
+    def run(self):
+        diario = DiarioRollos(self.base_path)
+        tareas = [(rollo, False) for rollo in diario.rollos()]
+        if self.almacen is not None:
+            tareas += [(rollo, True) for rollo in self.almacen.rollos_con_version_actual()]
+
+        errores = []
+        for num, (rollo, versionado) in enumerate(tareas, start=1):
+            try:
+                if versionado:
+                    self.almacen.restablecer(rollo)
+                    print(f"Rollo restaurado: {rollo}")
+                elif restaurar_rollo(self.base_path, rollo):
+                    diario.quitar(rollo)
+                    print(f"Rollo restaurado: {rollo}")
+                else:
+                    print(f"Rollo sin cambios que restaurar: {rollo}")
+            except Exception as e:
+                print(f"Error al restaurar {rollo}: {e}")
+                errores.append((rollo, str(e)))
+            self.progreso.emit(num, len(tareas), rollo)
+        self.completado.emit(errores)
@@ -0,0 +1,162 @@
+"""Caché de imágenes decodificadas y precarga en segundo plano para los visores.
+
+Decodificar un JPEG/PNG de cámara industrial cuesta decenas de milisegundos; hacerlo
+en el hilo de la interfaz en cada cambio de imagen del pase provoca tirones.
+`PrecargadorImagenes` decodifica y escala al tamaño del visor las siguientes
+imágenes del pase en un pool de hilos propio y las guarda en una caché LRU acotada,
+de modo que al mostrarlas solo queda convertir la QImage en QPixmap. Si una imagen
+aún no está lista, el visor no la decodifica: espera a la señal `imagen_lista`.
+
+Se trabaja con QImage (segura fuera del hilo de la interfaz); QPixmap solo se crea
+en el hilo de Qt.
+"""
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, Signal
+from PySide6.QtGui import QImage, QImageReader
+
+# Imágenes decodificadas que se mantienen en memoria
+MAX_IMAGENES_CACHE = 24
+# Hilos dedicados a decodificar imágenes
+HILOS_PRECARGA = 2
+
+
+def cargar_imagen_escalada(ruta, ancho, alto):
+    """
+    Decodifica una imagen y la reduce (manteniendo proporción) para caber en ancho x alto.
+
+    Las imágenes más pequeñas que el visor se devuelven sin escalar.
+
+    Returns:
+        QImage: Imagen cargada; nula si no se pudo leer el archivo.
+    """
+    lector = QImageReader(ruta)
+    lector.setAutoTransform(True)
+    imagen = lector.read()
+    if imagen.isNull():
+        return imagen
+    if ancho > 0 and alto > 0 and (imagen.width() > ancho or imagen.height() > alto):
+        imagen = imagen.scaled(QSize(ancho, alto), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return imagen
+
+
+class CacheImagenes:
+    """
+    Caché LRU de imágenes escaladas, segura entre hilos.
+
+    Cada entrada recuerda el tamaño para el que se escaló; una imagen solo sirve para
+    un visor igual o más pequeño (si el visor crece, se vuelve a decodificar).
+    """
+    def __init__(self, max_entradas=MAX_IMAGENES_CACHE):
+        self.max_entradas = max_entradas
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, ruta, ancho, alto):
+        """Devuelve la imagen de `ruta` válida para un visor de ancho x alto, o None."""
+        with self._lock:
+            entrada = self._entradas.get(ruta)
+            if entrada is None:
+                return None
+            (ancho_cache, alto_cache), imagen = entrada
+            escalada = imagen.width() < ancho_cache or imagen.height() < alto_cache
+            if escalada and (ancho > ancho_cache or alto > alto_cache):
+                return None
+            self._entradas.move_to_end(ruta)
+            return imagen
+
+    def guardar(self, ruta, ancho, alto, imagen):
+        """Guarda la imagen de `ruta` escalada para ancho x alto, expulsando la menos usada."""
+        with self._lock:
+            self._entradas[ruta] = ((ancho, alto), imagen)
+            self._entradas.move_to_end(ruta)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entradas)
+
+
+class _TareaPrecarga(QRunnable):
+    def __init__(self, precargador, ruta, ancho, alto):
+        super().__init__()
+        self.precargador = precargador
+        self.ruta = ruta
+        self.ancho = ancho
+        self.alto = alto
+
+    def run(self):
+        imagen = QImage()
+        try:
+            imagen = cargar_imagen_escalada(self.ruta, self.ancho, self.alto)
+            if not imagen.isNull():
+                self.precargador.cache.guardar(self.ruta, self.ancho, self.alto, imagen)
+        finally:
+            self.precargador._terminada(self.ruta, imagen)
+
+
+class PrecargadorImagenes(QObject):
+    """
+    Decodifica imágenes por adelantado en un pool de hilos propio.
+
+    Señales (entregadas en el hilo de la interfaz):
+        imagen_lista(str, QImage): Ruta y resultado de cada decodificación terminada
+            (la imagen es nula si no se pudo leer el archivo).
+
+    Args:
+        max_entradas (int): Tamaño de la caché LRU.
+        hilos (int): Hilos de decodificación.
+    """
+    imagen_lista = Signal(str, object)
+
+    def __init__(self, max_entradas=MAX_IMAGENES_CACHE, hilos=HILOS_PRECARGA, parent=None):
+        super().__init__(parent)
+        self.cache = CacheImagenes(max_entradas)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(hilos)
+        self._en_curso = set()
+        self._lock = threading.Lock()
+
+    def precargar(self, rutas, ancho, alto):
+        """Encola la decodificación de las rutas que no están ya en caché ni en curso."""
+        for ruta in rutas:
+            if self.cache.obtener(ruta, ancho, alto) is not None:
+                continue
+            with self._lock:
+                if ruta in self._en_curso:
+                    continue
+                self._en_curso.add(ruta)
+            self.pool.start(_TareaPrecarga(self, ruta, ancho, alto))
+
+    def _terminada(self, ruta, imagen):
+        with self._lock:
+            self._en_curso.discard(ruta)
+        self.imagen_lista.emit(ruta, imagen)
+
+    def obtener(self, ruta, ancho, alto):
+        """
+        Devuelve la imagen escalada para el visor si ya está en caché.
+
+        Si no lo está, no la decodifica en el hilo que llama: se une a la tarea en curso
+        para esa ruta o encola una nueva, y el resultado llega con `imagen_lista`.
+
+        Returns:
+            QImage | None: Imagen lista para mostrarse, o None si hay que esperar a la señal.
+        """
+        imagen = self.cache.obtener(ruta, ancho, alto)
+        if imagen is None:
+            self.precargar([ruta], ancho, alto)
+        return imagen
+
+    def limpiar(self):
+        """Descarta las tareas pendientes y vacía la caché (p. ej. al mover las carpetas del rollo)."""
+        self.pool.clear()
+        self.pool.waitForDone()
+        with self._lock:
+            self._en_curso.clear()
+        self.cache.limpiar()
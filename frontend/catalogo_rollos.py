@@ -0,0 +1,87 @@
+"""Catálogo de rollos de la carpeta raíz con el número de imágenes de cada uno.
+
+Contar las imágenes de cada rollo con `os.listdir` + `os.path.isfile` cuesta una
+llamada al sistema de archivos por archivo; en una unidad de red con cientos de
+rollos eso son segundos por cada apertura del ComboBox. El catálogo:
+- recorre las carpetas con `os.scandir`, que ya trae el tipo de cada entrada;
+- guarda el recuento de cada rollo junto con la fecha de modificación (mtime) de su
+  carpeta, y solo vuelve a contar los rollos cuya carpeta ha cambiado (añadir, borrar
+  o mover un archivo dentro de ella actualiza su mtime).
+
+`escanear` es bloqueante y está pensado para ejecutarse fuera del hilo de la interfaz;
+`rollos_validos` solo consulta la caché y es inmediato.
+"""
+import os
+import threading
+
+EXTENSIONES_IMAGEN = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def contar_imagenes(ruta):
+    """Número de archivos de imagen directamente dentro de la carpeta `ruta`."""
+    with os.scandir(ruta) as entradas:
+        return sum(
+            1 for entrada in entradas
+            if entrada.name.lower().endswith(EXTENSIONES_IMAGEN) and entrada.is_file()
+        )
+
+
+class CatalogoRollos:
+    """
+    Caché de rollos (subcarpetas de `base_folder`) y su número de imágenes.
+
+    Args:
+        base_folder (str): Carpeta raíz de los rollos.
+    """
+    def __init__(self, base_folder):
+        self.base_folder = base_folder
+        self.cargado = False
+        self._rollos = {}  # nombre -> (mtime_ns, num_imagenes)
+        self._lock = threading.Lock()
+
+    def escanear(self):
+        """
+        Actualiza el catálogo recontando solo los rollos nuevos o modificados.
+
+        Returns:
+            bool: True si cambió algún rollo o su número de imágenes.
+
+        Raises:
+            OSError: Si no se puede leer la carpeta raíz.
+        """
+        with self._lock:
+            anteriores = dict(self._rollos)
+
+        actuales = {}
+        with os.scandir(self.base_folder) as entradas:
+            for entrada in entradas:
+                try:
+                    # Las carpetas ocultas (p. ej. el almacén de resultados) no son rollos
+                    if entrada.name.startswith(".") or not entrada.is_dir():
+                        continue
+                    mtime = entrada.stat().st_mtime_ns
+                    previo = anteriores.get(entrada.name)
+                    if previo is not None and previo[0] == mtime:
+                        actuales[entrada.name] = previo
+                    else:
+                        actuales[entrada.name] = (mtime, contar_imagenes(entrada.path))
+                except OSError as e:
+                    # Un rollo ilegible (p. ej. borrado durante el recorrido) no invalida el resto
+                    print(f"No se pudo leer el rollo {entrada.name}: {e}")
+
+        with self._lock:
+            cambiado = not self.cargado or actuales != self._rollos
+            self._rollos = actuales
+            self.cargado = True
+        return cambiado
+
+    def num_imagenes(self, nombre):
+        """Número de imágenes del rollo según la caché, o None si no está catalogado."""
+        with self._lock:
+            datos = self._rollos.get(nombre)
+        return datos[1] if datos else None
+
+    def rollos_validos(self, max_imgs):
+        """Nombres (ordenados) de los rollos con como máximo `max_imgs` imágenes, según la caché."""
+        with self._lock:
+            return sorted(nombre for nombre, (_, num) in self._rollos.items() if num <= max_imgs)
@@ -0,0 +1,232 @@
+"""Cliente HTTP compartido por todas las ventanas del frontend ISLI.
+
+Mantiene una única sesión de `requests` con conexiones persistentes (keep-alive)
+hacia el backend, tiempos de espera, reintentos con espera exponencial para los
+métodos idempotentes y métodos tipados para cada endpoint que usa la interfaz.
+
+La URL del backend se toma, por orden, de la variable de entorno ISLI_API_URL,
+de la clave 'api_url' de config.json o del valor por defecto http://localhost:8000.
+"""
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.json'))
+API_URL_POR_DEFECTO = "http://localhost:8000"
+
+# (conexión, lectura) en segundos
+TIMEOUT_POR_DEFECTO = (3.05, float(os.getenv("ISLI_API_TIMEOUT", 30)))
+# Número máximo de respuestas GET guardadas para peticiones condicionales (ETag)
+MAX_RESPUESTAS_ETAG = 32
+# Controles por petición en los endpoints por lotes (MAX_CONTROLES_LOTE del backend)
+MAX_CONTROLES_LOTE = 200
+
+
+def cargar_api_url():
+    """Devuelve la URL base del backend según entorno, config.json o valor por defecto."""
+    url = os.getenv("ISLI_API_URL")
+    if not url:
+        try:
+            with open(CONFIG_PATH, encoding='utf-8') as f:
+                url = json.load(f).get("api_url")
+        except (OSError, ValueError):
+            url = None
+    return (url or API_URL_POR_DEFECTO).rstrip("/")
+
+
+class ErrorAPI(Exception):
+    """
+    Error al llamar al backend.
+
+    Attributes:
+        status_code (int | None): Código HTTP, o None si no se pudo conectar.
+        detalle (str): Mensaje de error devuelto por el backend (campo 'detail') o de la conexión.
+    """
+    def __init__(self, detalle, status_code=None):
+        super().__init__(detalle)
+        self.detalle = detalle
+        self.status_code = status_code
+
+
+class ClienteAPI:
+    """
+    Sesión HTTP reutilizable contra el backend.
+
+    Args:
+        base_url (str): URL base del backend.
+        timeout (tuple[float, float]): Tiempos de espera de conexión y lectura.
+        reintentos (int): Reintentos ante errores de conexión o respuestas 502/503/504.
+    """
+    def __init__(self, base_url=None, timeout=TIMEOUT_POR_DEFECTO, reintentos=3):
+        self.base_url = (base_url or cargar_api_url()).rstrip("/")
+        self.timeout = timeout
+        self.token = None
+        self.sesion = requests.Session()
+        # POST no se reintenta: guardar un control dos veces duplicaría registros
+        politica = Retry(
+            total=reintentos,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=politica)
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+        self._respuestas_etag = OrderedDict()
+        self._lock = threading.Lock()
+
+    def url(self, ruta):
+        """Devuelve la URL absoluta de una ruta del backend."""
+        return f"{self.base_url}{ruta}"
+
+    def establecer_token(self, token):
+        """Envía el token JWT como cabecera 'Authorization: Bearer' en las siguientes peticiones."""
+        self.token = token or None
+        if self.token:
+            self.sesion.headers["Authorization"] = f"Bearer {self.token}"
+        else:
+            self.sesion.headers.pop("Authorization", None)
+
+    def peticion(self, metodo, ruta, **kwargs):
+        """
+        Realiza una petición y devuelve la respuesta si su código es 2xx o 304.
+
+        Raises:
+            ErrorAPI: Si no se puede conectar o el backend responde con error.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            respuesta = self.sesion.request(metodo, self.url(ruta), **kwargs)
+        except requests.RequestException as e:
+            raise ErrorAPI(f"No se pudo conectar con el servidor: {e}") from e
+        if respuesta.status_code >= 400:
+            try:
+                detalle = respuesta.json().get("detail", respuesta.text)
+            except ValueError:
+                detalle = respuesta.text
+            raise ErrorAPI(str(detalle), respuesta.status_code)
+        return respuesta
+
+    def obtener_json(self, ruta, params=None, condicional=False):
+        """
+        GET que devuelve el JSON de la respuesta.
+
+        Con `condicional=True` reenvía el ETag de la última respuesta a la misma URL y,
+        si el backend responde 304, devuelve los datos ya descargados.
+        """
+        if not condicional:
+            return self.peticion("GET", ruta, params=params).json()
+
+        clave = (ruta, tuple(sorted((params or {}).items())))
+        with self._lock:
+            guardada = self._respuestas_etag.get(clave)
+        cabeceras = {"If-None-Match": guardada[0]} if guardada else {}
+        respuesta = self.peticion("GET", ruta, params=params, headers=cabeceras)
+        if respuesta.status_code == 304 and guardada:
+            return guardada[1]
+        datos = respuesta.json()
+        etag = respuesta.headers.get("ETag")
+        if etag:
+            with self._lock:
+                self._respuestas_etag[clave] = (etag, datos)
+                self._respuestas_etag.move_to_end(clave)
+                while len(self._respuestas_etag) > MAX_RESPUESTAS_ETAG:
+                    self._respuestas_etag.popitem(last=False)
+        return datos
+
+    def enviar_json(self, ruta, datos, timeout=None):
+        """POST con cuerpo JSON que devuelve el JSON de la respuesta."""
+        return self.peticion("POST", ruta, json=datos, timeout=timeout or self.timeout).json()
+
+    # --- Autenticación ---
+
+    def login(self, correo: str, contrasenia: str) -> Dict[str, Any]:
+        """Autentica al usuario y guarda su token para las siguientes peticiones."""
+        resultado = self.enviar_json("/login", {"correo": correo, "contrasenia": contrasenia})
+        self.establecer_token(resultado.get("access_token"))
+        return resultado
+
+    def logout(self, token: Optional[str] = None) -> None:
+        """Revoca el token en el backend (por defecto, el de la sesión actual)."""
+        token = token or self.token
+        if token:
+            self.enviar_json("/logout", {"token": token}, timeout=3)
+        if token == self.token:
+            self.establecer_token(None)
+
+    def url_panel_admin(self, token: str) -> str:
+        """URL del panel de administración web para el token indicado."""
+        return self.url(f"/admin?token={token}")
+
+    # --- Controles ---
+
+    def siguiente_id_control(self) -> int:
+        """ID que recibirá el próximo control registrado."""
+        return self.obtener_json("/controles/ultimo_id_control").get("siguiente_id")
+
+    def orden_analisis(self, nombre_rollo: str) -> int:
+        """Número de orden del próximo análisis del rollo."""
+        datos = self.obtener_json("/controles/rollo/orden_analisis", params={"nombre_rollo": nombre_rollo})
+        return datos.get("siguiente_orden", 1)
+
+    def guardar_control(self, control: Dict[str, Any]) -> Dict[str, Any]:
+        """Registra un control de calidad completo. Devuelve el mensaje y el id_control creado."""
+        return self.enviar_json("/controles/nuevo", control)
+
+    def historico(self, **filtros) -> List[Dict[str, Any]]:
+        """Controles del histórico que cumplen los filtros (revalidado con ETag)."""
+        params = {k: v for k, v in filtros.items() if v is not None}
+        return self.obtener_json("/controles/historico", params=params, condicional=True)
+
+    def usuarios(self) -> List[str]:
+        """Nombres de los usuarios registrados (revalidado con ETag)."""
+        return self.obtener_json("/controles/usuarios", condicional=True)
+
+    def informe_existe(self, id_control: int) -> Dict[str, Any]:
+        """Indica si el control tiene informe PDF y, en ese caso, su ruta."""
+        return self.obtener_json("/controles/informe/existe", params={"id_control": id_control})
+
+    def registrar_informe(self, informe: Dict[str, Any]) -> Dict[str, Any]:
+        """Registra el informe PDF generado para un control."""
+        return self.enviar_json("/controles/informe/nuevo", informe)
+
+    def registrar_informes(self, informes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Registra los informes PDF de varios controles con una llamada por cada MAX_CONTROLES_LOTE.
+
+        Returns:
+            dict: IDs de control 'registrados' y 'omitidos' (ya tenían informe).
+        """
+        resultado = {"registrados": [], "omitidos": []}
+        for inicio in range(0, len(informes), MAX_CONTROLES_LOTE):
+            parcial = self.enviar_json("/controles/informe", {"informes": informes[inicio:inicio + MAX_CONTROLES_LOTE]})
+            resultado["registrados"].extend(parcial.get("registrados", []))
+            resultado["omitidos"].extend(parcial.get("omitidos", []))
+        return resultado
+
+    def detalle_controles(self, ids: List[int]) -> List[Dict[str, Any]]:
+        """Rollo, tolerancias e imágenes de varios controles, para generar sus informes."""
+        detalles = []
+        for inicio in range(0, len(ids), MAX_CONTROLES_LOTE):
+            detalles.extend(self.enviar_json("/controles/detalle", {"ids": list(ids[inicio:inicio + MAX_CONTROLES_LOTE])}))
+        return detalles
+
+    def actualizar_notas(self, id_control: int, notas: str) -> Dict[str, Any]:
+        """Actualiza las notas del informe de un control."""
+        return self.enviar_json("/controles/informe/actualizar_notas", {"id_control": id_control, "notas": notas})
+
+    def solicitar_cambio_password(self, solicitud: Dict[str, Any]) -> Dict[str, Any]:
+        """Registra una solicitud de cambio de contraseña para revisión del administrador."""
+        return self.enviar_json("/controles/solicitud_password", solicitud)
+
+
+# Cliente compartido por todas las ventanas
+api = ClienteAPI()
@@ -5,35 +5,66 @@ visualizar resultados procesados, registrar datos en backend y generar informes
 """
 import sys
 import os
-import shutil
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import json
 from datetime import datetime
-import requests
 from PySide6.QtWidgets import (
     QMainWindow, QSizePolicy, QGraphicsView, QAbstractItemView,
-    QGraphicsScene, QFrame, QGraphicsTextItem, 
-    QTableWidgetItem, QMessageBox, QFileDialog, QProgressDialog
+    QGraphicsScene, QFrame, QGraphicsTextItem,
+    QMessageBox, QFileDialog, QProgressDialog, QHeaderView
 )
 from PySide6.QtGui import QPixmap, QImage, QPainter, QFont, QColor, QBrush, QIcon
 from PySide6.QtCore import Qt, QTimer, QRectF, QEvent
 from UI.menu_principal_v2 import Ui_MainWindow
 from reportlab.lib.pagesizes import A4
-from utils_ui import mostrar_datos_usuario, configurar_botones_comunes, mostrar_siguiente_id_control, obtener_ruta_informes, guardar_config_ruta
+from utils_ui import mostrar_datos_usuario, configurar_botones_comunes, mostrar_siguiente_id_control, obtener_ruta_informes, guardar_config_ruta, revocar_token_sesion, obtener_ruta_resultados, obtener_config_informe
+from cliente_api import api, ErrorAPI
+from peticiones_async import EjecutorPeticiones
+from analisis_async import HiloAnalisisRollo, HiloRestauracionRollos
+from analisis_defectos.almacen_resultados import AlmacenResultados
+from cache_imagenes import PrecargadorImagenes
+from resultados_rollo import ResultadosRollo
+from catalogo_rollos import CatalogoRollos
+from modelos_tabla import (
+    AlmacenColumnar, Columna, ModeloTabla, reemplazar_por_vista,
+    TIPO_TEXTO, TIPO_DECIMAL, TIPO_BOOL
+)
 from historico_controles_app import HistoricoControlesWindow
-from utils_informes import generar_pdf_completo, guardar_registro_informe
-from analisis_defectos.procesador_rollos import analizar_rollo
+from utils_informes import construir_pdf, construir_pdf_cuadricula, modo_informe, filas_tabla, abrir_pdf, guardar_registro_informe
+
+# Parejas de imágenes (original, procesada) que se decodifican por delante del pase
+IMAGENES_PRECARGA = 3
+
+
+def enviar_control(data):
+    """
+    Completa el orden de análisis del rollo y registra el control en el backend.
+
+    Se ejecuta en segundo plano (ver `EjecutorPeticiones`); no toca la interfaz.
+    """
+    try:
+        data["rollo"]["orden_analisis"] = api.orden_analisis(data["rollo"]["nombre_rollo"])
+    except ErrorAPI as e:
+        print(f"No se pudo obtener orden de análisis: {e}")
+    return api.guardar_control(data)
 
 
 class HighQualityImageView(QGraphicsView):
     """
     Visor de imágenes personalizado con capacidad para mostrar mensajes
     centrados sobre un fondo coloreado, además de imágenes procesadas con alta calidad.
+
+    Si recibe un `PrecargadorImagenes`, toma las imágenes ya decodificadas y escaladas
+    de su caché en lugar de leerlas de disco en el hilo de la interfaz; las que aún se
+    están decodificando se muestran al terminar (mientras, sigue la imagen anterior).
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, precargador=None):
         super().__init__(parent)
+        self.precargador = precargador
+        self.ruta_pendiente = None
+        if precargador is not None:
+            precargador.imagen_lista.connect(self.imagen_precargada)
         self.scene = QGraphicsScene(self)
         self.setScene(self.scene)
         self.setRenderHint(QPainter.Antialiasing, True)
@@ -51,8 +82,30 @@ class HighQualityImageView(QGraphicsView):
         self.current_text_color = "#FFFFFF"
         self.is_showing_message = False
 
+    def tamano_objetivo(self):
+        """Tamaño en píxeles físicos al que conviene escalar las imágenes para este visor."""
+        escala = self.devicePixelRatioF()
+        return int(self.viewport().width() * escala), int(self.viewport().height() * escala)
+
     def setImage(self, image_path):
-        image = QImage(image_path)
+        self.ruta_pendiente = None
+        if self.precargador is not None:
+            image = self.precargador.obtener(image_path, *self.tamano_objetivo())
+            if image is None:
+                self.ruta_pendiente = image_path
+                return True
+        else:
+            image = QImage(image_path)
+        return self.mostrar_imagen(image_path, image)
+
+    def imagen_precargada(self, image_path, image):
+        """Muestra la imagen esperada por `setImage` cuando el precargador termina de decodificarla."""
+        if image_path != self.ruta_pendiente:
+            return
+        self.ruta_pendiente = None
+        self.mostrar_imagen(image_path, image)
+
+    def mostrar_imagen(self, image_path, image):
         if image.isNull():
             print(f"\u274c Error: no se pudo cargar la imagen desde {image_path}")
             return False
@@ -64,8 +117,12 @@ class HighQualityImageView(QGraphicsView):
     def updateImage(self):
         if not self.pixmap or self.pixmap.isNull():
             return
-        self.scene.clear()
-        self.image_item = self.scene.addPixmap(self.pixmap)
+        if self.image_item is not None:
+            # Reutilizar el item existente en lugar de reconstruir la escena
+            self.image_item.setPixmap(self.pixmap)
+        else:
+            self.scene.clear()
+            self.image_item = self.scene.addPixmap(self.pixmap)
         # Usamos el tamaño real de la imagen como rectángulo de escena
         self.scene.setSceneRect(self.image_item.boundingRect())
         # Ajustamos la vista respetando proporción
@@ -73,6 +130,7 @@ class HighQualityImageView(QGraphicsView):
         self.text_item = None
 
     def showMessage(self, message, bgColor="#2C7873", textColor="#FFFFFF"):
+        self.ruta_pendiente = None
         self.scene.clear()
         self.image_item = None
         self.is_showing_message = True
@@ -150,6 +208,7 @@ class MainWindow(QMainWindow):
         self.rol_usuario = rol_usuario
         self.token_jwt = token_jwt
         self.id_usuario = id_usuario
+        self.peticiones = EjecutorPeticiones(self)
         mostrar_datos_usuario(self.ui, nombre_usuario, rol_usuario)
         configurar_botones_comunes(self, self.ui, self.rol_usuario, self.token_jwt)
 
@@ -161,6 +220,8 @@ class MainWindow(QMainWindow):
 
         # Directorio base donde se encuentran las subcarpetas
         self.base_folder = base_folder
+        self.catalogo_rollos = CatalogoRollos(base_folder)  # Rollos e imágenes por rollo, en caché
+        self.almacen_resultados = self.crear_almacen_resultados(base_folder)  # None: modo clásico (mover originales)
         
         # Inicializar variables
         self.folder = None  # Directorio actual seleccionado
@@ -168,6 +229,11 @@ class MainWindow(QMainWindow):
         self.index = 0
         self.analisis_completado = False
         self.timer = None
+        self.hilo_analisis = None  # Análisis del rollo en segundo plano
+        self.hilo_restauracion = None  # Restauración de rollos tras reiniciar
+        self.restauracion_pendiente = False  # Restauración aplazada hasta terminar el informe PDF
+        self.resultados = ResultadosRollo(None, 0.0)  # Resultados por imagen del rollo actual
+        self.total_analisis = 0
         
         # Temporizador para parpadeo del botón
         self.blink_timer = QTimer()
@@ -218,49 +284,53 @@ class MainWindow(QMainWindow):
         progress_dialog.close()
 
     def cargar_datos_iniciales(self):
-        mostrar_siguiente_id_control(self.ui)
+        mostrar_siguiente_id_control(self.ui, self.peticiones)
         self.configurar_combobox()
         self.image_view1.showMessage("♻️ Reinicia sistema antes de\n'Iniciar Control de Calidad'", "#708090", textColor= '#FBC02D')
         self.image_view2.showMessage("🌀 Selecciona rollo y\n haz clic en\n'Iniciar Control de Calidad'", "#708090")
 
     def configurar_combobox(self):
-        """Configura el ComboBox con las subcarpetas del directorio base, filtrando por el número máximo de imágenes"""
-        self.ui.comboBox.blockSignals(True)
-        self.ui.comboBox.clear()
-        
-        try:
-            max_imgs = self.ui.spinBox.value()
-            if max_imgs <= 0:
-                self.ui.comboBox.addItem("-- No hay rollos que cumplan con el umbral indicado --")
-                print("El valor del spinBox es 0, no se cargarán carpetas.")
-                return
-            
-            self.ui.comboBox.addItem("-- Selecciona un rollo --")
+        """
+        Rellena el ComboBox con los rollos del catálogo en caché (inmediato) y lanza en
+        segundo plano un escaneo de la carpeta raíz; si hay cambios, el ComboBox se actualiza.
+        """
+        self.mostrar_rollos_en_combobox()
+        self.peticiones.ejecutar(
+            self.catalogo_rollos.escanear,
+            al_completar=self.catalogo_actualizado,
+            al_fallar=self.mostrar_error_catalogo,
+            clave="catalogo_rollos"
+        )
 
-            subcarpetas = [
-                d for d in os.listdir(self.base_folder)
-                if os.path.isdir(os.path.join(self.base_folder, d))
-            ]
+    def catalogo_actualizado(self, cambiado):
+        if cambiado:
+            self.mostrar_rollos_en_combobox()
 
-            carpetas_validas = []
-            for carpeta in subcarpetas:
-                ruta = os.path.join(self.base_folder, carpeta)
-                num_imgs = len([
-                    f for f in os.listdir(ruta)
-                    if os.path.isfile(os.path.join(ruta, f)) and f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp'))
-                ])
-                if num_imgs <= max_imgs:
-                    carpetas_validas.append(carpeta)
+    def mostrar_error_catalogo(self, error):
+        print(f"Error al cargar subcarpetas: {error}")
+        QMessageBox.warning(self, "Error", f"No se pudo acceder al directorio: {self.base_folder}\n{str(error)}")
 
+    def mostrar_rollos_en_combobox(self):
+        """Muestra las subcarpetas con como máximo spinBox imágenes, conservando la selección actual"""
+        seleccion = self.ui.comboBox.currentText()
+        self.ui.comboBox.blockSignals(True)
+        self.ui.comboBox.clear()
+
+        max_imgs = self.ui.spinBox.value()
+        if max_imgs <= 0:
+            self.ui.comboBox.addItem("-- No hay rollos que cumplan con el umbral indicado --")
+        elif not self.catalogo_rollos.cargado:
+            self.ui.comboBox.addItem("-- Cargando rollos... --")
+        else:
+            self.ui.comboBox.addItem("-- Selecciona un rollo --")
+            carpetas_validas = self.catalogo_rollos.rollos_validos(max_imgs)
             if carpetas_validas:
                 self.ui.comboBox.addItems(carpetas_validas)
-                print(f"Cargadas {len(carpetas_validas)} carpetas con ≤ {max_imgs} imágenes")
+                if seleccion in carpetas_validas:
+                    self.ui.comboBox.setCurrentText(seleccion)
             else:
+                self.ui.comboBox.clear()
                 self.ui.comboBox.addItem("-- No hay rollos que cumplan con el umbral indicado --")
-                print("No se encontraron carpetas que cumplan con el criterio.")
-        except Exception as e:
-            print(f"Error al cargar subcarpetas: {e}")
-            QMessageBox.warning(self, "Error", f"No se pudo acceder al directorio: {self.base_folder}\n{str(e)}")
 
         self.ui.comboBox.blockSignals(False)
 
@@ -277,8 +347,9 @@ class MainWindow(QMainWindow):
             widget = item.widget()
             if widget:
                 widget.setParent(None)
-        self.image_view1 = HighQualityImageView()
-        self.image_view2 = HighQualityImageView()
+        self.precargador = PrecargadorImagenes(parent=self)
+        self.image_view1 = HighQualityImageView(precargador=self.precargador)
+        self.image_view2 = HighQualityImageView(precargador=self.precargador)
         layout.addWidget(self.image_view1)
         layout.addWidget(self.image_view2)
         
@@ -306,61 +377,48 @@ class MainWindow(QMainWindow):
             return []
 
     def configurar_tabla(self):
-        self.ui.tableWidget.setHorizontalHeaderLabels([
-        "Fecha/ Hora", "Tipo Defecto", "REF Defecto Img", "Mayor Defecto mm2", "Resultado",  "Min_defecto"
-        ])
-
-        self.ui.tableWidget.setColumnHidden(5, True)
-    
-        header = self.ui.tableWidget.horizontalHeader()
-        for col in range(5):
-            header.setSectionResizeMode(col, header.ResizeMode.Stretch)  # que todas se estiren por igual
+        """
+        Sustituye el QTableWidget del diseño por una vista sobre `ModeloTabla`.
 
-        self.ui.tableWidget.setRowCount(0)
+        Cada fila se guarda en un almacén por columnas y se colorea con un delegado al
+        pintarse, en lugar de crear un QTableWidgetItem por celda.
+        """
+        almacen = AlmacenColumnar({
+            "fecha": TIPO_TEXTO,
+            "tipos": TIPO_TEXTO,
+            "archivo": TIPO_TEXTO,
+            "mayor": TIPO_DECIMAL,
+            "resultado": TIPO_TEXTO,
+            "resumen": TIPO_BOOL
+        })
+        self.modelo_tabla = ModeloTabla([
+            Columna("Fecha/ Hora", "fecha"),
+            Columna("Tipo Defecto", "tipos"),
+            Columna("REF Defecto Img", "archivo"),
+            Columna("Mayor Defecto mm2", "mayor", formato=lambda v: f"{v:.2f}", estado="resultado"),
+            Columna("Resultado", "resultado", estado="resultado")
+        ], almacen, clave_resumen="resumen", parent=self)
+        self.tabla_resultados = reemplazar_por_vista(self.ui.tableWidget, self.modelo_tabla)
+
+        header = self.tabla_resultados.horizontalHeader()
+        for col in range(self.modelo_tabla.columnCount()):
+            header.setSectionResizeMode(col, QHeaderView.Stretch)  # que todas se estiren por igual
 
         # Hacer la tabla no editable
-        self.ui.tableWidget.setEditTriggers(QAbstractItemView.NoEditTriggers)
-
-    def agregar_registro_a_tabla(self, ruta_imagen_original, ruta_imagen_procesada):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        carpeta = os.path.basename(os.path.dirname(ruta_imagen_original))  # ID Rollo
-        archivo = os.path.basename(ruta_imagen_original)                  # Ref. Img Defecto
-
-        # Leer el mayor defecto desde el .txt de la imagen procesada
-        _, dim_defecto, _ = self.leer_defectos_txt(ruta_imagen_procesada)
-        dim_defecto = dim_defecto if dim_defecto is not None else 0.0
-
-        umbral_usuario = float(self.ui.doubleSpinBox.value())
-        result_analisis = "nok" if dim_defecto > umbral_usuario else "ok"
-        minimo, maximo, _ = self.leer_defectos_txt(ruta_imagen_procesada)
-
-        fila = self.ui.tableWidget.rowCount()
-        self.ui.tableWidget.insertRow(fila)
-
-        self.ui.tableWidget.setItem(fila, 0, QTableWidgetItem(timestamp))
-        tipos = self.leer_tipos_defecto_json(ruta_imagen_procesada)
-        tipos_str = ", ".join(tipos) if tipos else "—"
-        self.ui.tableWidget.setItem(fila, 1, QTableWidgetItem(tipos_str))
-        self.ui.tableWidget.setItem(fila, 2, QTableWidgetItem(archivo))
-
-        item_dim = QTableWidgetItem(f"{dim_defecto:.2f}")
-        item_result = QTableWidgetItem(result_analisis)
-
-        # Estilo condicional: rojo para NOK, verde para OK
-        if result_analisis == "nok":
-            item_dim.setBackground(QColor("#FFCDD2"))      # rojo claro
-            item_result.setBackground(QColor("#FFCDD2"))
-        else:
-            item_dim.setBackground(QColor("#C8E6C9"))      # verde claro
-            item_result.setBackground(QColor("#C8E6C9"))
-
-        self.ui.tableWidget.setItem(fila, 3, item_dim)
-        self.ui.tableWidget.setItem(fila, 4, item_result)
-        item_min = QTableWidgetItem(f"{minimo:.2f}" if minimo is not None else "0.00")
-        self.ui.tableWidget.setItem(fila, 5, item_min)  # columna oculta
+        self.tabla_resultados.setEditTriggers(QAbstractItemView.NoEditTriggers)
+
+    def agregar_registro_a_tabla(self, resultado):
+        """Añade a la tabla la fila de una imagen a partir de su `ResultadoImagen`."""
+        self.modelo_tabla.agregar({
+            "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "tipos": resultado.tipos_texto,
+            "archivo": resultado.nombre_archivo,  # Ref. Img Defecto
+            "mayor": resultado.mayor_defecto,
+            "resultado": resultado.clasificacion(self.resultados.umbral)
+        })
 
         # Desplazarse a la última fila
-        self.ui.tableWidget.scrollToBottom()
+        self.tabla_resultados.scrollToBottom()
 
 
     def parpadear_boton(self):
@@ -375,8 +433,8 @@ class MainWindow(QMainWindow):
         """
         Ejecuta el análisis de defectos sobre las imágenes del rollo seleccionado.
 
-        Procesa las imágenes mediante la función `analizar_rollo`,
-        carga las imágenes originales/procesadas, y lanza la visualización secuencial.
+        Lanza `analizar_rollo` en un hilo de trabajo (`HiloAnalisisRollo`) y arranca la
+        visualización secuencial, que muestra cada imagen en cuanto termina de procesarse.
         """
         # BLOQUEO SI INTERRUPCION
         if getattr(self, 'control_interrumpido', False):
@@ -384,7 +442,8 @@ class MainWindow(QMainWindow):
             return
         # LÓGICA DE PAUSA/REANUDACIÓN
         if self.timer and self.timer.isActive():
-            # PAUSA: para el timer, muestra 'Control pausado', cambia texto en btn y lo ilumina
+            # PAUSA: para el timer, muestra 'Control pausado', cambia texto en btn y lo ilumina.
+            # El análisis sigue avanzando en segundo plano.
             self.timer.stop()
             self.blink_timer.stop()
             self.ui.pushButton_5.setStyleSheet("background-color: #FFC107; color: black; font-weight: bold;")
@@ -393,7 +452,7 @@ class MainWindow(QMainWindow):
             self.image_view2.showMessage("🔄 Reanude o cancele control", "#708090", textColor="#FBC02D")
             self.ui.pushButton_5.setText("Reanudar Control de Calidad")
             return
-        elif self.timer and not self.timer.isActive() and self.images and not self.analisis_completado:
+        elif self.timer and not self.timer.isActive() and self.control_en_marcha():
             # REANUDAR: Reanuda el timer, restaura txt y estilo del botón
             self.timer.start(2000)
             self.blink_timer.start(500)
@@ -402,6 +461,10 @@ class MainWindow(QMainWindow):
             self.ui.pushButton_5.setText("Pausar Control de Calidad")
             return
 
+        if self.restauracion_en_curso():
+            QMessageBox.information(self, "Reiniciando", "Espera a que terminen de restaurarse los rollos")
+            return
+
         seleccion = self.ui.comboBox.currentText()
 
         # Solo mostrar un mensaje y no cambiar los QGraphicsView si no hay selección válida
@@ -411,55 +474,126 @@ class MainWindow(QMainWindow):
 
         self.folder = os.path.join(self.base_folder, seleccion)
         umbral_usuario = float(self.ui.doubleSpinBox.value())
-        self.ui.label_contador.setText("📊 0 / {}".format(len(self.images)))
-
-        # Ejecutar el análisis de imágenes antes de cargarlas
-        try:
-            analizar_rollo(base_path=self.base_folder, rollo=seleccion, area_umbral=umbral_usuario)
-        except Exception as e:
-            print(f"Error al analizar el rollo: {e}")
-            QMessageBox.critical(self, "Error", f"Ocurrió un error al analizar el rollo seleccionado:\n{e}")
-            return
 
-        # Cargar imágenes desde 'originales' y 'procesado'
-        carpeta_originales = os.path.join(self.folder, "originales")
-        carpeta_procesadas = os.path.join(self.folder, "procesado")
-        self.imagenes_originales = self.cargar_imagenes(carpeta_originales)
-        self.imagenes_procesadas = self.cargar_imagenes(carpeta_procesadas)
-
-        # Validar que ambos conjuntos estén sincronizados
-        if len(self.imagenes_originales) != len(self.imagenes_procesadas):
-            QMessageBox.warning(self, "Advertencia", "El número de imágenes originales y procesadas no coincide.")
-            return
-
-        self.images = list(zip(self.imagenes_originales, self.imagenes_procesadas))
+        self.images = []
+        self.resultados = ResultadosRollo(seleccion, umbral_usuario)
         self.index = 0
         self.imagenes_procesadas = []  # Limpiar acumulación previa
         self.analisis_completado = False
+        self.total_analisis = 0
 
-        self.ui.tableWidget.setRowCount(0)
-        self.ui.progressBar.setMaximum(len(self.images) if self.images else 1)
+        self.modelo_tabla.limpiar()
+        self.ui.progressBar.setMaximum(1)
         self.ui.progressBar.setValue(0)
+        self.actualizar_contador()
+        self.image_view1.showMessage("⚙️ Analizando rollo...", "#708090")
+        self.image_view2.showMessage(f"🔍 {seleccion}", "#708090")
+
+        # Analizar en segundo plano; las imágenes llegan por la señal imagen_procesada
+        self.hilo_analisis = HiloAnalisisRollo(self.base_folder, seleccion, umbral_usuario, self.almacen_resultados, self)
+        self.hilo_analisis.imagen_procesada.connect(self.imagen_analizada)
+        self.hilo_analisis.completado.connect(self.analisis_rollo_terminado)
+        self.hilo_analisis.fallido.connect(self.analisis_rollo_fallido)
+        self.hilo_analisis.start()
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.mostrar_siguiente_imagen)
+        self.timer.start(2000)
+
+        self.blink_timer.start(500)
+        self.ui.pushButton_5.setText("Pausar Control de Calidad")
+
+    def analisis_en_curso(self):
+        """Indica si el hilo de análisis del rollo sigue procesando imágenes."""
+        return self.hilo_analisis is not None and not self.hilo_analisis.cancelado()
+
+    def control_en_marcha(self):
+        """Indica si hay un control iniciado que aún no ha terminado (analizando o mostrando imágenes)."""
+        return (bool(self.images) or self.analisis_en_curso()) and not self.analisis_completado
+
+    def actualizar_contador(self):
+        """Muestra las imágenes vistas frente a las analizadas hasta el momento."""
+        texto = f"📊 {self.index} / {len(self.images)}"
+        if self.analisis_en_curso():
+            texto += f" (analizando, {len(self.images)} de {self.total_analisis or '?'})"
+        self.ui.label_contador.setText(texto)
+
+    def imagen_analizada(self, procesadas, total, resultado):
+        """Añade al pase de imágenes la imagen que el hilo de análisis acaba de procesar."""
+        if self.sender() is not self.hilo_analisis or not self.analisis_en_curso():
+            return  # Señal de un análisis cancelado
+        self.total_analisis = total
+        imagen = self.resultados.agregar(resultado)
+        self.images.append((imagen.ruta_original, imagen.ruta_procesada))
+        self.ui.progressBar.setMaximum(total)
+        self.precargar_siguientes()
+        # La primera imagen se muestra sin esperar al siguiente tic del temporizador
+        if self.index == 0 and self.timer and self.timer.isActive():
+            self.mostrar_siguiente_imagen()
+        else:
+            self.actualizar_contador()
+
+    def analisis_rollo_terminado(self, resultados):
+        """Cierra el análisis; el pase de imágenes termina de mostrar las pendientes."""
+        if self.sender() is not self.hilo_analisis or not self.analisis_en_curso():
+            return
+        self.hilo_analisis = None
+        self.ui.progressBar.setMaximum(len(self.images) if self.images else 1)
 
         if not self.images:
+            self.finalizar_control_sin_imagenes()
             self.image_view1.showMessage("No se encontraron\nimágenes en la carpeta", "#D32F2F")
             self.image_view2.showMessage("No se encontraron\nimágenes en la carpeta", "#D32F2F")
             self.ui.label_5.setText("Sin imágenes")
             self.ui.label_6.setText("Sin imágenes")
             return
 
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.mostrar_siguiente_imagen)
-        self.timer.start(2000)
+        self.actualizar_contador()
+        # Si el pase ya había alcanzado al análisis, completar ahora
+        if self.index >= len(self.images) and self.timer and self.timer.isActive():
+            self.mostrar_siguiente_imagen()
 
-        self.blink_timer.start(500)
-        self.ui.pushButton_5.setText("Pausar Control de Calidad")
-        self.mostrar_siguiente_imagen()
+    def analisis_rollo_fallido(self, error):
+        if self.sender() is not self.hilo_analisis or not self.analisis_en_curso():
+            return
+        self.hilo_analisis = None
+        print(f"Error al analizar el rollo: {error}")
+        self.finalizar_control_sin_imagenes()
+        self.images = []
+        self.image_view1.showMessage("⚠️ Error en el análisis", "#D32F2F")
+        self.image_view2.showMessage("♻️ Reinicia sistema\npara continuar", "#708090", textColor='#FBC02D')
+        QMessageBox.critical(self, "Error", f"Ocurrió un error al analizar el rollo seleccionado:\n{error}")
+
+    def finalizar_control_sin_imagenes(self):
+        """Detiene el pase de imágenes y restaura el botón de inicio."""
+        if self.timer:
+            self.timer.stop()
+        self.timer = None
+        self.blink_timer.stop()
+        self.ui.pushButton_5.setText("Iniciar Control de Calidad")
+        self.ui.pushButton_5.setStyleSheet(self.boton_color_original)
+
+    def cancelar_analisis(self, esperar=False):
+        """
+        Cancela el análisis en segundo plano, si lo hay.
+
+        Args:
+            esperar (bool): Bloquear hasta que el hilo termine la imagen en curso; necesario
+                antes de mover o borrar las carpetas del rollo.
+        """
+        if self.hilo_analisis is None:
+            return
+        self.hilo_analisis.cancelar()
+        if esperar:
+            self.hilo_analisis.wait()
+            self.hilo_analisis = None
 
 
     def limpiar_pantalla(self):
         """Limpia los visores de imágenes y detiene cualquier procesamiento"""
         self.interrumpir_control()
+        self.cancelar_analisis(esperar=True)
+        self.precargador.limpiar()
         
         # Limpiar visores
         self.image_view1.showMessage("🟢 Sistema reiniciado", "#708090")
@@ -471,47 +605,84 @@ class MainWindow(QMainWindow):
         self.ui.progressBar.setValue(0)
         
         # Limpiar la tabla
-        self.ui.tableWidget.setRowCount(0)
+        self.modelo_tabla.limpiar()
 
         # Restablecer valores de los spinboxes
         self.ui.spinBox.setValue(0)
         self.ui.doubleSpinBox.setValue(0.00)
 
-        # Revertir todas las carpetas de rollos al estado original
-        for carpeta in os.listdir(self.base_folder):
-            ruta_rollo = os.path.join(self.base_folder, carpeta)
-            if not os.path.isdir(ruta_rollo):
-                continue
-
-            ruta_originales = os.path.join(ruta_rollo, "originales")
-            ruta_procesado = os.path.join(ruta_rollo, "procesado")
-
-            # Solo actuar si existen ambas carpetas
-            if os.path.exists(ruta_originales) and os.path.exists(ruta_procesado):
-                try:
-                    # Mover imágenes desde 'originales/' a la raíz
-                    for archivo in os.listdir(ruta_originales):
-                        origen = os.path.join(ruta_originales, archivo)
-                        destino = os.path.join(ruta_rollo, archivo)
-                        shutil.move(origen, destino)
-
-                    # Borrar carpetas originales y procesado
-                    shutil.rmtree(ruta_originales)
-                    shutil.rmtree(ruta_procesado)
-                    print(f"Rollo restaurado: {carpeta}")
-                except Exception as e:
-                    print(f"Error al restaurar {carpeta}: {e}")
+        # Revertir en segundo plano los rollos modificados por el análisis
+        self.restaurar_rollos()
 
-        self.ui.pushButton_5.setEnabled(True)  # Habilitar btn 'Iniciar Control de Calidad' tras reinicio
         # RESTAURAR ESTADO DE INTERRUPCIÓN
         self.control_interrumpido = False
         # Restaurar estilo original del botón tras limpiar
         self.ui.pushButton_5.setStyleSheet(self.boton_color_original)
 
+    def restauracion_en_curso(self):
+        """Indica si los rollos se están restaurando (o esperan al informe para hacerlo) tras un reinicio."""
+        return self.hilo_restauracion is not None or self.restauracion_pendiente
+
+    def restaurar_rollos(self):
+        """
+        Lanza `HiloRestauracionRollos`, que devuelve a su estado original solo los rollos
+        anotados en el diario, con el progreso en la barra de progreso.
+        """
+        if self.restauracion_en_curso():
+            return  # La restauración en marcha ya recoge los rollos pendientes
+        self.ui.pushButton_5.setEnabled(False)
+        if self.peticiones.en_curso("informe_pdf"):
+            # El informe aún lee las imágenes procesadas: restaurar al terminarlo
+            self.restauracion_pendiente = True
+            self.image_view1.showMessage("📄 Generando informe...", "#708090")
+            return
+        self.image_view1.showMessage("♻️ Restaurando rollos...", "#708090")
+        self.hilo_restauracion = HiloRestauracionRollos(self.base_folder, self.almacen_resultados, self)
+        self.hilo_restauracion.progreso.connect(self.progreso_restauracion)
+        self.hilo_restauracion.completado.connect(self.restauracion_terminada)
+        self.hilo_restauracion.start()
+
+    def restaurar_rollos_pendientes(self):
+        """Lanza la restauración aplazada mientras se generaba el informe, si la hay."""
+        if self.restauracion_pendiente:
+            self.restauracion_pendiente = False
+            self.restaurar_rollos()
+
+    def progreso_restauracion(self, restaurados, total, rollo):
+        self.ui.progressBar.setMaximum(total)
+        self.ui.progressBar.setValue(restaurados)
+        self.ui.label_contador.setText(f"♻️ {restaurados} / {total} rollos restaurados")
+
+    def restauracion_terminada(self, errores):
+        self.hilo_restauracion = None
+        self.ui.progressBar.setValue(0)
+        self.actualizar_contador()
+        self.image_view1.showMessage("🟢 Sistema reiniciado", "#708090")
+        self.ui.pushButton_5.setEnabled(True)  # Habilitar btn 'Iniciar Control de Calidad' tras reinicio
+        self.configurar_combobox()  # Los rollos restaurados vuelven a contar sus imágenes
+        if errores:
+            detalle = "\n".join(f"- {rollo}: {error}" for rollo, error in errores)
+            QMessageBox.warning(
+                self, "Restauración incompleta",
+                f"No se pudieron restaurar algunos rollos; se reintentará en el próximo reinicio:\n{detalle}"
+            )
+
+    @staticmethod
+    def crear_almacen_resultados(base_folder):
+        """Abre el almacén de resultados versionado si está activado en config.json; si no, devuelve None."""
+        ruta = obtener_ruta_resultados(base_folder)
+        if ruta is None:
+            return None
+        try:
+            return AlmacenResultados(ruta)
+        except OSError as e:
+            print(f"No se pudo abrir el almacén de resultados ({ruta}), se usa el modo clásico: {e}")
+            return None
+
     def confirmar_interrumpir(self):
         """Muestra diálogo de confirmación antes de interrumpir el control"""
         # Permitir interrupción tanto si el timer está activo como si está pausado
-        if not (self.timer and (self.timer.isActive() or (not self.timer.isActive() and self.images and not self.analisis_completado))):
+        if not (self.timer and (self.timer.isActive() or self.control_en_marcha())):
             return  # No hay control activo o pausado que interrumpir
 
         self.timer.stop()
@@ -527,8 +698,9 @@ class MainWindow(QMainWindow):
 
         if respuesta == QMessageBox.Yes:
             self.control_interrumpido = True
+            self.cancelar_analisis()
             # Mostrar mensaje en visores
-            if not self.analisis_completado and self.images:
+            if not self.analisis_completado:
                 self.image_view1.showMessage("⚠️ Control cancelado", "#708090")
                 self.image_view2.showMessage("♻️ Reinicia sistema\npara continuar", "#708090", textColor= '#FBC02D')
                 self.ui.label_5.setText("🚫 Control cancelado")
@@ -547,8 +719,9 @@ class MainWindow(QMainWindow):
 
     def interrumpir_control(self):
         """Detiene el proceso de control de calidad"""
-        if self.timer and (self.timer.isActive() or (not self.timer.isActive() and self.images and not self.analisis_completado)):
+        if self.timer and (self.timer.isActive() or self.control_en_marcha()):
             self.timer.stop()
+            self.cancelar_analisis()
             print("Control de calidad interrumpido")
             
             # Detener parpadeo del botón y restaurar estilo original
@@ -556,7 +729,7 @@ class MainWindow(QMainWindow):
             self.ui.pushButton_5.setStyleSheet("")  # Restaurar estilo original
             
             # Mostrar mensaje de interrupción si no estaba completado
-            if not self.analisis_completado and self.images:
+            if not self.analisis_completado:
                 self.image_view1.showMessage("⚠️ Control cancelado", "#F57C00")
                 self.image_view2.showMessage("Control cancelado", "#F57C00")
                 self.ui.label_5.setText("Control cancelado")
@@ -567,7 +740,8 @@ class MainWindow(QMainWindow):
 
     def mostrar_siguiente_imagen(self):
         if not self.images or self.index >= len(self.images):
-            if not self.analisis_completado and self.images:
+            # Con el análisis en curso, esperar a que llegue la siguiente imagen
+            if not self.analisis_completado and self.images and not self.analisis_en_curso():
                 self.mostrar_analisis_completado()
             return
 
@@ -581,7 +755,8 @@ class MainWindow(QMainWindow):
 
         nombre = os.path.basename(ruta_original)
 
-        minimo, maximo, _ = self.leer_defectos_txt(ruta_procesada)
+        resultado = self.resultados[self.index]
+        minimo, maximo = resultado.minimo, resultado.maximo
         if minimo is not None and maximo is not None:
             self.ui.label_5.setText(f"Rango de defectos: {minimo:.2f} - {maximo:.2f} mm")
         else:
@@ -589,11 +764,20 @@ class MainWindow(QMainWindow):
 
         self.ui.label_6.setText(f"Imagen: {nombre}")
         self.ui.progressBar.setValue(self.index + 1)
-        self.ui.label_contador.setText(f"📊 {self.index + 1} / {len(self.images)}")
-        self.agregar_registro_a_tabla(ruta_original, ruta_procesada)
+        self.agregar_registro_a_tabla(resultado)
 
         print(f"Mostrando imagen: {nombre} ({self.index + 1}/{len(self.images)})")
         self.index += 1
+        self.actualizar_contador()
+        self.precargar_siguientes()
+
+    def precargar_siguientes(self):
+        """Decodifica en segundo plano las próximas IMAGENES_PRECARGA parejas del pase."""
+        siguientes = self.images[self.index:self.index + IMAGENES_PRECARGA]
+        if not siguientes:
+            return
+        self.precargador.precargar([original for original, _ in siguientes], *self.image_view1.tamano_objetivo())
+        self.precargador.precargar([procesada for _, procesada in siguientes], *self.image_view2.tamano_objetivo())
 
 
     def _agregar_imagenes_procesadas_a_pdf(self, c, width, height):
@@ -615,62 +799,22 @@ class MainWindow(QMainWindow):
                     print(f"Error al insertar imagen en PDF: {e}")
 
 
-    def leer_defectos_txt(self, ruta_imagen_procesada):
-        """
-        Lee el archivo .txt correspondiente a una imagen procesada.
-        Devuelve:
-        - área mínima
-        - área máxima
-        - lista completa de áreas
-        """
-        try:
-            txt_path = ruta_imagen_procesada + ".txt"
-            if not os.path.exists(txt_path):
-                return None, None, []
-
-            areas = []
-            with open(txt_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    partes = line.strip().split()
-                    if len(partes) == 2 and partes[1].endswith("mm2"):
-                        valor = float(partes[1].replace("mm2", ""))
-                        areas.append(valor)
-
-            if not areas:
-                return None, None, []
-
-            return min(areas), max(areas), areas
-        except Exception as e:
-            print(f"Error al leer defectos desde TXT: {e}")
-            return None, None, []
-        
-    def leer_tipos_defecto_json(self, ruta_imagen_procesada):
-        """Lee el archivo .json generado por procesador_rollos.py y devuelve la lista de tipos de defecto"""
-        json_path = ruta_imagen_procesada + ".json"
-        if not os.path.exists(json_path):
-            return []
-
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("tipos", [])
-        except Exception as e:
-            print(f"Error leyendo tipos de defecto desde JSON: {e}")
-            return []
-
-
     def guardar_resultados(self):
         """
-        Compila los resultados mostrados en la tabla y los envía al backend.
+        Compila los resultados del análisis (`self.resultados`) y los envía al backend.
 
         Incluye:
         - metadatos del control
         - lista de imágenes y defectos
         - cálculo del resultado global (ok/nok)
+
+        El envío se hace en segundo plano; un segundo clic mientras se guarda se ignora.
         """
         if not self.analisis_completado:
             QMessageBox.warning(self, "Advertencia", "No se ha completado ningún análisis para guardar.")
             return
+        if self.peticiones.en_curso("guardar_control"):
+            return
 
         try:
             # Extraer valores del formulario
@@ -681,14 +825,8 @@ class MainWindow(QMainWindow):
             ruta_rollo = self.folder  # Carpeta actual seleccionada
             nombre_rollo = os.path.basename(ruta_rollo).strip().lower()
             print(f"nombre_rollo enviado desde frontend: '{nombre_rollo}'")
-            orden_analisis = 1
+            orden_analisis = 1  # Se consulta al backend justo antes de guardar (enviar_control)
             print(f"Ruta enviada como rollo: {ruta_rollo}")
-            try:
-                resp_orden = requests.get("http://localhost:8000/controles/rollo/orden_analisis", params={"nombre_rollo": nombre_rollo})
-                if resp_orden.status_code == 200:
-                    orden_analisis = resp_orden.json().get("siguiente_orden", 1)
-            except Exception as e:
-                print(f"No se pudo obtener orden de análisis: {e}")
 
             # Compilar estructura del payload
             data = {
@@ -707,71 +845,52 @@ class MainWindow(QMainWindow):
                 "imagenes": []
             }
 
-            defectos_intolerables = 0
-
-            for row in range(self.ui.tableWidget.rowCount()):
-                if self.ui.tableWidget.item(row, 1).text() == "RESUMEN":
-                    continue
-
-                nombre_archivo = self.ui.tableWidget.item(row, 2).text()
-                max_defecto = float(self.ui.tableWidget.item(row, 3).text())
-                clasificacion = self.ui.tableWidget.item(row, 4).text().lower()
-                tipo_defecto = self.ui.tableWidget.item(row, 1).text().strip()
-
-                min_defecto = 0.0
-                min_item = self.ui.tableWidget.item(row, 5)
-                if min_item and min_item.text().replace('.', '', 1).isdigit():
-                    try:
-                        min_defecto = float(min_item.text())
-                    except ValueError:
-                        pass
-
-                if clasificacion == "nok":
-                    defectos_intolerables += 1
-
-                data["imagenes"].append({
-                    "nombre_archivo": nombre_archivo,
-                    "fecha_captura": timestamp_actual,
-                    "max_dim_defecto_medido": max_defecto,
-                    "min_dim_defecto_medido": min_defecto,
-                    "clasificacion": clasificacion,
-                    "defectos": [
-                        {"area": min_defecto, "tipo_valor": "min", "tipo_defecto": tipo_defecto},
-                        {"area": max_defecto, "tipo_valor": "max", "tipo_defecto": tipo_defecto}
-                    ]
-                })
+            data["imagenes"] = self.resultados.imagenes_para_guardar(timestamp_actual)
+            defectos_intolerables = self.resultados.defectos_intolerables()
 
             # Ajustar total de defectos intolerables y resultado del rollo
             data["rollo"]["total_defectos_intolerables_rollo"] = defectos_intolerables
             data["rollo"]["resultado_rollo"] = "nok" if defectos_intolerables > 0 else "ok"
 
-            response = requests.post("http://localhost:8000/controles/nuevo", json=data)
-
-            if response.status_code == 200:
-                QMessageBox.information(self, "Éxito", "Resultados guardados correctamente.")
-
-                # Actualizar id_control en interfaz
-                respuesta = response.json()
-                nuevo_id = respuesta.get("id_control")
-                if nuevo_id is not None:
-                    self.id_control_confirmado = nuevo_id
-                    self.ui.label_11.setText(f"{int(nuevo_id) + 1:05d}")
-                else:
-                    print("No se recibió un id_control válido desde el backend.")
-                    self.ui.label_11.setText("-----")
-            else:
-                error_msg = response.json().get("detail", "Error desconocido")
-                QMessageBox.critical(self, "Error", f"Error al guardar: {error_msg}")
+            self.peticiones.ejecutar(
+                enviar_control, data,
+                al_completar=self.confirmar_resultados_guardados,
+                al_fallar=self.mostrar_error_guardado,
+                clave="guardar_control"
+            )
 
         except Exception as e:
             QMessageBox.critical(self, "Error inesperado", str(e))
 
+    def confirmar_resultados_guardados(self, respuesta):
+        """Confirma el guardado y muestra el siguiente ID de control."""
+        QMessageBox.information(self, "Éxito", "Resultados guardados correctamente.")
+
+        # Actualizar id_control en interfaz
+        nuevo_id = respuesta.get("id_control")
+        if nuevo_id is not None:
+            self.id_control_confirmado = nuevo_id
+            self.ui.label_11.setText(f"{int(nuevo_id) + 1:05d}")
+        else:
+            print("No se recibió un id_control válido desde el backend.")
+            self.ui.label_11.setText("-----")
+
+    def mostrar_error_guardado(self, error):
+        """Informa de un error al guardar los resultados."""
+        if isinstance(error, ErrorAPI):
+            QMessageBox.critical(self, "Error", f"Error al guardar: {error.detalle or 'Error desconocido'}")
+        else:
+            QMessageBox.critical(self, "Error inesperado", str(error))
+
     def generar_informe_pdf(self):
         """
         Genera un informe PDF con los resultados del análisis actual.
 
         El informe se guarda en la carpeta 'historico' del escritorio y
         se registra en la base de datos mediante una llamada al backend.
+        El PDF se construye en segundo plano; la tabla se lee antes, en el hilo de la interfaz.
+        Los rollos grandes (según la clave "informe" de config.json) usan el informe en
+        cuadrícula con resumen estadístico (`construir_pdf_cuadricula`) en lugar del listado.
         """
         if not self.analisis_completado:
             QMessageBox.warning(self, "Advertencia", "Debe finalizar un análisis antes de generar el informe.")
@@ -789,26 +908,72 @@ class MainWindow(QMainWindow):
         os.makedirs(ruta_hist, exist_ok=True)
         ruta_hist_pdf = os.path.join(ruta_hist, nombre_pdf)
 
-        generar_pdf_completo(
+        if self.peticiones.en_curso("informe_pdf"):
+            return  # Ya se está generando un informe
+
+        comunes = dict(
             id_control=id_control,
             nombre_usuario=self.nombre_usuario,
             rol_usuario=self.rol_usuario,
-            tablewidget=self.ui.tableWidget,
-            imagenes_procesadas=self.imagenes_procesadas,
             tolerancia_tamano=self.ui.doubleSpinBox.value(),
             tolerancia_cantidad=self.ui.spinBox.value(),
             ruta_destino=ruta_hist_pdf,
-            logo_path= "logo_isli.ico",
-            parent_widget=self
+            logo_path="logo_isli.ico"
+        )
+        config_informe = obtener_config_informe()
+        if modo_informe(config_informe, len(self.resultados)) == "cuadricula":
+            umbral = self.resultados.umbral
+            imagenes = [
+                {
+                    "nombre_archivo": imagen.nombre_archivo,
+                    "ruta_procesada": imagen.ruta_procesada,
+                    "clasificacion": imagen.clasificacion(umbral),
+                    "mayor_defecto": imagen.mayor_defecto,
+                    "tipos": imagen.tipos
+                }
+                for imagen in self.resultados
+            ]
+            funcion = construir_pdf_cuadricula
+            argumentos = dict(
+                imagenes=imagenes,
+                columnas=int(config_informe["columnas"]),
+                filas=int(config_informe["filas"]),
+                solo_nok=bool(config_informe["solo_nok"])
+            )
+        else:
+            funcion = construir_pdf
+            argumentos = dict(filas=filas_tabla(self.modelo_tabla), imagenes_procesadas=list(self.imagenes_procesadas))
+
+        self.setCursor(Qt.BusyCursor)
+        self.peticiones.ejecutar(
+            funcion,
+            **comunes,
+            **argumentos,
+            al_completar=lambda ruta: self.informe_pdf_generado(id_control, ruta),
+            al_fallar=self.informe_pdf_fallido,
+            clave="informe_pdf"
         )
 
-        # Registrar el informe en la base de datos
-        guardar_registro_informe(
+    def informe_pdf_generado(self, id_control, ruta_pdf):
+        self.unsetCursor()
+        self.restaurar_rollos_pendientes()
+        QMessageBox.information(self, "Informe generado", f"Informe guardado en:\n{ruta_pdf}")
+        abrir_pdf(ruta_pdf)
+
+        # Registrar el informe en la base de datos (en segundo plano)
+        self.peticiones.ejecutar(
+            guardar_registro_informe,
             id_control=int(id_control),
-            ruta_pdf=ruta_hist_pdf,
+            ruta_pdf=ruta_pdf,
             generado_por=self.id_usuario
         )
 
+    def informe_pdf_fallido(self, error):
+        self.unsetCursor()
+        self.restaurar_rollos_pendientes()
+        print(f"Error al generar el PDF: {error}")
+        QMessageBox.critical(self, "Error al generar informe", f"Error al crear el informe:\n\n{error}")
+
     def setupUiConnections(self):
         self.ui.pushButton_report.clicked.connect(self.generar_informe_pdf)
         self.ui.pushButton_report.setEnabled(False)  # Deshabilitado por defecto
@@ -845,59 +1010,17 @@ class MainWindow(QMainWindow):
         if self.images:
             self.ui.progressBar.setValue(len(self.images))
 
-            # Calcular mayor defecto robustamente desde la columna 3
-            import re
-            mayor_defecto = 0.0
-            for i in range(self.ui.tableWidget.rowCount()):
-                item = self.ui.tableWidget.item(i, 3)
-                if item:
-                    match = re.search(r"(\d+(\.\d+)?)", item.text())
-                    if match:
-                        try:
-                            valor = float(match.group(1))
-                            mayor_defecto = max(mayor_defecto, valor)
-                        except ValueError:
-                            print(f"No se pudo convertir '{item.text()}' a float.")
-
-            umbral_usuario = float(self.ui.doubleSpinBox.value())
-            resultado_global = "nok" if mayor_defecto > umbral_usuario else "ok"
-
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            fila_actual = self.ui.tableWidget.rowCount()
-            self.ui.tableWidget.insertRow(fila_actual)
-
-            # Obtener tipos de defecto desde los JSON procesados
-            tipos_acumulados = []
-            for ruta in self.imagenes_procesadas:
-                tipos = self.leer_tipos_defecto_json(ruta)
-                tipos_acumulados.extend(tipos)
-            tipos_unicos = sorted(set(tipos_acumulados))
-            tipos_str = ", ".join(tipos_unicos) if tipos_unicos else "—"
-
-            # Crear items finales
-            item_fecha = QTableWidgetItem(timestamp)
-            item_tipos = QTableWidgetItem(tipos_str)
-            item_total = QTableWidgetItem(f"Total: {len(self.images)} imágenes")
-            item_limite = QTableWidgetItem(f"{mayor_defecto:.2f}")
-            item_resultado = QTableWidgetItem(resultado_global)
-
-            items = [item_fecha, item_tipos, item_total, item_limite, item_resultado]
-
-            for item in items:
-                item.setFont(QFont("Arial", 10, QFont.Bold))
-                item.setBackground(QColor("#FFFFFF"))
-
-            if resultado_global == "nok":
-                item_limite.setBackground(QColor("#FF6F61"))
-                item_resultado.setBackground(QColor("#FF6F61"))
-            elif resultado_global == "ok":
-                item_limite.setBackground(QColor("#9CAF88"))
-                item_resultado.setBackground(QColor("#9CAF88"))
-
-            for col, item in enumerate(items):
-                self.ui.tableWidget.setItem(fila_actual, col, item)
-
-            self.ui.tableWidget.scrollToBottom()
+            # Fila resumen con el resultado global del rollo
+            tipos_unicos = self.resultados.tipos_unicos()
+            self.modelo_tabla.agregar({
+                "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "tipos": ", ".join(tipos_unicos) if tipos_unicos else "—",
+                "archivo": f"Total: {len(self.images)} imágenes",
+                "mayor": self.resultados.mayor_defecto(),
+                "resultado": self.resultados.resultado_global(),
+                "resumen": True
+            })
+            self.tabla_resultados.scrollToBottom()
 
         self.analisis_completado = True
         self.ui.pushButton_report.setEnabled(True)
@@ -1058,6 +1181,9 @@ class MainWindow(QMainWindow):
         nueva_ruta = QFileDialog.getExistingDirectory(self, "Seleccionar carpeta raíz de los rollos")
         if nueva_ruta:
             self.base_folder = nueva_ruta
+            self.catalogo_rollos = CatalogoRollos(nueva_ruta)
+            self.almacen_resultados = self.crear_almacen_resultados(nueva_ruta)
+            self.peticiones.cancelar("catalogo_rollos")  # Descartar el escaneo de la ruta anterior
             guardar_config_ruta(nueva_ruta)
             QMessageBox.information(self, "Ruta actualizada", f"Nueva carpeta raíz:\n{nueva_ruta}")
             self.configurar_combobox()
@@ -1066,12 +1192,11 @@ class MainWindow(QMainWindow):
         """
         Revoca el token al cerrar la ventana principal (X), para forzar expiración de sesión en el panel web.
         """
-        token = getattr(self, 'token_jwt', None)
-        if token:
-            try:
-                requests.post("http://localhost:8000/logout", json={"token": token}, timeout=3)
-            except Exception as e:
-                print(f"Error al revocar token en closeEvent: {e}")
+        self.peticiones.cancelar_todas()
+        self.cancelar_analisis(esperar=True)
+        if self.hilo_restauracion is not None:
+            self.hilo_restauracion.wait()  # No dejar un rollo a medio restaurar
+        revocar_token_sesion(self)
         event.accept()  # Permite el cierre inmediato
 
     def prompt_reiniciar_on_start(self):
@@ -1,12 +1,19 @@
-import requests
 import json
 from PySide6.QtGui import QIcon
 import os
-from PySide6.QtWidgets import QWidget, QTableWidgetItem, QMessageBox, QHeaderView, QTableWidgetItem, QFileDialog  
-from PySide6.QtCore import QDate, QTimer, Qt, QRunnable, QThreadPool, Slot
+from PySide6.QtWidgets import QWidget, QMessageBox, QHeaderView, QFileDialog, QLineEdit, QPushButton, QProgressDialog
+from PySide6.QtCore import QDate, QTimer, Qt
 from datetime import datetime, time
 from UI.historico_controles import Ui_Form_historico
-from utils_ui import mostrar_datos_usuario, configurar_botones_comunes, guardar_config_ruta
+from utils_ui import (
+    mostrar_datos_usuario, configurar_botones_comunes, guardar_config_ruta, revocar_token_sesion,
+    obtener_ruta_informes, obtener_config_informe
+)
+from cliente_api import api, ErrorAPI
+from peticiones_async import EjecutorPeticiones
+from modelos_tabla import AlmacenColumnar, Columna, ModeloTabla, reemplazar_por_vista, TIPO_TEXTO, TIPO_ENTERO, TIPO_DECIMAL, TIPO_BOOL
+
+ICONOS_RESULTADO = {"ok": "🟢", "nok": "🔴"}
 
 
 class HistoricoControlesWindow(QWidget):
@@ -14,21 +21,29 @@ class HistoricoControlesWindow(QWidget):
     Ventana del sistema ISLI para visualizar y filtrar el histórico de controles de calidad.
 
     Permite aplicar filtros por usuario, fecha, tolerancia y tamaño de defecto.
-    También permite editar comentarios y visualizar informes asociados.
+    También permite editar comentarios, visualizar informes asociados y generar por lotes
+    los informes pendientes.
     """
     def cargar_datos_historico(self):
         """
-        Obtiene el listado completo de controles desde la API y los muestra en la tabla.
+        Obtiene en segundo plano el listado completo de controles y lo muestra en la tabla.
+
+        Sustituye a cualquier consulta del histórico todavía en curso.
         """
-        try:
-            response = requests.get("http://localhost:8000/controles/historico")
-            if response.status_code == 200:
-                data = response.json()
-                self.mostrar_datos_en_tabla(data)
-            else:
-                QMessageBox.warning(self, "Error", f"No se pudo obtener el histórico.\n{response.text}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error de conexión", str(e))
+        self.peticiones.ejecutar(
+            api.historico,
+            al_completar=self.mostrar_datos_en_tabla,
+            al_fallar=self.mostrar_error_historico,
+            clave="historico",
+            reemplazar=True
+        )
+
+    def mostrar_error_historico(self, error):
+        """Informa de que no se pudo obtener el histórico."""
+        if isinstance(error, ErrorAPI) and error.status_code is not None:
+            QMessageBox.warning(self, "Error", f"No se pudo obtener el histórico.\n{error.detalle}")
+        else:
+            QMessageBox.critical(self, "Error de conexión", str(error))
 
     def aplicar_filtros(self):
         """
@@ -51,6 +66,11 @@ class HistoricoControlesWindow(QWidget):
         if usuario and not usuario.startswith("--"):
             params["usuario"] = usuario
 
+        # Búsqueda de texto en usuarios, rollos y notas
+        texto_busqueda = self.lineEdit_busqueda.text().strip()
+        if texto_busqueda:
+            params["q"] = texto_busqueda
+
         # Filtro por fecha (si ambas fechas son válidas)
         fecha_desde = datetime.combine(self.ui.dateEdit_desde.date().toPython(), time.min)
         fecha_hasta = datetime.combine(self.ui.dateEdit_hasta.date().toPython(), time.max)
@@ -58,15 +78,15 @@ class HistoricoControlesWindow(QWidget):
         params["desde"] = fecha_desde.isoformat()
         params["hasta"] = fecha_hasta.isoformat()
 
-        try:
-            response = requests.get("http://localhost:8000/controles/historico", params=params)
-            if response.status_code == 200:
-                datos_filtrados = response.json()
-                self.mostrar_datos_en_tabla(datos_filtrados)
-            else:
-                print("Error al filtrar datos:", response.text)
-        except Exception as e:
-            print("Excepción al aplicar filtros:", str(e))
+        # Solo cuenta el último filtro aplicado: se descarta la respuesta de los anteriores
+        self.peticiones.ejecutar(
+            api.historico,
+            al_completar=self.mostrar_datos_en_tabla,
+            al_fallar=lambda e: print("Error al filtrar datos:", str(e)),
+            clave="historico",
+            reemplazar=True,
+            **params
+        )
 
     def limpiar_filtros(self):
         """Reinicia los filtros a valores por defecto y recarga los datos."""
@@ -74,8 +94,9 @@ class HistoricoControlesWindow(QWidget):
         self.ui.spinBox_numDefectos.setValue(0)
         self.ui.doubleSpinBox_dimDefectos.setValue(0.0)
 
-        # Resetear ComboBox
+        # Resetear ComboBox y búsqueda
         self.ui.comboBox_listaUsuarios.setCurrentIndex(0)
+        self.lineEdit_busqueda.clear()
 
         # Resetear fechas al día actual (o al mínimo)
         hoy = QDate.currentDate()
@@ -89,60 +110,30 @@ class HistoricoControlesWindow(QWidget):
     def mostrar_datos_en_tabla(self, controles):
         """
         Muestra en la tabla los datos de controles pasados como lista de diccionarios.
-        
+
+        Los datos se cargan en el modelo de una vez; la vista pide las filas por lotes
+        a medida que el usuario se desplaza.
+
         Args:
             controles (list[dict]): Lista con la información de cada control.
         """
-        self.ui.tableWidget_results.blockSignals(True)
-        self.ui.tableWidget_results.setRowCount(0)
-        self.ui.tableWidget_results.setColumnCount(8)
-        self.ui.tableWidget_results.setHorizontalHeaderLabels([
-            "ID Control", "Usuario", "Fecha/Hora", "Area max(mm2)", "#defectos",
-            "Informe", "Result.", "Comentarios"
-        ])
-        for row_idx, item in enumerate(controles):
-            self.ui.tableWidget_results.insertRow(row_idx)
-            columnas = [
-                str(item["id_control"]),
-                item["nombre_usuario"],
-                item["fecha_control"],
-                str(item["umbral_tamano_defecto"]),
-                str(item["num_defectos_tolerables_por_tamano"])
-            ]
-            for col_idx, valor in enumerate(columnas):
-                celda = QTableWidgetItem(valor)
-                celda.setFlags(celda.flags() & ~Qt.ItemIsEditable)
-                self.ui.tableWidget_results.setItem(row_idx, col_idx, celda)
-
-            icono_informe = "✅" if item.get("tiene_informe", False) else "❌"
-            reporte_item = QTableWidgetItem(icono_informe)
-            reporte_item.setFlags(reporte_item.flags() & ~Qt.ItemIsEditable)
-            self.ui.tableWidget_results.setItem(row_idx, 5, reporte_item)
-
-            resultado = item.get("resultado_rollo", "").lower()
-            icono_resultado = "🟢" if resultado == "ok" else "🔴" if resultado == "nok" else "❔"
-            resultado_item = QTableWidgetItem(icono_resultado)
-            resultado_item.setFlags(resultado_item.flags() & ~Qt.ItemIsEditable)
-            self.ui.tableWidget_results.setItem(row_idx, 6, resultado_item)
-
-            notas = item.get("notas", "")
-            notas_item = QTableWidgetItem(notas)
-            self.ui.tableWidget_results.setItem(row_idx, 7, notas_item)
-        self.ui.tableWidget_results.blockSignals(False)
-    
+        self.modelo_historico.cargar(controles)
+        self.tabla_historico.resizeColumnsToContents()
+
     def cargar_usuarios(self):
-        """Carga la lista de usuarios disponibles desde la API."""
-        try:
-            response = requests.get("http://localhost:8000/controles/usuarios")
-            if response.status_code == 200:
-                lista_usuarios = response.json()
-                self.ui.comboBox_listaUsuarios.clear()
-                self.ui.comboBox_listaUsuarios.addItem("-- Filtra por usuario --")  # placeholder
-                self.ui.comboBox_listaUsuarios.addItems(lista_usuarios)
-            else:
-                print("No se pudieron cargar los usuarios:", response.text)
-        except Exception as e:
-            print("Error al cargar usuarios:", str(e))
+        """Carga en segundo plano la lista de usuarios disponibles desde la API."""
+        self.peticiones.ejecutar(
+            api.usuarios,
+            al_completar=self.mostrar_usuarios,
+            al_fallar=lambda e: print("No se pudieron cargar los usuarios:", str(e)),
+            clave="usuarios"
+        )
+
+    def mostrar_usuarios(self, lista_usuarios):
+        """Rellena el filtro de usuarios."""
+        self.ui.comboBox_listaUsuarios.clear()
+        self.ui.comboBox_listaUsuarios.addItem("-- Filtra por usuario --")  # placeholder
+        self.ui.comboBox_listaUsuarios.addItems(lista_usuarios)
 
 
     def volver_a_menu_principal(self):
@@ -153,9 +144,43 @@ class HistoricoControlesWindow(QWidget):
         self.menu_window.show()
         self.hide()
 
+    def agregar_campo_busqueda(self):
+        """Añade junto al filtro de usuario un campo de búsqueda por usuario, rollo o notas."""
+        self.lineEdit_busqueda = QLineEdit(self.ui.frame_ComboBoxUsuarios)
+        self.lineEdit_busqueda.setPlaceholderText("Buscar por usuario, rollo o notas...")
+        self.lineEdit_busqueda.setStyleSheet("background-color: rgb(255, 255, 255);")
+        self.lineEdit_busqueda.setClearButtonEnabled(True)
+        self.lineEdit_busqueda.returnPressed.connect(self.aplicar_filtros)
+        self.ui.horizontalLayout_7.addWidget(self.lineEdit_busqueda)
+
     def configurar_tabla(self):
-        header = self.ui.tableWidget_results.horizontalHeader()
-        header.setSectionResizeMode(QHeaderView.ResizeToContents)  # Ajusta ancho al contenido
+        """Sustituye el QTableWidget del diseño por una vista sobre `ModeloTabla` (solo las notas son editables)."""
+        almacen = AlmacenColumnar({
+            "id_control": TIPO_ENTERO,
+            "nombre_usuario": TIPO_TEXTO,
+            "fecha_control": TIPO_TEXTO,
+            "umbral_tamano_defecto": TIPO_DECIMAL,
+            "num_defectos_tolerables_por_tamano": TIPO_ENTERO,
+            "tiene_informe": TIPO_BOOL,
+            "resultado_rollo": TIPO_TEXTO,
+            "notas": TIPO_TEXTO
+        })
+        self.modelo_historico = ModeloTabla([
+            Columna("ID Control", "id_control"),
+            Columna("Usuario", "nombre_usuario"),
+            Columna("Fecha/Hora", "fecha_control"),
+            Columna("Area max(mm2)", "umbral_tamano_defecto", formato=lambda v: f"{v:g}"),
+            Columna("#defectos", "num_defectos_tolerables_por_tamano"),
+            Columna("Informe", "tiene_informe", formato=lambda v: "✅" if v else "❌"),
+            Columna("Result.", "resultado_rollo", formato=lambda v: ICONOS_RESULTADO.get(v.lower(), "❔")),
+            Columna("Comentarios", "notas", editable=True)
+        ], almacen, parent=self)
+        self.modelo_historico.valor_editado.connect(self.on_nota_editada)
+        self.tabla_historico = reemplazar_por_vista(self.ui.tableWidget_results, self.modelo_historico)
+
+        header = self.tabla_historico.horizontalHeader()
+        # Ancho ajustado al contenido al cargar datos, no en cada cambio (costoso con muchas filas)
+        header.setSectionResizeMode(QHeaderView.Interactive)
         header.setStretchLastSection(True)  # Última columna ocupa espacio restante
 
     def mostrar_o_generar_informe(self):
@@ -163,40 +188,47 @@ class HistoricoControlesWindow(QWidget):
         Verifica si existe un informe PDF asociado al control seleccionado.
         Si existe, lo abre. Si no, muestra un mensaje.
         """
-        fila = self.ui.tableWidget_results.currentRow()
+        fila = self.tabla_historico.currentIndex().row()
         if fila == -1:
             QMessageBox.warning(self, "Sin selección", "Seleccione una fila para mostrar el informe.")
             return
 
-        id_control = self.ui.tableWidget_results.item(fila, 0).text()
-
-        try:
-            response = requests.get(f"http://localhost:8000/controles/informe/existe?id_control={id_control}")
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("existe"):
-                    ruta_pdf = data["ruta_pdf"]
-                    from utils_informes import abrir_pdf
-                    abrir_pdf(ruta_pdf)
-                else:
-                    QMessageBox.information(
-                        self,
-                        "Informe no disponible",
-                        f"Este control (ID {id_control}) aún no tiene un informe generado."
-                    )
-            else:
-                QMessageBox.warning(self, "Error", f"No se pudo verificar el informe:\n{response.text}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        id_control = self.modelo_historico.valor(fila, "id_control")
+
+        self.peticiones.ejecutar(
+            api.informe_existe, id_control,
+            al_completar=lambda data: self.abrir_informe(id_control, data),
+            al_fallar=self.mostrar_error_informe,
+            clave=f"informe:{id_control}"
+        )
+
+    def mostrar_error_informe(self, error):
+        """Informa de que no se pudo comprobar si existe el informe."""
+        if isinstance(error, ErrorAPI) and error.status_code is not None:
+            QMessageBox.warning(self, "Error", f"No se pudo verificar el informe:\n{error.detalle}")
+        else:
+            QMessageBox.critical(self, "Error", str(error))
+
+    def abrir_informe(self, id_control, data):
+        """Abre el PDF del control si existe o informa de que aún no se ha generado."""
+        if data.get("existe"):
+            ruta_pdf = data["ruta_pdf"]
+            from utils_informes import abrir_pdf
+            abrir_pdf(ruta_pdf)
+        else:
+            QMessageBox.information(
+                self,
+                "Informe no disponible",
+                f"Este control (ID {id_control}) aún no tiene un informe generado."
+            )
     
     def guardar_comentarios(self):
-        selection = self.ui.tableWidget_results.selectionModel()
+        selection = self.tabla_historico.selectionModel()
         if not selection.hasSelection():
             QMessageBox.warning(self, "Sin selección", "No hay notas que guardar. Seleccione fila de informe y escriba sus comentarios.")
             return
-        fila = self.ui.tableWidget_results.currentRow()
-        notas_item = self.ui.tableWidget_results.item(fila, 7)
-        if notas_item is None or not notas_item.text().strip():
+        fila = self.tabla_historico.currentIndex().row()
+        if fila == -1 or not self.modelo_historico.valor(fila, "notas").strip():
             QMessageBox.warning(self, "Sin comentarios", "No hay notas que guardar. Seleccione fila de informe y escriba sus comentarios.")
             return
         # Si hay selección y comentarios, mostrar mensaje de éxito
@@ -225,25 +257,192 @@ class HistoricoControlesWindow(QWidget):
             QMessageBox.information(self, "Ruta actualizada", f"Nueva carpeta para informes:\n{nueva_ruta}")
     
     def actualizar_nota_en_background(self, id_control, nota):
-        tarea = ActualizadorNotas(id_control, nota)
-        QThreadPool.globalInstance().start(tarea)
+        """Guarda la nota en segundo plano sin bloquear la edición de la tabla."""
+        def informar_error(e):
+            if isinstance(e, ErrorAPI) and e.status_code is not None:
+                print(f"Error actualizando nota de ID {id_control}: {e.detalle}")
+            else:
+                print(f"Error conexión al guardar nota ID {id_control}: {str(e)}")
+
+        self.peticiones.ejecutar(
+            api.actualizar_notas, id_control, nota,
+            al_fallar=informar_error
+        )
     
-    def on_cell_changed(self, row, column):
-        if column != 7:  # Solo columna "Comentarios"
+    def on_nota_editada(self, fila, clave, nueva_nota):
+        """Envía al backend la nota editada en la columna "Comentarios"."""
+        if clave != "notas":
             return
+        id_control = self.modelo_historico.valor(fila, "id_control")
+        self.actualizar_nota_en_background(id_control, nueva_nota)
 
-        id_item = self.ui.tableWidget_results.item(row, 0)
-        nota_item = self.ui.tableWidget_results.item(row, column)
+    def agregar_boton_informes_lote(self):
+        """Añade junto a "Mostrar informe" el botón que genera los informes pendientes por lotes."""
+        self.pushButton_informesLote = QPushButton("Generar informes pendientes", self.ui.frame_btnsDown)
+        self.pushButton_informesLote.setMinimumSize(self.ui.pushButton_report.minimumSize())
+        self.pushButton_informesLote.setFont(self.ui.pushButton_report.font())
+        self.pushButton_informesLote.setStyleSheet(self.ui.pushButton_report.styleSheet())
+        posicion = self.ui.horizontalLayout_3.indexOf(self.ui.pushButton_report) + 1
+        self.ui.horizontalLayout_3.insertWidget(posicion, self.pushButton_informesLote)
+        self.pushButton_informesLote.clicked.connect(self.generar_informes_pendientes)
+
+    def filas_para_informes(self):
+        """
+        Filas del lote: las seleccionadas si hay varias; si no, las cargadas cuya fecha
+        está entre "desde" y "hasta".
+        """
+        seleccionadas = sorted({indice.row() for indice in self.tabla_historico.selectionModel().selectedIndexes()})
+        if len(seleccionadas) > 1:
+            return seleccionadas
+        desde = self.ui.dateEdit_desde.date().toPython().isoformat()
+        hasta = self.ui.dateEdit_hasta.date().toPython().isoformat()
+        return [
+            fila for fila in range(self.modelo_historico.total_filas())
+            if desde <= self.modelo_historico.valor(fila, "fecha_control")[:10] <= hasta
+        ]
+
+    def generar_informes_pendientes(self):
+        """
+        Genera en paralelo los informes de los controles del lote que aún no tienen uno.
 
-        if not id_item or not nota_item:
+        El estado de cada control sale de la columna "Informe" del histórico (sin consultar
+        /informe/existe por control); los datos de todos se piden al backend de una vez.
+        """
+        if self.hilo_informes is not None or self.peticiones.en_curso("detalle_informes"):
+            QMessageBox.information(self, "Informes en curso", "Ya se están generando informes. Espere a que terminen.")
             return
 
-        id_control = int(id_item.text())
-        nueva_nota = nota_item.text()
+        pendientes = {}
+        for fila in self.filas_para_informes():
+            if not self.modelo_historico.valor(fila, "tiene_informe"):
+                pendientes[self.modelo_historico.valor(fila, "id_control")] = fila
+        if not pendientes:
+            QMessageBox.information(
+                self, "Sin informes pendientes",
+                "Todos los controles seleccionados (o del rango de fechas) ya tienen informe."
+            )
+            return
 
-        self.ui.tableWidget_results.blockSignals(True)
-        self.actualizar_nota_en_background(id_control, nueva_nota)
-        self.ui.tableWidget_results.blockSignals(False)
+        respuesta = QMessageBox.question(
+            self, "Generar informes",
+            f"Se generarán {len(pendientes)} informe(s) pendiente(s). ¿Desea continuar?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if respuesta != QMessageBox.Yes:
+            return
+
+        self.filas_informes = pendientes
+        self.errores_informes = []
+        self.pushButton_informesLote.setEnabled(False)
+        self.progreso_informes = QProgressDialog("Obteniendo datos de los controles...", "Cancelar", 0, len(pendientes), self)
+        self.progreso_informes.setWindowTitle("Generando informes")
+        self.progreso_informes.setWindowModality(Qt.WindowModal)
+        self.progreso_informes.setMinimumDuration(0)
+        self.progreso_informes.canceled.connect(self.cancelar_informes_lote)
+        self.progreso_informes.show()
+
+        self.peticiones.ejecutar(
+            api.detalle_controles, list(pendientes),
+            al_completar=self.lanzar_informes_lote,
+            al_fallar=self.informes_lote_fallidos,
+            clave="detalle_informes"
+        )
+
+    def lanzar_informes_lote(self, detalles):
+        """Reparte entre procesos de trabajo la generación de los informes del lote."""
+        if self.progreso_informes is None:
+            return  # Cancelado mientras se obtenían los datos
+        if not detalles:
+            self.informes_lote_terminados([])
+            return
+        from informes_lote import HiloInformesLote
+        self.progreso_informes.setLabelText(f"Generando {len(detalles)} informe(s)...")
+        self.progreso_informes.setMaximum(len(detalles))
+        self.hilo_informes = HiloInformesLote(
+            detalles,
+            obtener_ruta_informes(),
+            self.id_usuario,
+            obtener_config_informe(),
+            logo_path="logo_isli.ico",
+            parent=self
+        )
+        self.hilo_informes.progreso.connect(self.progreso_informes_lote)
+        self.hilo_informes.informe_fallido.connect(lambda id_control, error: self.errores_informes.append(f"ID {id_control}: {error}"))
+        self.hilo_informes.completado.connect(self.informes_lote_terminados)
+        self.hilo_informes.fallido.connect(self.informes_lote_fallidos)
+        self.hilo_informes.start()
+
+    def progreso_informes_lote(self, terminados, total):
+        if self.progreso_informes is not None:
+            self.progreso_informes.setValue(terminados)
+            self.progreso_informes.setLabelText(f"Generando informes... {terminados}/{total}")
+
+    def cancelar_informes_lote(self):
+        """Descarta los informes no empezados; los ya generados se registran igualmente."""
+        self.peticiones.cancelar("detalle_informes")
+        if self.hilo_informes is not None:
+            self.hilo_informes.cancelar()
+        else:
+            self.finalizar_informes_lote()
+
+    def informes_lote_terminados(self, generados):
+        """Registra con una sola llamada los informes generados y marca sus filas."""
+        if self.cerrada:
+            # closeEvent ya los registró antes de revocar el token
+            return
+        self.hilo_informes = None
+        if not generados:
+            self.finalizar_informes_lote()
+            self.mostrar_resumen_informes([])
+            return
+        if self.progreso_informes is not None:
+            self.progreso_informes.setLabelText("Registrando informes...")
+        self.informes_por_registrar = generados
+        self.peticiones.ejecutar(
+            api.registrar_informes, generados,
+            al_completar=self.informes_lote_registrados,
+            al_fallar=self.informes_lote_fallidos,
+            clave="registro_informes"
+        )
+
+    def informes_lote_registrados(self, resultado):
+        self.informes_por_registrar = None
+        for id_control in resultado["registrados"] + resultado["omitidos"]:
+            fila = self.filas_informes.get(id_control)
+            # La tabla puede haberse recargado mientras tanto
+            if fila is not None and fila < self.modelo_historico.total_filas() \
+                    and self.modelo_historico.valor(fila, "id_control") == id_control:
+                self.modelo_historico.fijar_valor(fila, "tiene_informe", True)
+        self.finalizar_informes_lote()
+        self.mostrar_resumen_informes(resultado["registrados"])
+
+    def informes_lote_fallidos(self, error):
+        if self.cerrada:
+            return
+        self.hilo_informes = None
+        self.informes_por_registrar = None
+        self.finalizar_informes_lote()
+        if isinstance(error, ErrorAPI) and error.status_code is not None:
+            QMessageBox.warning(self, "Error", f"No se pudieron generar los informes.\n{error.detalle}")
+        else:
+            QMessageBox.critical(self, "Error", f"No se pudieron generar los informes.\n{error}")
+
+    def finalizar_informes_lote(self):
+        if self.progreso_informes is not None:
+            self.progreso_informes.canceled.disconnect(self.cancelar_informes_lote)
+            self.progreso_informes.close()
+            self.progreso_informes = None
+        self.pushButton_informesLote.setEnabled(True)
+
+    def mostrar_resumen_informes(self, registrados):
+        mensaje = f"Informes generados y registrados: {len(registrados)}."
+        if self.errores_informes:
+            mensaje += f"\n\nNo se pudieron generar {len(self.errores_informes)}:\n" + "\n".join(self.errores_informes[:10])
+            if len(self.errores_informes) > 10:
+                mensaje += f"\n... y {len(self.errores_informes) - 10} más."
+            QMessageBox.warning(self, "Informes generados con errores", mensaje)
+        else:
+            QMessageBox.information(self, "Informes generados", mensaje)
 
 
     def __init__(self, nombre_usuario, rol_usuario, token_jwt, id_usuario):
@@ -264,7 +463,14 @@ class HistoricoControlesWindow(QWidget):
         ruta_icono = os.path.abspath(ruta_icono)
         self.setWindowIcon(QIcon(ruta_icono))
         self.id_usuario = id_usuario
+        self.peticiones = EjecutorPeticiones(self)
+        self.hilo_informes = None
+        self.progreso_informes = None
+        self.informes_por_registrar = None
+        self.cerrada = False
+        self.agregar_campo_busqueda()
         self.configurar_tabla()
+        self.agregar_boton_informes_lote()
         self.cargar_usuarios()
         # Establecer fecha actual al iniciar
         hoy = QDate.currentDate()
@@ -293,36 +499,36 @@ class HistoricoControlesWindow(QWidget):
         self.ui.pushButton_report.clicked.connect(self.mostrar_o_generar_informe)
         self.ui.pushButton_saveObs.clicked.connect(self.guardar_comentarios)
         self.ui.pushButton_rutaInforme.clicked.connect(self.seleccionar_ruta_informes)
-        self.ui.tableWidget_results.cellChanged.connect(self.on_cell_changed)
 
     def closeEvent(self, event):
         """
         Revoca el token al cerrar la ventana de histórico (X), para forzar expiración de sesión en el panel web.
         """
-        token = getattr(self, 'token_jwt', None)
-        if token:
-            try:
-                requests.post("http://localhost:8000/logout", json={"token": token}, timeout=3)
-            except Exception as e:
-                print(f"Error al revocar token en closeEvent: {e}")
+        self.cerrada = True
+        self.peticiones.cancelar_todas()
+        pendientes = self.informes_por_registrar or []
+        if self.hilo_informes is not None:
+            # Los informes en curso terminan; los no empezados se descartan
+            self.hilo_informes.cancelar()
+            self.hilo_informes.wait()
+            pendientes = self.hilo_informes.generados
+        self.registrar_informes_al_cerrar(pendientes)
+        revocar_token_sesion(self)
         event.accept()  # Permite el cierre inmediato
 
-class ActualizadorNotas(QRunnable):
-    def __init__(self, id_control, nota):
-        super().__init__()
-        self.id_control = id_control
-        self.nota = nota
+    def registrar_informes_al_cerrar(self, generados):
+        """
+        Registra, antes de revocar el token, los PDF del lote que aún no constan en el backend.
 
-    @Slot()
-    def run(self):
+        Se llama sin hilos porque la ventana se está cerrando. Si el registro ya estaba en
+        curso, repetirlo no duplica nada: el backend omite los controles que ya tienen informe.
+        """
+        if not generados:
+            return
         try:
-            payload = {"id_control": self.id_control, "notas": self.nota}
-            response = requests.post("http://localhost:8000/controles/informe/actualizar_notas", json=payload)
-            if response.status_code != 200:
-                print(f"Error actualizando nota de ID {self.id_control}: {response.text}")
-        except Exception as e:
-            print(f"Error conexión al guardar nota ID {self.id_control}: {str(e)}")
-
+            api.registrar_informes(generados)
+        except ErrorAPI as e:
+            print(f"No se pudieron registrar {len(generados)} informe(s) al cerrar: {e}")
 
 #if __name__ == "__main__":
 #    app = QApplication(sys.argv)
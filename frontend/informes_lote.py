@@ -0,0 +1,200 @@
+"""Generación por lotes de los informes PDF pendientes desde el histórico.
+
+Generar el informe de un control lleva segundos (reducir sus imágenes y componer las
+páginas), así que hacerlo control a control desde la interfaz no escala. Aquí:
+- Los datos de todos los controles se piden al backend de una vez (`api.detalle_controles`).
+- `HiloInformesLote` reparte los informes entre procesos de trabajo (contexto 'spawn',
+  como la cola de análisis del backend), emite el progreso y el error de cada informe
+  fallido sin detener el resto.
+- La ventana registra todos los informes generados con una sola llamada a
+  POST /controles/informe al terminar (o al cerrarse, con los ya generados).
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from PySide6.QtCore import QThread, Signal
+from utils_informes import construir_pdf, construir_pdf_cuadricula, modo_informe
+
+# Procesos que generan informes en paralelo (se deja un núcleo libre para la interfaz)
+PROCESOS_INFORMES = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def resolver_ruta_imagen(ruta_rollo, nombre_archivo):
+    """
+    Imagen que se muestra en el informe de un control antiguo.
+
+    La imagen procesada solo existe mientras el rollo no se ha restaurado; si ya no está,
+    se usa la original (dentro de 'originales' o en la raíz del rollo).
+
+    Returns:
+        str | None: Ruta de la imagen, o None si no queda ninguna en disco.
+    """
+    if not ruta_rollo:
+        return None
+    for ruta in (
+        os.path.join(ruta_rollo, "procesado", nombre_archivo),
+        os.path.join(ruta_rollo, "originales", nombre_archivo),
+        os.path.join(ruta_rollo, nombre_archivo)
+    ):
+        if os.path.isfile(ruta):
+            return ruta
+    return None
+
+
+def imagenes_desde_detalle(detalle):
+    """
+    Convierte las imágenes del detalle de un control (POST /controles/detalle) al formato
+    de `construir_pdf_cuadricula`.
+    """
+    imagenes = []
+    for imagen in detalle.get("imagenes", []):
+        tipos = [tipo for tipo in (imagen.get("tipo_defecto") or "").split(", ") if tipo and tipo != "—"]
+        imagenes.append({
+            "nombre_archivo": imagen["nombre_archivo"],
+            "ruta_procesada": resolver_ruta_imagen(detalle.get("ruta_local_rollo"), imagen["nombre_archivo"]),
+            "clasificacion": imagen["clasificacion"],
+            "mayor_defecto": float(imagen.get("max_dim_defecto_medido") or 0),
+            "tipos": tipos
+        })
+    return imagenes
+
+
+def generar_informe_control(detalle, ruta_destino, config_informe, logo_path=None):
+    """
+    Genera el PDF de un control del histórico. Se ejecuta en un proceso de trabajo.
+
+    Args:
+        detalle (dict): Detalle del control (ver `api.detalle_controles`).
+        ruta_destino (str): Ruta del PDF.
+        config_informe (dict): Configuración del informe (ver `obtener_config_informe`).
+
+    Returns:
+        str: Ruta del PDF generado.
+    """
+    imagenes = imagenes_desde_detalle(detalle)
+    comunes = dict(
+        id_control=detalle["id_control"],
+        nombre_usuario=detalle["nombre_usuario"],
+        rol_usuario=detalle.get("rol_usuario") or "",
+        tolerancia_tamano=detalle["umbral_tamano_defecto"],
+        tolerancia_cantidad=detalle["num_defectos_tolerables_por_tamano"],
+        ruta_destino=ruta_destino,
+        logo_path=logo_path
+    )
+    if modo_informe(config_informe, len(imagenes)) == "cuadricula":
+        return construir_pdf_cuadricula(
+            imagenes=imagenes,
+            columnas=int(config_informe.get("columnas", 4)),
+            filas=int(config_informe.get("filas", 6)),
+            solo_nok=bool(config_informe.get("solo_nok", False)),
+            **comunes
+        )
+    filas = [
+        [imagen["nombre_archivo"], ", ".join(imagen["tipos"]) or "—", f"{imagen['mayor_defecto']:.2f}", imagen["clasificacion"]]
+        for imagen in imagenes
+    ]
+    return construir_pdf(
+        filas=filas,
+        imagenes_procesadas=[imagen["ruta_procesada"] for imagen in imagenes if imagen["ruta_procesada"]],
+        **comunes
+    )
+
+
+def _inicializar_proceso():
+    # Las imágenes se decodifican con QImageReader: basta una QCoreApplication por proceso
+    from PySide6.QtCore import QCoreApplication
+    global _app
+    _app = QCoreApplication.instance() or QCoreApplication([])
+
+
+class HiloInformesLote(QThread):
+    """
+    Genera en procesos de trabajo los informes de varios controles.
+
+    Señales (entregadas en el hilo de la interfaz):
+        progreso(int, int): Informes terminados (generados o fallidos) y total.
+        informe_fallido(int, str): ID del control y error de un informe que no se pudo generar.
+        completado(list): Informes generados, con el formato de POST /controles/informe.
+        fallido(Exception): Error que impidió lanzar el lote (p. ej. al crear los procesos).
+
+    Args:
+        detalles (list[dict]): Detalle de cada control (ver `api.detalle_controles`).
+        carpeta_destino (str): Carpeta donde se guardan los PDF.
+        generado_por (int): ID del usuario que genera los informes.
+        config_informe (dict): Configuración del informe (ver `obtener_config_informe`).
+        logo_path (str, opcional): Logo del encabezado.
+        procesos (int): Procesos de trabajo.
+    """
+    progreso = Signal(int, int)
+    informe_fallido = Signal(int, str)
+    completado = Signal(object)
+    fallido = Signal(object)
+
+    def __init__(self, detalles, carpeta_destino, generado_por, config_informe, logo_path=None,
+                 procesos=PROCESOS_INFORMES, parent=None):
+        super().__init__(parent)
+        self.detalles = detalles
+        self.carpeta_destino = carpeta_destino
+        self.generado_por = generado_por
+        self.config_informe = config_informe
+        self.logo_path = logo_path
+        self.procesos = procesos
+        # Informes generados hasta el momento; tras `wait()` se pueden leer desde otro hilo
+        self.generados = []
+        self._cancelado = threading.Event()
+
+    def cancelar(self):
+        """Descarta los informes aún no empezados; los que están en curso terminan y se registran."""
+        self._cancelado.set()
+
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def run(self):
+        try:
+            generados = self._generar()
+        except Exception as e:
+            self.fallido.emit(e)
+            return
+        self.completado.emit(generados)
+
+    def _generar(self):
+        marca = datetime.now().strftime("%Y-%m-%d_%H-%M")
+        os.makedirs(self.carpeta_destino, exist_ok=True)
+        generados = self.generados
+        contexto = multiprocessing.get_context("spawn")
+        procesos = max(1, min(self.procesos, len(self.detalles)))
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto, initializer=_inicializar_proceso) as pool:
+            futuros = {}
+            for detalle in self.detalles:
+                id_control = detalle["id_control"]
+                ruta_pdf = os.path.join(self.carpeta_destino, f"informe_control_{id_control}_{marca}.pdf")
+                futuro = pool.submit(generar_informe_control, detalle, ruta_pdf, self.config_informe, self.logo_path)
+                futuros[futuro] = id_control
+
+            terminados = 0
+            for futuro in as_completed(futuros):
+                if futuro.cancelled():
+                    continue
+                terminados += 1
+                id_control = futuros[futuro]
+                try:
+                    ruta_pdf = futuro.result()
+                except Exception as e:
+                    print(f"Error al generar el informe del control {id_control}: {e}")
+                    self.informe_fallido.emit(id_control, str(e))
+                else:
+                    generados.append({
+                        "id_control": id_control,
+                        "ruta_pdf": ruta_pdf,
+                        "generado_por": self.generado_por,
+                        "fecha_generacion": datetime.now().isoformat(),
+                        "notas": ""
+                    })
+                self.progreso.emit(terminados, len(futuros))
+                if self.cancelado():
+                    for pendiente in futuros:
+                        pendiente.cancel()
+        return generados
@@ -3,7 +3,7 @@
 Lanza la ventana de login que autentica al usuario y da acceso al sistema.
 """
 import sys
-import requests
+import multiprocessing
 from PySide6.QtGui import QIcon
 import os
 from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QProgressDialog
@@ -11,10 +11,10 @@ from PySide6.QtCore import QTimer, Qt
 from UI.login_window import Ui_Form
 from control_calidad_menu_principal import MainWindow
 from solicitud_password_window import SolicitudPasswordWindow
+from cliente_api import api, ErrorAPI
+from peticiones_async import EjecutorPeticiones
 import json
 
-API_URL = "http://localhost:8000"
-
 # Cargar BASE_FOLDER desde config.json
 CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.json'))
 with open(CONFIG_PATH, encoding='utf-8') as f:
@@ -39,13 +39,14 @@ class LoginWindow(QMainWindow):
         ruta_icono = os.path.join(os.path.dirname(__file__), "..", "assets", "logo_isli.ico")
         ruta_icono = os.path.abspath(ruta_icono)
         self.setWindowIcon(QIcon(ruta_icono))
+        self.peticiones = EjecutorPeticiones(self)
         
         self.ui.pushButton_login.clicked.connect(self.login)
         self.ui.pushButton_login_2.clicked.connect(self.abrir_ventana_password)
 
     def login(self):
         """
-        Envía los datos de login al backend y procesa la respuesta.
+        Envía los datos de login al backend (en segundo plano) y procesa la respuesta.
 
         Si el login es correcto, se abre el menú principal.
         Si falla, se muestra un mensaje de error.
@@ -57,27 +58,36 @@ class LoginWindow(QMainWindow):
             QMessageBox.warning(self, "Campos vacíos", "Por favor completa ambos campos.")
             return
 
-        data = {"correo": email, "contrasenia": password}
-        try:
-            response = requests.post(f"{API_URL}/login", json=data)
-            if response.status_code == 200:
-                result = response.json()
-                rol = result.get("rol", "desconocido")
-                
-                progress = QProgressDialog(f"¡Bienvenido!\nRol: {rol}", None, 0, 0, self)
-                progress.setWindowTitle("Login exitoso")
-                progress.setCancelButton(None)
-                progress.setWindowModality(Qt.ApplicationModal)
-                progress.setMinimumDuration(0)
-                progress.show()
-                QTimer.singleShot(3000, progress.close)  # Close after 1.5 seconds
-                
-                self.abrir_menu_principal(result)
-            else:
-                detail = response.json().get("detail", "Error de autenticación")
-                QMessageBox.critical(self, "Error", detail)
-        except Exception as e:
-            QMessageBox.critical(self, "Error de conexión", str(e))
+        self.ui.pushButton_login.setEnabled(False)
+        self.peticiones.ejecutar(
+            api.login, email, password,
+            al_completar=self.login_correcto,
+            al_fallar=self.login_fallido,
+            clave="login"
+        )
+
+    def login_fallido(self, error):
+        """Muestra el motivo del fallo de autenticación."""
+        self.ui.pushButton_login.setEnabled(True)
+        if isinstance(error, ErrorAPI) and error.status_code is not None:
+            QMessageBox.critical(self, "Error", error.detalle or "Error de autenticación")
+        else:
+            QMessageBox.critical(self, "Error de conexión", str(error))
+
+    def login_correcto(self, result):
+        """Da la bienvenida y abre el menú principal."""
+        self.ui.pushButton_login.setEnabled(True)
+        rol = result.get("rol", "desconocido")
+
+        progress = QProgressDialog(f"¡Bienvenido!\nRol: {rol}", None, 0, 0, self)
+        progress.setWindowTitle("Login exitoso")
+        progress.setCancelButton(None)
+        progress.setWindowModality(Qt.ApplicationModal)
+        progress.setMinimumDuration(0)
+        progress.show()
+        QTimer.singleShot(3000, progress.close)  # Close after 1.5 seconds
+
+        self.abrir_menu_principal(result)
 
     def abrir_menu_principal(self, result):
         """
@@ -101,6 +111,8 @@ class LoginWindow(QMainWindow):
 
 
 if __name__ == "__main__":
+    # Necesario para los procesos de trabajo (informes por lotes) en el ejecutable de PyInstaller
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     ruta_icono = os.path.join(os.path.dirname(__file__), "..", "assets", "logo_isli.ico")
     ruta_icono = os.path.abspath(ruta_icono)
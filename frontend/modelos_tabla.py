@@ -0,0 +1,287 @@
+"""Modelos de tabla (model/view) para las tablas de resultados e histórico.
+
+Rellenar un QTableWidget crea un QTableWidgetItem (más su QColor) por celda; con
+decenas de miles de filas la carga es lenta y ocupa mucha memoria. Aquí:
+- `AlmacenColumnar` guarda los datos por columnas: los valores numéricos en
+  `array` y los textos en listas (los repetidos comparten el mismo objeto str).
+- `ModeloTabla` expone el almacén a un QTableView, formatea cada celda solo
+  cuando la vista la pinta y entrega las filas por lotes (canFetchMore/fetchMore).
+- `DelegadoResultado` colorea las celdas ok/nok y la fila resumen al pintarlas,
+  sin guardar estilos por celda.
+"""
+import sys
+from array import array
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+from PySide6.QtGui import QBrush, QColor, QFont
+from PySide6.QtWidgets import QStyledItemDelegate, QTableView, QHeaderView
+
+# Filas que se entregan a la vista en cada lote
+LOTE_FILAS = 500
+
+# Rol con el estado ('ok' / 'nok') de las celdas coloreadas
+ROL_ESTADO = Qt.UserRole + 1
+# Rol que indica si la fila es la fila resumen
+ROL_RESUMEN = Qt.UserRole + 2
+
+# Tipos de columna: códigos de `array` para números y enteros; 'texto' y 'bool' aparte
+TIPO_TEXTO = "texto"
+TIPO_BOOL = "bool"
+TIPO_ENTERO = "q"
+TIPO_DECIMAL = "d"
+
+
+class AlmacenColumnar:
+    """
+    Tabla en memoria almacenada por columnas.
+
+    Args:
+        tipos (dict[str, str]): Tipo de cada columna: TIPO_TEXTO, TIPO_BOOL,
+            TIPO_ENTERO o TIPO_DECIMAL. Los valores ausentes se guardan como '' / False / 0.
+    """
+    def __init__(self, tipos):
+        self.tipos = dict(tipos)
+        self.columnas = {}
+        self.limpiar()
+
+    def _columna_vacia(self, tipo):
+        if tipo == TIPO_TEXTO:
+            return []
+        if tipo == TIPO_BOOL:
+            return bytearray()
+        return array(tipo)
+
+    @staticmethod
+    def _convertir(tipo, valor):
+        if tipo == TIPO_TEXTO:
+            return sys.intern(str(valor)) if valor is not None else ""
+        if tipo == TIPO_BOOL:
+            return 1 if valor else 0
+        if valor is None or valor == "":
+            return 0
+        return int(valor) if tipo == TIPO_ENTERO else float(valor)
+
+    def limpiar(self):
+        self.columnas = {clave: self._columna_vacia(tipo) for clave, tipo in self.tipos.items()}
+        self._filas = 0
+
+    def cargar(self, filas):
+        """Sustituye el contenido por una lista de diccionarios (una pasada por columna)."""
+        self.limpiar()
+        for clave, tipo in self.tipos.items():
+            columna = self.columnas[clave]
+            if tipo == TIPO_BOOL:
+                columna.extend(1 if fila.get(clave) else 0 for fila in filas)
+            else:
+                columna.extend(self._convertir(tipo, fila.get(clave)) for fila in filas)
+        self._filas = len(filas)
+
+    def agregar(self, fila):
+        """Añade una fila (diccionario) al final."""
+        for clave, tipo in self.tipos.items():
+            self.columnas[clave].append(self._convertir(tipo, fila.get(clave)))
+        self._filas += 1
+
+    def valor(self, fila, clave):
+        valor = self.columnas[clave][fila]
+        return bool(valor) if self.tipos[clave] == TIPO_BOOL else valor
+
+    def fijar(self, fila, clave, valor):
+        self.columnas[clave][fila] = self._convertir(self.tipos[clave], valor)
+
+    def fila(self, fila):
+        """Devuelve la fila como diccionario."""
+        return {clave: self.valor(fila, clave) for clave in self.tipos}
+
+    def __len__(self):
+        return self._filas
+
+
+class Columna:
+    """
+    Definición de una columna visible del modelo.
+
+    Args:
+        titulo (str): Texto de la cabecera.
+        clave (str): Columna del almacén que se muestra.
+        formato (callable, opcional): Convierte el valor almacenado en el texto de la celda.
+        editable (bool): Si el usuario puede editar la celda.
+        estado (str, opcional): Columna del almacén con el estado 'ok'/'nok' con el que
+            `DelegadoResultado` colorea esta celda.
+    """
+    def __init__(self, titulo, clave, formato=None, editable=False, estado=None):
+        self.titulo = titulo
+        self.clave = clave
+        self.formato = formato or str
+        self.editable = editable
+        self.estado = estado
+
+
+class ModeloTabla(QAbstractTableModel):
+    """
+    Modelo de solo lectura (salvo columnas editables) sobre un `AlmacenColumnar`.
+
+    Signals:
+        valor_editado(int, str, object): fila, clave y nuevo valor tras editar una celda.
+
+    Args:
+        columnas (list[Columna]): Columnas visibles, en orden.
+        almacen (AlmacenColumnar): Datos de la tabla.
+        clave_resumen (str, opcional): Columna booleana del almacén que marca las filas resumen.
+    """
+    valor_editado = Signal(int, str, object)
+
+    def __init__(self, columnas, almacen, clave_resumen=None, parent=None):
+        super().__init__(parent)
+        self.columnas_visibles = list(columnas)
+        self.almacen = almacen
+        self.clave_resumen = clave_resumen
+        self._visibles = 0
+
+    # --- Carga de datos ---
+
+    def cargar(self, filas):
+        """Sustituye todos los datos; la vista recibe el primer lote y pide el resto al desplazarse."""
+        self.beginResetModel()
+        self.almacen.cargar(filas)
+        self._visibles = min(LOTE_FILAS, len(self.almacen))
+        self.endResetModel()
+
+    def agregar(self, fila):
+        """Añade una fila al final (visible de inmediato si no quedan lotes pendientes)."""
+        if self._visibles < len(self.almacen):
+            self.almacen.agregar(fila)
+            return
+        posicion = len(self.almacen)
+        self.beginInsertRows(QModelIndex(), posicion, posicion)
+        self.almacen.agregar(fila)
+        self._visibles += 1
+        self.endInsertRows()
+
+    def limpiar(self):
+        self.cargar([])
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._visibles < len(self.almacen)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        cantidad = min(LOTE_FILAS, len(self.almacen) - self._visibles)
+        if cantidad <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._visibles, self._visibles + cantidad - 1)
+        self._visibles += cantidad
+        self.endInsertRows()
+
+    # --- Acceso ---
+
+    def valor(self, fila, clave):
+        """Valor almacenado de una fila (aunque aún no se haya entregado a la vista)."""
+        return self.almacen.valor(fila, clave)
+
+    def fijar_valor(self, fila, clave, valor):
+        """Cambia un valor almacenado desde el código (sin emitir `valor_editado`) y repinta la fila."""
+        self.almacen.fijar(fila, clave, valor)
+        if fila < self._visibles:
+            self.dataChanged.emit(self.index(fila, 0), self.index(fila, self.columnCount() - 1))
+
+    def total_filas(self):
+        """Filas cargadas, incluidas las que la vista aún no ha pedido."""
+        return len(self.almacen)
+
+    def textos_fila(self, fila):
+        """Textos de las columnas visibles de una fila, tal como se muestran."""
+        return [columna.formato(self.almacen.valor(fila, columna.clave)) for columna in self.columnas_visibles]
+
+    # --- QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._visibles
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columnas_visibles)
+
+    def headerData(self, seccion, orientacion, rol=Qt.DisplayRole):
+        if rol == Qt.DisplayRole and orientacion == Qt.Horizontal:
+            return self.columnas_visibles[seccion].titulo
+        return super().headerData(seccion, orientacion, rol)
+
+    def data(self, index, rol=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        columna = self.columnas_visibles[index.column()]
+        if rol in (Qt.DisplayRole, Qt.EditRole):
+            return columna.formato(self.almacen.valor(index.row(), columna.clave))
+        if rol == ROL_ESTADO and columna.estado:
+            return self.almacen.valor(index.row(), columna.estado)
+        if rol == ROL_RESUMEN and self.clave_resumen:
+            return self.almacen.valor(index.row(), self.clave_resumen)
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and self.columnas_visibles[index.column()].editable:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, valor, rol=Qt.EditRole):
+        if rol != Qt.EditRole or not index.isValid():
+            return False
+        columna = self.columnas_visibles[index.column()]
+        if not columna.editable:
+            return False
+        if columna.formato(self.almacen.valor(index.row(), columna.clave)) == valor:
+            return False
+        self.almacen.fijar(index.row(), columna.clave, valor)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self.valor_editado.emit(index.row(), columna.clave, valor)
+        return True
+
+
+class DelegadoResultado(QStyledItemDelegate):
+    """
+    Colorea las celdas según su estado ('ok' verde, 'nok' rojo) y resalta la fila resumen
+    (negrita sobre blanco, con colores más intensos en las celdas de estado).
+    """
+    COLORES = {
+        (False, "ok"): QBrush(QColor("#C8E6C9")),
+        (False, "nok"): QBrush(QColor("#FFCDD2")),
+        (True, "ok"): QBrush(QColor("#9CAF88")),
+        (True, "nok"): QBrush(QColor("#FF6F61")),
+    }
+    FONDO_RESUMEN = QBrush(QColor("#FFFFFF"))
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        resumen = bool(index.data(ROL_RESUMEN))
+        if resumen:
+            option.font = QFont("Arial", 10, QFont.Bold)
+            option.backgroundBrush = self.FONDO_RESUMEN
+        brocha = self.COLORES.get((resumen, index.data(ROL_ESTADO)))
+        if brocha is not None:
+            option.backgroundBrush = brocha
+
+
+def reemplazar_por_vista(tabla_widget, modelo):
+    """
+    Sustituye en su layout un QTableWidget generado por Qt Designer por un QTableView
+    con el modelo indicado, conservando nombre, fuente y hoja de estilos.
+
+    Returns:
+        QTableView: La vista ya insertada en el layout.
+    """
+    vista = QTableView(tabla_widget.parentWidget())
+    vista.setObjectName(tabla_widget.objectName())
+    vista.setFont(tabla_widget.font())
+    vista.setStyleSheet(tabla_widget.styleSheet().replace("QTableWidget", "QTableView"))
+    vista.setModel(modelo)
+    vista.setItemDelegate(DelegadoResultado(vista))
+    vista.horizontalHeader().setStretchLastSection(True)
+    # Alto de fila fijo: la vista no tiene que medir cada fila
+    vista.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+
+    layout = tabla_widget.parentWidget().layout()
+    layout.replaceWidget(tabla_widget, vista)
+    tabla_widget.hide()
+    tabla_widget.deleteLater()
+    return vista
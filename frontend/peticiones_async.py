@@ -0,0 +1,144 @@
+"""Ejecución de llamadas al backend fuera del hilo de la interfaz gráfica.
+
+Las llamadas de `cliente_api` son bloqueantes; si se hacen desde el hilo de Qt
+la ventana se congela mientras el servidor responde. `EjecutorPeticiones` las
+lanza en el QThreadPool global y entrega el resultado (o el error) en el hilo de la
+interfaz mediante señales, por lo que los callbacks pueden tocar widgets.
+
+Además:
+- Deduplica peticiones en curso con la misma clave: la segunda se une a la primera
+  o, con `reemplazar=True`, la sustituye (la última petición de filtros es la que cuenta).
+- Permite cancelar peticiones; una petición cancelada no ejecuta sus callbacks.
+"""
+import itertools
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class Peticion:
+    """
+    Petición lanzada por el ejecutor.
+
+    Attributes:
+        clave (str | None): Clave de deduplicación.
+        cancelada (bool): Si se ha cancelado, sus callbacks no se ejecutan.
+    """
+    def __init__(self, id_peticion, clave):
+        self.id_peticion = id_peticion
+        self.clave = clave
+        self.cancelada = False
+        self.al_completar = []
+        self.al_fallar = []
+
+    def cancelar(self):
+        """Descarta el resultado de la petición. La llamada HTTP en curso termina en segundo plano."""
+        self.cancelada = True
+
+
+class _SenalesPeticion(QObject):
+    terminada = Signal(int, bool, object)
+
+
+class _TareaPeticion(QRunnable):
+    def __init__(self, peticion, senales, funcion, args, kwargs):
+        super().__init__()
+        self.peticion = peticion
+        self.senales = senales
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+
+    @Slot()
+    def run(self):
+        if self.peticion.cancelada:
+            self.senales.terminada.emit(self.peticion.id_peticion, False, None)
+            return
+        try:
+            resultado = self.funcion(*self.args, **self.kwargs)
+        except Exception as e:
+            self.senales.terminada.emit(self.peticion.id_peticion, False, e)
+        else:
+            self.senales.terminada.emit(self.peticion.id_peticion, True, resultado)
+
+
+class EjecutorPeticiones(QObject):
+    """
+    Lanza funciones bloqueantes (llamadas al backend) en el pool de hilos global de Qt.
+
+    Cada ventana crea el suyo (con la ventana como parent) para poder cancelar sus
+    peticiones al cerrarse. Debe crearse en el hilo de la interfaz; los callbacks
+    se ejecutan en ese hilo.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self._senales = _SenalesPeticion()
+        self._senales.terminada.connect(self._despachar)
+        self._ids = itertools.count(1)
+        self._en_curso = {}
+        self._por_clave = {}
+
+    def ejecutar(self, funcion, *args, al_completar=None, al_fallar=None, clave=None, reemplazar=False, **kwargs):
+        """
+        Ejecuta `funcion(*args, **kwargs)` en segundo plano.
+
+        Args:
+            funcion (callable): Función bloqueante, normalmente un método de `cliente_api.api`.
+            al_completar (callable, opcional): Recibe el resultado, en el hilo de la interfaz.
+            al_fallar (callable, opcional): Recibe la excepción, en el hilo de la interfaz.
+            clave (str, opcional): Peticiones con la misma clave en curso se deduplican.
+            reemplazar (bool): Si ya hay una con la misma clave, cancelarla en lugar de unirse a ella.
+
+        Returns:
+            Peticion: Objeto que permite cancelar la petición.
+        """
+        existente = self._por_clave.get(clave) if clave is not None else None
+        if existente is not None and not existente.cancelada:
+            if not reemplazar:
+                if al_completar:
+                    existente.al_completar.append(al_completar)
+                if al_fallar:
+                    existente.al_fallar.append(al_fallar)
+                return existente
+            existente.cancelar()
+
+        peticion = Peticion(next(self._ids), clave)
+        if al_completar:
+            peticion.al_completar.append(al_completar)
+        if al_fallar:
+            peticion.al_fallar.append(al_fallar)
+        self._en_curso[peticion.id_peticion] = peticion
+        if clave is not None:
+            self._por_clave[clave] = peticion
+        self.pool.start(_TareaPeticion(peticion, self._senales, funcion, args, kwargs))
+        return peticion
+
+    def en_curso(self, clave):
+        """Indica si hay una petición no cancelada con esa clave pendiente de respuesta."""
+        peticion = self._por_clave.get(clave)
+        return peticion is not None and not peticion.cancelada
+
+    def cancelar(self, clave):
+        """Cancela la petición en curso con esa clave, si la hay."""
+        peticion = self._por_clave.get(clave)
+        if peticion is not None:
+            peticion.cancelar()
+
+    def cancelar_todas(self):
+        """Cancela todas las peticiones pendientes (por ejemplo, al cerrar la ventana)."""
+        for peticion in self._en_curso.values():
+            peticion.cancelar()
+
+    @Slot(int, bool, object)
+    def _despachar(self, id_peticion, correcta, resultado):
+        peticion = self._en_curso.pop(id_peticion, None)
+        if peticion is None:
+            return
+        if peticion.clave is not None and self._por_clave.get(peticion.clave) is peticion:
+            del self._por_clave[peticion.clave]
+        if peticion.cancelada:
+            return
+        callbacks = peticion.al_completar if correcta else peticion.al_fallar
+        if not correcta and not callbacks:
+            print(f"Error en petición en segundo plano: {resultado}")
+        for callback in callbacks:
+            callback(resultado)
@@ -0,0 +1,129 @@
+"""Modelo en memoria de los resultados del análisis de un rollo.
+
+`analizar_rollo` ya devuelve, por cada imagen, las áreas de sus defectos y sus
+tipos; además los escribe en archivos .txt/.json junto a la imagen procesada.
+La ventana principal guarda aquí esos resultados según llegan del hilo de análisis
+y construye a partir de ellos la tabla, las etiquetas, la fila resumen y los datos
+que se envían al backend, sin volver a leer ni parsear esos archivos.
+"""
+from typing import List, Optional
+
+
+class ResultadoImagen:
+    """
+    Resultado del análisis de una imagen del rollo.
+
+    Attributes:
+        nombre_archivo (str): Nombre de la imagen.
+        ruta_original (str): Ruta de la imagen original.
+        ruta_procesada (str): Ruta de la imagen anotada.
+        areas (list[float]): Área de cada defecto detectado, en mm².
+        tipos (list[str]): Tipos de defecto presentes en la imagen.
+    """
+    def __init__(self, nombre_archivo, ruta_original, ruta_procesada, areas=None, tipos=None):
+        self.nombre_archivo = nombre_archivo
+        self.ruta_original = ruta_original
+        self.ruta_procesada = ruta_procesada
+        self.areas = list(areas or [])
+        self.tipos = list(tipos or [])
+
+    @classmethod
+    def desde_analisis(cls, resultado):
+        """Crea el resultado a partir del diccionario emitido por `HiloAnalisisRollo`."""
+        return cls(
+            resultado["nombre_archivo"],
+            resultado["ruta_original"],
+            resultado["ruta_procesada"],
+            resultado.get("areas_mm2"),
+            resultado.get("tipos")
+        )
+
+    @property
+    def minimo(self) -> Optional[float]:
+        """Área del defecto más pequeño, o None si no hay defectos."""
+        return min(self.areas) if self.areas else None
+
+    @property
+    def maximo(self) -> Optional[float]:
+        """Área del defecto más grande, o None si no hay defectos."""
+        return max(self.areas) if self.areas else None
+
+    @property
+    def mayor_defecto(self) -> float:
+        """Área del defecto más grande, 0.0 si no hay defectos."""
+        return self.maximo if self.areas else 0.0
+
+    @property
+    def tipos_texto(self) -> str:
+        """Tipos de defecto tal como se muestran en la tabla."""
+        return ", ".join(self.tipos) if self.tipos else "—"
+
+    def clasificacion(self, umbral) -> str:
+        """'nok' si el mayor defecto supera el umbral (mm²), 'ok' en caso contrario."""
+        return "nok" if self.mayor_defecto > umbral else "ok"
+
+
+class ResultadosRollo:
+    """
+    Resultados de todas las imágenes analizadas de un rollo, en orden de análisis.
+
+    Args:
+        nombre_rollo (str): Nombre de la carpeta del rollo.
+        umbral (float): Área máxima tolerable de un defecto (mm²) usada en el análisis.
+    """
+    def __init__(self, nombre_rollo, umbral):
+        self.nombre_rollo = nombre_rollo
+        self.umbral = umbral
+        self.imagenes: List[ResultadoImagen] = []
+
+    def agregar(self, resultado) -> ResultadoImagen:
+        """Añade el resultado de una imagen (diccionario del hilo de análisis) y lo devuelve."""
+        imagen = ResultadoImagen.desde_analisis(resultado)
+        self.imagenes.append(imagen)
+        return imagen
+
+    def __len__(self):
+        return len(self.imagenes)
+
+    def __getitem__(self, indice) -> ResultadoImagen:
+        return self.imagenes[indice]
+
+    def mayor_defecto(self) -> float:
+        """Mayor defecto del rollo (mm²)."""
+        return max((imagen.mayor_defecto for imagen in self.imagenes), default=0.0)
+
+    def tipos_unicos(self) -> List[str]:
+        """Tipos de defecto presentes en el rollo, ordenados alfabéticamente."""
+        return sorted({tipo for imagen in self.imagenes for tipo in imagen.tipos})
+
+    def defectos_intolerables(self) -> int:
+        """Número de imágenes clasificadas como 'nok'."""
+        return sum(1 for imagen in self.imagenes if imagen.clasificacion(self.umbral) == "nok")
+
+    def resultado_global(self) -> str:
+        """'nok' si algún defecto del rollo supera el umbral, 'ok' en caso contrario."""
+        return "nok" if self.mayor_defecto() > self.umbral else "ok"
+
+    def imagenes_para_guardar(self, fecha_captura):
+        """
+        Lista de imágenes con el formato que espera POST /controles/nuevo.
+
+        Args:
+            fecha_captura (str): Fecha ISO asignada a todas las imágenes del control.
+        """
+        imagenes = []
+        for imagen in self.imagenes:
+            min_defecto = imagen.minimo if imagen.minimo is not None else 0.0
+            max_defecto = imagen.mayor_defecto
+            imagenes.append({
+                "nombre_archivo": imagen.nombre_archivo,
+                "fecha_captura": fecha_captura,
+                "max_dim_defecto_medido": max_defecto,
+                "min_dim_defecto_medido": min_defecto,
+                "clasificacion": imagen.clasificacion(self.umbral),
+                "defectos": [
+                    {"area": min_defecto, "tipo_valor": "min", "tipo_defecto": imagen.tipos_texto},
+                    {"area": max_defecto, "tipo_valor": "max", "tipo_defecto": imagen.tipos_texto}
+                ]
+            })
+        return imagenes
@@ -1,4 +1,5 @@
-import requests
+from cliente_api import api, ErrorAPI
+from peticiones_async import EjecutorPeticiones
 from PySide6.QtGui import QIcon
 import os
 from PySide6.QtWidgets import QDialog, QMessageBox
@@ -25,6 +26,7 @@ class SolicitudPasswordWindow(QDialog):
         self.setWindowTitle("Solicitud de cambio de contraseña")
         ruta_icono = os.path.abspath("logo_isli.ico")  # Ajusta según tu estructura
         self.setWindowIcon(QIcon(ruta_icono))
+        self.peticiones = EjecutorPeticiones(self)
 
         # Conectamos botones
         self.ui.pushButton_enviar.clicked.connect(self.enviar_solicitud)
@@ -70,13 +72,21 @@ class SolicitudPasswordWindow(QDialog):
             "timestamp": datetime.now().isoformat()
         }
 
-        try:
-            response = requests.post("http://localhost:8000/controles/solicitud_password", json=payload)
-            if response.status_code == 200:
-                QMessageBox.information(self, "Enviado", "La solicitud fue registrada correctamente.")
-                self.close()
-            else:
-                detalle = response.json().get("detail", "Error desconocido")
-                QMessageBox.critical(self, "Error", f"No se pudo registrar la solicitud:\n{detalle}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error de conexión", f"No se pudo conectar al servidor:\n{str(e)}")
+        self.peticiones.ejecutar(
+            api.solicitar_cambio_password, payload,
+            al_completar=self.solicitud_registrada,
+            al_fallar=self.solicitud_fallida,
+            clave="solicitud_password"
+        )
+
+    def solicitud_registrada(self, _respuesta):
+        """Confirma el registro de la solicitud y cierra el diálogo."""
+        QMessageBox.information(self, "Enviado", "La solicitud fue registrada correctamente.")
+        self.close()
+
+    def solicitud_fallida(self, error):
+        """Muestra el motivo por el que no se registró la solicitud."""
+        if isinstance(error, ErrorAPI) and error.status_code is not None:
+            QMessageBox.critical(self, "Error", f"No se pudo registrar la solicitud:\n{error.detalle or 'Error desconocido'}")
+        else:
+            QMessageBox.critical(self, "Error de conexión", f"No se pudo conectar al servidor:\n{error}")
@@ -4,15 +4,506 @@ Incluye funciones para:
 - Crear el informe PDF con resultados del análisis visual.
 - Abrir el informe una vez generado.
 - Registrar su existencia en la base de datos vía backend.
+
+Las imágenes procesadas no se incrustan a resolución completa: cada una se reduce a
+la resolución del visor del informe (DPI_IMAGENES_INFORME) y se recomprime en JPEG.
+Las copias reducidas se guardan en una caché en disco, con el contenido de la imagen
+y el tamaño de destino como clave; así, volver a generar un informe no reprocesa
+sus imágenes. ReportLab incrusta una sola vez las imágenes con la misma ruta, de modo
+que las imágenes idénticas (la misma copia de la caché) se comparten en el PDF.
+
+Para rollos grandes, `construir_pdf_cuadricula` genera un informe con una página de
+resumen estadístico y las imágenes en miniatura, en una cuadrícula por página (4x6
+por defecto), opcionalmente solo las NOK.
 """
 import os
 import sys
-import requests
+import uuid
+import heapq
+import hashlib
+import tempfile
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageReader
 from PySide6.QtWidgets import QMessageBox
 
+# Tamaño (pt) del visor de cada imagen en el informe
+ANCHO_IMAGEN_INFORME = 200
+ALTO_IMAGEN_INFORME = 100
+# Resolución y calidad JPEG de las imágenes incrustadas
+DPI_IMAGENES_INFORME = 150
+CALIDAD_JPEG_INFORME = 80
+# Hilos que preparan las imágenes del informe en paralelo
+HILOS_IMAGENES_INFORME = 4
+# Tamaño máximo de la caché de imágenes reducidas
+MAX_BYTES_CACHE_INFORME = 512 * 1024 * 1024
+# Modo cuadrícula: miniaturas por página y margen de página (pt)
+COLUMNAS_CUADRICULA = 4
+FILAS_CUADRICULA = 6
+MARGEN_INFORME = 40
+# Alto (pt) del pie de cada miniatura
+ALTO_PIE_MINIATURA = 10
+# Imágenes con mayor defecto que se listan en el resumen estadístico
+MAX_MAYORES_DEFECTOS = 10
+
+def filas_tabla(tabla):
+    """
+    Devuelve los textos de cada fila de la tabla de resultados.
+
+    Admite un `ModeloTabla` (incluidas las filas que la vista aún no ha pedido) o un QTableWidget.
+    """
+    if hasattr(tabla, "textos_fila"):
+        return [tabla.textos_fila(fila) for fila in range(tabla.total_filas())]
+    filas = []
+    for row in range(tabla.rowCount()):
+        linea = []
+        for col in range(tabla.columnCount()):
+            item = tabla.item(row, col)
+            linea.append(item.text() if item else "")
+        filas.append(linea)
+    return filas
+
+
+def carpeta_cache_informes():
+    """Carpeta de la caché de imágenes reducidas para los informes."""
+    return os.path.join(tempfile.gettempdir(), "isli_cache_informes")
+
+
+def preparar_imagen_informe(ruta, ancho_pt, alto_pt, dpi=DPI_IMAGENES_INFORME, calidad=CALIDAD_JPEG_INFORME, carpeta_cache=None):
+    """
+    Devuelve una copia JPEG de la imagen reducida para un visor de ancho_pt x alto_pt a `dpi`.
+
+    La imagen se decodifica directamente al tamaño reducido (manteniendo la proporción y
+    cubriendo el visor) y nunca se amplía. Si la copia ya está en caché no se vuelve a decodificar.
+
+    Returns:
+        str: Ruta de la copia reducida, o la ruta original si no se pudo leer la imagen.
+    """
+    carpeta_cache = carpeta_cache or carpeta_cache_informes()
+    ancho_px = max(1, round(ancho_pt * dpi / 72))
+    alto_px = max(1, round(alto_pt * dpi / 72))
+
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    h.update(f"{ancho_px}x{alto_px}q{calidad}".encode("utf-8"))
+    destino = os.path.join(carpeta_cache, h.hexdigest()[:32] + ".jpg")
+    if os.path.exists(destino):
+        os.utime(destino)  # Marca de uso para podar la caché
+        return destino
+
+    lector = QImageReader(ruta)
+    lector.setAutoTransform(True)
+    tamano = lector.size()
+    if tamano.isValid() and (tamano.width() > ancho_px or tamano.height() > alto_px):
+        lector.setScaledSize(tamano.scaled(ancho_px, alto_px, Qt.KeepAspectRatioByExpanding))
+    imagen = lector.read()
+    if imagen.isNull():
+        print(f"No se pudo reducir la imagen {ruta}: {lector.errorString()}")
+        return ruta
+
+    os.makedirs(carpeta_cache, exist_ok=True)
+    temporal = f"{destino}.{uuid.uuid4().hex}.tmp"
+    if not imagen.convertToFormat(QImage.Format_RGB888).save(temporal, "JPG", calidad):
+        return ruta
+    os.replace(temporal, destino)
+    return destino
+
+
+def preparar_imagenes_informe(rutas, ancho_pt=ANCHO_IMAGEN_INFORME, alto_pt=ALTO_IMAGEN_INFORME, dpi=DPI_IMAGENES_INFORME, carpeta_cache=None):
+    """
+    Prepara en paralelo las copias reducidas de las imágenes existentes.
+
+    Returns:
+        dict[str, str]: Ruta original -> ruta a incrustar en el PDF.
+    """
+    existentes = list(dict.fromkeys(ruta for ruta in rutas if os.path.exists(ruta)))
+
+    def preparar(ruta):
+        try:
+            return preparar_imagen_informe(ruta, ancho_pt, alto_pt, dpi, carpeta_cache=carpeta_cache)
+        except OSError as e:
+            print(f"No se pudo reducir la imagen {ruta}: {e}")
+            return ruta
+
+    with ThreadPoolExecutor(max_workers=HILOS_IMAGENES_INFORME) as pool:
+        return dict(zip(existentes, pool.map(preparar, existentes)))
+
+
+def podar_cache_informes(carpeta_cache=None, max_bytes=MAX_BYTES_CACHE_INFORME):
+    """Borra las copias reducidas usadas hace más tiempo hasta que la caché ocupe como máximo `max_bytes`."""
+    carpeta_cache = carpeta_cache or carpeta_cache_informes()
+    try:
+        with os.scandir(carpeta_cache) as entradas:
+            archivos = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entradas if e.is_file()]
+    except FileNotFoundError:
+        return
+    total = sum(tamano for _, tamano, _ in archivos)
+    for _, tamano, ruta in sorted(archivos):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(ruta)
+            total -= tamano
+        except OSError:
+            pass
+
+
+def _dibujar_encabezado(c, id_control, nombre_usuario, rol_usuario, tolerancia_tamano, tolerancia_cantidad, logo_path):
+    """Dibuja logo, título y datos del control en la página actual y devuelve la altura libre (y)."""
+    width, height = A4
+
+    # ==== ENCABEZADO ====
+    logo_width = 100
+    logo_height = 60
+    logo_x = 40
+    logo_y = height - logo_height - 40  # Espacio superior
+
+    # Logo a la izquierda
+    if logo_path and os.path.exists(logo_path):
+        c.drawImage(
+            logo_path,
+            logo_x,
+            logo_y,
+            width=logo_width,
+            height=logo_height,
+            preserveAspectRatio=True,
+            mask='auto'
+        )
+
+    # Título alineado al centro del logo
+    title_y = logo_y + logo_height / 2 - 7  # Ajuste visual fino
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(logo_x + logo_width + 20, title_y, "Informe de Control de Calidad")
+
+    # ==== INFORMACIÓN BÁSICA ====
+    y = logo_y - 20
+    c.setFont("Helvetica", 10)
+    datos = [
+        f"ID Control: {id_control}",
+        f"Operario: {nombre_usuario} ({rol_usuario})",
+        f"Fecha de informe: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        f"Tolerancia máxima tamaño: {tolerancia_tamano} mm",
+        f"Tolerancia máxima cantidad: {tolerancia_cantidad} imágenes",
+    ]
+    for d in datos:
+        c.drawString(40, y, d)
+        y -= 15
+    return y
+
+
+def construir_pdf(
+    id_control,
+    nombre_usuario,
+    rol_usuario,
+    filas,
+    imagenes_procesadas,
+    tolerancia_tamano,
+    tolerancia_cantidad,
+    ruta_destino,
+    logo_path=None,
+    dpi_imagenes=DPI_IMAGENES_INFORME
+):
+    """
+    Escribe el informe PDF en `ruta_destino`, sin tocar la interfaz gráfica.
+
+    Puede ejecutarse en un hilo de trabajo: recibe las filas de la tabla ya extraídas
+    (ver `filas_tabla`) y no muestra mensajes.
+
+    Returns:
+        str: Ruta del PDF generado.
+
+    Raises:
+        Exception: Cualquier error al escribir el PDF.
+    """
+    imagenes = preparar_imagenes_informe(imagenes_procesadas, dpi=dpi_imagenes)
+
+    c = canvas.Canvas(ruta_destino, pagesize=A4)
+    width, height = A4
+    y = _dibujar_encabezado(c, id_control, nombre_usuario, rol_usuario, tolerancia_tamano, tolerancia_cantidad, logo_path)
+
+    # ==== RESUMEN DEL ANÁLISIS ====
+    y -= 10
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(40, y, "Resumen del análisis")
+    y -= 20
+
+    c.setFont("Helvetica", 9)
+    for linea in filas:
+        if y < 100:
+            c.showPage()
+            y = height - 50
+        c.drawString(40, y, " | ".join(linea))
+        y -= 12
+
+    # ==== IMÁGENES ANALIZADAS ====
+    y -= 20
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(40, y, "Visores de análisis")
+    y -= 20
+
+    for idx, img_path in enumerate(imagenes_procesadas):
+        if img_path not in imagenes:
+            continue
+
+        if y < 120:
+            c.showPage()
+            y = height - 50
+            c.setFont("Helvetica-Bold", 11)
+            c.drawString(40, y, "Visores de análisis (continuación)")
+            y -= 20
+
+        try:
+            c.drawImage(imagenes[img_path], 40, y - ALTO_IMAGEN_INFORME, width=ANCHO_IMAGEN_INFORME, height=ALTO_IMAGEN_INFORME)
+            c.setFont("Helvetica", 8)
+            c.drawString(250, y - 60, f"{idx+1}. {os.path.basename(img_path)}")
+            y -= 120
+        except Exception as e:
+            print(f"Error al insertar imagen en PDF: {e}")
+
+    c.save()
+    podar_cache_informes()
+    return ruta_destino
+
+
+def estadisticas_informe(imagenes):
+    """
+    Calcula el resumen estadístico del rollo en una sola pasada.
+
+    Args:
+        imagenes (iterable[dict]): Imágenes con 'nombre_archivo', 'clasificacion' ('ok'/'nok'),
+            'mayor_defecto' (mm²) y 'tipos'.
+
+    Returns:
+        dict: 'total', 'ok', 'nok', 'mayor_defecto', 'media_mayor_defecto', 'por_tipo'
+        (tipo -> número de imágenes) y 'mayores' (lista de (área, nombre) de las imágenes
+        con el mayor defecto más grande, de mayor a menor).
+    """
+    total = nok = 0
+    suma = 0.0
+    por_tipo = Counter()
+    mayores = []
+    for imagen in imagenes:
+        total += 1
+        if imagen["clasificacion"] == "nok":
+            nok += 1
+        area = imagen["mayor_defecto"]
+        suma += area
+        por_tipo.update(imagen["tipos"])
+        entrada = (area, imagen["nombre_archivo"])
+        if len(mayores) < MAX_MAYORES_DEFECTOS:
+            heapq.heappush(mayores, entrada)
+        else:
+            heapq.heappushpop(mayores, entrada)
+    mayores.sort(reverse=True)
+    return {
+        "total": total,
+        "ok": total - nok,
+        "nok": nok,
+        "mayor_defecto": mayores[0][0] if mayores else 0.0,
+        "media_mayor_defecto": suma / total if total else 0.0,
+        "por_tipo": dict(por_tipo.most_common()),
+        "mayores": mayores
+    }
+
+
+def _dibujar_estadisticas(c, estadisticas, y, solo_nok):
+    """Dibuja la sección de resumen estadístico a partir de la altura `y`."""
+    total = estadisticas["total"]
+
+    def porcentaje(n):
+        return f"{100 * n / total:.1f}%" if total else "—"
+
+    c.setFont("Helvetica-Bold", 11)
+    c.drawString(MARGEN_INFORME, y, "Resumen estadístico")
+    y -= 20
+    c.setFont("Helvetica", 10)
+    lineas = [
+        f"Imágenes analizadas: {total}",
+        f"Imágenes OK: {estadisticas['ok']} ({porcentaje(estadisticas['ok'])})",
+        f"Imágenes NOK: {estadisticas['nok']} ({porcentaje(estadisticas['nok'])})",
+        f"Mayor defecto: {estadisticas['mayor_defecto']:.2f} mm²",
+        f"Media del mayor defecto por imagen: {estadisticas['media_mayor_defecto']:.2f} mm²",
+    ]
+    for linea in lineas:
+        c.drawString(MARGEN_INFORME, y, linea)
+        y -= 15
+
+    y -= 10
+    c.setFont("Helvetica-Bold", 10)
+    c.drawString(MARGEN_INFORME, y, "Imágenes por tipo de defecto")
+    y -= 15
+    c.setFont("Helvetica", 10)
+    for tipo, num in estadisticas["por_tipo"].items() or [("Sin defectos", 0)]:
+        c.drawString(MARGEN_INFORME + 10, y, f"{tipo}: {num}")
+        y -= 15
+
+    if estadisticas["mayores"]:
+        y -= 10
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(MARGEN_INFORME, y, "Imágenes con los mayores defectos")
+        y -= 15
+        c.setFont("Helvetica", 10)
+        for area, nombre in estadisticas["mayores"]:
+            c.drawString(MARGEN_INFORME + 10, y, f"{nombre}: {area:.2f} mm²")
+            y -= 15
+
+    y -= 10
+    c.setFont("Helvetica-Oblique", 9)
+    if solo_nok:
+        texto = f"Las páginas siguientes muestran solo las imágenes NOK ({estadisticas['nok']} de {total})."
+    else:
+        texto = f"Las páginas siguientes muestran las {total} imágenes analizadas."
+    c.drawString(MARGEN_INFORME, y, texto)
+
+
+def modo_informe(config_informe, num_imagenes):
+    """
+    Decide el formato del informe según la configuración (ver `obtener_config_informe` en utils_ui).
+
+    Returns:
+        str: 'cuadricula' o 'lista'.
+    """
+    modo = config_informe.get("modo", "auto")
+    if modo == "auto":
+        return "cuadricula" if num_imagenes > int(config_informe.get("umbral_cuadricula", 24)) else "lista"
+    return modo
+
+
+def _dibujar_miniatura(c, numero, imagen, ruta, x, y, ancho, alto):
+    """Dibuja una miniatura enmarcada según su clasificación, con su pie, en la celda (x, y)."""
+    alto_imagen = alto - ALTO_PIE_MINIATURA
+    if ruta:
+        try:
+            c.drawImage(ruta, x, y + ALTO_PIE_MINIATURA, width=ancho, height=alto_imagen,
+                        preserveAspectRatio=True, anchor='c')
+        except Exception as e:
+            print(f"Error al insertar imagen en PDF: {e}")
+            ruta = None
+    if not ruta:
+        c.setFont("Helvetica", 7)
+        c.drawCentredString(x + ancho / 2, y + ALTO_PIE_MINIATURA + alto_imagen / 2, "Imagen no disponible")
+
+    if imagen["clasificacion"] == "nok":
+        c.setStrokeColorRGB(0.83, 0.18, 0.18)
+    else:
+        c.setStrokeColorRGB(0.30, 0.60, 0.30)
+    c.rect(x, y + ALTO_PIE_MINIATURA, ancho, alto_imagen)
+
+    # Pie: número, nombre (recortado al ancho de la celda) y mayor defecto
+    c.setFont("Helvetica", 6)
+    sufijo = f" · {imagen['mayor_defecto']:.2f} mm²"
+    nombre = f"{numero}. {imagen['nombre_archivo']}"
+    while len(nombre) > 1 and c.stringWidth(nombre + sufijo, "Helvetica", 6) > ancho:
+        nombre = nombre[:-2] + "…"
+    c.drawString(x, y + 2, nombre + sufijo)
+
+
+def construir_pdf_cuadricula(
+    id_control,
+    nombre_usuario,
+    rol_usuario,
+    imagenes,
+    tolerancia_tamano,
+    tolerancia_cantidad,
+    ruta_destino,
+    logo_path=None,
+    columnas=COLUMNAS_CUADRICULA,
+    filas=FILAS_CUADRICULA,
+    solo_nok=False,
+    dpi_imagenes=DPI_IMAGENES_INFORME,
+    carpeta_cache=None
+):
+    """
+    Escribe un informe para rollos grandes: resumen estadístico y cuadrícula de miniaturas.
+
+    La primera página contiene el encabezado y las estadísticas del rollo (ver
+    `estadisticas_informe`); las siguientes, `columnas` x `filas` miniaturas por página
+    con su número, nombre y mayor defecto, enmarcadas en verde (OK) o rojo (NOK).
+
+    Las páginas se construyen de una en una: solo se preparan las miniaturas de la
+    página actual y de la siguiente (esta en paralelo mientras se dibuja la actual), así
+    que el trabajo pendiente no crece con el tamaño del rollo. Como `construir_pdf`, no
+    toca la interfaz y puede ejecutarse en un hilo de trabajo.
+
+    Args:
+        imagenes (list[dict]): Imágenes en orden de análisis, con 'nombre_archivo',
+            'ruta_procesada', 'clasificacion', 'mayor_defecto' y 'tipos'.
+        columnas (int): Miniaturas por fila.
+        filas (int): Filas de miniaturas por página.
+        solo_nok (bool): Incluir en la cuadrícula solo las imágenes NOK (las estadísticas
+            siempre cubren todo el rollo).
+
+    Returns:
+        str: Ruta del PDF generado.
+    """
+    c = canvas.Canvas(ruta_destino, pagesize=A4)
+    width, height = A4
+
+    # ==== PÁGINA DE RESUMEN ====
+    y = _dibujar_encabezado(c, id_control, nombre_usuario, rol_usuario, tolerancia_tamano, tolerancia_cantidad, logo_path)
+    _dibujar_estadisticas(c, estadisticas_informe(imagenes), y - 10, solo_nok)
+    c.showPage()
+
+    # ==== CUADRÍCULA DE MINIATURAS ====
+    alto_titulo = 20
+    ancho_celda = (width - 2 * MARGEN_INFORME) / columnas
+    alto_celda = (height - 2 * MARGEN_INFORME - alto_titulo) / filas
+    separacion = 6
+    ancho_miniatura = ancho_celda - separacion
+    alto_miniatura = alto_celda - separacion
+    por_pagina = columnas * filas
+
+    seleccion = (
+        (numero, imagen) for numero, imagen in enumerate(imagenes, start=1)
+        if not solo_nok or imagen["clasificacion"] == "nok"
+    )
+
+    def preparar(imagen):
+        ruta = imagen.get("ruta_procesada")
+        if not ruta or not os.path.exists(ruta):
+            return None
+        try:
+            return preparar_imagen_informe(ruta, ancho_miniatura, alto_miniatura - ALTO_PIE_MINIATURA,
+                                           dpi_imagenes, carpeta_cache=carpeta_cache)
+        except OSError as e:
+            print(f"No se pudo reducir la imagen {ruta}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=HILOS_IMAGENES_INFORME) as pool:
+        def siguiente_pagina():
+            return [(numero, imagen, pool.submit(preparar, imagen)) for numero, imagen in islice(seleccion, por_pagina)]
+
+        pagina = siguiente_pagina()
+        num_pagina = 1
+        while pagina:
+            # Las miniaturas de la página siguiente se preparan mientras se dibuja esta
+            proxima = siguiente_pagina()
+
+            c.setFont("Helvetica-Bold", 11)
+            c.drawString(MARGEN_INFORME, height - MARGEN_INFORME, f"Visores de análisis · página {num_pagina}")
+            c.setLineWidth(1.5)
+            for posicion, (numero, imagen, futuro) in enumerate(pagina):
+                fila, columna = divmod(posicion, columnas)
+                x = MARGEN_INFORME + columna * ancho_celda
+                y = height - MARGEN_INFORME - alto_titulo - (fila + 1) * alto_celda
+                _dibujar_miniatura(c, numero, imagen, futuro.result(), x, y, ancho_miniatura, alto_miniatura)
+            c.showPage()
+
+            pagina = proxima
+            num_pagina += 1
+
+    c.save()
+    podar_cache_informes(carpeta_cache)
+    return ruta_destino
+
+
 def generar_pdf_completo(
     id_control,
     nombre_usuario,
@@ -29,94 +520,22 @@ def generar_pdf_completo(
     """
     Genera un informe PDF completo con datos del análisis y visores de imágenes.
 
-    El informe incluye encabezado, resumen del análisis, y hasta 6 imágenes procesadas.
+    El informe incluye encabezado, resumen del análisis y las imágenes procesadas (ver `construir_pdf`).
+    `tablewidget` puede ser el `ModeloTabla` de la ventana principal o un QTableWidget.
     Se guarda en la ruta especificada y se abre automáticamente tras generarse (si abrir_pdf_automaticamente es True).
     """
     try:
-        c = canvas.Canvas(ruta_destino, pagesize=A4)
-        width, height = A4
-
-        # ==== ENCABEZADO ====
-        logo_width = 100
-        logo_height = 60
-        logo_x = 40
-        logo_y = height - logo_height - 40  # Espacio superior
-
-        # Logo a la izquierda
-        if logo_path and os.path.exists(logo_path):
-            c.drawImage(
-                logo_path,
-                logo_x,
-                logo_y,
-                width=logo_width,
-                height=logo_height,
-                preserveAspectRatio=True,
-                mask='auto'
-            )
-
-        # Título alineado al centro del logo
-        title_y = logo_y + logo_height / 2 - 7  # Ajuste visual fino
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(logo_x + logo_width + 20, title_y, "Informe de Control de Calidad")
-
-        # ==== INFORMACIÓN BÁSICA ====
-        y = logo_y - 20
-        c.setFont("Helvetica", 10)
-        datos = [
-            f"ID Control: {id_control}",
-            f"Operario: {nombre_usuario} ({rol_usuario})",
-            f"Fecha de informe: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"Tolerancia máxima tamaño: {tolerancia_tamano} mm",
-            f"Tolerancia máxima cantidad: {tolerancia_cantidad} imágenes",
-        ]
-        for d in datos:
-            c.drawString(40, y, d)
-            y -= 15
-
-        # ==== RESUMEN DEL ANÁLISIS ====
-        y -= 10
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(40, y, "Resumen del análisis")
-        y -= 20
-
-        c.setFont("Helvetica", 9)
-        for row in range(tablewidget.rowCount()):
-            if y < 100:
-                c.showPage()
-                y = height - 50
-            linea = []
-            for col in range(tablewidget.columnCount()):
-                item = tablewidget.item(row, col)
-                linea.append(item.text() if item else "")
-            c.drawString(40, y, " | ".join(linea))
-            y -= 12
-
-        # ==== IMÁGENES ANALIZADAS ====
-        y -= 20
-        c.setFont("Helvetica-Bold", 11)
-        c.drawString(40, y, "Visores de análisis")
-        y -= 20
-
-        for idx, img_path in enumerate(imagenes_procesadas):
-            if not os.path.exists(img_path):
-                continue
-
-            if y < 120:
-                c.showPage()
-                y = height - 50
-                c.setFont("Helvetica-Bold", 11)
-                c.drawString(40, y, "Visores de análisis (continuación)")
-                y -= 20
-
-            try:
-                c.drawImage(img_path, 40, y - 100, width=200, height=100)
-                c.setFont("Helvetica", 8)
-                c.drawString(250, y - 60, f"{idx+1}. {os.path.basename(img_path)}")
-                y -= 120
-            except Exception as e:
-                print(f"Error al insertar imagen en PDF: {e}")
-
-        c.save()
+        construir_pdf(
+            id_control,
+            nombre_usuario,
+            rol_usuario,
+            filas_tabla(tablewidget),
+            imagenes_procesadas,
+            tolerancia_tamano,
+            tolerancia_cantidad,
+            ruta_destino,
+            logo_path=logo_path
+        )
 
         # Mostrar mensaje de éxito
         if parent_widget:
@@ -148,6 +567,8 @@ def guardar_registro_informe(id_control, ruta_pdf, generado_por):
     Envía al backend la información del informe generado para registrar en la tabla INFORME_CONTROL.
     Devuelve True si se registró correctamente, False en caso de error.
     """
+    from cliente_api import api, ErrorAPI
+
     payload = {
         "id_control": id_control,
         "ruta_pdf": ruta_pdf,
@@ -157,13 +578,9 @@ def guardar_registro_informe(id_control, ruta_pdf, generado_por):
     }
 
     try:
-        response = requests.post("http://localhost:8000/controles/informe/nuevo", json=payload)
-        if response.status_code == 200:
-            print("Informe registrado correctamente.")
-            return True
-        else:
-            print(f"Error al registrar informe: {response.status_code} - {response.text}")
-            return False
-    except Exception as e:
-        print(f"Excepción al registrar informe: {e}")
+        api.registrar_informe(payload)
+        print("Informe registrado correctamente.")
+        return True
+    except ErrorAPI as e:
+        print(f"Error al registrar informe: {e.status_code} - {e.detalle}")
         return False
\ No newline at end of file
@@ -13,6 +13,7 @@ from PySide6.QtCore import QTimer
 import urllib.request
 import sys
 import os
+from cliente_api import api, ErrorAPI
 
 CONFIG_FILE = "config.json"
 
@@ -53,32 +54,34 @@ def mostrar_datos_usuario(ui, nombre_usuario, rol_usuario):
     """
     ui.label_3.setText(f"{nombre_usuario} ({rol_usuario})")
 
-import requests
-
-def mostrar_siguiente_id_control(ui, label_name="label_11"):
+def mostrar_siguiente_id_control(ui, peticiones, label_name="label_11"):
     """
-    Obtiene el siguiente ID de control desde el backend y lo muestra en el QLabel indicado.
+    Obtiene en segundo plano el siguiente ID de control y lo muestra en el QLabel indicado.
+
+    Args:
+        ui: Interfaz que contiene la etiqueta.
+        peticiones (EjecutorPeticiones): Ejecutor de la ventana.
+        label_name (str): Nombre del QLabel donde mostrar el ID.
     """
-    try:
-        response = requests.get("http://localhost:8000/controles/ultimo_id_control")
-        if response.status_code == 200:
-            data = response.json()
-            siguiente_id = data.get("siguiente_id")
-            if isinstance(siguiente_id, int):
-                getattr(ui, label_name).setText(f"{siguiente_id:05d}")
-                return True
-            else:
-                print("ID inválido recibido.")
-                getattr(ui, label_name).setText("-----")
-                return False
+    etiqueta = getattr(ui, label_name)
+
+    def mostrar(siguiente_id):
+        if isinstance(siguiente_id, int):
+            etiqueta.setText(f"{siguiente_id:05d}")
         else:
-            print(f"Error HTTP {response.status_code}")
-            getattr(ui, label_name).setText("Error")
-            return False
-    except Exception as e:
-        print(f"Error obteniendo ID de control: {e}")
-        getattr(ui, label_name).setText("N/A")
-        return False
+            print("ID inválido recibido.")
+            etiqueta.setText("-----")
+
+    def mostrar_error(e):
+        if isinstance(e, ErrorAPI) and e.status_code is not None:
+            print(f"Error HTTP {e.status_code}")
+            etiqueta.setText("Error")
+        else:
+            print(f"Error obteniendo ID de control: {e}")
+            etiqueta.setText("N/A")
+
+    peticiones.ejecutar(api.siguiente_id_control, al_completar=mostrar, al_fallar=mostrar_error,
+                        clave="siguiente_id_control")
 
 
 def configurar_botones_comunes(parent, ui, rol_usuario, token_jwt):
@@ -100,7 +103,7 @@ def configurar_botones_comunes(parent, ui, rol_usuario, token_jwt):
 
     else:
         print(f"Abriendo panel admin con token: {token_jwt}")
-        ui.pushButton_pcontrol.clicked.connect(lambda: webbrowser.open(f"http://localhost:8000/admin?token={token_jwt}"))
+        ui.pushButton_pcontrol.clicked.connect(lambda: webbrowser.open(api.url_panel_admin(token_jwt)))
 
 
 def logout(parent):
@@ -110,7 +113,6 @@ def logout(parent):
     Al confirmar, revoca el token en el backend y abre la página de trigger en el navegador.
     """
     from main import LoginWindow
-    import requests
 
     msg_box = QMessageBox(parent)
     msg_box.setWindowTitle("Cerrar sesión")
@@ -126,19 +128,7 @@ def logout(parent):
 
     if clicked_button == btn_yes:
         # --- Asegurar lógica de logout ---
-        token = getattr(parent, 'token_jwt', None)
-        if token:
-            try:
-                response = requests.post(
-                    "http://localhost:8000/logout",
-                    json={"token": token},
-                    timeout=3
-                )
-                print(f"Logout backend response: {response.status_code} {response.text}")
-            except Exception as e:
-                print(f"Error al llamar /logout: {e}")
-        else:
-            print("No se encontró token_jwt en la ventana principal.")
+        revocar_token_sesion(parent)
         # --- Fin de lógica de seguridad ---
         despedida = QMessageBox(parent)
         despedida.setWindowTitle("Gracias")
@@ -157,24 +147,25 @@ def logout(parent):
         return
 
     elif clicked_button == btn_new_session:
-        token = getattr(parent, 'token_jwt', None)
-        if token:
-            try:
-                response = requests.post(
-                    "http://localhost:8000/logout",
-                    json={"token": token},
-                    timeout=3
-                )
-                print(f"Logout backend response: {response.status_code} {response.text}")
-            except Exception as e:
-                print(f"Error al llamar /logout: {e}")
-        else:
-            print("No se encontró token_jwt en la ventana principal.")
+        revocar_token_sesion(parent)
         parent.hide()
         parent.login_window = LoginWindow()
         parent.login_window.show()
 
 
+def revocar_token_sesion(parent):
+    """Revoca en el backend el token de la ventana indicada, si lo tiene."""
+    token = getattr(parent, 'token_jwt', None)
+    if not token:
+        print("No se encontró token_jwt en la ventana principal.")
+        return
+    try:
+        api.logout(token)
+        print("Logout backend: token revocado")
+    except ErrorAPI as e:
+        print(f"Error al llamar /logout: {e}")
+
+
 def hay_conexion_internet(url="http://www.google.com", timeout=3):
     """Verifica si hay conexión a internet intentando abrir una URL."""
     try:
@@ -230,3 +221,43 @@ def obtener_ruta_informes():
     ruta_por_defecto = os.path.join(escritorio, "historico")
     os.makedirs(ruta_por_defecto, exist_ok=True)
     return ruta_por_defecto
+
+
+def obtener_ruta_resultados(base_folder):
+    """
+    Devuelve la carpeta del almacén de resultados versionado, o None si no está activado.
+
+    Se activa con "resultados_versionados": true en config.json; la carpeta se toma de
+    "ruta_resultados" o, si no se indica, se crea dentro de la carpeta raíz de los rollos.
+    Con el modo desactivado el análisis mueve las originales como siempre.
+    """
+    try:
+        if os.path.exists("config.json"):
+            with open("config.json", "r", encoding="utf-8") as f:
+                config = json.load(f)
+            if config.get("resultados_versionados"):
+                ruta = config.get("ruta_resultados") or os.path.join(base_folder, ".isli_resultados")
+                return os.path.abspath(ruta)
+    except Exception as e:
+        print(f"Error al cargar config.json: {e}")
+    return None
+
+
+def obtener_config_informe():
+    """
+    Devuelve la configuración del informe PDF (clave "informe" de config.json).
+
+    Claves admitidas y valores por defecto:
+        "modo": "auto" ("lista", "cuadricula" o "auto": cuadrícula a partir de
+            "umbral_cuadricula" imágenes).
+        "umbral_cuadricula": 24, "columnas": 4, "filas": 6, "solo_nok": false.
+    """
+    config_informe = {"modo": "auto", "umbral_cuadricula": 24, "columnas": 4, "filas": 6, "solo_nok": False}
+    try:
+        if os.path.exists("config.json"):
+            with open("config.json", "r", encoding="utf-8") as f:
+                config = json.load(f)
+            config_informe.update(config.get("informe") or {})
+    except Exception as e:
+        print(f"Error al cargar config.json: {e}")
+    return config_informe
@@ -0,0 +1,56 @@
+"""Benchmark de serialización del histórico de controles (50.000 filas).
+
+Compara el camino por defecto de FastAPI (`jsonable_encoder` + `JSONResponse`)
+con `RespuestaJSONRapida`. No forma parte de la batería de tests; se ejecuta con:
+
+    python tests/benchmark_json_historico.py [num_filas]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import time
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from respuestas import RespuestaJSONRapida, orjson
+
+
+def generar_filas(num_filas):
+    """Genera filas con la misma forma que las de CONTROL_RESUMEN devueltas por mysql.connector."""
+    inicio = datetime(2024, 1, 1, 6, 0, 0)
+    return [{
+        "id_control": i,
+        "nombre_usuario": f"operario{i % 25}",
+        "fecha_control": inicio + timedelta(minutes=7 * i),
+        "umbral_tamano_defecto": Decimal("0.50") + Decimal(i % 10) / 100,
+        "num_defectos_tolerables_por_tamano": i % 5,
+        "observacs": "Rollo con manchas en el borde" if i % 3 else None,
+        "notas": "Revisar con calidad" if i % 7 == 0 else None,
+        "tiene_informe": i % 2,
+        "resultado_rollo": "nok" if i % 4 == 0 else "ok"
+    } for i in range(num_filas)]
+
+
+def medir(nombre, funcion, repeticiones=5):
+    """Ejecuta la función varias veces y muestra el mejor tiempo."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        cuerpo = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    print(f"{nombre:<45} {mejor * 1000:9.1f} ms  ({len(cuerpo) / 1024:.0f} KiB)")
+    return mejor, cuerpo
+
+
+if __name__ == "__main__":
+    num_filas = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    filas = generar_filas(num_filas)
+    print(f"Serializando {num_filas} filas (orjson {'disponible' if orjson else 'no instalado'})")
+
+    base, cuerpo_base = medir("jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(filas)).body)
+    rapida, cuerpo_rapido = medir("RespuestaJSONRapida", lambda: RespuestaJSONRapida(filas).body)
+
+    assert json.loads(cuerpo_base) == json.loads(cuerpo_rapido), "Las dos salidas no son equivalentes"
+    print(f"Aceleración: x{base / rapida:.1f}")
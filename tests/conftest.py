@@ -0,0 +1,18 @@
+import os
+import sys
+import pytest
+
+# Los tests de Qt no necesitan pantalla
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="session")
+def app_qt():
+    """
+    QApplication única para toda la sesión de tests.
+
+    Qt solo admite una instancia por proceso: si un test creara una QCoreApplication,
+    los que necesitan widgets no podrían crear después su QApplication.
+    """
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication(sys.argv)
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+import io
+import hashlib
+import time
+import tempfile
+from almacen_imagenes import AlmacenImagenes, DesfaseSubidaError, SubidaInvalidaError, SubidaNoEncontradaError
+
+class TestAlmacenImagenes(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rollos = os.path.join(self.tmp.name, "almacen")
+        self.almacen = AlmacenImagenes(self.rollos, os.path.join(self.tmp.name, "datos"))
+        self.contenido = b"imagen-de-prueba" * 1000
+        self.sha = hashlib.sha256(self.contenido).hexdigest()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def subir(self, datos, offset, id_subida):
+        archivo, _ = self.almacen.abrir_fragmento(id_subida, offset)
+        with archivo:
+            archivo.write(datos)
+        return self.almacen.finalizar_si_completa(id_subida)
+
+    def test_subida_reanudable_por_fragmentos(self):
+        """Verifica que una subida cortada se reanuda desde el offset recibido."""
+        sub = self.almacen.iniciar_subida("rollo1", "img_001.png", len(self.contenido), self.sha)
+        self.assertEqual(sub["offset"], 0)
+        self.subir(self.contenido[:5000], 0, sub["id_subida"])
+
+        # Tras un corte, repetir la petición inicial devuelve el mismo ID y el offset alcanzado
+        reanudada = self.almacen.iniciar_subida("rollo1", "img_001.png", len(self.contenido), self.sha)
+        self.assertEqual(reanudada["id_subida"], sub["id_subida"])
+        self.assertEqual(reanudada["offset"], 5000)
+
+        with self.assertRaises(DesfaseSubidaError):
+            self.almacen.abrir_fragmento(sub["id_subida"], 0)
+
+        estado = self.subir(self.contenido[5000:], 5000, sub["id_subida"])
+        self.assertTrue(estado["completada"])
+        with open(os.path.join(self.rollos, "rollo1", "img_001.png"), "rb") as f:
+            self.assertEqual(f.read(), self.contenido)
+
+    def test_deduplicacion_por_hash(self):
+        """Verifica que un contenido ya almacenado no se vuelve a transferir."""
+        self.almacen.guardar_flujo("rollo1", "a.png", io.BytesIO(self.contenido))
+        sub = self.almacen.iniciar_subida("rollo2", "b.png", len(self.contenido), self.sha)
+        self.assertTrue(sub["duplicada"])
+        self.assertTrue(os.path.exists(os.path.join(self.rollos, "rollo2", "b.png")))
+
+    def test_hash_incorrecto_descarta_subida(self):
+        """Verifica que un contenido que no coincide con el hash declarado se rechaza."""
+        sub = self.almacen.iniciar_subida("rollo1", "img.png", 3, self.sha)
+        with self.assertRaises(SubidaInvalidaError):
+            self.subir(b"xyz", 0, sub["id_subida"])
+
+    def test_nombres_con_rutas_rechazados(self):
+        """Verifica que no se aceptan nombres de rollo o archivo con rutas."""
+        with self.assertRaises(SubidaInvalidaError):
+            self.almacen.iniciar_subida("../fuera", "img.png", 1, self.sha)
+
+    def test_purga_subidas_abandonadas(self):
+        """Verifica que solo se borran las subidas parciales sin datos nuevos desde hace tiempo."""
+        otro_sha = hashlib.sha256(b"otra").hexdigest()
+        vieja = self.almacen.iniciar_subida("rollo1", "vieja.png", 10, self.sha)
+        viva = self.almacen.iniciar_subida("rollo1", "viva.png", 10, otro_sha)
+        hace_dos_dias = time.time() - 2 * 24 * 3600
+        for ruta in self.almacen._rutas_subida(vieja["id_subida"]):
+            os.utime(ruta, (hace_dos_dias, hace_dos_dias))
+        # La subida viva tiene el .json antiguo pero acaba de recibir datos
+        os.utime(self.almacen._rutas_subida(viva["id_subida"])[0], (hace_dos_dias, hace_dos_dias))
+        temporal = os.path.join(self.almacen.carpeta_parciales, "abc.tmp")
+        open(temporal, "wb").close()
+        os.utime(temporal, (hace_dos_dias, hace_dos_dias))
+
+        self.assertEqual(self.almacen.purgar_abandonadas(), 3)
+        with self.assertRaises(SubidaNoEncontradaError):
+            self.almacen.estado_subida(vieja["id_subida"])
+        self.assertEqual(self.almacen.estado_subida(viva["id_subida"])["offset"], 0)
+        self.assertFalse(os.path.exists(temporal))
+
+if __name__ == "__main__":
+    unittest.main()
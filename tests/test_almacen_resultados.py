@@ -0,0 +1,79 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import tempfile
+import unittest
+from analisis_defectos.almacen_resultados import AlmacenResultados
+
+ENTRADA = {"originalFileName": "img_0.jpg", "labelSource": "manual", "crops": []}
+
+class TestAlmacenResultados(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.imagen = os.path.join(self.tmp.name, "img_0.jpg")
+        with open(self.imagen, "wb") as f:
+            f.write(b"contenido-imagen")
+        self.almacen = AlmacenResultados(os.path.join(self.tmp.name, ".isli_resultados"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def publicar(self, clave, areas=None):
+        temporal = self.almacen.preparar(clave)
+        with open(os.path.join(temporal, "img_0.jpg"), "wb") as f:
+            f.write(b"anotada")
+        return self.almacen.confirmar(clave, temporal, "img_0.jpg", areas or [0.5], ["punto-negro"])
+
+    def test_clave_depende_de_contenido_y_parametros(self):
+        """Verifica que la clave cambia con el contenido de la imagen y con los parámetros."""
+        clave = self.almacen.clave_resultado(self.imagen, ENTRADA, 1.0, 0.13)
+        self.assertEqual(clave, self.almacen.clave_resultado(self.imagen, ENTRADA, 1.0, 0.13))
+        self.assertNotEqual(clave, self.almacen.clave_resultado(self.imagen, ENTRADA, 2.0, 0.13))
+        with open(self.imagen, "ab") as f:
+            f.write(b"x")
+        self.assertNotEqual(clave, self.almacen.clave_resultado(self.imagen, ENTRADA, 1.0, 0.13))
+
+    def test_resultado_publicado_se_reutiliza(self):
+        """Verifica que un resultado confirmado se recupera con su ruta procesada y sin temporales."""
+        clave = self.almacen.clave_resultado(self.imagen, ENTRADA, 1.0, 0.13)
+        self.assertIsNone(self.almacen.obtener(clave))
+        self.publicar(clave)
+
+        resultado = self.almacen.obtener(clave)
+        self.assertEqual(resultado["areas_mm2"], [0.5])
+        self.assertEqual(resultado["tipos"], ["punto-negro"])
+        self.assertTrue(os.path.isfile(resultado["ruta_procesada"]))
+        self.assertFalse(any(n.startswith(".tmp") for n in os.listdir(self.almacen.dir_objetos)))
+
+    def test_confirmar_clave_existente_conserva_la_primera(self):
+        """Verifica que publicar dos veces la misma clave no falla y conserva el resultado existente."""
+        clave = self.almacen.clave_resultado(self.imagen, ENTRADA, 1.0, 0.13)
+        self.publicar(clave, [0.5])
+        resultado = self.publicar(clave, [9.9])
+        self.assertEqual(resultado["areas_mm2"], [0.5])
+
+    def test_versiones_y_restablecer(self):
+        """Verifica que cada análisis crea una versión nueva y que restablecer solo quita la vigente."""
+        clave = self.almacen.clave_resultado(self.imagen, ENTRADA, 1.0, 0.13)
+        resultado = self.publicar(clave)
+        self.assertIsNone(self.almacen.version_actual("rollo_a"))
+
+        self.assertEqual(self.almacen.registrar_version("rollo_a", [resultado], {"area_umbral": 1.0}), 1)
+        self.assertEqual(self.almacen.registrar_version("rollo_a", [resultado], {"area_umbral": 1.0}), 2)
+        self.assertEqual(self.almacen.version_actual("rollo_a"), 2)
+        self.assertEqual(self.almacen.rollos_con_version_actual(), ["rollo_a"])
+
+        manifiesto = self.almacen.cargar_version("rollo_a")
+        self.assertEqual(manifiesto["version"], 2)
+        self.assertEqual(manifiesto["imagenes"][0]["ruta_procesada"], resultado["ruta_procesada"])
+
+        self.almacen.restablecer("rollo_a")
+        self.assertIsNone(self.almacen.version_actual("rollo_a"))
+        self.assertEqual(self.almacen.rollos_con_version_actual(), [])
+        self.assertEqual(self.almacen.versiones("rollo_a"), [1, 2])
+        self.assertIsNotNone(self.almacen.obtener(clave))
+        self.assertTrue(os.path.isfile(self.imagen))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
 import unittest
 from tests.auth_testable import crear_token, verificar_contrasena, hashear_contrasena
 from jose import jwt
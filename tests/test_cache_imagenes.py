@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import tempfile
+import threading
+import time
+import unittest
+import pytest
+from unittest.mock import patch
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtGui import QImage, QColor
+import cache_imagenes
+from cache_imagenes import CacheImagenes, PrecargadorImagenes, cargar_imagen_escalada
+
+@pytest.mark.usefixtures("app_qt")
+class TestCacheImagenes(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rutas = []
+        for i in range(3):
+            imagen = QImage(400, 200, QImage.Format_RGB32)
+            imagen.fill(QColor(i * 50, 0, 0))
+            ruta = os.path.join(self.tmp.name, f"img_{i}.png")
+            imagen.save(ruta)
+            self.rutas.append(ruta)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_escalado_mantiene_proporcion(self):
+        """Verifica que la imagen se reduce para caber en el visor sin deformarse."""
+        imagen = cargar_imagen_escalada(self.rutas[0], 100, 100)
+        self.assertEqual((imagen.width(), imagen.height()), (100, 50))
+
+    def test_lru_expulsa_la_menos_usada(self):
+        """Verifica que la caché respeta su tamaño máximo expulsando la entrada más antigua."""
+        cache = CacheImagenes(max_entradas=2)
+        for ruta in self.rutas[:2]:
+            cache.guardar(ruta, 100, 100, cargar_imagen_escalada(ruta, 100, 100))
+        cache.obtener(self.rutas[0], 100, 100)
+        cache.guardar(self.rutas[2], 100, 100, cargar_imagen_escalada(self.rutas[2], 100, 100))
+        self.assertIsNotNone(cache.obtener(self.rutas[0], 100, 100))
+        self.assertIsNone(cache.obtener(self.rutas[1], 100, 100))
+
+    def test_imagen_escalada_no_sirve_para_visor_mayor(self):
+        """Verifica que una imagen reducida no se reutiliza si el visor ha crecido."""
+        cache = CacheImagenes()
+        cache.guardar(self.rutas[0], 100, 100, cargar_imagen_escalada(self.rutas[0], 100, 100))
+        self.assertIsNotNone(cache.obtener(self.rutas[0], 80, 80))
+        self.assertIsNone(cache.obtener(self.rutas[0], 300, 300))
+
+    def test_precarga_en_segundo_plano(self):
+        """Verifica que las imágenes precargadas quedan en caché listas para mostrarse."""
+        precargador = PrecargadorImagenes()
+        precargador.precargar(self.rutas, 200, 200)
+        precargador.pool.waitForDone()
+        self.assertEqual(len(precargador.cache), 3)
+        self.assertFalse(precargador.obtener(self.rutas[1], 200, 200).isNull())
+
+    def test_obtener_espera_a_la_precarga_en_curso(self):
+        """Verifica que un fallo de caché no decodifica en el hilo que llama y la imagen llega por señal."""
+        precargador = PrecargadorImagenes()
+        liberar = threading.Event()
+        hilos = []
+
+        def cargar_lento(ruta, ancho, alto):
+            hilos.append(threading.current_thread())
+            liberar.wait(5)
+            return cargar_imagen_escalada(ruta, ancho, alto)
+
+        listas = []
+        precargador.imagen_lista.connect(lambda ruta, imagen: listas.append((ruta, imagen)))
+        with patch.object(cache_imagenes, "cargar_imagen_escalada", cargar_lento):
+            precargador.precargar(self.rutas[:1], 200, 200)
+            # La decodificación sigue en curso: obtener no la repite
+            self.assertIsNone(precargador.obtener(self.rutas[0], 200, 200))
+            ausente = os.path.join(self.tmp.name, "no_existe.png")
+            self.assertIsNone(precargador.obtener(ausente, 200, 200))
+            liberar.set()
+            precargador.pool.waitForDone()
+            fin = time.time() + 5
+            while len(listas) < 2 and time.time() < fin:
+                QCoreApplication.processEvents()
+
+        self.assertEqual(len(hilos), 2)
+        self.assertNotIn(threading.main_thread(), hilos)
+        imagenes = dict(listas)
+        self.assertEqual((imagenes[self.rutas[0]].width(), imagenes[self.rutas[0]].height()), (200, 100))
+        self.assertTrue(imagenes[ausente].isNull())
+        self.assertIs(precargador.obtener(self.rutas[0], 200, 200), precargador.cache.obtener(self.rutas[0], 200, 200))
+
+if __name__ == "__main__":
+    unittest.main()
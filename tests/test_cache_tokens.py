@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+import time
+from cache import CacheExpiracionLRU
+
+class TestCacheExpiracionLRU(unittest.TestCase):
+
+    def test_descarta_entrada_caducada(self):
+        """Verifica que una entrada deja de devolverse al llegar su instante de caducidad."""
+        cache = CacheExpiracionLRU(max_entradas=10)
+        cache.guardar("vigente", {"sub": "1"}, time.time() + 60)
+        cache.guardar("caducado", {"sub": "2"}, time.time() - 1)
+        self.assertEqual(cache.obtener("vigente"), {"sub": "1"})
+        self.assertIsNone(cache.obtener("caducado"))
+        self.assertEqual(len(cache), 1)
+
+    def test_expulsa_la_menos_usada(self):
+        """Verifica que al superar el máximo se descarta la entrada usada hace más tiempo."""
+        cache = CacheExpiracionLRU(max_entradas=2)
+        exp = time.time() + 60
+        cache.guardar("a", 1, exp)
+        cache.guardar("b", 2, exp)
+        cache.obtener("a")
+        cache.guardar("c", 3, exp)
+        self.assertIsNone(cache.obtener("b"))
+        self.assertEqual(cache.obtener("a"), 1)
+        self.assertEqual(cache.obtener("c"), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import tempfile
+import unittest
+from catalogo_rollos import CatalogoRollos
+
+class TestCatalogoRollos(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = self.tmp.name
+        self.crear_rollo("rollo_a", 2)
+        self.crear_rollo("rollo_b", 5)
+        open(os.path.join(self.base, "formaspack_test_black_dots.json"), "w").close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def crear_rollo(self, nombre, num_imagenes):
+        ruta = os.path.join(self.base, nombre)
+        os.makedirs(ruta, exist_ok=True)
+        for i in range(num_imagenes):
+            open(os.path.join(ruta, f"img_{i}.jpg"), "w").close()
+        open(os.path.join(ruta, "notas.txt"), "w").close()
+        return ruta
+
+    def test_cuenta_solo_imagenes_de_carpetas(self):
+        """Verifica que se catalogan las subcarpetas y se cuentan solo sus imágenes."""
+        catalogo = CatalogoRollos(self.base)
+        self.assertFalse(catalogo.cargado)
+        self.assertTrue(catalogo.escanear())
+        self.assertEqual(catalogo.num_imagenes("rollo_a"), 2)
+        self.assertEqual(catalogo.num_imagenes("rollo_b"), 5)
+        self.assertIsNone(catalogo.num_imagenes("formaspack_test_black_dots.json"))
+        self.assertEqual(catalogo.rollos_validos(3), ["rollo_a"])
+        self.assertEqual(catalogo.rollos_validos(10), ["rollo_a", "rollo_b"])
+
+    def test_reescaneo_sin_cambios(self):
+        """Un segundo escaneo sin cambios en disco no modifica el catálogo."""
+        catalogo = CatalogoRollos(self.base)
+        catalogo.escanear()
+        self.assertFalse(catalogo.escanear())
+
+    def test_recuenta_rollos_modificados(self):
+        """Verifica que se detectan rollos nuevos, borrados y carpetas con mtime distinto."""
+        catalogo = CatalogoRollos(self.base)
+        catalogo.escanear()
+        ruta_a = os.path.join(self.base, "rollo_a")
+        open(os.path.join(ruta_a, "img_extra.png"), "w").close()
+        os.utime(ruta_a, ns=(0, 1))  # mtime distinto aunque el sistema de archivos tenga poca resolución
+        self.crear_rollo("rollo_c", 1)
+        os.remove(os.path.join(self.base, "rollo_b", "img_0.jpg"))
+        os.remove(os.path.join(self.base, "rollo_b", "img_1.jpg"))
+        os.utime(os.path.join(self.base, "rollo_b"), ns=(0, 2))
+        self.assertTrue(catalogo.escanear())
+        self.assertEqual(catalogo.num_imagenes("rollo_a"), 3)
+        self.assertEqual(catalogo.num_imagenes("rollo_b"), 3)
+        self.assertEqual(catalogo.num_imagenes("rollo_c"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
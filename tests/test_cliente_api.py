@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import unittest
+from unittest.mock import MagicMock
+from cliente_api import ClienteAPI, ErrorAPI, MAX_CONTROLES_LOTE
+
+def respuesta_falsa(status_code, datos=None, cabeceras=None):
+    respuesta = MagicMock()
+    respuesta.status_code = status_code
+    respuesta.json.return_value = datos
+    respuesta.headers = cabeceras or {}
+    respuesta.text = str(datos)
+    return respuesta
+
+class TestClienteAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.cliente = ClienteAPI(base_url="http://servidor:8000/")
+        self.cliente.sesion.request = MagicMock()
+
+    def test_historico_revalida_con_etag(self):
+        """Verifica que una segunda consulta envía If-None-Match y reutiliza los datos ante un 304."""
+        filas = [{"id_control": 1}]
+        self.cliente.sesion.request.side_effect = [
+            respuesta_falsa(200, filas, {"ETag": 'W/"v1"'}),
+            respuesta_falsa(304)
+        ]
+        self.assertEqual(self.cliente.historico(usuario="ana"), filas)
+        self.assertEqual(self.cliente.historico(usuario="ana"), filas)
+        llamada = self.cliente.sesion.request.call_args_list[1]
+        self.assertEqual(llamada.args[1], "http://servidor:8000/controles/historico")
+        self.assertEqual(llamada.kwargs["headers"], {"If-None-Match": 'W/"v1"'})
+        self.assertIn("timeout", llamada.kwargs)
+
+    def test_error_con_detalle_del_backend(self):
+        """Verifica que un error HTTP se traduce en ErrorAPI con el 'detail' del backend."""
+        self.cliente.sesion.request.return_value = respuesta_falsa(401, {"detail": "Credenciales incorrectas"})
+        with self.assertRaises(ErrorAPI) as ctx:
+            self.cliente.login("ana@isli.com", "mala")
+        self.assertEqual(ctx.exception.status_code, 401)
+        self.assertEqual(ctx.exception.detalle, "Credenciales incorrectas")
+
+    def test_login_guarda_token(self):
+        """Verifica que tras el login las peticiones llevan la cabecera Authorization."""
+        self.cliente.sesion.request.return_value = respuesta_falsa(200, {"access_token": "abc", "rol": "operario"})
+        self.cliente.login("ana@isli.com", "buena")
+        self.assertEqual(self.cliente.sesion.headers["Authorization"], "Bearer abc")
+
+    def test_registrar_informes_por_bloques(self):
+        """Verifica que los informes se registran en bloques de MAX_CONTROLES_LOTE y se combinan los resultados."""
+        informes = [{"id_control": i, "ruta_pdf": f"{i}.pdf", "generado_por": 1} for i in range(MAX_CONTROLES_LOTE + 1)]
+        self.cliente.sesion.request.side_effect = [
+            respuesta_falsa(200, {"registrados": list(range(MAX_CONTROLES_LOTE - 1)), "omitidos": [MAX_CONTROLES_LOTE - 1]}),
+            respuesta_falsa(200, {"registrados": [MAX_CONTROLES_LOTE], "omitidos": []})
+        ]
+        resultado = self.cliente.registrar_informes(informes)
+        self.assertEqual(self.cliente.sesion.request.call_count, 2)
+        self.assertEqual(len(resultado["registrados"]), MAX_CONTROLES_LOTE)
+        self.assertEqual(resultado["omitidos"], [MAX_CONTROLES_LOTE - 1])
+        segunda = self.cliente.sesion.request.call_args_list[1]
+        self.assertEqual(segunda.kwargs["json"], {"informes": informes[MAX_CONTROLES_LOTE:]})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+import time
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from jose import jwt
+from starlette.requests import Request
+from seguridad import SECRET_KEY, ALGORITHM
+from schemas.schemas_controles import InformeControlInput, InformesControlInput, DetalleControlesInput
+from routers import controles
+
+class CursorFalso:
+    """Registra las sentencias y devuelve, en orden, los resultados preparados para cada fetchall."""
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def execute(self, sql, params=None):
+        self.conexion.sentencias.append((" ".join(sql.split()), params))
+
+    def executemany(self, sql, filas):
+        for params in filas:
+            self.execute(sql, params)
+
+    def fetchall(self):
+        return self.conexion.resultados.pop(0)
+
+    def close(self):
+        pass
+
+class ConexionFalsa:
+    def __init__(self, resultados=None):
+        self.resultados = list(resultados or [])
+        self.sentencias = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, dictionary=False):
+        return CursorFalso(self)
+
+    def commit(self):
+        # Para comprobar qué sentencias entran en la transacción
+        self.sentencias.append(("COMMIT", None))
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+def informe(id_control):
+    return InformeControlInput(
+        id_control=id_control, ruta_pdf=f"informe_{id_control}.pdf", generado_por=1, fecha_generacion=datetime(2025, 1, 2), notas=None
+    )
+
+def peticion_get(ruta, query=b""):
+    return Request({"type": "http", "method": "GET", "path": ruta, "query_string": query, "headers": []})
+
+class TestControles(unittest.TestCase):
+
+    def usar_conexion(self, conexion):
+        parche = patch.object(controles, "get_connection", return_value=conexion)
+        parche.start()
+        self.addCleanup(parche.stop)
+        return conexion
+
+    def test_escapar_like(self):
+        """Verifica que los comodines de LIKE y la barra invertida se buscan de forma literal."""
+        self.assertEqual(controles.escapar_like("ana"), "ana")
+        self.assertEqual(controles.escapar_like("ana_m%"), "ana\\_m\\%")
+        self.assertEqual(controles.escapar_like("a\\b"), "a\\\\b")
+        self.assertEqual(controles.escapar_like("\\%"), "\\\\\\%")
+
+    def test_historico_filtra_usuario_por_prefijo(self):
+        """Verifica que el filtro de usuario es un LIKE por prefijo con el texto escapado."""
+        conexion = self.usar_conexion(ConexionFalsa([[]]))
+        respuesta = controles.obtener_historico_controles(
+            peticion_get("/controles/historico", b"usuario=ana_m%25"),
+            max_defectos=None, max_dim=None, usuario="ana_m%", desde=None, hasta=None, q=None
+        )
+        sql, params = conexion.sentencias[0]
+        self.assertIn("FROM CONTROL_RESUMEN c", sql)
+        self.assertIn("AND c.nombre_usuario LIKE %s", sql)
+        self.assertEqual(params, ["ana\\_m\\%%"])
+        self.assertEqual(json.loads(respuesta.body), [])
+
+    def test_busqueda_fulltext(self):
+        """Verifica la expresión booleana generada a partir del texto libre de búsqueda."""
+        self.assertEqual(controles.construir_busqueda_fulltext("rollo ana"), '+"rollo" +"ana"')
+        # Los operadores del usuario no alteran la consulta
+        self.assertEqual(controles.construir_busqueda_fulltext('+ana -"rollo" (xx~yy) <zz> @12 pe*'), '+"ana" +"rollo" +"xx" +"yy" +"zz" +"12" +"pe"')
+        self.assertEqual(controles.construir_busqueda_fulltext('R1-12'), '+"R1" +"12"')
+        for vacio in ("", "   ", "\t\n", '+-<>()~*"@', " * ) "):
+            self.assertIsNone(controles.construir_busqueda_fulltext(vacio))
+
+    def test_busqueda_fulltext_terminos_cortos(self):
+        """Verifica que los términos más cortos que el n-grama se buscan como prefijo."""
+        with patch.object(controles, "NGRAM_TOKEN_SIZE", 2):
+            self.assertEqual(controles.construir_busqueda_fulltext("a rollo b"), '+a* +"rollo" +b*')
+        with patch.object(controles, "NGRAM_TOKEN_SIZE", 3):
+            self.assertEqual(controles.construir_busqueda_fulltext("ab abc"), '+ab* +"abc"')
+
+    def test_actualizar_resumen_en_la_misma_transaccion(self):
+        """Verifica que registrar un informe recalcula CONTROL_RESUMEN antes del commit."""
+        conexion = self.usar_conexion(ConexionFalsa())
+        informe = InformeControlInput(
+            id_control=5, ruta_pdf="informe_5.pdf", generado_por=1, fecha_generacion=datetime(2025, 1, 2), notas=None
+        )
+        controles.guardar_informe_control(informe)
+        sentencias = [sql for sql, _ in conexion.sentencias]
+        self.assertTrue(sentencias[0].startswith("INSERT INTO INFORME_CONTROL"))
+        self.assertTrue(sentencias[1].startswith("REPLACE INTO CONTROL_RESUMEN"))
+        self.assertEqual(conexion.sentencias[1][1], (5,))
+        self.assertEqual(sentencias[2], "COMMIT")
+
+    def test_informes_lote_omite_existentes(self):
+        """Verifica que el registro por lotes omite los controles con informe y no duplica IDs."""
+        conexion = self.usar_conexion(ConexionFalsa([[(2,)]]))
+        with patch.object(controles.versiones_tablas, "incrementar") as incrementar:
+            respuesta = controles.guardar_informes_control(InformesControlInput(informes=[informe(1), informe(2), informe(3), informe(1)]))
+        self.assertEqual(respuesta["registrados"], [1, 3])
+        self.assertEqual(respuesta["omitidos"], [2])
+
+        sql, params = conexion.sentencias[0]
+        self.assertIn("FROM INFORME_CONTROL WHERE id_control IN (%s, %s, %s)", sql)
+        self.assertEqual(params, [1, 2, 3])
+        inserciones = [params for sql, params in conexion.sentencias if sql.startswith("INSERT INTO INFORME_CONTROL")]
+        self.assertEqual([params[0] for params in inserciones], [1, 3])
+        self.assertEqual(inserciones[0][4], "")
+        resumenes = [params for sql, params in conexion.sentencias if sql.startswith("REPLACE INTO CONTROL_RESUMEN")]
+        self.assertEqual(resumenes, [(1,), (3,)])
+        self.assertEqual(conexion.sentencias[-1], ("COMMIT", None))
+        incrementar.assert_called_once_with("CONTROL_RESUMEN")
+
+    def test_informes_lote_todos_existentes(self):
+        """Verifica que reintentar un lote ya registrado no inserta nada ni invalida el histórico."""
+        conexion = self.usar_conexion(ConexionFalsa([[(1,), (2,)]]))
+        with patch.object(controles.versiones_tablas, "incrementar") as incrementar:
+            respuesta = controles.guardar_informes_control(InformesControlInput(informes=[informe(2), informe(1)]))
+        self.assertEqual(respuesta["registrados"], [])
+        self.assertEqual(respuesta["omitidos"], [1, 2])
+        self.assertEqual([sql for sql, _ in conexion.sentencias][1:], ["COMMIT"])
+        incrementar.assert_not_called()
+
+    def test_lotes_vacios_y_demasiado_grandes(self):
+        """Verifica que un lote vacío no abre conexión y que uno mayor que MAX_CONTROLES_LOTE se rechaza."""
+        with patch.object(controles, "get_connection") as get_connection:
+            self.assertEqual(controles.guardar_informes_control(InformesControlInput(informes=[]))["registrados"], [])
+            self.assertEqual(controles.obtener_detalle_controles(DetalleControlesInput(ids=[])), [])
+            with patch.object(controles, "MAX_CONTROLES_LOTE", 2):
+                # Los IDs repetidos no cuentan para el límite
+                with self.assertRaises(HTTPException) as ctx:
+                    controles.guardar_informes_control(InformesControlInput(informes=[informe(1), informe(2), informe(3)]))
+                self.assertEqual(ctx.exception.status_code, 400)
+                with self.assertRaises(HTTPException) as ctx:
+                    controles.obtener_detalle_controles(DetalleControlesInput(ids=[1, 2, 3]))
+                self.assertEqual(ctx.exception.status_code, 400)
+            get_connection.assert_not_called()
+
+        conexion = self.usar_conexion(ConexionFalsa([[], []]))
+        with patch.object(controles, "MAX_CONTROLES_LOTE", 2):
+            self.assertEqual(controles.obtener_detalle_controles(DetalleControlesInput(ids=[1, 2, 1, 2])), [])
+        self.assertEqual(conexion.sentencias[0][1], [1, 2])
+
+    def test_detalle_controles_en_orden_solicitado(self):
+        """Verifica que el detalle agrupa las imágenes por control y respeta el orden pedido."""
+        control = lambda id_control: {"id_control": id_control, "nombre_usuario": "ana", "ruta_local_rollo": f"/rollos/{id_control}"}
+        imagen = lambda id_control, nombre: {
+            "id_control": id_control, "nombre_archivo": nombre, "max_dim_defecto_medido": 1.5, "clasificacion": "nok", "tipo_defecto": "mancha"
+        }
+        conexion = self.usar_conexion(ConexionFalsa([
+            [control(4), control(9)],
+            [imagen(4, "a.png"), imagen(4, "b.png"), imagen(9, "c.png")]
+        ]))
+        detalle = controles.obtener_detalle_controles(DetalleControlesInput(ids=[9, 7, 4, 9]))
+        self.assertEqual([d["id_control"] for d in detalle], [9, 4])
+        self.assertEqual([i["nombre_archivo"] for i in detalle[1]["imagenes"]], ["a.png", "b.png"])
+        self.assertEqual(detalle[0]["imagenes"], [{"nombre_archivo": "c.png", "max_dim_defecto_medido": 1.5, "clasificacion": "nok", "tipo_defecto": "mancha"}])
+        self.assertEqual(detalle[0]["ruta_local_rollo"], "/rollos/9")
+        self.assertEqual([params for _, params in conexion.sentencias], [[9, 7, 4], [9, 7, 4]])
+
+    def test_endpoints_exigen_token(self):
+        """Verifica que /controles exige un token válido salvo la solicitud de cambio de contraseña."""
+        self.usar_conexion(ConexionFalsa([[]]))
+        app = FastAPI()
+        app.include_router(controles.router)
+        app.include_router(controles.router_publico)
+        cliente = TestClient(app)
+
+        self.assertEqual(cliente.get("/controles/historico").status_code, 401)
+        self.assertEqual(cliente.post("/controles/detalle", json={"ids": [1]}).status_code, 401)
+        self.assertEqual(cliente.post("/controles/informe", json={"informes": []}).status_code, 401)
+        invalido = {"Authorization": "Bearer no-es-un-token"}
+        self.assertEqual(cliente.get("/controles/historico", headers=invalido).status_code, 401)
+
+        token = jwt.encode({"sub": "1", "rol": "operario", "exp": int(time.time()) + 60}, SECRET_KEY, algorithm=ALGORITHM)
+        respuesta = cliente.get("/controles/historico", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(respuesta.status_code, 200)
+
+        publicas = {ruta.path for ruta in app.routes if ruta.path.startswith("/controles") and not any(
+            dependencia.call is controles.usuario_actual for dependencia in ruta.dependant.dependencies
+        )}
+        self.assertIn("/controles/solicitud_password", publicas)
+        self.assertNotIn("/controles/historico", publicas)
+
+if __name__ == "__main__":
+    unittest.main()
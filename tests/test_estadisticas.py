@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+from estadisticas import tasa_nok, percentiles_desde_histograma, conteo_por_tipo
+from cache import CacheTTL
+
+class TestEstadisticas(unittest.TestCase):
+
+    def test_percentiles_desde_histograma(self):
+        """Verifica que los percentiles del histograma coinciden con los de la lista expandida."""
+        histograma = [(0.5, 50), (1.0, 40), (3.0, 9), (10.0, 1)]
+        p = percentiles_desde_histograma(histograma)
+        self.assertEqual(p["p50"], 0.5)
+        self.assertEqual(p["p75"], 1.0)
+        self.assertEqual(p["p95"], 3.0)
+        self.assertEqual(p["p99"], 3.0)
+        self.assertEqual(percentiles_desde_histograma([]), {})
+
+    def test_tasa_nok(self):
+        """Verifica el cálculo de la tasa NOK por grupo."""
+        filas = [{"usuario": "ana", "total": 4, "nok": 1}, {"usuario": "luis", "total": 0, "nok": None}]
+        resultado = tasa_nok(filas, "usuario")
+        self.assertEqual(resultado[0]["tasa_nok"], 0.25)
+        self.assertEqual(resultado[1]["tasa_nok"], 0.0)
+
+    def test_conteo_por_tipo_reparte_combinaciones(self):
+        """Verifica que las combinaciones de tipos se reparten entre cada tipo individual."""
+        filas = [
+            {"tipo_defecto": "punto-negro, pegote-cascarilla", "imagenes": 2},
+            {"tipo_defecto": "punto-negro", "imagenes": 3},
+            {"tipo_defecto": "—", "imagenes": 5},
+        ]
+        self.assertEqual(conteo_por_tipo(filas), {"punto-negro": 5, "pegote-cascarilla": 2, "sin-defecto": 5})
+
+    def test_cache_invalidacion(self):
+        """Verifica que la caché reutiliza el valor hasta que se invalida."""
+        cache = CacheTTL(ttl=60)
+        llamadas = []
+        calcular = lambda: llamadas.append(1) or len(llamadas)
+        self.assertEqual(cache.obtener_o_calcular("k", calcular), 1)
+        self.assertEqual(cache.obtener_o_calcular("k", calcular), 1)
+        cache.invalidar()
+        self.assertEqual(cache.obtener_o_calcular("k", calcular), 2)
+
+    def test_cache_no_guarda_valor_invalidado_durante_el_calculo(self):
+        """Verifica que un valor calculado antes de una invalidación no se guarda al terminar."""
+        cache = CacheTTL(ttl=60)
+        llamadas = []
+
+        def calcular_con_escritura():
+            # Una escritura concurrente invalida la caché mientras se calcula
+            llamadas.append(1)
+            cache.invalidar()
+            return "antiguo"
+
+        self.assertEqual(cache.obtener_o_calcular("k", calcular_con_escritura), "antiguo")
+        self.assertIsNone(cache.obtener("k"))
+        self.assertEqual(cache.obtener_o_calcular("k", lambda: "nuevo"), "nuevo")
+        self.assertEqual(cache.obtener("k"), "nuevo")
+        self.assertEqual(len(llamadas), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,7 @@ class TestGeneracionInformePDF(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.app = QApplication(sys.argv)
+        cls.app = QApplication.instance() or QApplication(sys.argv)
 
     def test_generar_pdf(self):
         """
@@ -0,0 +1,25 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+import asyncio
+import unittest
+from hashing import verificar_contrasena, hashear_contrasena, verificar_contrasena_async, HashInvalidoError
+
+class TestHashing(unittest.TestCase):
+
+    def test_verificar_contrasena(self):
+        """Verifica que solo la contraseña correcta coincide con su hash."""
+        hash_guardado = hashear_contrasena("secreta")
+        self.assertTrue(verificar_contrasena("secreta", hash_guardado))
+        self.assertFalse(verificar_contrasena(b"otra", hash_guardado.encode("utf-8")))
+
+    def test_hash_invalido(self):
+        """Verifica que un hash corrupto se notifica con HashInvalidoError, también desde el pool."""
+        with self.assertRaises(HashInvalidoError):
+            verificar_contrasena("secreta", "no-es-un-hash")
+        with self.assertRaises(HashInvalidoError):
+            asyncio.run(verificar_contrasena_async("secreta", "no-es-un-hash"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import tempfile
+import unittest
+import pytest
+from PySide6.QtGui import QImage, QImageReader, QColor
+from frontend.utils_informes import (
+    preparar_imagen_informe, preparar_imagenes_informe, podar_cache_informes,
+    estadisticas_informe, construir_pdf_cuadricula
+)
+
+@pytest.mark.usefixtures("app_qt")
+class TestImagenesInforme(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmp.name, "cache")
+        self.ruta = self.crear_imagen("img_0.png", 4000, 2000)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def crear_imagen(self, nombre, ancho, alto):
+        imagen = QImage(ancho, alto, QImage.Format_RGB32)
+        imagen.fill(QColor(120, 30, 30))
+        ruta = os.path.join(self.tmp.name, nombre)
+        imagen.save(ruta)
+        return ruta
+
+    def test_reduce_a_la_resolucion_del_visor(self):
+        """Verifica que la copia es un JPEG con la resolución justa para el visor (200x100 pt a 144 DPI)."""
+        reducida = preparar_imagen_informe(self.ruta, 200, 100, dpi=144, carpeta_cache=self.cache)
+        self.assertTrue(reducida.endswith(".jpg"))
+        tamano = QImageReader(reducida).size()
+        self.assertEqual((tamano.width(), tamano.height()), (400, 200))
+        self.assertLess(os.path.getsize(reducida), os.path.getsize(self.ruta))
+
+    def test_no_amplia_imagenes_pequenas(self):
+        """Verifica que una imagen menor que el visor conserva su tamaño."""
+        pequena = self.crear_imagen("pequena.png", 100, 50)
+        tamano = QImageReader(preparar_imagen_informe(pequena, 200, 100, carpeta_cache=self.cache)).size()
+        self.assertEqual((tamano.width(), tamano.height()), (100, 50))
+
+    def test_imagenes_identicas_comparten_copia(self):
+        """Verifica que la misma imagen (aunque esté en otra ruta) reutiliza la copia de la caché."""
+        duplicada = self.crear_imagen("img_1.png", 4000, 2000)
+        preparadas = preparar_imagenes_informe([self.ruta, duplicada, "no_existe.png"], carpeta_cache=self.cache)
+        self.assertEqual(set(preparadas), {self.ruta, duplicada})
+        self.assertEqual(preparadas[self.ruta], preparadas[duplicada])
+        self.assertEqual(len(os.listdir(self.cache)), 1)
+
+    def test_poda_la_cache(self):
+        """Verifica que la poda deja la caché por debajo del límite."""
+        preparar_imagen_informe(self.ruta, 200, 100, carpeta_cache=self.cache)
+        podar_cache_informes(self.cache, max_bytes=0)
+        self.assertEqual(os.listdir(self.cache), [])
+
+    def imagenes_rollo(self, total, cada_nok=3):
+        return [
+            {
+                "nombre_archivo": f"img_{i}.png",
+                "ruta_procesada": self.ruta,
+                "clasificacion": "nok" if i % cada_nok == 0 else "ok",
+                "mayor_defecto": float(i),
+                "tipos": ["punto-negro"] if i % 2 else []
+            }
+            for i in range(total)
+        ]
+
+    def test_estadisticas_informe(self):
+        """Verifica los recuentos, la media y la lista de mayores defectos del resumen."""
+        estadisticas = estadisticas_informe(self.imagenes_rollo(30))
+        self.assertEqual((estadisticas["total"], estadisticas["nok"], estadisticas["ok"]), (30, 10, 20))
+        self.assertEqual(estadisticas["mayor_defecto"], 29.0)
+        self.assertAlmostEqual(estadisticas["media_mayor_defecto"], 14.5)
+        self.assertEqual(estadisticas["por_tipo"], {"punto-negro": 15})
+        self.assertEqual(estadisticas["mayores"][0], (29.0, "img_29.png"))
+        self.assertEqual(len(estadisticas["mayores"]), 10)
+
+    def test_cuadricula_pagina_las_miniaturas(self):
+        """Verifica que 30 imágenes en cuadrícula 4x6 ocupan resumen + 2 páginas y solo NOK, resumen + 1."""
+        ruta_pdf = os.path.join(self.tmp.name, "informe.pdf")
+        construir_pdf_cuadricula(1, "Operario", "operario", self.imagenes_rollo(30), 1.0, 3, ruta_pdf, carpeta_cache=self.cache)
+        with open(ruta_pdf, "rb") as f:
+            self.assertIn(b"/Count 3", f.read())
+
+        construir_pdf_cuadricula(1, "Operario", "operario", self.imagenes_rollo(30), 1.0, 3, ruta_pdf, solo_nok=True, carpeta_cache=self.cache)
+        with open(ruta_pdf, "rb") as f:
+            self.assertIn(b"/Count 2", f.read())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from informes_lote import resolver_ruta_imagen, imagenes_desde_detalle
+import historico_controles_app
+from historico_controles_app import HistoricoControlesWindow
+
+class TestInformesLote(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rollo = os.path.join(self.tmp.name, "rollo_1")
+        os.makedirs(os.path.join(self.rollo, "procesado"))
+        os.makedirs(os.path.join(self.rollo, "originales"))
+        for ruta in (
+            os.path.join(self.rollo, "procesado", "a.png"),
+            os.path.join(self.rollo, "originales", "a.png"),
+            os.path.join(self.rollo, "b.png")
+        ):
+            open(ruta, "wb").close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_resolver_ruta_imagen(self):
+        """Verifica que se prefiere la imagen procesada y, si no existe, la original."""
+        self.assertEqual(resolver_ruta_imagen(self.rollo, "a.png"), os.path.join(self.rollo, "procesado", "a.png"))
+        self.assertEqual(resolver_ruta_imagen(self.rollo, "b.png"), os.path.join(self.rollo, "b.png"))
+        self.assertIsNone(resolver_ruta_imagen(self.rollo, "c.png"))
+        self.assertIsNone(resolver_ruta_imagen(None, "a.png"))
+
+    def test_imagenes_desde_detalle(self):
+        """Verifica la conversión del detalle del backend al formato del informe en cuadrícula."""
+        detalle = {
+            "id_control": 7,
+            "ruta_local_rollo": self.rollo,
+            "imagenes": [
+                {"nombre_archivo": "a.png", "max_dim_defecto_medido": "1.50", "clasificacion": "nok", "tipo_defecto": "mancha, arruga"},
+                {"nombre_archivo": "c.png", "max_dim_defecto_medido": None, "clasificacion": "ok", "tipo_defecto": "—"}
+            ]
+        }
+        imagenes = imagenes_desde_detalle(detalle)
+        self.assertEqual(imagenes[0]["tipos"], ["mancha", "arruga"])
+        self.assertEqual(imagenes[0]["mayor_defecto"], 1.5)
+        self.assertEqual(imagenes[0]["ruta_procesada"], os.path.join(self.rollo, "procesado", "a.png"))
+        self.assertEqual(imagenes[1]["tipos"], [])
+        self.assertEqual(imagenes[1]["mayor_defecto"], 0.0)
+        self.assertIsNone(imagenes[1]["ruta_procesada"])
+
+class HiloFalso:
+    """Simula un HiloInformesLote con un informe ya generado y otro en curso al cancelar."""
+    def __init__(self):
+        self.generados = [{"id_control": 1, "ruta_pdf": "1.pdf", "generado_por": 3}]
+        self.eventos = []
+
+    def cancelar(self):
+        self.eventos.append("cancelar")
+
+    def wait(self):
+        self.eventos.append("wait")
+        self.generados.append({"id_control": 2, "ruta_pdf": "2.pdf", "generado_por": 3})
+
+class VentanaFalsa:
+    closeEvent = HistoricoControlesWindow.closeEvent
+    registrar_informes_al_cerrar = HistoricoControlesWindow.registrar_informes_al_cerrar
+
+    def __init__(self, hilo_informes=None, informes_por_registrar=None):
+        self.peticiones = MagicMock()
+        self.hilo_informes = hilo_informes
+        self.informes_por_registrar = informes_por_registrar
+        self.cerrada = False
+
+class TestCierreHistorico(unittest.TestCase):
+
+    def cerrar(self, ventana):
+        orden = []
+        api = MagicMock()
+        api.registrar_informes.side_effect = lambda informes: orden.append(("registrar", [i["id_control"] for i in informes]))
+        with patch.object(historico_controles_app, "api", api), \
+                patch.object(historico_controles_app, "revocar_token_sesion", lambda ventana: orden.append("revocar")):
+            evento = MagicMock()
+            ventana.closeEvent(evento)
+        evento.accept.assert_called_once()
+        self.assertTrue(ventana.cerrada)
+        return orden
+
+    def test_cierre_registra_informes_generados(self):
+        """Verifica que al cerrar se registran los PDF ya generados antes de revocar el token."""
+        hilo = HiloFalso()
+        orden = self.cerrar(VentanaFalsa(hilo_informes=hilo))
+        self.assertEqual(hilo.eventos, ["cancelar", "wait"])
+        self.assertEqual(orden, [("registrar", [1, 2]), "revocar"])
+
+    def test_cierre_con_registro_en_curso(self):
+        """Verifica que un registro cancelado por el cierre se repite antes de revocar el token."""
+        orden = self.cerrar(VentanaFalsa(informes_por_registrar=[{"id_control": 5, "ruta_pdf": "5.pdf", "generado_por": 3}]))
+        self.assertEqual(orden, [("registrar", [5]), "revocar"])
+        self.assertEqual(self.cerrar(VentanaFalsa()), ["revocar"])
+
+if __name__ == "__main__":
+    unittest.main()
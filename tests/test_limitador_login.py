@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+from limitador import LimitadorIntentos
+
+class TestLimitadorLogin(unittest.TestCase):
+
+    def test_bloqueo_tras_max_intentos(self):
+        """Verifica que una cuenta se bloquea al alcanzar el número máximo de fallos."""
+        limitador = LimitadorIntentos(max_intentos=3, ventana=60)
+        for _ in range(2):
+            limitador.registrar_fallo("operario1@isli.com")
+        self.assertEqual(limitador.segundos_bloqueo("operario1@isli.com"), 0)
+        limitador.registrar_fallo("operario1@isli.com")
+        self.assertGreater(limitador.segundos_bloqueo("operario1@isli.com"), 0)
+        # Otras cuentas no se ven afectadas
+        self.assertEqual(limitador.segundos_bloqueo("admin1@isli.com"), 0)
+
+    def test_login_correcto_reinicia_contador(self):
+        """Verifica que un login correcto olvida los fallos previos."""
+        limitador = LimitadorIntentos(max_intentos=2, ventana=60)
+        limitador.registrar_fallo("a@isli.com")
+        limitador.reiniciar("a@isli.com")
+        limitador.registrar_fallo("a@isli.com")
+        self.assertEqual(limitador.segundos_bloqueo("a@isli.com"), 0)
+
+    def test_ventana_caducada(self):
+        """Verifica que los fallos fuera de la ventana no cuentan."""
+        limitador = LimitadorIntentos(max_intentos=1, ventana=0)
+        limitador.registrar_fallo("a@isli.com")
+        self.assertEqual(limitador.segundos_bloqueo("a@isli.com"), 0)
+
+if __name__ == "__main__":
+    unittest.main()
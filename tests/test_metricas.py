@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+from metricas import Contador, Histograma, Indicador, RegistroMetricas
+from instrumentacion_db import ConexionMedida, etiqueta_sentencia, latencia_sentencias, conexiones_en_uso
+
+class CursorFalso:
+    def __init__(self):
+        self.sentencias = []
+        self.lastrowid = 7
+
+    def execute(self, sql, params=None):
+        self.sentencias.append((sql, params))
+
+    def executemany(self, sql, secuencia_params):
+        self.sentencias.extend((sql, params) for params in secuencia_params)
+
+class ConexionFalsa:
+    def cursor(self, dictionary=False):
+        return CursorFalso()
+
+    def commit(self):
+        return "commit"
+
+    def close(self):
+        pass
+
+class TestMetricas(unittest.TestCase):
+
+    def test_exposicion_prometheus(self):
+        """Verifica el texto generado para contadores, indicadores con función e histogramas."""
+        registro = RegistroMetricas()
+        peticiones = registro.registrar(Contador("peticiones_total", "Peticiones", etiquetas=("ruta",)))
+        registro.registrar(Indicador("cola", "Trabajos en cola", funcion=lambda: 3))
+        latencia = registro.registrar(Histograma("latencia_segundos", "Latencia", buckets=(0.1, 1.0)))
+        peticiones.incrementar("/controles/historico")
+        peticiones.incrementar("/controles/historico")
+        latencia.observar(0.5)
+        texto = registro.exponer()
+        self.assertIn('peticiones_total{ruta="/controles/historico"} 2', texto)
+        self.assertIn("# TYPE cola gauge", texto)
+        self.assertIn("cola 3", texto)
+        self.assertIn('latencia_segundos_bucket{le="0.1"} 0', texto)
+        self.assertIn('latencia_segundos_bucket{le="1.0"} 1', texto)
+        self.assertIn("latencia_segundos_count 1", texto)
+
+    def test_etiqueta_sentencia(self):
+        """Verifica que cada sentencia se resume en operación y tabla principal."""
+        self.assertEqual(etiqueta_sentencia("\n  SELECT c.id FROM CONTROL_RESUMEN c WHERE 1=1"), "select control_resumen")
+        self.assertEqual(etiqueta_sentencia("INSERT INTO DEFECTO_MEDIDO (a) VALUES (%s)"), "insert defecto_medido")
+        self.assertEqual(etiqueta_sentencia("UPDATE rollo SET estado_rollo = 'x'"), "update rollo")
+        self.assertEqual(etiqueta_sentencia("SELECT 1"), "select")
+
+    def test_conexion_medida(self):
+        """Verifica que la conexión envuelta mide sentencias, cuenta conexiones y delega el resto."""
+        en_uso = conexiones_en_uso()
+        conn = ConexionMedida(ConexionFalsa())
+        self.assertEqual(conexiones_en_uso(), en_uso + 1)
+        antes = latencia_sentencias.resumen("select rollo")[0]
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM ROLLO WHERE id_rollo = %s", (1,))
+        self.assertEqual(latencia_sentencias.resumen("select rollo")[0], antes + 1)
+        antes = latencia_sentencias.resumen("insert informe_control")[0]
+        cursor.executemany("INSERT INTO INFORME_CONTROL (id_control) VALUES (%s)", [(1,), (2,)])
+        self.assertEqual(latencia_sentencias.resumen("insert informe_control")[0], antes + 1)
+        self.assertEqual(len(cursor.sentencias), 3)
+        self.assertEqual(cursor.lastrowid, 7)
+        self.assertEqual(conn.commit(), "commit")
+        conn.close()
+        conn.close()
+        self.assertEqual(conexiones_en_uso(), en_uso)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import unittest
+import pytest
+from PySide6.QtCore import Qt
+from modelos_tabla import (
+    AlmacenColumnar, Columna, ModeloTabla, LOTE_FILAS, ROL_ESTADO,
+    TIPO_TEXTO, TIPO_ENTERO, TIPO_DECIMAL, TIPO_BOOL
+)
+
+def crear_modelo():
+    almacen = AlmacenColumnar({
+        "id_control": TIPO_ENTERO,
+        "area": TIPO_DECIMAL,
+        "resultado": TIPO_TEXTO,
+        "tiene_informe": TIPO_BOOL,
+        "notas": TIPO_TEXTO
+    })
+    return ModeloTabla([
+        Columna("ID", "id_control"),
+        Columna("Área", "area", formato=lambda v: f"{v:.2f}", estado="resultado"),
+        Columna("Informe", "tiene_informe", formato=lambda v: "sí" if v else "no"),
+        Columna("Notas", "notas", editable=True)
+    ], almacen)
+
+@pytest.mark.usefixtures("app_qt")
+class TestModelosTabla(unittest.TestCase):
+
+    def test_carga_por_lotes(self):
+        """Verifica que 50.000 filas se cargan en el almacén y se entregan a la vista por lotes."""
+        modelo = crear_modelo()
+        filas = [{"id_control": i, "area": i / 100, "resultado": "ok", "notas": None} for i in range(50000)]
+        modelo.cargar(filas)
+        self.assertEqual(modelo.total_filas(), 50000)
+        self.assertEqual(modelo.rowCount(), LOTE_FILAS)
+        self.assertTrue(modelo.canFetchMore())
+        modelo.fetchMore()
+        self.assertEqual(modelo.rowCount(), 2 * LOTE_FILAS)
+        self.assertEqual(modelo.textos_fila(49999), ["49999", "499.99", "no", ""])
+
+    def test_datos_y_estado(self):
+        """Verifica el texto formateado y el estado que usa el delegado para colorear."""
+        modelo = crear_modelo()
+        modelo.cargar([{"id_control": 7, "area": "1.5", "resultado": "nok", "tiene_informe": True, "notas": "revisar"}])
+        self.assertEqual(modelo.data(modelo.index(0, 1)), "1.50")
+        self.assertEqual(modelo.data(modelo.index(0, 1), ROL_ESTADO), "nok")
+        self.assertIsNone(modelo.data(modelo.index(0, 0), ROL_ESTADO))
+        self.assertEqual(modelo.data(modelo.index(0, 2)), "sí")
+
+    def test_edicion_solo_en_columnas_editables(self):
+        """Verifica que solo las notas se pueden editar y que la edición se notifica."""
+        modelo = crear_modelo()
+        modelo.cargar([{"id_control": 1, "area": 0.2, "resultado": "ok", "notas": ""}])
+        editados = []
+        modelo.valor_editado.connect(lambda fila, clave, valor: editados.append((fila, clave, valor)))
+        self.assertFalse(modelo.flags(modelo.index(0, 0)) & Qt.ItemIsEditable)
+        self.assertFalse(modelo.setData(modelo.index(0, 0), "99"))
+        self.assertTrue(modelo.setData(modelo.index(0, 3), "nota nueva"))
+        self.assertEqual(modelo.valor(0, "notas"), "nota nueva")
+        self.assertEqual(editados, [(0, "notas", "nota nueva")])
+
+    def test_agregar_fila_visible(self):
+        """Las filas añadidas una a una (tabla de la ventana principal) son visibles de inmediato."""
+        modelo = crear_modelo()
+        modelo.agregar({"id_control": 1, "area": 0.5, "resultado": "ok"})
+        modelo.agregar({"id_control": 2, "area": 2.0, "resultado": "nok"})
+        self.assertEqual(modelo.rowCount(), 2)
+        self.assertEqual(modelo.data(modelo.index(1, 1), ROL_ESTADO), "nok")
+
+    def test_fijar_valor_no_notifica_edicion(self):
+        """Verifica que un cambio hecho desde el código se refleja en la vista sin emitir valor_editado."""
+        modelo = crear_modelo()
+        modelo.cargar([{"id_control": 1, "area": 0.2, "resultado": "ok", "tiene_informe": False}])
+        editados, cambios = [], []
+        modelo.valor_editado.connect(lambda *args: editados.append(args))
+        modelo.dataChanged.connect(lambda inicio, fin: cambios.append((inicio.row(), fin.row())))
+        modelo.fijar_valor(0, "tiene_informe", True)
+        self.assertEqual(modelo.data(modelo.index(0, 2)), "sí")
+        self.assertEqual(cambios, [(0, 0)])
+        self.assertEqual(editados, [])
+
+if __name__ == "__main__":
+    unittest.main()
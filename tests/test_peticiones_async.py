@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import time
+import threading
+import unittest
+import pytest
+from PySide6.QtCore import QCoreApplication
+from peticiones_async import EjecutorPeticiones
+
+@pytest.mark.usefixtures("app_qt")
+class TestEjecutorPeticiones(unittest.TestCase):
+
+    def esperar(self, condicion, limite=5):
+        inicio = time.monotonic()
+        while not condicion() and time.monotonic() - inicio < limite:
+            QCoreApplication.processEvents()
+            time.sleep(0.01)
+
+    def test_resultado_en_hilo_de_interfaz(self):
+        """Verifica que el callback recibe el resultado en el hilo principal."""
+        ejecutor = EjecutorPeticiones()
+        recibidos = []
+        ejecutor.ejecutar(lambda: threading.current_thread(),
+                          al_completar=lambda hilo: recibidos.append((hilo, threading.current_thread())))
+        self.esperar(lambda: recibidos)
+        hilo_trabajo, hilo_callback = recibidos[0]
+        self.assertIsNot(hilo_trabajo, threading.main_thread())
+        self.assertIs(hilo_callback, threading.main_thread())
+
+    def test_deduplicacion_y_reemplazo(self):
+        """Verifica que una clave en curso se comparte y que reemplazar descarta la respuesta anterior."""
+        ejecutor = EjecutorPeticiones()
+        llamadas, resultados = [], []
+        liberar = threading.Event()
+
+        def lenta(valor):
+            llamadas.append(valor)
+            liberar.wait(2)
+            return valor
+
+        primera = ejecutor.ejecutar(lenta, 1, al_completar=resultados.append, clave="historico")
+        repetida = ejecutor.ejecutar(lenta, 1, al_completar=resultados.append, clave="historico")
+        self.assertIs(primera, repetida)
+        ejecutor.ejecutar(lenta, 2, al_completar=resultados.append, clave="historico", reemplazar=True)
+        self.assertTrue(primera.cancelada)
+        liberar.set()
+        self.esperar(lambda: not ejecutor.en_curso("historico") and len(llamadas) == 2)
+        self.esperar(lambda: resultados)
+        self.assertEqual(resultados, [2])
+
+    def test_error_en_callback_de_fallo(self):
+        """Verifica que las excepciones de la función llegan a al_fallar."""
+        ejecutor = EjecutorPeticiones()
+        errores = []
+
+        def falla():
+            raise ValueError("sin conexión")
+
+        ejecutor.ejecutar(falla, al_fallar=errores.append)
+        self.esperar(lambda: errores)
+        self.assertIsInstance(errores[0], ValueError)
+
+if __name__ == "__main__":
+    unittest.main()
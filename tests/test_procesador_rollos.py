@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import json
+import tempfile
+import unittest
+import pytest
+from unittest.mock import patch
+import numpy as np
+import cv2
+from analisis_defectos.procesador_rollos import analizar_rollo
+from analisis_async import HiloAnalisisRollo
+
+IMAGENES = ["img_0.png", "img_1.png", "img_2.png"]
+
+class SegmentacionFalsa:
+    """Sustituye a BlackSpotsSegmentation: las imágenes de prueba no tienen recortes que segmentar."""
+    def __init__(self, *args):
+        pass
+
+    def draw_bounding_box(self, imagen, rect, tipo):
+        return imagen
+
+@pytest.mark.usefixtures("app_qt")
+class TestAnalizarRollo(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = self.tmp.name
+        self.rollo = os.path.join(self.base, "R1")
+        os.makedirs(self.rollo)
+        etiquetas = []
+        for nombre in IMAGENES:
+            cv2.imwrite(os.path.join(self.rollo, nombre), np.full((20, 20), 200, dtype=np.uint8))
+            etiquetas.append({"originalFileName": nombre, "labelSource": "manual", "crops": []})
+        with open(os.path.join(self.base, "etiquetas.json"), "w", encoding="utf-8") as f:
+            json.dump(etiquetas, f)
+        parche = patch("analisis_defectos.procesador_rollos.BlackSpotsSegmentation", SegmentacionFalsa)
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def analizar(self, **kwargs):
+        return analizar_rollo(self.base, "R1", json_filename="etiquetas.json", area_umbral=1.0, **kwargs)
+
+    def test_al_procesar_recibe_cada_imagen(self):
+        """Verifica que al_procesar recibe (resultado, procesadas, total) tras cada imagen."""
+        llamadas = []
+        resultados = self.analizar(al_procesar=lambda resultado, procesadas, total: llamadas.append((dict(resultado), procesadas, total)))
+        self.assertEqual([(r["nombre_archivo"], p, t) for r, p, t in llamadas], [(n, i, 3) for i, n in enumerate(IMAGENES, start=1)])
+        self.assertEqual([r for r, _, _ in llamadas], resultados)
+        # Cada resultado se entrega ya escrito en disco
+        for resultado, _, _ in llamadas:
+            self.assertTrue(os.path.isfile(resultado["ruta_procesada"]))
+            self.assertTrue(os.path.isfile(resultado["ruta_original"]))
+
+    def test_cancelado_detiene_antes_de_la_siguiente_imagen(self):
+        """Verifica que cancelar detiene el análisis antes de la siguiente imagen y devuelve los parciales."""
+        procesadas = []
+        resultados = self.analizar(
+            al_procesar=lambda resultado, num, total: procesadas.append(num),
+            cancelado=lambda: len(procesadas) >= 1
+        )
+        self.assertEqual(procesadas, [1])
+        self.assertEqual([r["nombre_archivo"] for r in resultados], ["img_0.png"])
+        # Las imágenes no procesadas siguen en la raíz del rollo
+        self.assertTrue(os.path.isfile(os.path.join(self.rollo, "img_1.png")))
+        self.assertFalse(os.path.exists(os.path.join(self.rollo, "procesado", "img_1.png")))
+
+    def test_hilo_publica_imagenes_y_se_cancela(self):
+        """Verifica las señales de HiloAnalisisRollo y que cancelar entrega los resultados parciales."""
+        hilo = HiloAnalisisRollo(self.base, "R1", 1.0)
+        emitidas, completados = [], []
+
+        def al_recibir(procesadas, total, resultado):
+            emitidas.append((procesadas, total, resultado["nombre_archivo"]))
+            if procesadas == 2:
+                hilo.cancelar()
+
+        hilo.imagen_procesada.connect(al_recibir)
+        hilo.completado.connect(completados.append)
+        hilo.fallido.connect(lambda e: self.fail(str(e)))
+        with patch("analisis_async.analizar_rollo", lambda **kwargs: analizar_rollo(json_filename="etiquetas.json", **kwargs)):
+            hilo.run()  # En el hilo del test: las señales se entregan en el acto
+
+        self.assertEqual(emitidas, [(1, 3, "img_0.png"), (2, 3, "img_1.png")])
+        self.assertEqual(len(completados), 1)
+        self.assertEqual([r["nombre_archivo"] for r in completados[0]], ["img_0.png", "img_1.png"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+import json
+from datetime import datetime
+from decimal import Decimal
+from respuestas import RespuestaJSONRapida
+
+class TestRespuestaJSONRapida(unittest.TestCase):
+
+    def test_filas_con_fecha_y_decimal(self):
+        """Verifica que datetime y Decimal se serializan igual que con el codificador de FastAPI."""
+        filas = [{"id_control": 1, "fecha_control": datetime(2024, 5, 3, 14, 30),
+                  "umbral_tamano_defecto": Decimal("0.75"), "num": Decimal("3"), "notas": "Ñandú"}]
+        cuerpo = json.loads(RespuestaJSONRapida(filas).body)
+        self.assertEqual(cuerpo, [{"id_control": 1, "fecha_control": "2024-05-03T14:30:00",
+                                   "umbral_tamano_defecto": 0.75, "num": 3, "notas": "Ñandú"}])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import tempfile
+import unittest
+import pytest
+from analisis_defectos.restauracion_rollos import DiarioRollos, restaurar_rollo
+from analisis_async import HiloRestauracionRollos
+
+@pytest.mark.usefixtures("app_qt")
+class TestRestauracionRollos(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def crear_rollo_analizado(self, nombre, imagenes, sin_etiquetar=()):
+        """Reproduce la estructura que deja `analizar_rollo` en modo clásico."""
+        ruta = os.path.join(self.base, nombre)
+        os.makedirs(os.path.join(ruta, "originales"))
+        os.makedirs(os.path.join(ruta, "procesado"))
+        for imagen in imagenes:
+            with open(os.path.join(ruta, "originales", imagen), "w") as f:
+                f.write("original")
+            with open(os.path.join(ruta, "procesado", imagen), "w") as f:
+                f.write("anotada")
+        for imagen in sin_etiquetar:
+            open(os.path.join(ruta, imagen), "w").close()
+        return ruta
+
+    def test_diario_registra_y_quita_rollos(self):
+        """Verifica que el diario anota cada rollo una vez y lo olvida al quitarlo."""
+        diario = DiarioRollos(self.base)
+        self.assertEqual(diario.rollos(), [])
+        diario.registrar("rollo_b")
+        diario.registrar("rollo_a")
+        diario.registrar("rollo_b")
+        self.assertEqual(DiarioRollos(self.base).rollos(), ["rollo_a", "rollo_b"])
+        diario.quitar("rollo_b")
+        diario.quitar("inexistente")
+        self.assertEqual(diario.rollos(), ["rollo_a"])
+
+    def test_restaura_originales_y_descarta_procesado(self):
+        """Verifica que las originales y las imágenes sin etiquetar quedan en la raíz del rollo."""
+        ruta = self.crear_rollo_analizado("rollo_a", ["img_0.jpg", "img_1.jpg"], sin_etiquetar=["img_2.jpg"])
+
+        self.assertTrue(restaurar_rollo(self.base, "rollo_a"))
+        self.assertEqual(sorted(os.listdir(ruta)), ["img_0.jpg", "img_1.jpg", "img_2.jpg"])
+        with open(os.path.join(ruta, "img_0.jpg")) as f:
+            self.assertEqual(f.read(), "original")
+        self.assertEqual(os.listdir(self.base), ["rollo_a"])
+
+    def test_rollo_sin_analizar_no_se_toca(self):
+        """Verifica que un rollo sin carpeta 'originales' se deja como está."""
+        ruta = os.path.join(self.base, "rollo_a")
+        os.makedirs(ruta)
+        open(os.path.join(ruta, "img_0.jpg"), "w").close()
+        self.assertFalse(restaurar_rollo(self.base, "rollo_a"))
+        self.assertFalse(restaurar_rollo(self.base, "inexistente"))
+        self.assertEqual(os.listdir(ruta), ["img_0.jpg"])
+
+    def test_conflicto_no_sobrescribe_originales(self):
+        """Verifica que si un archivo de la raíz coincide con una original no se modifica nada."""
+        ruta = self.crear_rollo_analizado("rollo_a", ["img_0.jpg"], sin_etiquetar=["img_0.jpg"])
+        with self.assertRaises(FileExistsError):
+            restaurar_rollo(self.base, "rollo_a")
+        with open(os.path.join(ruta, "originales", "img_0.jpg")) as f:
+            self.assertEqual(f.read(), "original")
+        self.assertTrue(os.path.isdir(os.path.join(ruta, "procesado")))
+
+    def test_completa_restauracion_interrumpida(self):
+        """Verifica que una restauración cortada tras sacar 'originales' se completa."""
+        ruta = self.crear_rollo_analizado("rollo_a", ["img_0.jpg"])
+        os.rename(os.path.join(ruta, "originales"), os.path.join(self.base, ".rollo_a.restaurando"))
+        os.rename(os.path.join(ruta, "procesado"), os.path.join(self.base, ".rollo_a.descartado"))
+
+        self.assertTrue(restaurar_rollo(self.base, "rollo_a"))
+        self.assertEqual(os.listdir(ruta), ["img_0.jpg"])
+        self.assertEqual(os.listdir(self.base), ["rollo_a"])
+
+    def interrumpir_con_carpeta_no_vacia(self, nombre):
+        """Restauración cortada tras sacar 'originales', con un archivo nuevo en el rollo (p. ej. Thumbs.db)."""
+        ruta = self.crear_rollo_analizado(nombre, ["img_0.jpg"])
+        os.rename(os.path.join(ruta, "originales"), os.path.join(self.base, f".{nombre}.restaurando"))
+        os.rename(os.path.join(ruta, "procesado"), os.path.join(self.base, f".{nombre}.descartado"))
+        open(os.path.join(ruta, "Thumbs.db"), "w").close()
+        return ruta
+
+    def test_restauracion_interrumpida_con_rollo_no_vacio(self):
+        """Verifica que si la carpeta intermedia no puede volver a su sitio se lanza un error sin tocar nada."""
+        ruta = self.interrumpir_con_carpeta_no_vacia("rollo_a")
+        with self.assertRaises(FileExistsError):
+            restaurar_rollo(self.base, "rollo_a")
+        self.assertEqual(os.listdir(ruta), ["Thumbs.db"])
+        self.assertEqual(os.listdir(os.path.join(self.base, ".rollo_a.restaurando")), ["img_0.jpg"])
+
+    def test_hilo_solo_quita_del_diario_los_rollos_restaurados(self):
+        """Verifica que el diario conserva los rollos que fallan o no tenían nada que restaurar."""
+        self.crear_rollo_analizado("rollo_ok", ["img_0.jpg"])
+        self.interrumpir_con_carpeta_no_vacia("rollo_cortado")
+        os.makedirs(os.path.join(self.base, "rollo_intacto"))
+        diario = DiarioRollos(self.base)
+        for rollo in ("rollo_ok", "rollo_cortado", "rollo_intacto"):
+            diario.registrar(rollo)
+
+        errores = []
+        hilo = HiloRestauracionRollos(self.base)
+        hilo.completado.connect(errores.extend)
+        hilo.run()  # En el hilo del test: las señales se entregan en el acto
+
+        self.assertEqual([rollo for rollo, _ in errores], ["rollo_cortado"])
+        self.assertEqual(diario.rollos(), ["rollo_cortado", "rollo_intacto"])
+        self.assertEqual(os.listdir(os.path.join(self.base, "rollo_ok")), ["img_0.jpg"])
+
+if __name__ == "__main__":
+    unittest.main()
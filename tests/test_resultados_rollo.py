@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend")))
+import unittest
+from resultados_rollo import ResultadosRollo
+
+def resultado(nombre, areas, tipos):
+    return {
+        "nombre_archivo": nombre,
+        "areas_mm2": areas,
+        "tipos": tipos,
+        "ruta_original": f"/rollo/originales/{nombre}",
+        "ruta_procesada": f"/rollo/procesado/{nombre}"
+    }
+
+class TestResultadosRollo(unittest.TestCase):
+
+    def setUp(self):
+        self.resultados = ResultadosRollo("rollo_1", umbral=1.0)
+        self.resultados.agregar(resultado("a.png", [0.2, 0.8], ["punto-negro"]))
+        self.resultados.agregar(resultado("b.png", [1.5], ["pegote-cascarilla", "punto-negro"]))
+        self.resultados.agregar(resultado("c.png", [], []))
+
+    def test_resumen_del_rollo(self):
+        """Verifica el mayor defecto, los tipos y el resultado global calculados en memoria."""
+        self.assertEqual(self.resultados.mayor_defecto(), 1.5)
+        self.assertEqual(self.resultados.tipos_unicos(), ["pegote-cascarilla", "punto-negro"])
+        self.assertEqual(self.resultados.defectos_intolerables(), 1)
+        self.assertEqual(self.resultados.resultado_global(), "nok")
+
+    def test_imagen_sin_defectos(self):
+        """Una imagen sin defectos se muestra con 0.0, sin rango y con tipo '—'."""
+        imagen = self.resultados[2]
+        self.assertIsNone(imagen.minimo)
+        self.assertEqual(imagen.mayor_defecto, 0.0)
+        self.assertEqual(imagen.tipos_texto, "—")
+        self.assertEqual(imagen.clasificacion(1.0), "ok")
+
+    def test_imagenes_para_guardar(self):
+        """Verifica que el payload de imágenes tiene el formato de /controles/nuevo."""
+        imagenes = self.resultados.imagenes_para_guardar("2025-01-01T10:00:00")
+        self.assertEqual(len(imagenes), 3)
+        self.assertEqual(imagenes[0]["min_dim_defecto_medido"], 0.2)
+        self.assertEqual(imagenes[0]["max_dim_defecto_medido"], 0.8)
+        self.assertEqual(imagenes[1]["clasificacion"], "nok")
+        self.assertEqual(imagenes[1]["defectos"][1], {
+            "area": 1.5, "tipo_valor": "max", "tipo_defecto": "pegote-cascarilla, punto-negro"
+        })
+        self.assertEqual(imagenes[2]["min_dim_defecto_medido"], 0.0)
+
+if __name__ == "__main__":
+    unittest.main()
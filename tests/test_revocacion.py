@@ -0,0 +1,36 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+import time
+import tempfile
+from revocacion import AlmacenRevocacionMemoria, AlmacenRevocacionSQLite
+
+class TestAlmacenRevocacion(unittest.TestCase):
+
+    def test_memoria_expulsa_al_expirar(self):
+        """Verifica que un jti revocado deja de almacenarse al llegar su exp."""
+        almacen = AlmacenRevocacionMemoria()
+        almacen.revocar("vigente", time.time() + 60)
+        almacen.revocar("caducado", time.time() - 1)
+        self.assertTrue(almacen.esta_revocado("vigente"))
+        self.assertFalse(almacen.esta_revocado("caducado"))
+        self.assertFalse(almacen.esta_revocado("otro"))
+        self.assertEqual(len(almacen), 1)
+
+    def test_sqlite_compartido_entre_instancias(self):
+        """Verifica que dos instancias (workers) sobre el mismo archivo ven las mismas revocaciones."""
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, "revocados.sqlite3")
+            worker1 = AlmacenRevocacionSQLite(ruta)
+            worker2 = AlmacenRevocacionSQLite(ruta)
+            worker1.revocar("abc", time.time() + 60)
+            worker1.revocar("viejo", time.time() - 1)
+            self.assertTrue(worker2.esta_revocado("abc"))
+            self.assertFalse(worker2.esta_revocado("viejo"))
+            self.assertEqual(len(worker2), 1)
+            worker1._local.conn.close()
+            worker2._local.conn.close()
+
+if __name__ == "__main__":
+    unittest.main()
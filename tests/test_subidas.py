@@ -0,0 +1,70 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+# Almacenes del servidor en una carpeta temporal (se leen al importar los módulos)
+_TMP = tempfile.mkdtemp()
+os.environ.setdefault("ANALISIS_BASE_FOLDER", os.path.join(_TMP, "almacen"))
+os.environ.setdefault("SUBIDAS_FOLDER", os.path.join(_TMP, "subidas"))
+import asyncio
+import hashlib
+import unittest
+from unittest.mock import patch
+import httpx
+from fastapi import FastAPI
+from almacen_imagenes import AlmacenImagenes
+from seguridad import usuario_actual
+from routers import subidas
+
+class TestSubirFragmento(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.rollos = os.path.join(self.tmp.name, "almacen")
+        self.almacen = AlmacenImagenes(self.rollos, os.path.join(self.tmp.name, "datos"))
+        parche = patch.object(subidas, "almacen", self.almacen)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.app = FastAPI()
+        self.app.include_router(subidas.router)
+        self.app.dependency_overrides[usuario_actual] = lambda: {"sub": "ana"}
+        self.contenido = os.urandom(300 * 1024)
+        self.sha = hashlib.sha256(self.contenido).hexdigest()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def subir(self, id_subida, datos, offset=0, veces=2):
+        async def cuerpo_lento():
+            # Cede el bucle de eventos entre fragmentos para que la otra petición intente entrar
+            for inicio in range(0, len(datos), 64 * 1024):
+                yield datos[inicio:inicio + 64 * 1024]
+                await asyncio.sleep(0.01)
+
+        transporte = httpx.ASGITransport(app=self.app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://test") as cliente:
+            return await asyncio.gather(*(
+                cliente.put(f"/subidas/{id_subida}", params={"offset": offset}, content=cuerpo_lento())
+                for _ in range(veces)
+            ))
+
+    def test_peticiones_simultaneas_no_se_mezclan(self):
+        """Verifica que dos PUT al mismo offset se atienden de uno en uno: el segundo recibe 409."""
+        mitad = len(self.contenido) // 2
+        sub = self.almacen.iniciar_subida("rollo1", "img.png", len(self.contenido), self.sha)
+        respuestas = asyncio.run(self.subir(sub["id_subida"], self.contenido[:mitad]))
+        self.assertEqual(sorted(r.status_code for r in respuestas), [200, 409])
+        rechazada = next(r for r in respuestas if r.status_code == 409)
+        self.assertEqual(rechazada.json()["detail"]["offset"], mitad)
+        self.assertEqual(self.almacen.estado_subida(sub["id_subida"])["offset"], mitad)
+
+        # El cliente reanuda desde el offset indicado y completa la imagen
+        respuesta, = asyncio.run(self.subir(sub["id_subida"], self.contenido[mitad:], offset=mitad, veces=1))
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.json()["completada"])
+        with open(os.path.join(self.rollos, "rollo1", "img.png"), "rb") as f:
+            self.assertEqual(f.read(), self.contenido)
+        self.assertEqual(len(subidas._bloqueos_subidas), 0)
+
+if __name__ == "__main__":
+    unittest.main()
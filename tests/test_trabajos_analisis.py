@@ -0,0 +1,93 @@
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+# Almacenes del servidor en una carpeta temporal (se leen al importar los módulos)
+_TMP = tempfile.mkdtemp()
+os.environ["ANALISIS_BASE_FOLDER"] = os.path.join(_TMP, "almacen")
+os.environ["SUBIDAS_FOLDER"] = os.path.join(_TMP, "subidas")
+import io
+import time
+import unittest
+from fastapi import HTTPException, UploadFile
+from trabajos_analisis import GestorAnalisis, ColaLlenaError
+
+def analisis_falso(id_trabajo, base_path, rollo, area_umbral, pixel_to_mm, progreso_compartido):
+    """Sustituye a `analizar_rollo` en el proceso hijo: 'lento' tarda, 'falla' lanza un error."""
+    if rollo == "lento":
+        time.sleep(1.5)
+    if rollo == "falla":
+        raise ValueError("rollo corrupto")
+    progreso_compartido[id_trabajo] = (2, 2)
+    return [{"nombre_archivo": f"{rollo}.png", "area_umbral": area_umbral}]
+
+def esperar_fin(gestor, id_trabajo, limite=30):
+    fin = time.time() + limite
+    while time.time() < fin:
+        estado = gestor.estado(id_trabajo)
+        if estado["estado"] not in ("pendiente", "en_curso"):
+            return estado
+        time.sleep(0.05)
+    raise AssertionError(f"El trabajo {id_trabajo} no terminó")
+
+class TestGestorAnalisis(unittest.TestCase):
+
+    def setUp(self):
+        self.gestor = GestorAnalisis(max_workers=1, max_cola=1, funcion_trabajo=analisis_falso)
+
+    def tearDown(self):
+        self.gestor.cerrar()
+
+    def test_trabajo_completado(self):
+        """Verifica que un trabajo encolado termina con su progreso y sus resultados."""
+        id_trabajo = self.gestor.encolar("/base", "R1", 2.5, 0.1)
+        estado = esperar_fin(self.gestor, id_trabajo)
+        self.assertEqual(estado["estado"], "completado")
+        self.assertEqual((estado["procesadas"], estado["total"]), (2, 2))
+        self.assertIsNotNone(estado["fecha_fin"])
+        self.assertEqual(self.gestor.resultados(id_trabajo), [{"nombre_archivo": "R1.png", "area_umbral": 2.5}])
+
+    def test_trabajo_con_error(self):
+        """Verifica que una excepción en el proceso hijo deja el trabajo en 'error' con el mensaje."""
+        id_trabajo = self.gestor.encolar("/base", "falla", 2.5, 0.1)
+        estado = esperar_fin(self.gestor, id_trabajo)
+        self.assertEqual(estado["estado"], "error")
+        self.assertIn("rollo corrupto", estado["error"])
+        self.assertIsNone(self.gestor.resultados(id_trabajo))
+
+    def test_cola_llena_y_cancelacion(self):
+        """Verifica el límite de trabajos activos y que solo se cancelan los que no han empezado."""
+        en_curso = self.gestor.encolar("/base", "lento", 2.5, 0.1)
+        en_espera = self.gestor.encolar("/base", "R2", 2.5, 0.1)
+        with self.assertRaises(ColaLlenaError):
+            self.gestor.encolar("/base", "R3", 2.5, 0.1)
+
+        self.assertTrue(self.gestor.cancelar(en_espera))
+        self.assertEqual(self.gestor.estado(en_espera)["estado"], "cancelado")
+        # Al cancelar se libera su hueco en la cola
+        otro = self.gestor.encolar("/base", "R3", 2.5, 0.1)
+
+        fin = time.time() + 10
+        while not self.gestor._trabajos[en_curso]["futuro"].running() and time.time() < fin:
+            time.sleep(0.05)
+        self.assertFalse(self.gestor.cancelar(en_curso))
+        self.assertEqual(esperar_fin(self.gestor, en_curso)["estado"], "completado")
+        self.assertEqual(esperar_fin(self.gestor, otro)["estado"], "completado")
+        self.assertFalse(self.gestor.cancelar("no_existe"))
+        self.assertIsNone(self.gestor.estado("no_existe"))
+
+class TestCrearTrabajoDesdeImagenes(unittest.TestCase):
+
+    def test_rollo_fuera_del_almacen(self):
+        """Verifica que un nombre de rollo con rutas se rechaza antes de escribir ninguna imagen."""
+        from routers.analisis import crear_trabajo_desde_imagenes
+        for rollo in ("..", "../fuera", "a/b", ""):
+            imagen = UploadFile(file=io.BytesIO(b"datos"), filename="img_0.png")
+            with self.assertRaises(HTTPException) as ctx:
+                crear_trabajo_desde_imagenes(rollo=rollo, area_umbral=1.0, pixel_to_mm=0.1, imagenes=[imagen])
+            self.assertEqual(ctx.exception.status_code, 400)
+        self.assertFalse(os.path.exists(os.path.join(_TMP, "img_0.png")))
+        self.assertFalse(os.path.exists(os.path.join(_TMP, "fuera")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+import trazas
+from trazas import iniciar_traza, finalizar_traza, span, normalizar_id_peticion, id_peticion_actual
+from instrumentacion_db import CursorMedido
+
+class CursorFalso:
+    rowcount = 1
+
+    def execute(self, sql, params=None):
+        pass
+
+    def executemany(self, sql, secuencia_params):
+        pass
+
+class TestTrazas(unittest.TestCase):
+
+    def setUp(self):
+        self.muestreo = trazas.TRAZAS_MUESTREO
+        trazas.TRAZAS_MUESTREO = 1.0
+
+    def tearDown(self):
+        trazas.TRAZAS_MUESTREO = self.muestreo
+
+    def test_traza_con_spans_sql(self):
+        """Verifica que los execute y los bloques marcados quedan como spans de la petición."""
+        token = iniciar_traza("abc123", "POST", "/controles/nuevo")
+        self.assertEqual(id_peticion_actual(), "abc123")
+        cursor = CursorMedido(CursorFalso())
+        with span("insertar_imagenes", imagenes=2):
+            cursor.execute("INSERT INTO IMG_DEFECTO (a) VALUES (%s)", (1,))
+            cursor.execute("INSERT INTO IMG_DEFECTO (a) VALUES (%s)", (2,))
+        registro = finalizar_traza(token, 200, "/controles/nuevo")
+        self.assertIsNone(id_peticion_actual())
+        self.assertEqual(registro["id_peticion"], "abc123")
+        self.assertEqual([s["nombre"] for s in registro["spans"]], ["sql", "sql", "insertar_imagenes"])
+        self.assertEqual(registro["spans"][0]["sentencia"], "insert img_defecto")
+        self.assertEqual(registro["spans"][2]["imagenes"], 2)
+
+    def test_executemany_como_span_sql(self):
+        """Verifica que un executemany queda medido como un único span de su sentencia."""
+        token = iniciar_traza("lote1", "POST", "/controles/informe")
+        cursor = CursorMedido(CursorFalso())
+        cursor.executemany("INSERT INTO INFORME_CONTROL (id_control) VALUES (%s)", [(1,), (2,)])
+        registro = finalizar_traza(token, 200, "/controles/informe")
+        self.assertEqual([(s["nombre"], s["sentencia"]) for s in registro["spans"]], [("sql", "insert informe_control")])
+
+    def test_muestreo_descarta_peticiones_rapidas(self):
+        """Verifica que con muestreo 0 las peticiones rápidas no se registran."""
+        trazas.TRAZAS_MUESTREO = 0.0
+        token = iniciar_traza("rapida", "GET", "/")
+        self.assertIsNone(finalizar_traza(token, 200))
+
+    def test_id_peticion_del_cliente(self):
+        """Verifica que se respeta un X-Request-ID válido y se sustituye uno sospechoso."""
+        self.assertEqual(normalizar_id_peticion("cliente-42"), "cliente-42")
+        self.assertNotEqual(normalizar_id_peticion("x\nInyectado: 1"), "x\nInyectado: 1")
+        self.assertEqual(len(normalizar_id_peticion(None)), 32)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "backend")))
+import unittest
+import tempfile
+from versiones import VersionesMemoria, VersionesSQLite, calcular_etag, etag_coincide
+
+class TestVersionesTablas(unittest.TestCase):
+
+    def test_etag_cambia_al_escribir(self):
+        """Verifica que el ETag solo cambia cuando se incrementa la versión de la tabla leída."""
+        versiones = VersionesMemoria()
+        etag = calcular_etag(versiones.version("CONTROL_RESUMEN"), "/controles/historico", ())
+        versiones.incrementar("USUARIO")
+        self.assertEqual(etag, calcular_etag(versiones.version("CONTROL_RESUMEN"), "/controles/historico", ()))
+        versiones.incrementar("CONTROL_RESUMEN")
+        self.assertNotEqual(etag, calcular_etag(versiones.version("CONTROL_RESUMEN"), "/controles/historico", ()))
+
+    def test_etag_depende_de_los_parametros(self):
+        """Verifica que dos filtros distintos sobre la misma versión no comparten ETag."""
+        self.assertNotEqual(
+            calcular_etag("1", "/controles/historico", (("usuario", "ana"),)),
+            calcular_etag("1", "/controles/historico", (("usuario", "luis"),))
+        )
+
+    def test_if_none_match(self):
+        """Verifica la comparación débil de If-None-Match, con listas y comodín."""
+        etag = calcular_etag("1")
+        self.assertTrue(etag_coincide(etag, etag))
+        self.assertTrue(etag_coincide(f'"otro", {etag.removeprefix("W/")}', etag))
+        self.assertTrue(etag_coincide("*", etag))
+        self.assertFalse(etag_coincide(None, etag))
+        self.assertFalse(etag_coincide('W/"otro"', etag))
+
+    def test_sqlite_compartido_entre_instancias(self):
+        """Verifica que las versiones escritas por un worker las ve otro sobre el mismo archivo."""
+        with tempfile.TemporaryDirectory() as tmp:
+            ruta = os.path.join(tmp, "versiones.sqlite3")
+            worker1 = VersionesSQLite(ruta)
+            worker2 = VersionesSQLite(ruta)
+            antes = worker2.version("USUARIO")
+            worker1.incrementar("USUARIO")
+            self.assertNotEqual(antes, worker2.version("USUARIO"))
+
+if __name__ == "__main__":
+    unittest.main()